@@ -0,0 +1,59 @@
+"""
+Compares two result files of ``python -m benchmarks.run``.
+
+Prints the median time of every benchmark in both files and the ratio of the
+new time to the old time. Ratios above ``--threshold`` are flagged as
+regressions and make the command exit with status 1.
+
+Example::
+
+    python -m benchmarks.compare v2.1.3.json v2.2.0.json
+"""
+import argparse
+import json
+import sys
+
+
+def _load_results(filename):
+    with open(filename) as fp:
+        report = json.load(fp)
+    return {(r['backend'], r['name']): r for r in report['results']}
+
+
+def compare(old_results, new_results, threshold):
+    """Returns the lines of the comparison and whether there are regressions"""
+    lines = ['%-18s %-6s %11s %11s %8s' % ('benchmark', 'backend', 'old', 'new', 'ratio')]
+    regressed = False
+    for key in sorted(set(old_results) & set(new_results)):
+        old = old_results[key]['median_seconds']
+        new = new_results[key]['median_seconds']
+        ratio = new / old if old else float('inf')
+        flag = ''
+        if ratio > threshold:
+            flag = ' REGRESSION'
+            regressed = True
+        lines.append('%-18s %-6s %10.4fs %10.4fs %7.2fx%s'
+                     % (key[1], key[0], old, new, ratio, flag))
+    for key in sorted(set(old_results) ^ set(new_results)):
+        lines.append('%-18s %-6s only in %s results' % (key[1], key[0],
+                                                        'old' if key in old_results else 'new'))
+    return lines, regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare stor benchmark results.')
+    parser.add_argument('old', help='The JSON results of the baseline.')
+    parser.add_argument('new', help='The JSON results to compare with the baseline.')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='The ratio of new to old times that is a regression '
+                             '(default 1.2).')
+    options = parser.parse_args(argv)
+
+    lines, regressed = compare(_load_results(options.old), _load_results(options.new),
+                               options.threshold)
+    print('\n'.join(lines))
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,385 @@
+"""
+Runs the stor benchmarks against local stand-ins of S3 and Swift.
+
+S3 benchmarks run against a moto server (``pip install -r benchmarks/requirements.txt``)
+and are skipped when moto is not installed. Swift benchmarks run against
+`benchmarks.swift_server.SwiftServer`. Results are printed as a table and
+written as JSON with ``--output``, which can be compared across releases with
+``python -m benchmarks.compare``.
+
+Examples::
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --backend swift --benchmark list --benchmark stat
+"""
+import argparse
+from collections import namedtuple
+import datetime
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import shutil
+import socket
+import sys
+import tempfile
+import time
+
+import stor
+from stor import Path
+from stor import settings
+
+BACKENDS = ('s3', 'swift', 'posix')
+
+#: A benchmark of ``backends``. ``prepare(ctx)`` runs untimed before every
+#: repetition and returns the timed function, which returns the number of
+#: operations and bytes it performed.
+Benchmark = namedtuple('Benchmark', ['name', 'backends', 'prepare'])
+
+_benchmarks = []
+
+
+def benchmark(name, backends=('s3', 'swift')):
+    """Registers a benchmark"""
+    def decorated(prepare):
+        _benchmarks.append(Benchmark(name, backends, prepare))
+        return prepare
+    return decorated
+
+
+class Context(object):
+    """The state of the benchmarks of a backend.
+
+    Attributes:
+        backend (str): The backend.
+        root (Path): The path under which benchmarks create objects.
+        local_dir (str): A local directory for files of the benchmarks.
+        options (argparse.Namespace): The parameters of the run.
+    """
+    def __init__(self, backend, root, local_dir, options):
+        self.backend = backend
+        self.root = root
+        self.local_dir = local_dir
+        self.options = options
+        self._fixtures = {}
+
+    def fixture(self, name, create):
+        """Returns the fixture ``name``, calling ``create()`` the first time"""
+        if name not in self._fixtures:
+            self._fixtures[name] = create()
+        return self._fixtures[name]
+
+    def make_files(self, name, count, size):
+        """Creates ``count`` local files of ``size`` bytes in the directory ``name``"""
+        def create():
+            directory = os.path.join(self.local_dir, name)
+            os.makedirs(directory)
+            data = os.urandom(size)
+            for i in range(count):
+                with open(os.path.join(directory, 'file%06d' % i), 'wb') as fp:
+                    fp.write(data)
+            return directory
+        return self.fixture('files:%s' % name, create)
+
+    def make_objects(self, name, count, size):
+        """Uploads ``count`` objects of ``size`` bytes under ``root / name``"""
+        def create():
+            directory = self.make_files(name, count, size)
+            prefix = self.root / name
+            stor.copytree(directory, prefix)
+            return prefix
+        return self.fixture('objects:%s' % name, create)
+
+    def new_local_dir(self):
+        """Returns a new empty local directory"""
+        return tempfile.mkdtemp(dir=self.local_dir)
+
+
+@benchmark('path_construction', backends=BACKENDS)
+def _path_construction(ctx):
+    prefix = {'s3': 's3://bucket/', 'swift': 'swift://AUTH_tenant/container/',
+              'posix': '/data/'}[ctx.backend]
+    names = [prefix + 'dir/obj%d' % i for i in range(ctx.options.paths)]
+
+    def run():
+        for name in names:
+            Path(name)
+        return len(names), 0
+    return run
+
+
+@benchmark('write_object')
+def _write_object(ctx):
+    options = ctx.options
+    prefix = ctx.root / 'write_object' / str(time.time())
+    data = os.urandom(options.small_size)
+
+    def run():
+        for i in range(options.small_files):
+            (prefix / ('obj%06d' % i)).write_object(data)
+        return options.small_files, options.small_files * options.small_size
+    return run
+
+
+@benchmark('read_object')
+def _read_object(ctx):
+    options = ctx.options
+    prefix = ctx.make_objects('small', options.small_files, options.small_size)
+    paths = [prefix / ('file%06d' % i) for i in range(options.small_files)]
+
+    def run():
+        size = sum(len(p.read_object()) for p in paths)
+        return len(paths), size
+    return run
+
+
+@benchmark('stat')
+def _stat(ctx):
+    options = ctx.options
+    prefix = ctx.make_objects('small', options.small_files, options.small_size)
+    paths = [prefix / ('file%06d' % i) for i in range(options.small_files)]
+
+    def run():
+        for p in paths:
+            p.stat()
+        return len(paths), 0
+    return run
+
+
+@benchmark('list')
+def _list(ctx):
+    options = ctx.options
+    prefix = ctx.make_objects('small', options.small_files, options.small_size)
+
+    def run():
+        return len(prefix.list()), 0
+    return run
+
+
+def _upload(ctx, name, count, size):
+    directory = ctx.make_files(name, count, size)
+    dest = ctx.root / ('upload_%s' % name) / str(time.time())
+
+    def run():
+        stor.copytree(directory, dest)
+        return count, count * size
+    return run
+
+
+def _download(ctx, name, count, size):
+    prefix = ctx.make_objects(name, count, size)
+
+    def run():
+        stor.copytree(prefix, os.path.join(ctx.new_local_dir(), 'download'))
+        return count, count * size
+    return run
+
+
+@benchmark('upload_small')
+def _upload_small(ctx):
+    return _upload(ctx, 'small', ctx.options.small_files, ctx.options.small_size)
+
+
+@benchmark('download_small')
+def _download_small(ctx):
+    return _download(ctx, 'small', ctx.options.small_files, ctx.options.small_size)
+
+
+@benchmark('upload_large')
+def _upload_large(ctx):
+    return _upload(ctx, 'large', ctx.options.large_files, ctx.options.large_size)
+
+
+@benchmark('download_large')
+def _download_large(ctx):
+    return _download(ctx, 'large', ctx.options.large_files, ctx.options.large_size)
+
+
+@benchmark('rmtree')
+def _rmtree(ctx):
+    options = ctx.options
+    directory = ctx.make_files('small', options.small_files, options.small_size)
+    prefix = ctx.root / 'rmtree' / str(time.time())
+    stor.copytree(directory, prefix)
+
+    def run():
+        prefix.rmtree()
+        return options.small_files, 0
+    return run
+
+
+def _get_free_port():
+    sock = socket.socket()
+    try:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+    finally:
+        sock.close()
+
+
+def _start_s3():
+    """Starts a moto server and returns its root path and a function that stops it"""
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        return None, None
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    port = _get_free_port()
+    server = ThreadedMotoServer(ip_address='127.0.0.1', port=port, verbose=False)
+    server.start()
+    # boto3 reads the endpoint from the environment, so stor needs no configuration
+    os.environ.update({
+        'AWS_ENDPOINT_URL': 'http://127.0.0.1:%d' % port,
+        'AWS_ACCESS_KEY_ID': 'benchmark',
+        'AWS_SECRET_ACCESS_KEY': 'benchmark',
+        'AWS_DEFAULT_REGION': 'us-east-1'
+    })
+    import boto3
+    boto3.client('s3').create_bucket(Bucket='benchmark')
+    return Path('s3://benchmark'), server.stop
+
+
+def _start_swift():
+    """Starts a Swift stand-in and returns its root path and a function that stops it"""
+    from benchmarks.swift_server import SwiftServer
+
+    server = SwiftServer()
+    server.start()
+    settings.update({
+        'swift': {
+            'auth_url': server.auth_url,
+            'username': 'benchmark',
+            'password': 'benchmark'
+        }
+    })
+    return Path('swift://AUTH_benchmark/benchmark'), server.stop
+
+
+def _start_posix(local_dir):
+    root = os.path.join(local_dir, 'posix')
+    os.makedirs(root)
+    return Path(root), lambda: None
+
+
+def _run_benchmark(bench, ctx, repeat):
+    durations = []
+    ops = num_bytes = 0
+    for _ in range(repeat):
+        run = bench.prepare(ctx)
+        start = time.time()
+        ops, num_bytes = run()
+        durations.append(time.time() - start)
+
+    median = sorted(durations)[len(durations) // 2]
+    return {
+        'name': bench.name,
+        'backend': ctx.backend,
+        'seconds': durations,
+        'median_seconds': median,
+        'min_seconds': min(durations),
+        'ops': ops,
+        'bytes': num_bytes,
+        'ops_per_second': ops / median if median else None,
+        'bytes_per_second': num_bytes / median if median and num_bytes else None
+    }
+
+
+def _run_backend(backend, local_dir, options):
+    if backend == 's3':
+        root, stop = _start_s3()
+        if root is None:
+            logging.warning('skipping s3 benchmarks since moto is not installed')
+            return []
+    elif backend == 'swift':
+        root, stop = _start_swift()
+    else:
+        root, stop = _start_posix(local_dir)
+
+    ctx = Context(backend, root, tempfile.mkdtemp(dir=local_dir), options)
+    results = []
+    try:
+        for bench in _benchmarks:
+            if backend not in bench.backends or (options.benchmark and
+                                                 bench.name not in options.benchmark):
+                continue
+            result = _run_benchmark(bench, ctx, options.repeat)
+            print(_format_result(result))
+            sys.stdout.flush()
+            results.append(result)
+    finally:
+        stop()
+    return results
+
+
+def _format_result(result):
+    line = '%-18s %-6s %10.4fs %12.1f ops/s' % (
+        result['name'], result['backend'], result['median_seconds'],
+        result['ops_per_second'] or 0)
+    if result['bytes_per_second']:
+        line += ' %10.2f MB/s' % (result['bytes_per_second'] / (1024 * 1024.0))
+    return line
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description='Run the stor benchmarks.')
+    parser.add_argument('--backend', action='append', choices=BACKENDS,
+                        help='Only run the benchmarks of a backend. May be repeated.')
+    parser.add_argument('--benchmark', action='append',
+                        choices=sorted({b.name for b in _benchmarks}),
+                        help='Only run a benchmark. May be repeated.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='The number of repetitions of every benchmark (default 3).')
+    parser.add_argument('--small-files', type=int, default=200,
+                        help='The number of small files or objects (default 200).')
+    parser.add_argument('--small-size', type=int, default=4096,
+                        help='The size of small files in bytes (default 4096).')
+    parser.add_argument('--large-files', type=int, default=4,
+                        help='The number of large files (default 4).')
+    parser.add_argument('--large-size', type=int, default=32 * 1024 * 1024,
+                        help='The size of large files in bytes (default 32 MB).')
+    parser.add_argument('--paths', type=int, default=100000,
+                        help='The number of paths constructed by path_construction '
+                             '(default 100000).')
+    parser.add_argument('--output', help='Write the results as JSON to this file.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = _parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    local_dir = tempfile.mkdtemp(prefix='stor-benchmarks-')
+    results = []
+    try:
+        for backend in options.backend or BACKENDS:
+            results.extend(_run_backend(backend, local_dir, options))
+    finally:
+        shutil.rmtree(local_dir)
+
+    report = {
+        'format_version': 1,
+        'stor_version': stor._get_version(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': multiprocessing.cpu_count(),
+        'timestamp': datetime.datetime.utcnow().isoformat() + 'Z',
+        'parameters': {
+            'repeat': options.repeat,
+            'small_files': options.small_files,
+            'small_size': options.small_size,
+            'large_files': options.large_files,
+            'large_size': options.large_size,
+            'paths': options.paths
+        },
+        'results': results
+    }
+    if options.output:
+        with open(options.output, 'w') as fp:
+            json.dump(report, fp, indent=2, sort_keys=True)
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+"""
+A minimal in-process Swift stand-in for benchmarks.
+
+The server implements keystone v2 authentication and the parts of the Swift
+API that stor uses: account and container listings (``format=json`` with
+``prefix``, ``delimiter``, ``marker`` and ``limit``), container PUT, HEAD and
+DELETE, and object PUT (including chunked bodies), GET (including ranges),
+HEAD, POST and DELETE. Data is kept in memory. Large objects, bulk deletes and
+server-side copies are not supported, so ``/info`` advertises none of them.
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+from six.moves.urllib import parse
+
+DEFAULT_LISTING_LIMIT = 10000
+
+
+class _Object(object):
+    def __init__(self, data, headers):
+        self.data = data
+        self.etag = hashlib.md5(data).hexdigest()
+        self.timestamp = time.time()
+        self.content_type = headers.get('Content-Type') or 'application/octet-stream'
+        self.metadata = _get_metadata(headers)
+
+    def listing(self, name):
+        return {
+            'name': name,
+            'bytes': len(self.data),
+            'hash': self.etag,
+            'content_type': self.content_type,
+            'last_modified': time.strftime('%Y-%m-%dT%H:%M:%S.000000',
+                                           time.gmtime(self.timestamp))
+        }
+
+
+def _get_metadata(headers):
+    return {k: v for k, v in headers.items() if k.lower().startswith('x-object-meta-')}
+
+
+def _list(names, query):
+    """Returns the entries of a listing of ``names`` for the query of a GET"""
+    prefix = query.get('prefix', '')
+    delimiter = query.get('delimiter')
+    marker = query.get('marker', '')
+    end_marker = query.get('end_marker')
+    limit = int(query.get('limit', DEFAULT_LISTING_LIMIT))
+
+    entries = []
+    for name in sorted(names):
+        if len(entries) >= limit:
+            break
+        if not name.startswith(prefix) or name <= marker:
+            continue
+        if end_marker and name >= end_marker:
+            break
+        if delimiter:
+            index = name.find(delimiter, len(prefix))
+            if index != -1:
+                subdir = name[:index + len(delimiter)]
+                if subdir > marker and (not entries or entries[-1] != (subdir, None)):
+                    entries.append((subdir, None))
+                continue
+        entries.append((name, names[name]))
+    return entries
+
+
+class SwiftHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Handles the requests of `SwiftServer`"""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def store(self):
+        return self.server.store
+
+    def _send(self, status, body=b'', headers=None, send_body=True):
+        self.send_response(status)
+        headers = dict(headers or {})
+        headers.setdefault('Content-Length', str(len(body)))
+        headers.setdefault('X-Trans-Id', uuid.uuid4().hex)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        if send_body and body:
+            self.wfile.write(body)
+
+    def _send_json(self, status, value, headers=None):
+        headers = dict(headers or {}, **{'Content-Type': 'application/json; charset=utf-8'})
+        self._send(status, json.dumps(value).encode('utf-8'), headers)
+
+    def _read_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().strip().split(b';')[0], 16)
+                if not size:
+                    self.rfile.readline()
+                    return b''.join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+    def _parse_path(self):
+        url = parse.urlsplit(self.path)
+        query = dict(parse.parse_qsl(url.query))
+        parts = [parse.unquote(p) for p in url.path.split('/', 4)[1:]]
+        return parts, query
+
+    def _handle(self, method):
+        parts, query = self._parse_path()
+        if parts == ['info']:
+            return self._send_json(200, {'swift': {'version': 'stand-in'}})
+        if parts[:2] == ['v2.0', 'tokens'] and method == 'POST':
+            return self._authenticate()
+        if len(parts) < 2 or parts[0] != 'v1':
+            return self._send(404)
+        if self.headers.get('X-Auth-Token') != self.server.token:
+            return self._send(401)
+
+        account, rest = parts[1], parts[2:]
+        with self.server.lock:
+            containers = self.store.setdefault(account, {})
+            if not rest or not rest[0]:
+                return self._handle_account(method, containers, query)
+            if len(rest) == 1 or not rest[1]:
+                return self._handle_container(method, containers, rest[0], query)
+            return self._handle_object(method, containers, rest[0], rest[1])
+
+    def _authenticate(self):
+        body = json.loads(self._read_body().decode('utf-8'))
+        tenant = body['auth'].get('tenantName', 'tenant')
+        host, port = self.server.server_address[:2]
+        storage_url = 'http://%s:%d/v1/%s' % (host, port, tenant)
+        self._send_json(200, {'access': {
+            'token': {'id': self.server.token, 'expires': '2999-01-01T00:00:00Z',
+                      'tenant': {'id': tenant, 'name': tenant}},
+            'serviceCatalog': [{
+                'type': 'object-store',
+                'name': 'swift',
+                'endpoints': [{'region': 'RegionOne', 'publicURL': storage_url,
+                               'internalURL': storage_url, 'adminURL': storage_url}],
+                'endpoints_links': []
+            }],
+            'user': {'id': 'user', 'name': 'user', 'roles': []},
+            'metadata': {'roles': [], 'is_admin': 0}
+        }})
+
+    def _handle_account(self, method, containers, query):
+        headers = {'X-Account-Container-Count': str(len(containers))}
+        if method == 'HEAD':
+            return self._send(204, headers=headers)
+        if method != 'GET':
+            return self._send(405)
+        counts = {name: {'name': name, 'count': len(objs),
+                         'bytes': sum(len(o.data) for o in objs.values())}
+                  for name, objs in containers.items()}
+        entries = _list(counts, query)
+        self._send_json(200, [value or {'subdir': name} for name, value in entries], headers)
+
+    def _handle_container(self, method, containers, container, query):
+        if method == 'PUT':
+            created = container not in containers
+            containers.setdefault(container, {})
+            return self._send(201 if created else 202)
+        if container not in containers:
+            return self._send(404)
+        objs = containers[container]
+        headers = {
+            'X-Container-Object-Count': str(len(objs)),
+            'X-Container-Bytes-Used': str(sum(len(o.data) for o in objs.values()))
+        }
+        if method == 'HEAD':
+            return self._send(204, headers=headers)
+        if method == 'DELETE':
+            if objs:
+                return self._send(409)
+            del containers[container]
+            return self._send(204)
+        if method == 'POST':
+            return self._send(204)
+        if method != 'GET':
+            return self._send(405)
+        entries = _list(objs, query)
+        self._send_json(200, [value.listing(name) if value else {'subdir': name}
+                              for name, value in entries], headers)
+
+    def _object_headers(self, obj):
+        headers = {
+            'ETag': obj.etag,
+            'Content-Type': obj.content_type,
+            'X-Timestamp': '%.5f' % obj.timestamp,
+            'Last-Modified': time.strftime('%a, %d %b %Y %H:%M:%S GMT',
+                                           time.gmtime(obj.timestamp)),
+            'Accept-Ranges': 'bytes'
+        }
+        headers.update(obj.metadata)
+        return headers
+
+    def _handle_object(self, method, containers, container, name):
+        if container not in containers:
+            return self._send(404)
+        objs = containers[container]
+        if method == 'PUT':
+            obj = _Object(self._read_body(), self.headers)
+            expected_etag = self.headers.get('ETag')
+            if expected_etag and expected_etag.strip('"') != obj.etag:
+                return self._send(422)
+            objs[name] = obj
+            return self._send(201, headers={'ETag': obj.etag})
+        if name not in objs:
+            return self._send(404)
+        obj = objs[name]
+        if method == 'DELETE':
+            del objs[name]
+            return self._send(204)
+        if method == 'POST':
+            obj.metadata = _get_metadata(self.headers)
+            return self._send(202)
+        if method not in ('GET', 'HEAD'):
+            return self._send(405)
+        return self._send_object(obj, send_body=method == 'GET')
+
+    def _send_object(self, obj, send_body):
+        headers = self._object_headers(obj)
+        range_header = self.headers.get('Range')
+        if not range_header or not range_header.startswith('bytes='):
+            return self._send(200, obj.data, headers, send_body=send_body)
+
+        start, end = range_header[len('bytes='):].split(',')[0].split('-')
+        size = len(obj.data)
+        if not start:
+            start, end = max(size - int(end), 0), size - 1
+        else:
+            start, end = int(start), min(int(end), size - 1) if end else size - 1
+        if start >= size:
+            return self._send(416)
+        headers['Content-Range'] = 'bytes %d-%d/%d' % (start, end, size)
+        self._send(206, obj.data[start:end + 1], headers, send_body=send_body)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_HEAD(self):
+        self._handle('HEAD')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+
+class SwiftServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """A Swift stand-in that serves requests on threads.
+
+    Use `start` to serve in the background and ``auth_url`` for the ``auth_url``
+    option of the ``swift`` settings.
+    """
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        BaseHTTPServer.HTTPServer.__init__(self, (host, port), SwiftHandler)
+        self.store = {}
+        self.lock = threading.Lock()
+        self.token = uuid.uuid4().hex
+        self._thread = None
+
+    @property
+    def auth_url(self):
+        return 'http://%s:%d/v2.0' % self.server_address[:2]
+
+    def start(self):
+        """Serves requests on a daemon thread."""
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stops serving requests."""
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
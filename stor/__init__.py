@@ -20,24 +20,47 @@ functions.
 
 See `stor.swift` for more information on Swift-specific functionality.
 """
-import pkg_resources
+import sys
 
 from stor.utils import copy
 from stor.utils import copytree
+from stor.utils import exists_many
 from stor.utils import is_filesystem_path
 from stor.utils import is_swift_path
 from stor.utils import is_obs_path
 from stor.utils import NamedTemporaryDirectory
+from stor.utils import stat_many
 from stor.base import Path
 from stor import settings
 
 
-# TODO: Compile this - costs ~700us to do this on import
-try:
-    __version__ = pkg_resources.get_distribution('stor').version
-except pkg_resources.DistributionNotFound:  # pragma: no cover
-    # we are not pip installed in environment
-    __version__ = None
+def _get_version():
+    """Returns the installed version of stor, or None if it is not pip installed"""
+    try:
+        from importlib import metadata
+    except ImportError:  # pragma: no cover
+        # Python < 3.8 only has pkg_resources, which is slow to import
+        import pkg_resources
+        try:
+            return pkg_resources.get_distribution('stor').version
+        except pkg_resources.DistributionNotFound:
+            return None
+    try:
+        return metadata.version('stor')
+    except metadata.PackageNotFoundError:  # pragma: no cover
+        return None
+
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        """Looks up ``__version__`` on first access instead of on import"""
+        if name == '__version__':
+            global __version__
+            __version__ = _get_version()
+            return __version__
+        raise AttributeError("module 'stor' has no attribute '%s'" % name)
+else:  # pragma: no cover
+    __version__ = _get_version()
 
 
 settings._initialize()
@@ -106,6 +129,7 @@ __all__ = [
     'listdir',
     'glob',
     'exists',
+    'exists_many',
     'isabs',
     'isdir',
     'isfile',
@@ -117,6 +141,7 @@ __all__ = [
     'remove',
     'rmtree',
     'walkfiles',
+    'stat_many',
     'is_filesystem_path',
     'is_swift_path',
     'is_obs_path',
@@ -1,6 +1,7 @@
 import errno
 import fnmatch
 import glob
+import importlib
 import os
 import ntpath
 import posixpath
@@ -17,6 +18,40 @@ from stor import utils
 import six
 
 
+# Maps the drive prefixes of OBS paths to the "module:class" names of their path
+# classes. Classes are imported when the first path with their drive is constructed.
+_DRIVE_REGISTRY = {
+    'swift://': 'stor.swift:SwiftPath',
+    's3://': 'stor.s3:S3Path',
+}
+
+# Maps the path modules of the filesystem to the names of their path classes
+_FILESYSTEM_REGISTRY = {
+    ntpath: 'stor.windows:WindowsPath',
+    posixpath: 'stor.posix:PosixPath',
+}
+
+# The classes of the registries, keyed by drive or path module once imported
+_path_classes = {}
+
+
+def _get_path_class(key, registry):
+    """Returns the path class of a registry key, importing it on first use.
+
+    Returns:
+        type: The path class, or None if ``key`` is not in ``registry``.
+    """
+    try:
+        return _path_classes[key]
+    except KeyError:
+        if key not in registry:
+            return None
+        module_name, class_name = registry[key].split(':')
+        path_class = getattr(importlib.import_module(module_name), class_name)
+        _path_classes[key] = path_class
+        return path_class
+
+
 class TreeWalkWarning(Warning):
     pass
 
@@ -45,24 +80,24 @@ class Path(text_type):
         if cls is Path:
             if not hasattr(path, 'startswith'):
                 raise TypeError('must be a string like')
-            if utils.is_swift_path(path):
-                from stor.swift import SwiftPath
-
-                cls = SwiftPath
-            elif utils.is_s3_path(path):
-                from stor.s3 import S3Path
-
-                cls = S3Path
-            elif os.path == ntpath:
-                from stor.windows import WindowsPath
+            # Every OBS drive ends with "://", so one search finds the drive
+            drive_end = path.find('://')
+            path_class = (_get_path_class(path[:drive_end + 3], _DRIVE_REGISTRY)
+                          if drive_end > 0 else None)
+            if path_class is None:
+                # The path module is looked up on every call since it can be patched
+                path_class = _get_path_class(os.path, _FILESYSTEM_REGISTRY)
+                assert path_class, 'path is not compatible with stor'
+            cls = path_class
+        return text_type.__new__(cls, path)
 
-                cls = WindowsPath
-            elif os.path == posixpath:
-                from stor.posix import PosixPath
+    @classmethod
+    def _from_trusted(cls, path):
+        """Constructs a path of this class without validating it.
 
-                cls = PosixPath
-            else:  # pragma: no cover
-                assert False, 'path is not compatible with stor'
+        Only use this for strings that are known to be valid paths of the class,
+        such as paths built from listing results of a path of the class.
+        """
         return text_type.__new__(cls, path)
 
     def __init__(self, path):
@@ -0,0 +1,219 @@
+"""
+Checksums of local files.
+
+Checksums are the MD5 hex digest of a file or, when a chunk size is given, the
+ETag that S3 assigns to a multipart upload with parts of that size. Files are
+hashed on a process pool so that hashing large trees is not bound by the GIL.
+
+Checksums are cached in a SQLite database keyed on the device, inode, size and
+modification time (in nanoseconds) of each file, so unchanged files are not read
+again. The cache is configured with the ``cache_file`` option of the
+``stor:checksum`` settings.
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import sqlite3
+import time
+
+from stor import settings
+
+logger = logging.getLogger(__name__)
+
+# The size of the reads when hashing files
+READ_SIZE = 1024 * 1024
+
+# Files modified this recently (in nanoseconds) before they are hashed are not
+# cached, since file systems may not record a later modification in the same tick
+_RACY_MTIME_NS = 2 * 10**9
+
+
+def _get_mtime_ns(st):
+    return getattr(st, 'st_mtime_ns', None) or int(st.st_mtime * 10**9)
+
+
+def compute_checksum(path, chunk_size=None):
+    """Computes the checksum of a local file.
+
+    Args:
+        path (str): The path of the file.
+        chunk_size (int, optional): The part size of multipart uploads. Files
+            with at least ``chunk_size`` bytes have the checksum of a multipart
+            upload, which is the MD5 of the MD5 digests of every part followed
+            by ``-`` and the number of parts.
+
+    Returns:
+        str: The MD5 hex digest or multipart ETag of the file.
+    """
+    part_digests = []
+    md5 = hashlib.md5()
+    part_remaining = chunk_size
+    with open(path, 'rb') as fp:
+        while True:
+            data = fp.read(min(READ_SIZE, part_remaining) if chunk_size else READ_SIZE)
+            if not data:
+                break
+            md5.update(data)
+            if chunk_size:
+                part_remaining -= len(data)
+                if not part_remaining:
+                    part_digests.append(md5.digest())
+                    md5 = hashlib.md5()
+                    part_remaining = chunk_size
+
+    if not part_digests:
+        return md5.hexdigest()
+    if part_remaining != chunk_size:
+        part_digests.append(md5.digest())
+    return '%s-%d' % (hashlib.md5(b''.join(part_digests)).hexdigest(), len(part_digests))
+
+
+def _compute_checksum_worker(args):
+    """Computes the checksum of ``(path, chunk_size)`` in a pool process"""
+    path, chunk_size = args
+    return path, compute_checksum(path, chunk_size=chunk_size)
+
+
+class ChecksumCache(object):
+    """A persistent cache of the checksums of local files.
+
+    Entries are keyed on the device, inode and chunk size of a file and are only
+    used while the size and modification time of the file are unchanged.
+
+    Args:
+        filename (str): The SQLite database of the cache. It is created if it
+            doesn't exist.
+    """
+    def __init__(self, filename):
+        self.filename = os.path.expanduser(filename)
+        dirname = os.path.dirname(self.filename)
+        if dirname and not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        self._conn = sqlite3.connect(self.filename, timeout=30)
+        with self._conn:
+            self._conn.execute('CREATE TABLE IF NOT EXISTS checksums ('
+                               'device INTEGER, inode INTEGER, chunk_size INTEGER, '
+                               'size INTEGER, mtime_ns INTEGER, checksum TEXT, '
+                               'PRIMARY KEY (device, inode, chunk_size))')
+
+    def __repr__(self):
+        return 'ChecksumCache(%r)' % self.filename
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Closes the database of the cache."""
+        self._conn.close()
+
+    def get(self, st, chunk_size=None):
+        """Returns the cached checksum of a file, or None if it isn't cached.
+
+        Args:
+            st (os.stat_result): The stat of the file.
+            chunk_size (int, optional): See `compute_checksum`.
+        """
+        row = self._conn.execute(
+            'SELECT checksum FROM checksums WHERE device = ? AND inode = ? AND '
+            'chunk_size = ? AND size = ? AND mtime_ns = ?',
+            (st.st_dev, st.st_ino, chunk_size or 0, st.st_size, _get_mtime_ns(st))).fetchone()
+        return row[0] if row else None
+
+    def set_many(self, entries, chunk_size=None):
+        """Caches checksums of files.
+
+        Args:
+            entries (List[tuple(os.stat_result, str)]): The stat and checksum of
+                every file.
+            chunk_size (int, optional): See `compute_checksum`.
+        """
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO checksums VALUES (?, ?, ?, ?, ?, ?)',
+                [(st.st_dev, st.st_ino, chunk_size or 0, st.st_size, _get_mtime_ns(st), checksum)
+                 for st, checksum in entries])
+
+
+def _compute_uncached_checksums(paths, chunk_size, processes):
+    """Computes checksums of files, on a process pool when there are several files"""
+    tasks = [(path, chunk_size) for path in paths]
+    if processes == 1 or len(tasks) < 2:
+        return dict(_compute_checksum_worker(task) for task in tasks)
+
+    processes = min(processes, len(tasks))
+    pool = multiprocessing.Pool(processes)
+    try:
+        chunks = max(1, min(64, len(tasks) // (processes * 8)))
+        checksums = dict(pool.imap_unordered(_compute_checksum_worker, tasks, chunks))
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return checksums
+
+
+def compute_checksums(paths, chunk_size=None, processes=None, cache_file=None):
+    """Computes the checksums of local files.
+
+    Cached checksums are used for files that have not changed. The other
+    files are hashed on a pool of ``processes`` processes and their checksums
+    are added to the cache.
+
+    Args:
+        paths (List[str]): The paths of the files.
+        chunk_size (int, optional): See `compute_checksum`.
+        processes (int, optional): The number of processes. Defaults to the
+            ``processes`` option of the ``stor:checksum`` settings, and 0 uses
+            one process per CPU.
+        cache_file (str, optional): The database of the `ChecksumCache`.
+            Defaults to the ``cache_file`` option of the ``stor:checksum``
+            settings. An empty string disables the cache.
+
+    Returns:
+        dict: The checksum of every path.
+    """
+    options = settings.get()['stor:checksum']
+    processes = options['processes'] if processes is None else processes
+    processes = processes or multiprocessing.cpu_count()
+    cache_file = options['cache_file'] if cache_file is None else cache_file
+    if not cache_file:
+        return _compute_uncached_checksums(paths, chunk_size, processes)
+
+    checksums = {}
+    stats = {}
+    with ChecksumCache(cache_file) as cache:
+        for path in paths:
+            st = os.stat(path)
+            checksum = cache.get(st, chunk_size=chunk_size)
+            if checksum:
+                checksums[path] = checksum
+            else:
+                stats[path] = st
+        logger.debug('%d of %d checksums cached', len(checksums), len(paths))
+
+        started_ns = int(time.time() * 10**9)
+        computed = _compute_uncached_checksums(list(stats), chunk_size, processes)
+        checksums.update(computed)
+
+        # Only cache files that were not modified while or just before hashing them
+        cache.set_many([
+            (stats[path], checksum) for path, checksum in computed.items()
+            if _get_mtime_ns(stats[path]) < started_ns - _RACY_MTIME_NS and
+            _is_unchanged(path, stats[path])
+        ], chunk_size=chunk_size)
+    return checksums
+
+
+def _is_unchanged(path, st):
+    try:
+        new_st = os.stat(path)
+    except OSError:
+        return False
+    return ((new_st.st_dev, new_st.st_ino, new_st.st_size, _get_mtime_ns(new_st)) ==
+            (st.st_dev, st.st_ino, st.st_size, _get_mtime_ns(st)))
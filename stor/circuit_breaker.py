@@ -0,0 +1,167 @@
+"""
+Circuit breakers for unavailable OBS endpoints.
+
+A `CircuitBreaker` is shared by every thread of a process that talks to the
+same endpoint. After ``failure_threshold`` consecutive failures the circuit
+opens and calls fail fast with `CircuitOpenError` instead of reaching the
+endpoint. Once ``reset_timeout`` seconds have passed, a single probe call is
+let through. The circuit closes again when the probe succeeds and opens for
+another ``reset_timeout`` seconds when it fails.
+
+Calls that return their errors instead of raising them (such as the results of
+``SwiftService`` transfers) are checked with ``is_failed_result``.
+"""
+import logging
+import threading
+import time
+
+from stor import exceptions
+
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+# The circuit breakers of the process, keyed by endpoint
+_circuit_breakers = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+class CircuitBreaker(object):
+    """Fails calls to an endpoint fast after consecutive failures.
+
+    Args:
+        endpoint (str): The name of the endpoint, used in errors.
+        failure_exceptions (tuple(Exception)): The exceptions that count as failures
+            of the endpoint. Any other exception counts as a success, since the
+            endpoint responded.
+        failure_threshold (int): The number of consecutive failures that open the
+            circuit. 0 disables the circuit breaker.
+        reset_timeout (float): The time (in seconds) that the circuit stays open
+            before a probe call is let through.
+        is_failed_result (function(result) -> bool, optional): Returns True if
+            a result returned by a call is a failure of the endpoint.
+    """
+    def __init__(self, endpoint, failure_exceptions, failure_threshold, reset_timeout,
+                 is_failed_result=None):
+        self.endpoint = endpoint
+        self.failure_exceptions = failure_exceptions
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.is_failed_result = is_failed_result
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return 'CircuitBreaker(%r, state=%r, failures=%r)' % (self.endpoint, self.state,
+                                                              self.failures)
+
+    def _before_call(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN and time.time() >= self.opened_at + self.reset_timeout:
+                # Let this call through as the probe of the endpoint
+                self.state = HALF_OPEN
+                return
+            raise exceptions.CircuitOpenError(
+                'circuit of %s is open after %d consecutive failures'
+                % (self.endpoint, self.failures))
+
+    def _record_success(self):
+        if self.state == CLOSED and not self.failures:
+            return
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info('closing circuit of %s', self.endpoint)
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+
+    def _cancel_probe(self):
+        """Lets the next call probe the endpoint when a probe ended without a response."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.state = OPEN
+
+    def _record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning('opening circuit of %s for %ss after %d consecutive failures',
+                                   self.endpoint, self.reset_timeout, self.failures)
+                self.state = OPEN
+                self.opened_at = time.time()
+
+    def call(self, func, *args, **kwargs):
+        """Calls ``func`` with ``args`` and ``kwargs`` unless the circuit is open.
+
+        Returns:
+            The result of ``func``.
+
+        Raises:
+            CircuitOpenError: The circuit is open.
+        """
+        if not self.failure_threshold:
+            return func(*args, **kwargs)
+
+        self._before_call()
+        try:
+            result = func(*args, **kwargs)
+        except self.failure_exceptions:
+            self._record_failure()
+            raise
+        except Exception:
+            self._record_success()
+            raise
+        except BaseException:
+            # The call was interrupted (for example by KeyboardInterrupt) before
+            # the endpoint responded, so the circuit must not stay half-open
+            self._cancel_probe()
+            raise
+        if self.is_failed_result and self.is_failed_result(result):
+            self._record_failure()
+        else:
+            self._record_success()
+        return result
+
+
+def get_circuit_breaker(endpoint, failure_exceptions, failure_threshold, reset_timeout,
+                        is_failed_result=None):
+    """Returns the circuit breaker of an endpoint, creating it if it doesn't exist.
+
+    The ``failure_threshold`` and ``reset_timeout`` of an existing circuit
+    breaker are updated so that settings changes take effect while keeping
+    the state of the circuit.
+
+    Args:
+        endpoint (str): The endpoint, for example the swift auth url.
+        failure_exceptions (tuple(Exception)): See `CircuitBreaker`.
+        failure_threshold (int): See `CircuitBreaker`.
+        reset_timeout (float): See `CircuitBreaker`.
+        is_failed_result (function(result) -> bool, optional): See `CircuitBreaker`.
+
+    Returns:
+        CircuitBreaker: The circuit breaker shared by every thread of the process.
+    """
+    breaker = _circuit_breakers.get(endpoint)
+    if breaker is None:
+        with _circuit_breakers_lock:
+            breaker = _circuit_breakers.setdefault(
+                endpoint, CircuitBreaker(endpoint, failure_exceptions,
+                                         failure_threshold, reset_timeout,
+                                         is_failed_result=is_failed_result))
+    breaker.failure_threshold = failure_threshold
+    breaker.reset_timeout = reset_timeout
+    return breaker
+
+
+def reset_circuit_breakers():
+    """Closes every circuit and forgets its failures."""
+    with _circuit_breakers_lock:
+        _circuit_breakers.clear()
@@ -13,6 +13,11 @@ as a directory in a way that is similar to the UNIX command.
 
 To copy or remove a tree, use the ``-r`` flag with ``cp`` or ``remove``.
 
+To see how the requests and transfers of a command ran, use ``--trace`` to write
+a timeline that can be opened in ``chrome://tracing``::
+
+    $ stor --trace upload.trace.json cp -r dir s3://bucket/dir
+
 Relative Paths
 --------------
 
@@ -69,12 +74,14 @@ subcommand::
     $ stor cat s3://my/file1
     hello world
 
-Direct file transfer between OBS services or within one OBS service (server-side copy)
-is not yet supported.
+Copies within swift are performed on the swift cluster (server-side copy). Copies
+between swift and S3 are streamed through memory without using local disk. Direct
+file transfer within S3 is not yet supported.
 """
 import argparse
 import copy
 from functools import partial
+from functools import wraps
 import locale
 import logging
 import os
@@ -90,8 +97,8 @@ import stor
 from stor import exceptions
 from stor import settings
 from stor import Path
+from stor import tracing
 from stor import utils
-from stor.extensions import swiftstack
 
 PRINT_CMDS = ('list', 'listdir', 'ls', 'cat', 'pwd', 'walkfiles', 'url', 'convert-swiftstack')
 SERVICES = ('s3', 'swift')
@@ -276,6 +283,8 @@ def _to_url(path):
 
 
 def _convert_swiftstack(path, bucket=None):
+    from stor.extensions import swiftstack
+
     path = stor.Path(path)
     if utils.is_swift_path(path):
         if not bucket:
@@ -288,6 +297,18 @@ def _convert_swiftstack(path, bucket=None):
         raise ValueError("invalid path for conversion: '%s'" % path)
 
 
+class _VersionAction(argparse.Action):
+    """Prints the version of stor, which is only looked up when requested"""
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, default=argparse.SUPPRESS,
+                 help=None):
+        super(_VersionAction, self).__init__(option_strings=option_strings, dest=dest,
+                                             default=default, nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        sys.stdout.write('%s\n' % stor.__version__)
+        parser.exit()
+
+
 def create_parser():
     parser = argparse.ArgumentParser(description='A command line interface for stor.')
 
@@ -297,8 +318,13 @@ def create_parser():
                         type=str,
                         metavar='CONFIG_FILE')
     parser.add_argument('--version', help='Print version',
-                        action='version',
-                        version=stor.__version__)
+                        action=_VersionAction)
+    parser.add_argument('--trace',
+                        help='Write a trace of the requests and transfers of the command. '
+                             'Files ending with .jsonl are written as JSON lines and other '
+                             'files as Chrome trace events.',
+                        type=str,
+                        metavar='TRACE_FILE')
 
     subparsers = parser.add_subparsers(dest='cmd')
     subparsers.required = True
@@ -401,10 +427,28 @@ def create_parser():
     return parser
 
 
+def _traced(func, trace_file):
+    """Returns ``func`` recording a trace that is written to ``trace_file``.
+
+    ``func`` is returned unchanged when no trace file is given.
+    """
+    if not trace_file:
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with tracing.use(tracing.Tracer()) as tracer:
+            try:
+                return func(*args, **kwargs)
+            finally:
+                tracer.write(trace_file)
+    return wrapper
+
+
 def process_args(args):
     args_copy = copy.copy(vars(args))
     config = args_copy.pop('config', None)
-    func = args_copy.pop('func', None)
+    func = _traced(args_copy.pop('func', None), args_copy.pop('trace', None))
     pth = args_copy.pop('path', None)
     cmd = args_copy.pop('cmd', None)
 
@@ -454,6 +498,12 @@ def main():
     swift_logger = logging.getLogger('stor.swift.progress')
     swift_logger.setLevel(logging.INFO)
     swift_logger.addHandler(handler)
+    posix_logger = logging.getLogger('stor.posix.progress')
+    posix_logger.setLevel(logging.INFO)
+    posix_logger.addHandler(handler)
+    obs_logger = logging.getLogger('stor.obs.progress')
+    obs_logger.setLevel(logging.INFO)
+    obs_logger.addHandler(handler)
 
     settings._initialize()
     parser = create_parser()
@@ -71,6 +71,15 @@ class UnavailableError(RemoteError):
     pass
 
 
+class CircuitOpenError(UnavailableError):
+    """Thrown when calls to an endpoint fail fast because its circuit is open.
+
+    The circuit of an endpoint opens after consecutive failures and calls are
+    not retried while it is open. See `stor.circuit_breaker`.
+    """
+    pass
+
+
 class ConflictError(RemoteError):
     """Thrown when a 409 response is returned.
 
@@ -92,6 +101,15 @@ class ConditionNotMetError(RemoteError):
     pass
 
 
+class DeadlineExceededError(RemoteError):
+    """Thrown when an operation does not complete before its deadline.
+
+    The ``caught_exception`` attribute holds the last error of the operation
+    when its retries were stopped by the deadline.
+    """
+    pass
+
+
 class FailedTransferError(RemoteError):
     """Thrown when a file transfer fails."""
     pass
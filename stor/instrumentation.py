@@ -0,0 +1,408 @@
+"""
+Instrumentation of the requests made to OBS services.
+
+Every request to S3 or swift goes through a few methods of `S3Path` and
+`SwiftPath`. Instruments added with `add_instrument` (or `use`) are notified
+before and after each of these requests with a `RequestEvent`, which describes
+the operation, the bucket or container, the number of bytes transferred, the
+status, the duration and the number of retries of the request.
+
+`LatencyAggregator` is an instrument that counts the requests of every
+operation and keeps histograms of their latencies::
+
+    from stor import instrumentation
+
+    aggregator = instrumentation.LatencyAggregator()
+    with instrumentation.use(aggregator):
+        stor.copytree('s3://bucket/dir', 'dir')
+    print(aggregator.get_report())
+
+Requests are not instrumented while no instrument is added.
+"""
+import contextlib
+import logging
+import math
+import threading
+import time
+
+from stor import retry
+
+
+logger = logging.getLogger(__name__)
+
+# The instruments of the process. The tuple is replaced when instruments are
+# added or removed so that requests can iterate over it without locking.
+_instruments = ()
+_instruments_lock = threading.Lock()
+
+
+class RequestEvent(object):
+    """Describes a request to an OBS service.
+
+    Attributes:
+        service (str): The service of the request, "s3" or "swift".
+        operation (str): The client, transfer or service method of the request,
+            for example "head_object", "upload_file" or "download".
+        bucket (str): The bucket or container of the request, or None for
+            requests on an account.
+        resource (str): The object of the request, or None for requests that
+            are not on a single object.
+        retries (int): The number of retries of the operation made before this
+            request.
+        start_time (float): The time at which the request started.
+        duration (float): The duration of the request (in seconds). None until
+            the request finishes.
+        bytes (int): The number of bytes sent or received, when known.
+        status (int): The HTTP status of the response, when known.
+        error (Exception): The error raised by the request, if any.
+        context (dict): Values that instruments keep between the before and
+            after notifications of the request.
+    """
+    __slots__ = ('service', 'operation', 'bucket', 'resource', 'retries', 'start_time',
+                 'duration', 'bytes', 'status', 'error', 'context')
+
+    def __init__(self, service, operation, bucket, resource=None, retries=0):
+        self.service = service
+        self.operation = operation
+        self.bucket = bucket
+        self.resource = resource
+        self.retries = retries
+        self.start_time = None
+        self.duration = None
+        self.bytes = None
+        self.status = None
+        self.error = None
+        self.context = {}
+
+    def __repr__(self):
+        return ('RequestEvent(service=%r, operation=%r, bucket=%r, resource=%r, retries=%r, '
+                'duration=%r, bytes=%r, status=%r, error=%r)') % (
+                    self.service, self.operation, self.bucket, self.resource, self.retries,
+                    self.duration, self.bytes, self.status, self.error)
+
+
+class Instrument(object):
+    """The base class of instruments.
+
+    Instruments are called from the threads that make the requests, so they
+    must be thread-safe. Exceptions raised by instruments are logged and do
+    not fail requests.
+    """
+    def before_request(self, event):
+        """Called before a request starts.
+
+        Args:
+            event (RequestEvent): The request. Only ``service``, ``operation``,
+                ``bucket``, ``resource``, ``retries`` and ``start_time`` are set.
+        """
+
+    def after_request(self, event):
+        """Called after a request finishes or fails.
+
+        Args:
+            event (RequestEvent): The request.
+        """
+
+
+def add_instrument(instrument):
+    """Adds an instrument that is notified of every request of the process.
+
+    Args:
+        instrument (Instrument): The instrument.
+    """
+    global _instruments
+    with _instruments_lock:
+        _instruments += (instrument,)
+
+
+def remove_instrument(instrument):
+    """Removes an instrument added with `add_instrument`.
+
+    Args:
+        instrument (Instrument): The instrument.
+
+    Raises:
+        ValueError: The instrument was not added.
+    """
+    global _instruments
+    with _instruments_lock:
+        instruments = list(_instruments)
+        instruments.remove(instrument)
+        _instruments = tuple(instruments)
+
+
+@contextlib.contextmanager
+def use(instrument):
+    """Adds an instrument for the duration of a ``with`` block.
+
+    Args:
+        instrument (Instrument): The instrument.
+    """
+    add_instrument(instrument)
+    try:
+        yield instrument
+    finally:
+        remove_instrument(instrument)
+
+
+def _notify(instruments, method_name, event):
+    for instrument in instruments:
+        try:
+            getattr(instrument, method_name)(event)
+        except Exception:
+            logger.exception('%s of %r failed', method_name, instrument)
+
+
+def get_error_status(error):
+    """Returns the HTTP status of an error of a request, or None if it is unknown.
+
+    Args:
+        error (Exception): A stor `RemoteError` or an exception of boto3 or swiftclient.
+    """
+    while error is not None:
+        status = getattr(error, 'http_status', None)
+        if status:
+            return status
+        status = get_response_status(getattr(error, 'response', None))
+        if status:
+            return status
+        error = getattr(error, 'caught_exception', None) or getattr(error, 'exception', None)
+    return None
+
+
+def get_response_status(response):
+    """Returns the HTTP status of a boto3 response, or None if it is unknown."""
+    if isinstance(response, dict):
+        return response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+    return None
+
+
+class _Request(object):
+    """Notifies instruments before and after a request"""
+    def __init__(self, instruments, event):
+        self.instruments = instruments
+        self.event = event
+        self._start = None
+        self._cancelled = False
+
+    def cancel(self):
+        """Does not notify instruments after the block, since no request was made."""
+        self._cancelled = True
+
+    def __enter__(self):
+        self.event.start_time = time.time()
+        _notify(self.instruments, 'before_request', self.event)
+        self._start = time.time()
+        return self.event
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._cancelled:
+            return
+        event = self.event
+        event.duration = time.time() - self._start
+        if exc_value is not None:
+            event.error = exc_value
+        if event.error is not None and event.status is None:
+            event.status = get_error_status(event.error)
+        _notify(self.instruments, 'after_request', event)
+
+
+class _NullRequest(object):
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_null_request = _NullRequest()
+_end = object()
+
+
+def request(service, operation, bucket, resource=None):
+    """Returns a context manager that instruments the request made in its block.
+
+    The context manager returns the `RequestEvent` of the request, on which
+    the block sets the ``bytes`` and ``status`` of the response when they are
+    known, or None when no instruments are added::
+
+        with instrumentation.request('s3', 'get_object', bucket) as event:
+            response = client.get_object(Bucket=bucket, Key=key)
+            if event:
+                event.bytes = response['ContentLength']
+
+    Args:
+        service (str): The service of the request.
+        operation (str): The operation of the request.
+        bucket (str): The bucket or container of the request.
+        resource (str, optional): The object of the request.
+    """
+    instruments = _instruments
+    if not instruments:
+        return _null_request
+    return _Request(instruments, RequestEvent(service, operation, bucket, resource=resource,
+                                              retries=retry.get_attempt()))
+
+
+def iter_requests(service, operation, bucket, pages):
+    """Instruments the requests that fetch every page of a paginated listing.
+
+    Args:
+        service (str): The service of the requests.
+        operation (str): The operation of the requests.
+        bucket (str): The bucket or container of the requests.
+        pages (iterable): The pages of the listing, which are fetched
+            lazily. Pages that are dictionaries are treated as boto3 responses.
+            Since the end of a listing is usually known without a request,
+            `Instrument.before_request` may be called for the page after the
+            last one without a matching `Instrument.after_request`.
+
+    Returns:
+        iter: The pages.
+    """
+    pages = iter(pages)
+    while True:
+        req = request(service, operation, bucket)
+        with req as event:
+            page = next(pages, _end)
+            if event:
+                if page is _end:
+                    # The end of a listing is known without making a request
+                    req.cancel()
+                else:
+                    event.status = get_response_status(page)
+        if page is _end:
+            return
+        yield page
+
+
+class LatencyHistogram(object):
+    """A histogram of latencies with buckets that grow geometrically.
+
+    Percentiles are accurate to the ``growth`` factor of the buckets
+    regardless of the number of values, and memory use only grows with
+    the range of the values.
+
+    Args:
+        min_value (float): The upper bound of the first bucket (in seconds).
+        growth (float): The ratio of the bounds of consecutive buckets.
+    """
+    def __init__(self, min_value=0.0001, growth=1.05):
+        self.min_value = min_value
+        self.growth = growth
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._log_growth = math.log(growth)
+        self._buckets = {}
+
+    def add(self, value):
+        """Adds a value to the histogram."""
+        if value <= self.min_value:
+            index = 0
+        else:
+            index = int(math.ceil(math.log(value / self.min_value) / self._log_growth))
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent):
+        """Returns the upper bound of the bucket of a percentile.
+
+        Args:
+            percent (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The percentile, or None if the histogram is empty.
+        """
+        if not self.count:
+            return None
+        rank = max(1, int(math.ceil(self.count * percent / 100.0)))
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                break
+        return min(self.min_value * self.growth ** index, self.max)
+
+
+class _OperationStats(object):
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+
+
+class LatencyAggregator(Instrument):
+    """Aggregates the counts and latencies of requests by service and operation.
+
+    Example::
+
+        aggregator = instrumentation.LatencyAggregator()
+        with instrumentation.use(aggregator):
+            path.download('dir')
+        stats = aggregator.get_stats()
+        stats['swift:download']['p99']
+    """
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def after_request(self, event):
+        key = '%s:%s' % (event.service, event.operation)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _OperationStats()
+            stats.histogram.add(event.duration)
+            stats.errors += event.error is not None
+            stats.retries += bool(event.retries)
+            stats.bytes += event.bytes or 0
+
+    def reset(self):
+        """Discards the requests aggregated so far."""
+        with self._lock:
+            self._stats = {}
+
+    def get_stats(self):
+        """Returns the statistics of every operation.
+
+        Returns:
+            dict: The statistics of every operation, keyed by ``service:operation``.
+                Statistics are dictionaries with the ``count``, ``errors``,
+                ``retries`` (the number of requests that were retries) and ``bytes``
+                of the requests and the ``total``, ``max``, ``p50``, ``p95`` and
+                ``p99`` latencies in seconds.
+        """
+        with self._lock:
+            return {
+                key: {
+                    'count': stats.histogram.count,
+                    'errors': stats.errors,
+                    'retries': stats.retries,
+                    'bytes': stats.bytes,
+                    'total': stats.histogram.total,
+                    'max': stats.histogram.max,
+                    'p50': stats.histogram.percentile(50),
+                    'p95': stats.histogram.percentile(95),
+                    'p99': stats.histogram.percentile(99)
+                }
+                for key, stats in self._stats.items()
+            }
+
+    def get_report(self):
+        """Returns a table of the statistics of every operation.
+
+        Returns:
+            str: The table, with latencies in milliseconds.
+        """
+        lines = ['%-24s %8s %7s %7s %12s %9s %9s %9s %9s' % (
+            'operation', 'count', 'errors', 'retries', 'bytes', 'p50', 'p95', 'p99', 'max')]
+        for key, stats in sorted(self.get_stats().items()):
+            lines.append('%-24s %8d %7d %7d %12d %9.1f %9.1f %9.1f %9.1f' % (
+                key, stats['count'], stats['errors'], stats['retries'], stats['bytes'],
+                stats['p50'] * 1000, stats['p95'] * 1000, stats['p99'] * 1000,
+                stats['max'] * 1000))
+        return '\n'.join(lines)
@@ -1,16 +1,21 @@
+from functools import partial
 import locale
+import logging
 import posixpath
 import sys
 
 import six
-from swiftclient.service import SwiftError
-from swiftclient.service import SwiftUploadObject
 
+from stor import exceptions
 from stor.base import Path
 from stor.posix import PosixPath
+from stor import settings
 from stor import utils
 
 
+progress_logger = logging.getLogger('%s.progress' % __name__)
+
+
 def _delegate_to_buffer(attr_name, valid_modes=None):
     """Factory function that delegates file-like properties to underlying buffer"""
     def wrapper(self, *args, **kwargs):
@@ -26,10 +31,119 @@ def _delegate_to_buffer(attr_name, valid_modes=None):
     return wrapper
 
 
-class OBSUploadObject(SwiftUploadObject):
+class OBSCopyLogger(utils.BaseProgressLogger):
+    """Logs the progress of streaming copies between OBS paths.
+
+    Bytes are counted while the objects are read.
+    """
+    operation = 'copy'
+
+    def __init__(self, total_copy_objects):
+        super(OBSCopyLogger, self).__init__(progress_logger, total_objects=total_copy_objects)
+
+    def get_start_message(self):
+        return 'starting copy of %s objects' % self.total_objects
+
+    def get_finish_message(self):
+        return 'copy complete - %s' % self.get_progress_message()
+
+
+class _CountingReader(object):
+    """Wraps a binary stream and counts the bytes read from it.
+
+    ``callback`` is called with the number of bytes of every read.
+    """
+    def __init__(self, stream, callback=None):
+        self._stream = stream
+        self._callback = callback
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self._stream.read(size)
+        self.bytes_read += len(data)
+        if self._callback and data:
+            self._callback(len(data))
+        return data
+
+
+def _stream_copy_object_attempt(source, dest, options, callback=None):
+    """Makes one attempt of copying an object for `_stream_copy_object`.
+
+    The bytes that were counted with ``callback`` are returned with a negative
+    count when the attempt fails.
+    """
+    stream, metadata = source._open_read_stream()
+    counting_stream = _CountingReader(stream, callback)
+    try:
+        dest._write_stream(counting_stream,
+                           utils.str_to_bytes(options['segment_size']),
+                           options['segment_threads'],
+                           metadata=metadata)
+    except BaseException:
+        if callback and counting_stream.bytes_read:
+            callback(-counting_stream.bytes_read)
+        raise
+    finally:
+        stream.close()
+    return counting_stream.bytes_read
+
+
+def _stream_copy_object(paths, options, callback=None, retry_args=None):
+    """Copies the contents and metadata of one OBS object to another through memory.
+
+    Failed attempts are retried with the retry policy of the destination service.
+    """
+    source, dest = paths
+    policy = dest._get_retry_policy().replace(
+        exceptions=((exceptions.UnavailableError, exceptions.FailedTransferError, IOError) +
+                    source._transient_errors + dest._transient_errors))
+    policy = policy.with_retry_args(dict(retry_args or {}))
+    num_bytes = policy.call(_stream_copy_object_attempt, source, dest, options, callback)
+    return {'source': source, 'dest': dest, 'bytes': num_bytes}
+
+
+def stream_copy_objects(to_copy, **retry_args):
+    """Copies objects between OBS services without staging them on local disk.
+
+    Every object is read with a streaming GET and written with a multipart or
+    segmented upload while reading. At most ``segment_threads`` segments of
+    ``segment_size`` bytes of each object are held in memory, and
+    ``object_threads`` objects are copied concurrently. These options are
+    configured in the ``stor:copy`` settings.
+
+    The content type and user metadata of the objects are copied along with
+    their contents. Objects whose copy fails are copied again from the start
+    with the retry policy of the destination service.
+
+    Args:
+        to_copy (List[tuple(OBSPath, OBSPath)]): The source and destination
+            objects to copy.
+        **retry_args: Optional ``num_retries``, ``initial_retry_sleep``,
+            ``retry_sleep_function`` and ``deadline`` arguments that override
+            the retry policy of every object.
+
+    Returns:
+        List[OBSPath]: The copied destination paths.
+    """
+    options = settings.get()['stor:copy']
+    results = []
+    with OBSCopyLogger(len(to_copy)) as cl:
+        copy_object = partial(_stream_copy_object, options=options, callback=cl.add_bytes,
+                              retry_args=retry_args)
+        for result in utils.threaded_imap_unordered(copy_object, to_copy,
+                                                    options['object_threads']):
+            cl.add_result(result)
+            results.append(result['dest'])
+    return results
+
+
+class OBSUploadObject(object):
     """
     An upload object similar to swiftclient's SwiftUploadObject that allows the user
     to specify a destination file name (full key) and upload options.
+
+    It does not depend on swiftclient, so that S3 uploads don't import it. Swift
+    uploads convert it to a SwiftUploadObject.
     """
     def __init__(self, source, object_name, options=None):
         """
@@ -38,15 +152,25 @@ class OBSUploadObject(SwiftUploadObject):
         Args:
             source (str): A path that specifies a source file.
             dest (str): A path that specifies a destination file name (full key)
+
+        Raises:
+            ValueError: The source or object name is invalid.
         """
-        try:
-            super(OBSUploadObject, self).__init__(source, object_name=object_name, options=options)
-        except SwiftError as exc:
-            if 'SwiftUploadObject' in exc.value:
-                msg = exc.value.replace('SwiftUploadObject', 'OBSUploadObject', 1)
-            else:
-                msg = exc.value
-            raise ValueError(msg)
+        if isinstance(source, six.string_types):
+            object_name = object_name or source
+        elif source is None or hasattr(source, 'read'):
+            if not object_name or not isinstance(object_name, six.string_types):
+                raise ValueError('Object names must be specified as strings for uploads'
+                                 ' from None or file like objects.')
+        else:
+            raise ValueError('Unexpected source type for OBSUploadObject: %s' % type(source))
+
+        if not object_name:
+            raise ValueError('Object names must not be empty strings')
+
+        self.object_name = object_name.lstrip('/')
+        self.options = options
+        self.source = source
 
 
 class OBSPath(Path):
@@ -57,6 +181,10 @@ class OBSPath(Path):
     path_module = posixpath
     parts_class = PosixPath
 
+    #: Exceptions of the service (besides `UnavailableError`) that indicate
+    #: transient failures of a request
+    _transient_errors = ()
+
     def __init__(self, pth):
         """
         Validates OBS path is in the proper format.
@@ -91,12 +219,17 @@ class OBSPath(Path):
         """
         return not self.endswith('/') and not self.ext
 
-    def _get_parts(self):
-        """Returns the path parts (excluding the drive) as a list of strings."""
+    @utils.CachedProperty
+    def _parts(self):
+        """The path parts (excluding the drive) as a tuple of strings, parsed once."""
         if len(self) > len(self.drive):
-            return self[len(self.drive):].split('/')
+            return tuple(self[len(self.drive):].split('/'))
         else:
-            return []
+            return ()
+
+    def _get_parts(self):
+        """Returns the path parts (excluding the drive) as a tuple of strings."""
+        return self._parts
 
     @property
     def name(self):
@@ -108,7 +241,7 @@ class OBSPath(Path):
         """The parent of the path, mimicking path.py's parent property"""
         return self.path_class(super(OBSPath, self).parent)
 
-    @property
+    @utils.CachedProperty
     def resource(self):
         """Returns the resource as a ``PosixPath`` object or None.
 
@@ -116,10 +249,10 @@ class OBSPath(Path):
         Note that it's important to keep the trailing slash in a resource
         name for prefix queries.
         """
-        parts = self._get_parts()
+        parts = self._parts
         joined_resource = '/'.join(parts[1:]) if len(parts) > 1 else None
 
-        return self.parts_class(joined_resource) if joined_resource else None
+        return self.parts_class._from_trusted(joined_resource) if joined_resource else None
 
     def normpath(self):
         """Normalize path following linux conventions (keeps drive prefix)"""
@@ -149,6 +282,33 @@ class OBSPath(Path):
         """
         raise NotImplementedError
 
+    def _open_read_stream(self):
+        """Opens a binary stream of the contents of the object.
+
+        Returns:
+            tuple(file, dict): A file-like object that supports ``read`` and
+            ``close``, and the ``content_type`` and user ``metadata`` of the object.
+
+        Requests are not retried, since `stream_copy_objects` retries the copy of
+        the whole object.
+        """
+        raise NotImplementedError
+
+    def _write_stream(self, stream, segment_size, segment_threads, metadata=None):
+        """Writes the contents of a binary stream to the object.
+
+        Objects larger than ``segment_size`` are uploaded in segments (or parts),
+        with at most ``segment_threads`` segments uploaded at a time. The
+        ``content_type`` and user ``metadata`` of ``metadata`` are set on the
+        object, as returned by `_open_read_stream`. Requests are not retried, as
+        with `_open_read_stream`.
+        """
+        raise NotImplementedError
+
+    def _get_retry_policy(self):
+        """Returns the default `RetryPolicy` of operations on the service of the path."""
+        raise NotImplementedError
+
     def list(self):
         """List contents using the resource of the path as a prefix."""
         raise NotImplementedError
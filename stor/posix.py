@@ -1,13 +1,227 @@
 """
 Provides functionality for accessing resources on Posix file systems.
 """
+import errno
+import logging
 import os
 import posixpath
+import shutil
+import stat
+import sys
 
 from stor import base
+from stor import settings
 from stor import utils
 
 
+progress_logger = logging.getLogger('%s.progress' % __name__)
+
+# The kernel copy functions that are not supported, so that they are only tried once
+_unsupported_copy_functions = set()
+
+# Errors of kernel copy functions that mean a fallback is needed for the files
+_COPY_FALLBACK_ERRNOS = (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+                         errno.ENOTSUP, errno.EBADF, errno.ENOTSOCK)
+
+# Only Linux can sendfile to regular files. Other platforms require a socket.
+_HAS_FILE_SENDFILE = sys.platform.startswith('linux')
+
+
+class PosixCopyLogger(utils.BaseProgressLogger):
+    """Logs the progress of `parallel_copytree`"""
+    operation = 'copy'
+
+    def __init__(self, total_files):
+        super(PosixCopyLogger, self).__init__(progress_logger, total_objects=total_files)
+
+    def update_progress(self, result):
+        """Tracks number of bytes copied."""
+        self.add_bytes(result['bytes'])
+
+    def get_start_message(self):
+        return 'starting copy of %s files' % self.total_objects
+
+    def get_finish_message(self):
+        return 'copy complete - %s' % self.get_progress_message()
+
+
+def _get_copy_chunk_size(size):
+    """Returns the bytes copied per call of a kernel copy function.
+
+    Like ``shutil``, chunks are the size of the file, at least 8 MiB (in case
+    the file grows) and at most 1 GiB.
+    """
+    return min(max(size, 1 << 23), 1 << 30)
+
+
+def _copy_file_range(fsrc, fdst, size):
+    """Copies with ``os.copy_file_range``, which can avoid copying data on the host"""
+    chunk_size = _get_copy_chunk_size(size)
+    while os.copy_file_range(fsrc, fdst, chunk_size):
+        pass
+
+
+def _sendfile(fsrc, fdst, size):
+    """Copies with ``os.sendfile``, which copies data in the kernel"""
+    chunk_size = _get_copy_chunk_size(size)
+    offset = 0
+    while True:
+        sent = os.sendfile(fdst, fsrc, offset, chunk_size)
+        if not sent:
+            break
+        offset += sent
+
+
+def _copy_file_contents(fsrc, fdst, size):
+    """Copies an open file with the fastest available kernel copy function.
+
+    Falls back to copying in Python when the kernel cannot copy between the
+    files, for example with ``copy_file_range`` across filesystems on older kernels.
+    """
+    for copy_function_name, copy_function in (('copy_file_range', _copy_file_range),
+                                              ('sendfile', _sendfile)):
+        if (copy_function_name in _unsupported_copy_functions or
+                not hasattr(os, copy_function_name) or
+                (copy_function_name == 'sendfile' and not _HAS_FILE_SENDFILE)):
+            continue
+        try:
+            return copy_function(fsrc.fileno(), fdst.fileno(), size)
+        except OSError as e:
+            if e.errno not in _COPY_FALLBACK_ERRNOS:
+                raise
+            if e.errno == errno.ENOSYS:
+                _unsupported_copy_functions.add(copy_function_name)
+            # Nothing was written if the first call failed, but rewind to be sure
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+
+    shutil.copyfileobj(fsrc, fdst)
+
+
+def _copy_file(paths):
+    """Copies a file and its metadata like ``shutil.copy2`` for `parallel_copytree`.
+
+    Returns:
+        dict: The source, destination and number of bytes copied.
+    """
+    source, dest = paths
+    # Opening named pipes blocks until they are written to
+    if stat.S_ISFIFO(os.stat(source).st_mode):
+        raise shutil.SpecialFileError('`%s` is a named pipe' % source)
+    with open(source, 'rb') as fsrc:
+        size = os.fstat(fsrc.fileno()).st_size
+        with open(dest, 'wb') as fdst:
+            _copy_file_contents(fsrc, fdst, size)
+    shutil.copystat(source, dest)
+    return {'source': source, 'dest': dest, 'bytes': size}
+
+
+def _try_copy_file(paths):
+    """Copies a file with `_copy_file` and returns errors in the result"""
+    try:
+        return _copy_file(paths)
+    except (IOError, OSError) as e:
+        return {'source': paths[0], 'dest': paths[1], 'bytes': 0, 'error': e}
+
+
+def _list_copy_tree(source, dest, errors):
+    """Lists the files and directories of a copy with `utils.scan_tree`.
+
+    Like ``shutil.copytree``, symlinks are followed. Files that cannot be
+    stat'ed and directories that cannot be listed are added to ``errors``.
+
+    Returns:
+        tuple(List[tuple(str, str)], List[tuple(str, str)]): The (source, dest)
+            paths of the files and of the directories, ordered so that parent
+            directories come first.
+
+    Raises:
+        OSError: ``source`` cannot be listed.
+    """
+    missing_files = []
+    scan_errors = []
+    entries = list(utils.scan_tree(source, missing_files=missing_files, follow_symlinks=True,
+                                   errors=scan_errors))
+    for error in scan_errors:
+        if error.filename == source:
+            raise error
+        errors.append((error.filename, os.path.join(dest, os.path.relpath(error.filename,
+                                                                          source)), str(error)))
+    for path in missing_files:
+        errors.append((path, os.path.join(dest, os.path.relpath(path, source)),
+                       '[Errno %s] %s' % (errno.ENOENT, os.strerror(errno.ENOENT))))
+
+    files = []
+    # Directories are only listed when they are empty, so add the parents of every entry
+    dir_names = set()
+    for entry in entries:
+        rel_path = os.path.relpath(entry.path, source)
+        if entry.is_dir:
+            dir_names.add(rel_path)
+        else:
+            files.append((entry.path, os.path.join(dest, rel_path)))
+        parent = os.path.dirname(rel_path)
+        while parent and parent not in dir_names:
+            dir_names.add(parent)
+            parent = os.path.dirname(parent)
+    dir_names.discard(os.curdir)
+    # Parents sort before their subdirectories
+    dirs = [(source, dest)] + [(os.path.join(source, name), os.path.join(dest, name))
+                               for name in sorted(dir_names)]
+    return files, dirs
+
+
+def parallel_copytree(source, dest, num_threads=None):
+    """Copies a local directory to a new local directory with a thread pool.
+
+    Follows the semantics of ``shutil.copytree``: ``dest`` must not exist,
+    symlinks are followed, and file and directory metadata is copied like
+    ``shutil.copy2``. The source is scanned with `utils.scan_tree` and the
+    directories are created before files are copied concurrently with
+    ``os.copy_file_range`` or ``os.sendfile`` (on Linux) when available, so
+    data isn't copied through Python. Named pipes are not copied and are
+    reported as errors. Progress is logged to the ``stor.posix.progress``
+    logger.
+
+    Args:
+        source (str): The directory to copy.
+        dest (str): The directory to create.
+        num_threads (int): The number of files to copy concurrently. Defaults to
+            the ``file_threads`` option of the ``posix:copy`` settings.
+
+    Raises:
+        OSError: The source cannot be listed or ``dest`` already exists.
+        shutil.Error: Some files could not be copied. The error holds the list of
+            (source, dest, error message) tuples of the failed files.
+    """
+    if num_threads is None:
+        num_threads = settings.get()['posix:copy']['file_threads']
+
+    errors = []
+    files, dirs = _list_copy_tree(source, dest, errors)
+    os.makedirs(dest)
+    for dir_source, dir_dest in dirs[1:]:
+        os.mkdir(dir_dest)
+
+    with PosixCopyLogger(len(files)) as copy_logger:
+        for result in utils.threaded_imap_unordered(_try_copy_file, files, num_threads):
+            if 'error' in result:
+                errors.append((result['source'], result['dest'], str(result['error'])))
+            else:
+                copy_logger.add_result(result)
+
+    # Copy directory metadata last since copying files updates the modification times
+    for dir_source, dir_dest in reversed(dirs):
+        try:
+            shutil.copystat(dir_source, dir_dest)
+        except OSError as e:  # pragma: no cover
+            errors.append((dir_source, dir_dest, str(e)))
+
+    if errors:
+        raise shutil.Error(errors)
+
+
 class PosixPath(base.FileSystemPath):
     """Represents a posix path.
 
@@ -27,11 +241,15 @@ class PosixPath(base.FileSystemPath):
         Returns:
             List[str]: A list of all files and directories.
         """
-        return list(utils.walk_files_and_dirs([self]).keys())
+        make_path = self.path_class._from_trusted
+        return [make_path(p) for p in utils.walk_files_and_dirs([self])]
 
     def walkfiles(self, pattern=None):
         """Iterate over files recursively.
 
+        Directories are walked with `utils.scan_tree`, so files are only
+        stat'ed once.
+
         Args:
             pattern (str, optional): Limits the results to files
                 with names that match the pattern.  For example,
@@ -40,9 +258,16 @@ class PosixPath(base.FileSystemPath):
 
         Returns:
             Iter[Path]: Files recursively under the path
-        Note:
-            This may be much slower than list() because it checks twice that everything is a file.
         """
-        for f in self.list():
-            if os.path.isfile(f) and (pattern is None or f.fnmatch(pattern)):
+        if os.path.isfile(self):
+            paths = [self]
+        elif os.path.isdir(self):
+            make_path = self.path_class._from_trusted
+            paths = (make_path(entry.path) for entry in utils.scan_tree(self)
+                     if not entry.is_dir)
+        else:
+            raise ValueError('file "%s" not found' % self)
+
+        for f in paths:
+            if pattern is None or f.fnmatch(pattern):
                 yield f
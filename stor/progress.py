@@ -0,0 +1,145 @@
+"""
+Progress of transfers.
+
+Transfers track the bytes they have sent or received, from the callbacks of
+boto3 transfers and from the results of ``SwiftService``, and report their
+progress every ``progress_interval`` seconds (an option of the ``stor``
+settings) instead of after a number of objects. Reports include the
+throughput over the last `THROUGHPUT_WINDOW` seconds and, when the total size
+of the transfer is known, the estimated time left.
+
+Besides being logged, reports are passed to the callbacks added with
+`add_callback` (or `use`) as `Progress` tuples, for example to show the
+progress of jobs on a dashboard::
+
+    from stor import progress
+
+    def on_progress(p):
+        dashboard.update(p.operation, p.bytes, p.total_bytes, p.eta)
+
+    with progress.use(on_progress):
+        stor.copytree('dir', 's3://bucket/dir')
+"""
+from collections import deque
+from collections import namedtuple
+import contextlib
+import logging
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+#: The time (in seconds) over which the throughput of a transfer is averaged
+THROUGHPUT_WINDOW = 30
+
+#: A report of the progress of a transfer.
+#:
+#: Attributes:
+#:     operation (str): The transfer, for example "upload" or "download".
+#:     objects (int): The number of objects transferred.
+#:     total_objects (int): The number of objects to transfer, or None if it is unknown.
+#:     bytes (int): The number of bytes transferred.
+#:     total_bytes (int): The number of bytes to transfer, or None if it is unknown.
+#:     elapsed (float): The time (in seconds) since the transfer started.
+#:     throughput (float): The bytes per second over the last `THROUGHPUT_WINDOW`
+#:         seconds, or over the whole transfer once it is finished.
+#:     eta (float): The estimated time (in seconds) left, or None if it is unknown.
+#:     finished (bool): True for the report at the end of the transfer.
+Progress = namedtuple('Progress', ['operation', 'objects', 'total_objects', 'bytes',
+                                   'total_bytes', 'elapsed', 'throughput', 'eta', 'finished'])
+
+# The callbacks of the process. The tuple is replaced when callbacks are added
+# or removed so that reports can iterate over it without locking.
+_callbacks = ()
+_callbacks_lock = threading.Lock()
+
+
+def add_callback(callback):
+    """Adds a callback that receives the progress reports of every transfer.
+
+    Callbacks are called from the threads of the transfers, so they must
+    be thread-safe. Exceptions raised by callbacks are logged.
+
+    Args:
+        callback (function(Progress)): The callback.
+    """
+    global _callbacks
+    with _callbacks_lock:
+        _callbacks += (callback,)
+
+
+def remove_callback(callback):
+    """Removes a callback added with `add_callback`.
+
+    Args:
+        callback (function(Progress)): The callback.
+
+    Raises:
+        ValueError: The callback was not added.
+    """
+    global _callbacks
+    with _callbacks_lock:
+        callbacks = list(_callbacks)
+        callbacks.remove(callback)
+        _callbacks = tuple(callbacks)
+
+
+@contextlib.contextmanager
+def use(callback):
+    """Adds a progress callback for the duration of a ``with`` block.
+
+    Args:
+        callback (function(Progress)): The callback.
+    """
+    add_callback(callback)
+    try:
+        yield callback
+    finally:
+        remove_callback(callback)
+
+
+def notify(report):
+    """Passes a progress report to every callback.
+
+    Args:
+        report (Progress): The report.
+    """
+    for callback in _callbacks:
+        try:
+            callback(report)
+        except Exception:
+            logger.exception('progress callback %r failed', callback)
+
+
+class ThroughputMeter(object):
+    """Measures a moving average of the rate at which a total grows.
+
+    Args:
+        window (float): The time (in seconds) over which the rate is averaged.
+    """
+    def __init__(self, window=THROUGHPUT_WINDOW):
+        self.window = window
+        self._samples = deque()
+
+    def add_sample(self, t, total):
+        """Records the total at time ``t``."""
+        samples = self._samples
+        samples.append((t, total))
+        # Keep the newest sample that is at least as old as the window
+        while len(samples) > 2 and samples[1][0] <= t - self.window:
+            samples.popleft()
+
+    def get_rate(self):
+        """Returns the average rate per second over the window, or None without
+        enough samples."""
+        if len(self._samples) < 2:
+            return None
+        (start, start_total), (end, end_total) = self._samples[0], self._samples[-1]
+        return (end_total - start_total) / float(end - start) if end > start else None
+
+
+def format_duration(seconds):
+    """Formats a duration in seconds as ``H:MM:SS``."""
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return '%d:%02d:%02d' % (hours, minutes, seconds)
@@ -0,0 +1,267 @@
+"""
+Retry policies for operations on OBS services.
+
+A `RetryPolicy` describes which exceptions are retried, how many times, and how
+long to sleep between attempts. Policies are immutable, so the policy derived
+from the settings is built once per settings snapshot and shared by every call
+instead of being rebuilt on each call.
+
+Methods decorated with `retry` accept the ``num_retries``,
+``initial_retry_sleep``, ``retry_sleep_function`` and ``deadline`` keyword
+arguments to override the policy of a single call.
+
+A policy with a ``deadline`` bounds the total time of an operation, including
+every retry. The deadline also applies to the operations called while it is
+active, and `get_remaining_time` allows capping per-request timeouts with it.
+The deadline is held per thread; functions that run in worker threads are
+wrapped with `propagate_deadline` to apply the deadline of the calling thread.
+Threads started by other libraries, such as the transfer threads of boto3,
+only see the deadline through the calls that stor makes before the transfer.
+
+`get_attempt` returns the number of retries made so far by the innermost
+retried call of the thread.
+"""
+from functools import wraps
+import logging
+import random
+import threading
+import time
+
+import six
+
+from stor import exceptions
+
+
+logger = logging.getLogger(__name__)
+
+#: The keyword arguments that override the retry policy of a call
+RETRY_ARGS = ('num_retries', 'initial_retry_sleep', 'retry_sleep_function', 'deadline')
+
+# Thread-local variable that holds the time at which the active deadline expires
+_deadline_local = threading.local()
+
+# Thread-local variable that holds the attempt of the innermost retried call
+_attempt_local = threading.local()
+
+
+def get_attempt():
+    """Returns the number of retries made so far by the innermost retried call.
+
+    Returns:
+        int: 0 during the first attempt of a call, or when no call is retried.
+    """
+    return getattr(_attempt_local, 'attempt', 0)
+
+
+def get_remaining_time():
+    """Returns the time (in seconds) left before the active deadline expires.
+
+    Returns:
+        float|None: The remaining time, which is negative once the deadline
+            has expired, or None if no deadline is active.
+    """
+    expires_at = getattr(_deadline_local, 'expires_at', None)
+    return None if expires_at is None else expires_at - time.time()
+
+
+def propagate_deadline(func):
+    """Returns a function that calls ``func`` with the deadline active now.
+
+    Used for functions that are called from worker threads, which do not
+    share the deadline of the thread that submits them.
+
+    Args:
+        func (function): The function to call.
+    """
+    expires_at = getattr(_deadline_local, 'expires_at', None)
+    if expires_at is None:
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        previous_expires_at = getattr(_deadline_local, 'expires_at', None)
+        if previous_expires_at is None or expires_at < previous_expires_at:
+            _deadline_local.expires_at = expires_at
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _deadline_local.expires_at = previous_expires_at
+    return wrapper
+
+
+def check_deadline(description):
+    """Raises `DeadlineExceededError` if the active deadline has expired.
+
+    Args:
+        description (str): A description of the operation that is about to start.
+    """
+    remaining_time = get_remaining_time()
+    if remaining_time is not None and remaining_time <= 0:
+        raise exceptions.DeadlineExceededError('deadline exceeded before %s' % description)
+
+
+def get_retry_args(kwargs):
+    """Returns the retry keyword arguments (see `RETRY_ARGS`) of a call.
+
+    Args:
+        kwargs (dict): The keyword arguments of a call.
+    """
+    return {arg: kwargs[arg] for arg in RETRY_ARGS if arg in kwargs}
+
+
+def check_unexpected_args(func_name, kwargs):
+    """Raises `TypeError` for keyword arguments left after taking the retry arguments.
+
+    Args:
+        func_name (str): The name of the called function.
+        kwargs (dict): The keyword arguments of the call, with the retry
+            arguments popped by `RetryPolicy.with_retry_args`.
+    """
+    if kwargs:
+        raise TypeError('%s() got unexpected keyword arguments: %s'
+                        % (func_name, ', '.join(sorted(kwargs))))
+
+
+def _double_sleep_function(t, attempt):
+    return t * 2
+
+
+class RetryPolicy(object):
+    """Describes how an operation is retried.
+
+    Args:
+        exceptions (Exception|tuple(Exception)): The exceptions that are retried.
+            Any other exception is raised immediately.
+        num_retries (int): The maximum number of retries after the first attempt.
+        initial_sleep (float): The time to sleep (in seconds) before the first retry.
+        sleep_function (function(float, int) -> float): A function that takes the
+            last sleep time and the attempt number and returns the next sleep time.
+            Defaults to doubling the sleep time.
+        jitter (float): The fraction of every sleep time that is randomized, e.g.
+            0.1 sleeps between 90% and 110% of the sleep time.
+        deadline (float): The total time (in seconds) that the operation and its
+            retries may take. Retries that would sleep past the deadline are not
+            started. None (or 0) retries regardless of time.
+    """
+    def __init__(self, exceptions=(), num_retries=0, initial_sleep=1, sleep_function=None,
+                 jitter=0, deadline=None):
+        self.exceptions = exceptions
+        self.num_retries = num_retries
+        self.initial_sleep = initial_sleep
+        self.sleep_function = sleep_function or _double_sleep_function
+        self.jitter = jitter
+        self.deadline = deadline
+
+    def __repr__(self):
+        return ('RetryPolicy(exceptions=%r, num_retries=%r, initial_sleep=%r, jitter=%r, '
+                'deadline=%r)') % (self.exceptions, self.num_retries, self.initial_sleep,
+                                   self.jitter, self.deadline)
+
+    def replace(self, **options):
+        """Returns a copy of the policy with ``options`` replaced.
+
+        Args:
+            **options: Any of the arguments of `RetryPolicy`.
+        """
+        policy_options = dict(self.__dict__)
+        policy_options.update(options)
+        return RetryPolicy(**policy_options)
+
+    def with_retry_args(self, retry_args):
+        """Returns the policy with the retry keyword arguments of a call applied.
+
+        Args:
+            retry_args (dict): Keyword arguments of a call. The ``num_retries``,
+                ``initial_retry_sleep``, ``retry_sleep_function`` and ``deadline``
+                arguments are popped from the dictionary.
+        """
+        if not any(arg in retry_args for arg in RETRY_ARGS):
+            return self
+        return self.replace(
+            num_retries=retry_args.pop('num_retries', self.num_retries),
+            initial_sleep=retry_args.pop('initial_retry_sleep', self.initial_sleep),
+            sleep_function=retry_args.pop('retry_sleep_function', self.sleep_function),
+            deadline=retry_args.pop('deadline', self.deadline))
+
+    def _get_sleep_time(self, sleep_time):
+        if self.jitter:
+            return sleep_time * random.uniform(1 - self.jitter, 1 + self.jitter)
+        return sleep_time
+
+    def call(self, func, *args, **kwargs):
+        """Calls ``func`` with ``args`` and ``kwargs`` and retries it with the policy.
+
+        Returns:
+            The result of ``func``.
+
+        Raises:
+            DeadlineExceededError: The deadline expired before ``func`` succeeded.
+        """
+        if not self.num_retries and not self.deadline:
+            return func(*args, **kwargs)
+
+        previous_expires_at = getattr(_deadline_local, 'expires_at', None)
+        if self.deadline:
+            expires_at = time.time() + self.deadline
+            if previous_expires_at is None or expires_at < previous_expires_at:
+                _deadline_local.expires_at = expires_at
+        previous_attempt = get_attempt()
+        try:
+            return self._call(func, *args, **kwargs)
+        finally:
+            _deadline_local.expires_at = previous_expires_at
+            _attempt_local.attempt = previous_attempt
+
+    def _call(self, func, *args, **kwargs):
+        sleep_time = self.initial_sleep
+        for attempt in range(self.num_retries):
+            _attempt_local.attempt = attempt
+            try:
+                return func(*args, **kwargs)
+            except self.exceptions as exc:
+                if isinstance(exc, exceptions.CircuitOpenError):
+                    # Retrying would only add load while the endpoint recovers
+                    raise
+                jittered_sleep_time = self._get_sleep_time(sleep_time)
+                remaining_time = get_remaining_time()
+                if remaining_time is not None and remaining_time < jittered_sleep_time:
+                    msg = 'deadline exceeded after %d attempts of %s: %s' % (
+                        attempt + 1, getattr(func, '__name__', func), exc)
+                    six.raise_from(exceptions.DeadlineExceededError(msg, exc), exc)
+                logger.info('retrying %s in %0.2fs after %r (attempt %d of %d)',
+                            getattr(func, '__name__', func), sleep_time, exc,
+                            attempt + 1, self.num_retries)
+                time.sleep(jittered_sleep_time)
+                sleep_time = self.sleep_function(sleep_time, attempt)
+
+        _attempt_local.attempt = self.num_retries
+        return func(*args, **kwargs)
+
+
+def retry(exceptions, get_policy):
+    """Returns a decorator that retries a function with a `RetryPolicy`.
+
+    Decorated functions accept the ``num_retries``, ``initial_retry_sleep``,
+    ``retry_sleep_function`` and ``deadline`` keyword arguments to override
+    the policy of a call.
+
+    Args:
+        exceptions (Exception|tuple(Exception)): The exceptions that are retried.
+        get_policy (function() -> RetryPolicy): Returns the default policy. The
+            policy of the decorated function is only derived again when the
+            default policy is a different object.
+    """
+    def decorated(func):
+        # The default policy and the policy derived from it for this function
+        cache = [None, None]
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            default_policy = get_policy()
+            cached_policy, policy = cache
+            if default_policy is not cached_policy:
+                policy = default_policy.replace(exceptions=exceptions)
+                cache[:] = [default_policy, policy]
+            return policy.with_retry_args(kwargs).call(func, *args, **kwargs)
+        return wrapper
+    return decorated
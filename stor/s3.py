@@ -7,17 +7,24 @@ from multiprocessing.pool import ThreadPool
 import os
 import tempfile
 import threading
+import time
 import warnings
 
 import boto3
 from boto3 import exceptions as boto3_exceptions
 from boto3.s3.transfer import S3Transfer
 from boto3.s3.transfer import TransferConfig
+from botocore import config as botocore_config
 from botocore import exceptions as botocore_exceptions
 import six
 
+from stor import circuit_breaker
 from stor import exceptions
+from stor import instrumentation
+from stor import retry
 from stor import settings
+from stor import throttle
+from stor import tracing
 from stor import utils
 from stor.base import Path
 from stor.obs import OBSFile
@@ -27,6 +34,22 @@ from stor.obs import OBSUploadObject
 # Thread-local variable used to cache the client
 _thread_local = threading.local()
 
+# The s3 settings that are passed to boto3.session.Session
+_SESSION_SETTINGS = ('aws_access_key_id', 'aws_secret_access_key', 'aws_session_token',
+                     'profile_name', 'region_name')
+
+_retry_policy_cache = (None, None)
+
+# The directions of the operations whose requests are limited by the
+# ``max_requests_per_second`` options of ``s3:upload`` and ``s3:download``
+_THROTTLED_OPERATIONS = {
+    'PutObject': 'upload',
+    'CreateMultipartUpload': 'upload',
+    'UploadPart': 'upload',
+    'CompleteMultipartUpload': 'upload',
+    'GetObject': 'download'
+}
+
 logger = logging.getLogger(__name__)
 progress_logger = logging.getLogger('%s.progress' % __name__)
 
@@ -68,6 +91,81 @@ def _parse_s3_error(exc, **kwargs):
         return exceptions.RemoteError(msg, exc)
 
 
+def _get_request_bytes(method_name, kwargs, response):
+    """Returns the number of bytes sent or received by a request, or None if it is unknown"""
+    if method_name == 'get_object':
+        return response.get('ContentLength')
+    elif method_name == 'put_object' and isinstance(kwargs.get('Body'), bytes):
+        return len(kwargs['Body'])
+    elif method_name in ('upload_file', 'download_file'):
+        return os.path.getsize(kwargs['filename'])
+    return None
+
+
+def _trace_part_start(params, model, context, **kwargs):
+    """Starts the span of an uploaded part or a ranged download when tracing"""
+    if tracing.get_tracer() is None:
+        return
+    if model.name == 'UploadPart':
+        try:
+            num_bytes = len(params['Body'])
+        except TypeError:
+            num_bytes = None
+        part = {'part_number': params['PartNumber']}
+    elif 'Range' in params:
+        num_bytes = None
+        part = {'range': params['Range']}
+    else:
+        return
+    context['stor_trace_part'] = ('s3://%s/%s' % (params['Bucket'], params['Key']),
+                                  time.time(), num_bytes, dict(part, operation=model.name))
+
+
+def _trace_part_end(context, parsed=None, exception=None, **kwargs):
+    """Records the span of an uploaded part or a ranged download when tracing"""
+    part = context.pop('stor_trace_part', None)
+    tracer = tracing.get_tracer()
+    if part is None or tracer is None:
+        return
+    name, start, num_bytes, args = part
+    retries = max(context.get('retries', {}).get('attempt', 1) - 1, 0)
+    if parsed is not None:
+        status = instrumentation.get_response_status(parsed)
+        if status:
+            args['status'] = status
+        num_bytes = num_bytes if num_bytes is not None else parsed.get('ContentLength')
+    if exception is not None:
+        args['error'] = repr(exception)
+    tracer.add_span(name, 'part', start, time.time(), thread=threading.current_thread().name,
+                    bytes=num_bytes, retries=retries, **args)
+
+
+def _register_trace_handlers(s3_client):
+    """Registers the handlers that trace the parts of transfers made with a client"""
+    events = s3_client.meta.events
+    for operation in ('UploadPart', 'GetObject'):
+        events.register('before-parameter-build.s3.%s' % operation, _trace_part_start)
+        events.register('after-call.s3.%s' % operation, _trace_part_end)
+        events.register('after-call-error.s3.%s' % operation, _trace_part_end)
+
+
+def _throttle_request(direction, **kwargs):
+    """Waits until the request limit of ``direction`` allows a request to be sent"""
+    limiter = throttle.get_limiter('s3', direction)
+    if limiter:
+        limiter.consume_request()
+
+
+def _register_throttle_handlers(s3_client):
+    """Registers the handlers that limit the upload and download requests of a client.
+
+    Handlers run before every request is sent, including retries of boto3.
+    """
+    events = s3_client.meta.events
+    for operation, direction in _THROTTLED_OPERATIONS.items():
+        events.register('before-send.s3.%s' % operation, partial(_throttle_request, direction))
+
+
 def _get_s3_client():
     """Returns the boto3 client and initializes one if it doesn't already exist.
 
@@ -79,13 +177,21 @@ def _get_s3_client():
     """
     if not hasattr(_thread_local, 's3_client'):
         kwargs = {}
-        for k, v in settings.get()['s3'].items():
+        options = settings.get()['s3']
+        for k in _SESSION_SETTINGS:
             # only pass through keyword arguments that are set to avoid
             # overriding Boto3's default lookup behavior
-            if v:
-                kwargs[k] = v
+            if options.get(k):
+                kwargs[k] = options[k]
         session = boto3.session.Session(**kwargs)
-        _thread_local.s3_client = session.client('s3')
+        if options.get('timeout'):
+            config = botocore_config.Config(connect_timeout=options['timeout'],
+                                            read_timeout=options['timeout'])
+            _thread_local.s3_client = session.client('s3', config=config)
+        else:
+            _thread_local.s3_client = session.client('s3')
+        _register_trace_handlers(_thread_local.s3_client)
+        _register_throttle_handlers(_thread_local.s3_client)
     return _thread_local.s3_client
 
 
@@ -112,65 +218,153 @@ def _get_s3_transfer(config=None):
     return _thread_local.s3_transfer
 
 
+def _get_circuit_breaker():
+    """Returns the circuit breaker of the S3 endpoint, or None if it is disabled."""
+    options = settings.get()['s3']
+    if not options['circuit_failure_threshold']:
+        return None
+    return circuit_breaker.get_circuit_breaker(
+        's3:%s' % (options['region_name'] or 'default'),
+        (exceptions.UnavailableError, botocore_exceptions.ConnectionError,
+         boto3_exceptions.RetriesExceededError),
+        options['circuit_failure_threshold'],
+        options['circuit_reset_timeout'])
+
+
+def _get_retry_policy():
+    """Returns the default `RetryPolicy` of S3 operations.
+
+    The policy is only built again when the s3 settings change.
+    """
+    global _retry_policy_cache
+    options = settings.get()['s3']
+    cached_options, policy = _retry_policy_cache
+    if options is not cached_options:
+        policy = retry.RetryPolicy(num_retries=options['num_retries'],
+                                   jitter=options['retry_jitter'],
+                                   deadline=options['deadline'] or None)
+        _retry_policy_cache = (options, policy)
+    return policy
+
+
+def _call_with_circuit_breaker(func, *args, **kwargs):
+    """Calls ``func`` through the circuit breaker of the S3 endpoint, if it is enabled."""
+    breaker = _get_circuit_breaker()
+    if breaker:
+        return breaker.call(func, *args, **kwargs)
+    return func(*args, **kwargs)
+
+
+def _next_page(pages):
+    """Fetches the next page of a boto3 paginator, or returns None after the last page."""
+    try:
+        return next(pages, None)
+    except botocore_exceptions.ClientError as e:
+        six.raise_from(_parse_s3_error(e), e)
+
+
+def _iter_pages_with_circuit_breaker(pages, breaker):
+    """Fetches every page of a boto3 paginator through a circuit breaker."""
+    pages = iter(pages)
+    while True:
+        page = breaker.call(_next_page, pages)
+        if page is None:
+            return
+        yield page
+
+
+def _call_transfer_method(method, *args, **kwargs):
+    """Calls a ``S3Transfer`` method.
+
+    Uploads that fail because S3 is unavailable raise `UnavailableError`
+    instead of ``S3UploadFailedError``, so that circuit breakers count them.
+    """
+    try:
+        return method(*args, **kwargs)
+    except boto3_exceptions.S3UploadFailedError as e:
+        cause = e.__context__
+        if isinstance(cause, botocore_exceptions.ClientError):
+            error = _parse_s3_error(cause)
+            if isinstance(error, exceptions.UnavailableError):
+                six.raise_from(error, e)
+        raise
+
+
+def _get_listing_metadata(contents):
+    """Returns the ``(size, checksum)`` of listed objects keyed on their key.
+
+    The checksum of an object is its ETag without quotes.
+    """
+    return {
+        obj['Key']: (obj.get('Size'), obj['ETag'].strip('"') if obj.get('ETag') else None)
+        for obj in contents
+    }
+
+
+def _get_manifest_checksums(upload_objects, walked_files, segment_size):
+    """Returns the checksums of uploaded files for the data manifest.
+
+    Checksums are the ETags of the uploads, which are multipart ETags for files
+    of at least ``segment_size`` bytes. No checksums are computed unless the
+    ``manifest_checksums`` option of the ``stor:checksum`` settings is enabled
+    and version 2 data manifests are written.
+    """
+    options = settings.get()
+    if (not options['stor:checksum']['manifest_checksums'] or
+            options['stor']['data_manifest_version'] != 2):
+        return {}
+    from stor import checksum
+
+    return checksum.compute_checksums([
+        o.source for o in upload_objects
+        if o.source in walked_files and not utils.has_trailing_slash(o.object_name) and
+        os.path.isfile(o.source)
+    ], chunk_size=segment_size)
+
+
+def _s3_retry(exceptions):
+    """Allows `S3Path` methods to take optional retry configuration
+    parameters for doing retry logic
+    """
+    return retry.retry(exceptions, _get_retry_policy)
+
+
 class S3DownloadLogger(utils.BaseProgressLogger):
-    def __init__(self, total_download_objects):
-        super(S3DownloadLogger, self).__init__(progress_logger)
-        self.total_download_objects = total_download_objects
-        self.downloaded_bytes = 0
+    """Logs the progress of downloads.
 
-    def update_progress(self, result):
-        """Tracks number of bytes downloaded."""
-        self.downloaded_bytes += (os.path.getsize(result['dest'])
-                                  if not utils.has_trailing_slash(result['source']) else 0)
+    Bytes are counted by the callbacks of the transfers.
+    """
+    operation = 'download'
+
+    def __init__(self, total_download_objects):
+        super(S3DownloadLogger, self).__init__(progress_logger,
+                                               total_objects=total_download_objects)
 
     def get_start_message(self):
-        return 'starting download of %s objects' % self.total_download_objects
+        return 'starting download of %s objects' % self.total_objects
 
     def get_finish_message(self):
         return 'download complete - %s' % self.get_progress_message()
 
-    def get_progress_message(self):
-        elapsed_time = self.get_elapsed_time()
-        formatted_elapsed_time = self.format_time(elapsed_time)
-        mb = self.downloaded_bytes / (1024 * 1024.0)
-        mb_s = mb / elapsed_time.total_seconds() if elapsed_time else 0.0
-        return (
-            '%s/%s\t'
-            '%s\t'
-            '%0.2f MB\t'
-            '%0.2f MB/s'
-        ) % (self.num_results, self.total_download_objects, formatted_elapsed_time, mb, mb_s)
-
 
 class S3UploadLogger(utils.BaseProgressLogger):
-    def __init__(self, total_upload_objects):
-        super(S3UploadLogger, self).__init__(progress_logger)
-        self.total_upload_objects = total_upload_objects
-        self.uploaded_bytes = 0
+    """Logs the progress of uploads.
 
-    def update_progress(self, result):
-        """Keep track of total uploaded bytes by referencing the object sizes"""
-        self.uploaded_bytes += (os.path.getsize(result['source'])
-                                if not utils.has_trailing_slash(result['dest']) else 0)
+    Bytes are counted by the callbacks of the transfers.
+    """
+    operation = 'upload'
+
+    def __init__(self, total_upload_objects, total_bytes=None):
+        super(S3UploadLogger, self).__init__(progress_logger,
+                                             total_objects=total_upload_objects,
+                                             total_bytes=total_bytes)
 
     def get_start_message(self):
-        return 'starting upload of %s objects' % self.total_upload_objects
+        return 'starting upload of %s objects' % self.total_objects
 
     def get_finish_message(self):
         return 'upload complete - %s' % self.get_progress_message()
 
-    def get_progress_message(self):
-        elapsed_time = self.get_elapsed_time()
-        formatted_elapsed_time = self.format_time(elapsed_time)
-        mb = self.uploaded_bytes / (1024 * 1024.0)
-        mb_s = mb / elapsed_time.total_seconds() if elapsed_time else 0.0
-        return (
-            '%s/%s\t'
-            '%s\t'
-            '%0.2f MB\t'
-            '%0.2f MB/s'
-        ) % (self.num_results, self.total_upload_objects, formatted_elapsed_time, mb, mb_s)
-
 
 class S3Path(OBSPath):
     """
@@ -187,23 +381,38 @@ class S3Path(OBSPath):
     `S3 User Guide <http://docs.aws.amazon.com/AmazonS3/latest/UG/FolderOperations.html>`_.
     """
     drive = 's3://'
+    _transient_errors = (botocore_exceptions.ConnectionError,
+                         botocore_exceptions.HTTPClientError,
+                         botocore_exceptions.IncompleteReadError,
+                         boto3_exceptions.S3UploadFailedError)
 
-    @property
+    @utils.CachedProperty
     def bucket(self):
         """Returns the bucket name from the path or None"""
-        parts = self._get_parts()
+        parts = self._parts
         return parts[0] if len(parts) > 0 and parts[0] else None
 
     def _s3_client_call(self, method_name, *args, **kwargs):
         """
         Creates a boto3 S3 ``Client`` object and runs ``method_name``.
         """
+        retry.check_deadline('calling %s on %s' % (method_name, self))
+        return _call_with_circuit_breaker(self._s3_client_method_call, method_name,
+                                          *args, **kwargs)
+
+    def _s3_client_method_call(self, method_name, *args, **kwargs):
         s3_client = _get_s3_client()
         method = getattr(s3_client, method_name)
-        try:
-            return method(*args, **kwargs)
-        except botocore_exceptions.ClientError as e:
-            six.raise_from(_parse_s3_error(e, **kwargs), e)
+        with instrumentation.request('s3', method_name, self.bucket,
+                                     kwargs.get('Key')) as event:
+            try:
+                response = method(*args, **kwargs)
+            except botocore_exceptions.ClientError as e:
+                six.raise_from(_parse_s3_error(e, **kwargs), e)
+            if event:
+                event.status = instrumentation.get_response_status(response)
+                event.bytes = _get_request_bytes(method_name, kwargs, response)
+            return response
 
     def _get_s3_iterator(self, method_name, *args, **kwargs):
         """
@@ -212,7 +421,11 @@ class S3Path(OBSPath):
         """
         s3_client = _get_s3_client()
         paginator = s3_client.get_paginator(method_name)
-        return paginator.paginate(**kwargs)
+        pages = paginator.paginate(**kwargs)
+        breaker = _get_circuit_breaker()
+        if breaker:
+            pages = _iter_pages_with_circuit_breaker(pages, breaker)
+        return instrumentation.iter_requests('s3', method_name, self.bucket, pages)
 
     def _make_s3_transfer(self, method_name, config=None, *args, **kwargs):
         """
@@ -221,12 +434,51 @@ class S3Path(OBSPath):
         """
         transfer = _get_s3_transfer(config=config)
         method = getattr(transfer, method_name)
-        try:
-            return method(*args, **kwargs)
-        except boto3_exceptions.S3UploadFailedError as e:
-            six.raise_from(exceptions.FailedUploadError(str(e), e), e)
-        except boto3_exceptions.RetriesExceededError as e:
-            six.raise_from(exceptions.FailedDownloadError(str(e), e), e)
+        callback = kwargs.get('callback')
+        transferred = [0]
+        if callback:
+            # Count the bytes of this attempt so that they can be reported
+            # again as negative amounts if it fails and the transfer is retried
+            transferred_lock = threading.Lock()
+
+            def counting_callback(num_bytes):
+                with transferred_lock:
+                    transferred[0] += num_bytes
+                callback(num_bytes)
+            kwargs['callback'] = counting_callback
+        limiter = throttle.get_limiter('s3', 'upload' if method_name == 'upload_file'
+                                       else 'download')
+        if limiter:
+            kwargs['callback'] = throttle.throttle_callback(limiter, kwargs.get('callback'))
+        with instrumentation.request('s3', method_name, self.bucket,
+                                     kwargs.get('key')) as event:
+            try:
+                result = _call_with_circuit_breaker(_call_transfer_method, method,
+                                                    *args, **kwargs)
+            except (exceptions.UnavailableError,
+                    boto3_exceptions.S3UploadFailedError,
+                    boto3_exceptions.RetriesExceededError) as e:
+                if transferred[0]:
+                    callback(-transferred[0])
+                if isinstance(e, exceptions.UnavailableError):
+                    raise
+                if isinstance(e, boto3_exceptions.S3UploadFailedError):
+                    six.raise_from(exceptions.FailedUploadError(str(e), e), e)
+                six.raise_from(exceptions.FailedDownloadError(str(e), e), e)
+            if event:
+                event.bytes = _get_request_bytes(method_name, kwargs, result)
+            return result
+
+    @_s3_retry(exceptions=(exceptions.UnavailableError, exceptions.FailedUploadError,
+                           exceptions.FailedDownloadError))
+    def _retry_s3_call(self, s3_call, method_name, **kwargs):
+        """Calls ``s3_call`` (`_s3_client_call` or `_make_s3_transfer`) with
+        ``method_name`` and retries it with the S3 retry policy.
+
+        Failed attempts of transfers report their bytes to ``callback`` again
+        as negative amounts, so progress is not counted twice.
+        """
+        return s3_call(method_name, **kwargs)
 
     def open(self, mode='r', encoding=None):
         """
@@ -256,7 +508,8 @@ class S3Path(OBSPath):
              use_manifest=False,
              # hidden args
              list_as_dir=False,
-             ignore_dir_markers=False):
+             ignore_dir_markers=False,
+             **retry_args):
         """
         List contents using the resource of the path as a prefix.
 
@@ -268,7 +521,8 @@ class S3Path(OBSPath):
             condition (function(results) -> bool): The method will only return
                 when the results matches the condition.
             use_manifest (bool): Perform the list and use the data manfest file to validate
-                the list.
+                the list. The sizes and checksums of the manifest are verified against the
+                listing, and retries only check the objects that have not been validated yet.
 
         Returns:
             List[S3Path]: Every path in the listing
@@ -277,15 +531,18 @@ class S3Path(OBSPath):
             RemoteError: An s3 client error occurred.
             ConditionNotMetError: Results were returned, but they did not meet the condition.
         """
-        bucket = self.bucket
-        prefix = self.resource
         utils.validate_condition(condition)
+        manifest_validator = (utils.ManifestValidator(utils.iter_data_manifest(self))
+                              if use_manifest else None)
+        return self._list(starts_with, limit, condition, manifest_validator,
+                          list_as_dir, ignore_dir_markers, **retry_args)
 
-        if use_manifest:
-            object_names = utils.get_data_manifest_contents(self)
-            manifest_cond = partial(utils.validate_manifest_list, object_names)
-            condition = (utils.join_conditions(condition, manifest_cond)
-                         if condition else manifest_cond)
+    @_s3_retry(exceptions=(exceptions.ConditionNotMetError, exceptions.UnavailableError))
+    def _list(self, starts_with, limit, condition, manifest_validator, list_as_dir,
+              ignore_dir_markers):
+        """Performs `S3Path.list`, validating the listing with ``manifest_validator``"""
+        bucket = self.bucket
+        prefix = self.resource
 
         if starts_with:
             prefix = prefix / starts_with if prefix else starts_with
@@ -306,27 +563,32 @@ class S3Path(OBSPath):
             list_kwargs['Prefix'] = utils.with_trailing_slash(prefix) if prefix else ''
             list_kwargs['Delimiter'] = '/'
 
-        path_prefix = S3Path('%s%s' % (self.drive, bucket))
+        path_prefix = '%s%s/' % (self.drive, bucket)
+        make_path = S3Path._from_trusted
 
         results = self._get_s3_iterator('list_objects_v2', **list_kwargs)
         list_results = []
+        listed_objs = []
         try:
             for page in results:
                 if 'Contents' in page:
                     list_results.extend([
-                        path_prefix / result['Key']
+                        make_path(path_prefix + result['Key'])
                         for result in page['Contents']
                         if not ignore_dir_markers or
                         (ignore_dir_markers and not utils.has_trailing_slash(result['Key']))
                     ])
+                    listed_objs.extend(page['Contents'])
                 if list_as_dir and 'CommonPrefixes' in page:
                     list_results.extend([
-                        path_prefix / result['Prefix']
+                        make_path(path_prefix + result['Prefix'])
                         for result in page['CommonPrefixes']
                     ])
         except botocore_exceptions.ClientError as e:
             six.raise_from(_parse_s3_error(e), e)
 
+        if manifest_validator:
+            manifest_validator.check(_get_listing_metadata(listed_objs))
         utils.check_condition(condition, list_results)
         return list_results
 
@@ -382,6 +644,7 @@ class S3Path(OBSPath):
         except (exceptions.NotFoundError, ValueError):
             return False
 
+    @_s3_retry(exceptions=exceptions.UnavailableError)
     def getsize(self):
         """
         Returns the content length of an object in S3.
@@ -403,6 +666,7 @@ class S3Path(OBSPath):
                     raise
         return 0
 
+    @_s3_retry(exceptions=exceptions.UnavailableError)
     def remove(self):
         """
         Removes a single object.
@@ -435,7 +699,7 @@ class S3Path(OBSPath):
                     for i in range(len_range)
                 ]
             }
-            response = self._s3_client_call('delete_objects', Bucket=self.bucket, Delete=objects)
+            response = self._delete_objects(objects)
 
             if 'Errors' in response:
                 raise exceptions.RemoteError('an error occurred while using rmtree: %s, Key: %s'
@@ -443,6 +707,12 @@ class S3Path(OBSPath):
                                                 response['Errors'][0].get('Key')),
                                              response['Errors'])
 
+    @_s3_retry(exceptions=exceptions.UnavailableError)
+    def _delete_objects(self, objects):
+        """Deletes up to 1000 objects of the bucket with one request"""
+        return self._s3_client_call('delete_objects', Bucket=self.bucket, Delete=objects)
+
+    @_s3_retry(exceptions=exceptions.UnavailableError)
     def stat(self):
         """
         Performs a stat on the path.
@@ -491,6 +761,7 @@ class S3Path(OBSPath):
         }
         return response
 
+    @_s3_retry(exceptions=exceptions.UnavailableError)
     def read_object(self):
         """Read an individual object from OBS.
 
@@ -500,6 +771,35 @@ class S3Path(OBSPath):
         body = self._s3_client_call('get_object', Bucket=self.bucket, Key=self.resource)['Body']
         return body.read()
 
+    def _open_read_stream(self):
+        response = self._s3_client_call('get_object', Bucket=self.bucket, Key=self.resource)
+        metadata = {
+            'content_type': response.get('ContentType'),
+            'metadata': response.get('Metadata') or {}
+        }
+        return response['Body'], metadata
+
+    def _write_stream(self, stream, segment_size, segment_threads, metadata=None):
+        config = TransferConfig(multipart_threshold=segment_size,
+                                multipart_chunksize=segment_size,
+                                max_concurrency=segment_threads)
+        kwargs = {}
+        limiter = throttle.get_limiter('s3', 'upload')
+        if limiter:
+            kwargs['Callback'] = throttle.throttle_callback(limiter)
+        extra_args = {}
+        if metadata and metadata.get('content_type'):
+            extra_args['ContentType'] = metadata['content_type']
+        if metadata and metadata.get('metadata'):
+            extra_args['Metadata'] = metadata['metadata']
+        if extra_args:
+            kwargs['ExtraArgs'] = extra_args
+        self._s3_client_call('upload_fileobj', stream, self.bucket, self.resource, Config=config,
+                             **kwargs)
+
+    def _get_retry_policy(self):
+        return _get_retry_policy()
+
     def write_object(self, content):
         """Writes an individual object.
 
@@ -517,12 +817,17 @@ class S3Path(OBSPath):
             fp.flush()
             self.upload([OBSUploadObject(fp.name, self.resource)])
 
-    def download_object(self, dest, config=None, **kwargs):
+    def download_object(self, dest, config=None, callback=None, **retry_args):
         """
         Downloads a file from S3 to a destination file.
 
+        Downloads that fail are retried with the S3 retry policy, and the
+        error of the last attempt is returned in the result.
+
         Args:
             dest (str): The destination path to download file to.
+            callback (function(int), optional): Called from the threads of the
+                transfer with the number of bytes received.
 
         Notes:
             - The destination directory will be created automatically if it doesn't exist.
@@ -546,18 +851,22 @@ class S3Path(OBSPath):
             'filename': str(dest),
             'config': config
         }
+        if callback:
+            dl_kwargs['callback'] = callback
+        dl_kwargs.update(retry_args)
         utils.make_dest_dir(self.parts_class(dest).parent)
         try:
-            self._make_s3_transfer('download_file', **dl_kwargs)
+            self._retry_s3_call(self._make_s3_transfer, 'download_file', **dl_kwargs)
         except exceptions.RemoteError as e:
             result['success'] = False
             result['error'] = e
         return result
 
-    def _download_object_worker(self, obj_params, config=None):
+    def _download_object_worker(self, obj_params, config=None, callback=None, **retry_args):
         """Downloads a single object. Helper for threaded download."""
         name = self.parts_class(obj_params['source'][len(utils.with_trailing_slash(self)):])
-        return obj_params['source'].download_object(obj_params['dest'] / name, config=config)
+        return obj_params['source'].download_object(obj_params['dest'] / name, config=config,
+                                                    callback=callback, **retry_args)
 
     def download(self, dest, condition=None, use_manifest=False, **kwargs):
         """Downloads a directory from S3 to a destination directory.
@@ -567,6 +876,9 @@ class S3Path(OBSPath):
                 there must be a trailing slash. The directory will be created if it doesn't exist.
             condition (function(results) -> bool): The method will only return
                 when the results of download matches the condition.
+            **kwargs: The ``num_retries``, ``initial_retry_sleep``,
+                ``retry_sleep_function`` and ``deadline`` arguments override the
+                retry policy of every object downloaded.
 
         Returns:
             List[S3Path]: A list of the downloaded objects.
@@ -596,13 +908,14 @@ class S3Path(OBSPath):
             'max_concurrency': options.get('segment_threads'),
             'multipart_chunksize': segment_size
         }
-        download_w_config = partial(self._download_object_worker, config=transfer_config)
-
         downloaded = {'completed': [], 'failed': []}
         with S3DownloadLogger(len(files_to_download)) as dl:
+            download_w_config = partial(self._download_object_worker, config=transfer_config,
+                                        callback=dl.add_bytes, **retry.get_retry_args(kwargs))
             pool = ThreadPool(options['object_threads'])
             try:
-                result_iter = pool.imap_unordered(download_w_config, files_to_download)
+                result_iter = pool.imap_unordered(retry.propagate_deadline(download_w_config),
+                                                  files_to_download)
                 while True:
                     try:
                         result = result_iter.next(0xFFFF)
@@ -626,8 +939,13 @@ class S3Path(OBSPath):
         utils.check_condition(condition, [r['source'] for r in downloaded['completed']])
         return downloaded
 
-    def _upload_object(self, upload_obj, config=None):
-        """Upload a single object given an OBSUploadObject."""
+    def _upload_object(self, upload_obj, config=None, callback=None, **retry_args):
+        """Upload a single object given an OBSUploadObject.
+
+        ``callback`` is called from the threads of the transfer with the
+        number of bytes sent. Uploads that fail are retried with the S3 retry
+        policy, and the error of the last attempt is returned in the result.
+        """
         if utils.has_trailing_slash(upload_obj.object_name):
             # Handle empty directories separately
             ul_kwargs = {
@@ -647,8 +965,11 @@ class S3Path(OBSPath):
             }
             if upload_obj.options and 'headers' in upload_obj.options:
                 ul_kwargs['extra_args'] = upload_obj.options['headers']
+            if callback:
+                ul_kwargs['callback'] = callback
             s3_call = self._make_s3_transfer
             method = 'upload_file'
+        ul_kwargs.update(retry_args)
 
         result = {
             'source': upload_obj.source,
@@ -658,7 +979,7 @@ class S3Path(OBSPath):
         }
 
         try:
-            s3_call(method, **ul_kwargs)
+            self._retry_s3_call(s3_call, method, **ul_kwargs)
         except exceptions.RemoteError as e:
             result['success'] = False
             result['error'] = e
@@ -685,6 +1006,9 @@ class S3Path(OBSPath):
                 specified by an OBSUploadObject will override these headers.
                 Headers should be specified as key-value pairs,
                 e.g. {'ContentLanguage': 'en'}
+            **kwargs: The ``num_retries``, ``initial_retry_sleep``,
+                ``retry_sleep_function`` and ``deadline`` arguments override the
+                retry policy of every object uploaded.
 
         Returns:
             List[S3Path]: A list of the uploaded files as S3Paths.
@@ -717,10 +1041,18 @@ class S3Path(OBSPath):
             for name in files_to_convert if name != manifest_file_name
         ])
 
+        options = settings.get()['s3:upload']
+        segment_size = utils.str_to_bytes(options.get('segment_size'))
+
         if use_manifest:
             # Generate the data manifest and save it remotely
             object_names = [o.object_name for o in files_to_upload]
-            utils.generate_and_save_data_manifest(source[0], object_names)
+            checksums = _get_manifest_checksums(files_to_upload, files_to_convert, segment_size)
+            utils.generate_and_save_data_manifest(source[0], [
+                utils.ManifestEntry(o.object_name, files_to_convert.get(o.source),
+                                    checksums.get(o.source))
+                for o in files_to_upload
+            ])
             manifest_obj_name = resource_base / utils.file_name_to_object_name(manifest_file_name)
             manifest_obj = OBSUploadObject(str(manifest_file_name),
                                            manifest_obj_name,
@@ -732,20 +1064,20 @@ class S3Path(OBSPath):
             condition = (utils.join_conditions(condition, manifest_cond)
                          if condition else manifest_cond)
 
-        options = settings.get()['s3:upload']
-        segment_size = utils.str_to_bytes(options.get('segment_size'))
         transfer_config = {
             'multipart_threshold': segment_size,
             'max_concurrency': options.get('segment_threads'),
             'multipart_chunksize': segment_size
         }
-        upload_w_config = partial(self._upload_object, config=transfer_config)
-
         uploaded = {'completed': [], 'failed': []}
-        with S3UploadLogger(len(files_to_upload)) as ul:
+        with S3UploadLogger(len(files_to_upload),
+                            utils.get_upload_size(files_to_upload, files_to_convert)) as ul:
+            upload_w_config = partial(self._upload_object, config=transfer_config,
+                                      callback=ul.add_bytes, **retry.get_retry_args(kwargs))
             pool = ThreadPool(options['object_threads'])
             try:
-                result_iter = pool.imap_unordered(upload_w_config, files_to_upload)
+                result_iter = pool.imap_unordered(retry.propagate_deadline(upload_w_config),
+                                                  files_to_upload)
                 while True:
                     try:
                         result = result_iter.next(0xFFFF)
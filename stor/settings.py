@@ -25,7 +25,32 @@ to config sections and values are dictionaries where the keys are the option
 names and values are the environment variables.s
 """
 
-_global_settings = {}
+
+class _FrozenDict(dict):
+    """A read-only dictionary of settings.
+
+    Settings are stored as snapshots that are never modified once created.
+    `update` and `use` create new snapshots that share every section that is
+    not updated, so snapshots can be returned by `get` without copying them.
+    """
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('settings are read-only, use settings.update() or settings.use()')
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+    def __reduce__(self):
+        return (_FrozenDict, (dict(self),))
+
+
+_global_settings = _FrozenDict()
+_update_lock = threading.Lock()
 thread_local = threading.local()
 
 
@@ -97,7 +122,8 @@ def _initialize():
     Returns:
         None
     """
-    _global_settings.clear()
+    global _global_settings
+    _global_settings = _FrozenDict()
     default_cfg = os.path.join(os.path.dirname(__file__), CONFIG_FILE)
     update(parse_config_file(default_cfg), validate=False)
     custom_cfg = os.path.expanduser(USER_CONFIG_FILE)
@@ -108,42 +134,52 @@ def _initialize():
 
 def _update(d, updates, validate=True):
     """
-    Updates a nested dictionary with given dictionary
+    Returns a read-only copy of a nested dictionary with given dictionary
+    applied. Nested dictionaries that are not updated are shared with ``d``.
 
     If validate is set to True, the key being updated must already exist
     in the dictionary.
     """
+    updated = dict(d)
     for key, value in updates.items():
         if type(value) is dict:
-            if key not in d or not type(d[key]) is dict:
+            if key not in d or not isinstance(d[key], dict):
                 if validate:
                     raise ValueError('\'%s\' is not a valid setting' % key)
-                d[key] = {}
-            _update(d[key], value, validate)
+                updated[key] = _update(_FrozenDict(), value, validate)
+            else:
+                updated[key] = _update(d[key], value, validate)
         else:
             if validate and key not in d:
                 raise ValueError('\'%s\' is not a valid setting' % key)
-            d[key] = value
+            updated[key] = value
+    return _FrozenDict(updated)
+
+
+def _freeze(d):
+    """Returns a read-only copy of a nested dictionary of settings"""
+    return _update(_FrozenDict(), d, validate=False)
 
 
 def get():
     """
-    Returns a deep copy of global settings as a dictionary.
+    Returns the current settings as a read-only dictionary.
+
+    The returned settings are a snapshot that never changes, so it is
+    cheap to call this function often. Settings are changed with `update`
+    or `use`. Use ``copy.deepcopy`` to obtain a modifiable copy.
 
     This function should always be used rather than accessing
     ``global_settings`` directly.
     """
-    try:
-        return copy.deepcopy(thread_local.settings)
-    except AttributeError:
-        return copy.deepcopy(_global_settings)
+    return getattr(thread_local, 'settings', _global_settings)
 
 
 def update(settings=None,
            # not documented
            validate=True):
     """
-    Updates global settings permanently (in place).
+    Updates global settings permanently.
 
     Arguments:
         settings (dict): A nested dictionary of settings options.
@@ -151,10 +187,12 @@ def update(settings=None,
     Returns:
         None
     """
+    global _global_settings
     if hasattr(thread_local, 'settings'):
         raise RuntimeError('update() cannot be called from within a settings context manager')
     if settings:
-        _update(_global_settings, settings, validate=validate)
+        with _update_lock:
+            _global_settings = _update(_global_settings, settings, validate=validate)
 
 
 class _Use(object):
@@ -162,21 +200,15 @@ class _Use(object):
     Context manager for temporarily modifying settings.
     """
     def __init__(self, settings=None):
-        settings = settings or {}
-
-        if hasattr(thread_local, 'settings'):
-            self.old_settings = get()
-        else:
-            self.old_settings = None
-        self.temp_settings = get()
-        _update(self.temp_settings, settings)
+        self.old_settings = getattr(thread_local, 'settings', None)
+        self.temp_settings = _update(get(), settings or {})
         thread_local.settings = self.temp_settings
 
     def __enter__(self):
         pass
 
     def __exit__(self, type, value, traceback):
-        if self.old_settings:
+        if self.old_settings is not None:
             thread_local.settings = self.old_settings
         else:
             del thread_local.settings
@@ -191,3 +223,28 @@ class _Use(object):
 #:      >>> with settings.use({'swift:upload': {'object_threads': 20}}):
 #:      >>>     # do something here
 use = _Use
+
+
+class _UseSnapshot(_Use):
+    """
+    Context manager for using a snapshot returned by `get` in the current thread.
+    """
+    def __init__(self, snapshot):
+        self.old_settings = getattr(thread_local, 'settings', None)
+        self.temp_settings = snapshot
+        thread_local.settings = snapshot
+
+
+#: Context manager for using a snapshot returned by `get`, for example to run
+#: worker threads with the settings of the thread that started them.
+#:
+#: Arguments:
+#:   snapshot (dict): Settings returned by `get`.
+#:
+#: Example:
+#:      >>> from stor import settings
+#:      >>> snapshot = settings.get()
+#:      >>> # in another thread
+#:      >>> with settings.use_snapshot(snapshot):
+#:      >>>     # do something here
+use_snapshot = _UseSnapshot
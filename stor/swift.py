@@ -35,30 +35,42 @@ the `SwiftPath` class.
 import copy
 from functools import partial
 from functools import wraps
+import hashlib
+import io
 import json
 import logging
+from multiprocessing.pool import ThreadPool
 import os
+import shutil
 import tempfile
 import threading
+import time
 import warnings
 
+from requests import exceptions as requests_exceptions
 import six
 from six.moves.urllib import parse
 from swiftclient import exceptions as swift_exceptions
+from swiftclient import multithreading as swift_multithreading
 from swiftclient import service as swift_service
 from swiftclient import client as swift_client
 from swiftclient.utils import generate_temp_url
+from swiftclient.utils import parse_api_response
 
+from stor import circuit_breaker
 from stor import exceptions as stor_exceptions
+from stor import instrumentation
 from stor import is_swift_path
+from stor import retry
 from stor import settings
+from stor import throttle
+from stor import tracing
 from stor import utils
 from stor.base import Path
 from stor.obs import OBSFile
 from stor.obs import OBSPath
 from stor.obs import OBSUploadObject
 from stor.posix import PosixPath
-from stor.third_party.backoff import with_backoff
 
 
 logger = logging.getLogger(__name__)
@@ -87,9 +99,18 @@ swift_client.get_auth_keystone = patched_get_auth_keystone
 _cached_auth_token_map = {}
 _singleton_lock = threading.Lock()
 
+# The capabilities of the /info endpoint of swift clusters keyed on their auth url
+_cached_capabilities_map = {}
+
 # Content types that are assigned to empty directories
 DIR_MARKER_TYPES = ('text/directory', 'application/directory')
 
+# The MD5 of empty objects, which swift lists as the hash of dynamic large object manifests
+_EMPTY_MD5 = hashlib.md5(b'').hexdigest()
+
+# The prefix of the headers of user metadata of objects
+_OBJECT_META_PREFIX = 'x-object-meta-'
+
 # These variables are used to configure retry logic for swift.
 # These variables can also be passed to the methods themselves
 initial_retry_sleep = 1
@@ -102,7 +123,6 @@ ConditionNotMetError = stor_exceptions.ConditionNotMetError
 ConflictError = stor_exceptions.ConflictError
 UnavailableError = stor_exceptions.UnavailableError
 UnauthorizedError = stor_exceptions.UnauthorizedError
-SwiftFile = OBSFile
 SwiftUploadObject = OBSUploadObject
 
 
@@ -207,26 +227,34 @@ class ConfigurationError(SwiftError):
     pass
 
 
+_retry_policy_cache = (None, None, None, None)
+
+
+def _get_retry_policy():
+    """Returns the default `RetryPolicy` of swift operations.
+
+    The policy is only built again when the swift settings or the module-level
+    retry variables change.
+    """
+    global _retry_policy_cache
+    options = settings.get()['swift']
+    cached_options, cached_sleep, cached_sleep_function, policy = _retry_policy_cache
+    if (options is not cached_options or initial_retry_sleep != cached_sleep or
+            retry_sleep_function is not cached_sleep_function):
+        policy = retry.RetryPolicy(num_retries=options['num_retries'],
+                                   initial_sleep=initial_retry_sleep,
+                                   sleep_function=retry_sleep_function,
+                                   jitter=options['retry_jitter'],
+                                   deadline=options['deadline'] or None)
+        _retry_policy_cache = (options, initial_retry_sleep, retry_sleep_function, policy)
+    return policy
+
+
 def _swift_retry(exceptions=None):
     """Allows `SwiftPath` methods to take optional retry configuration
     parameters for doing retry logic
     """
-    def decorated(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            retries = kwargs.pop('num_retries', settings.get()['swift']['num_retries'])
-            initial_sleep = kwargs.pop('initial_retry_sleep',
-                                       initial_retry_sleep)
-            sleep_function = kwargs.pop('retry_sleep_function',
-                                        retry_sleep_function)
-
-            return with_backoff(func,
-                                exceptions=exceptions,
-                                sleep_function=sleep_function,
-                                retries=retries,
-                                initial_sleep=initial_sleep)(*args, **kwargs)
-        return wrapper
-    return decorated
+    return retry.retry(exceptions or (), _get_retry_policy)
 
 
 def _swiftclient_error_to_descriptive_exception(exc):
@@ -310,6 +338,220 @@ def _retry_on_cached_auth_err(func):
     return wrapper
 
 
+def _get_contents_length(contents, content_length=None):
+    """Returns the length of the contents of a ``put_object`` call, or None if it is unknown"""
+    if content_length is not None:
+        return content_length
+    elif isinstance(contents, (six.binary_type, six.text_type)):
+        return len(contents)
+    return None
+
+
+def _get_request_bytes(method_name, args, kwargs, result):
+    """Returns the number of bytes transferred by a swift call, or None if it is unknown"""
+    if method_name == 'get_object':
+        content_length = result[0].get('content-length')
+        return int(content_length) if content_length is not None else None
+    elif method_name == 'put_object':
+        contents = args[2] if len(args) > 2 else kwargs.get('contents')
+        return _get_contents_length(contents, kwargs.get('content_length'))
+    elif method_name == 'download':
+        return sum(r.get('read_length', 0) for r in result if not _is_failed_result(r))
+    elif method_name == 'upload':
+        return sum(os.path.getsize(r['path']) for r in result
+                   if r.get('action') == 'upload_object' and r.get('path') and
+                   not _is_failed_result(r))
+    return None
+
+
+def _get_result_span(result):
+    """Returns the name, category and bytes of the span of a ``SwiftService`` result.
+
+    Returns None for results that are not about a single object or segment.
+    """
+    action = result.get('action')
+    if action == 'upload_segment':
+        return 'swift:/%s' % result['segment_location'], 'part', result.get('segment_size')
+    elif action not in ('upload_object', 'download_object', 'delete_object', 'delete_segment'):
+        return None
+
+    num_bytes = result.get('read_length')
+    if action == 'upload_object' and result.get('path') and not _is_failed_result(result):
+        num_bytes = os.path.getsize(result['path'])
+    name = 'swift://%s/%s' % (result.get('container'), result.get('object'))
+    return name, 'part' if action == 'delete_segment' else 'object', num_bytes
+
+
+def _trace_service_result(tracer, result):
+    """Records the span of an object or segment of a ``SwiftService`` result.
+
+    swiftclient only reports when downloads start, so the spans of other
+    results end and start when the result is received.
+    """
+    span = _get_result_span(result)
+    if span is None:
+        return
+    name, category, num_bytes = span
+    end = result.get('finish_time') or result.get('error_timestamp') or time.time()
+    args = {'action': result['action']}
+    if _is_failed_result(result):
+        args['error'] = repr(result['error'])
+    # Retries of swiftclient and of the transfer
+    retries = max(result.get('attempts', 1) - 1, 0) + retry.get_attempt()
+    tracer.add_span(name, category, result.get('start_time') or end, end, bytes=num_bytes,
+                    retries=retries, **args)
+
+
+def _get_request_container(pth, method_name, args, kwargs):
+    """Returns the container requested by a swiftclient call on ``pth``.
+
+    Calls pass their container as the first argument (or as the ``container``
+    keyword argument), which differs from the container of the path for calls on
+    segment containers. Account calls, such as bulk deletes, are reported with
+    the container of the path.
+    """
+    if args and not method_name.endswith('_account') and method_name != 'get_capabilities':
+        return args[0]
+    return kwargs.get('container', pth.container)
+
+
+def _instrument_swift_call(func):
+    """Instruments a call of a swiftclient ``Connection`` or ``SwiftService`` method.
+
+    Calls are reported with the container they request (see
+    `_get_request_container`). Calls of ``SwiftService`` methods that return
+    failed results without raising them are reported with the error of the
+    first failed result.
+    """
+    @wraps(func)
+    def wrapper(self, method_name, *args, **kwargs):
+        resource = args[1] if method_name.endswith('_object') and len(args) > 1 else None
+        container = _get_request_container(self, method_name, args, kwargs)
+        with instrumentation.request('swift', method_name, container, resource) as event:
+            result = func(self, method_name, *args, **kwargs)
+            if event:
+                if isinstance(result, list):
+                    event.error = next((r['error'] for r in result if _is_failed_result(r)),
+                                       None)
+                event.bytes = _get_request_bytes(method_name, args, kwargs, result)
+            return result
+    return wrapper
+
+
+def _has_unavailable_result(results):
+    """Returns True if ``SwiftService`` results failed because the cluster was unavailable.
+
+    Service calls that don't raise their errors return the failed results along with
+    the successful ones.
+    """
+    if not isinstance(results, list):
+        return False
+    for result in results:
+        if _is_failed_result(result):
+            error = getattr(result['error'], 'exception', result['error'])
+            if (getattr(error, 'http_status', None) == 503 or
+                    isinstance(error, requests_exceptions.ConnectionError)):
+                return True
+    return False
+
+
+def _check_circuit_breaker(func):
+    """Calls a function through the circuit breaker of the swift cluster.
+
+    Calls fail fast with `CircuitOpenError` after ``circuit_failure_threshold``
+    consecutive unavailable or connection errors of the cluster of ``auth_url``,
+    including the errors of failed results returned by service calls.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        options = settings.get()['swift']
+        if not options['circuit_failure_threshold']:
+            return func(*args, **kwargs)
+        breaker = circuit_breaker.get_circuit_breaker(
+            'swift:%s' % options['auth_url'],
+            (UnavailableError, requests_exceptions.ConnectionError),
+            options['circuit_failure_threshold'],
+            options['circuit_reset_timeout'],
+            is_failed_result=_has_unavailable_result)
+        return breaker.call(func, *args, **kwargs)
+    return wrapper
+
+
+def _ignore_not_found(service_call):
+    """Ignores 404 errors when performing a swift service call"""
+    def wrapper(*args, **kwargs):
+        try:
+            return service_call(*args, **kwargs)
+        except NotFoundError:
+            return []
+    return wrapper
+
+
+def _stat_result_to_dict(result):
+    """Converts a ``SwiftService.stat`` result into the dictionary returned by `SwiftPath.stat`"""
+    stat_values = {
+        k.replace(' ', '-'): v
+        for k, v in result['items']
+    }
+    stat_values['headers'] = result['headers']
+
+    if result['action'] == 'stat_account':
+        # Load account ACLs
+        stat_values['Access-Control'] = json.loads(
+            result['headers'].get('x-account-access-control', '{}'))
+
+    return stat_values
+
+
+def _get_listing_metadata(listing):
+    """Returns the ``(size, checksum)`` of listed objects keyed on their name.
+
+    Dynamic large object manifests are listed as empty objects, so the size and
+    checksum of empty objects are unknown.
+    """
+    return {
+        r['name']: ((None, None) if r.get('bytes') == 0 and r.get('hash') == _EMPTY_MD5
+                    else (r.get('bytes'), r.get('hash')))
+        for r in listing if 'name' in r
+    }
+
+
+def _is_failed_result(result):
+    """Returns True if a ``SwiftService`` result has an error status"""
+    if 'error' not in result:
+        return False
+    http_status = getattr(result['error'], 'http_status', None)
+    return not http_status or http_status >= 400
+
+
+def _transfer_object_name(obj):
+    """Returns the object name of an object passed to ``SwiftService`` transfers"""
+    return str(obj.object_name if isinstance(obj, OBSUploadObject) else obj)
+
+
+def _to_swift_upload_object(obj):
+    """Converts an object passed to `SwiftPath.upload` for ``SwiftService.upload``"""
+    if not isinstance(obj, OBSUploadObject):
+        return obj
+    return swift_service.SwiftUploadObject(obj.source, object_name=obj.object_name,
+                                           options=obj.options)
+
+
+def _compute_upload_checksums(upload_objects, walked_files, segment_size):
+    """Returns the MD5 checksums of uploaded files that are not segmented.
+
+    Files larger than ``segment_size`` are uploaded as large objects, whose
+    ETag is not the MD5 of the file, so they have no checksum.
+    """
+    from stor import checksum
+
+    return checksum.compute_checksums([
+        o.source for o in upload_objects
+        if walked_files.get(o.source) is not None and
+        walked_files[o.source] <= segment_size and os.path.isfile(o.source)
+    ])
+
+
 def _validate_manifest_upload(expected_objs, upload_results):
     """
     Given a list of expected object names and a list of dictionaries of
@@ -339,9 +581,10 @@ def _validate_manifest_download(expected_objs, download_results):
 
 
 class SwiftDownloadLogger(utils.BaseProgressLogger):
+    operation = 'download'
+
     def __init__(self):
         super(SwiftDownloadLogger, self).__init__(progress_logger)
-        self.downloaded_bytes = 0
 
     def update_progress(self, result):
         """Tracks number of bytes downloaded.
@@ -349,7 +592,7 @@ class SwiftDownloadLogger(utils.BaseProgressLogger):
         The ``read_length`` property in swift download results contains the
         total size of the object
         """
-        self.downloaded_bytes += result.get('read_length', 0)
+        self.add_bytes(result.get('read_length', 0))
 
     def add_result(self, result):
         """Only add results to progress if they are ``download_object`` actions.
@@ -366,53 +609,419 @@ class SwiftDownloadLogger(utils.BaseProgressLogger):
     def get_finish_message(self):
         return 'download complete - %s' % self.get_progress_message()
 
-    def get_progress_message(self):
-        elapsed_time = self.get_elapsed_time()
-        formatted_elapsed_time = self.format_time(elapsed_time)
-        mb = self.downloaded_bytes / (1024 * 1024.0)
-        mb_s = mb / elapsed_time.total_seconds() if elapsed_time else 0
-        return (
-            '%s\t'
-            '%s\t'
-            '%0.2f MB\t'
-            '%0.2f MB/s'
-        ) % (self.num_results, formatted_elapsed_time, mb, mb_s)
-
 
 class SwiftUploadLogger(utils.BaseProgressLogger):
-    def __init__(self, total_upload_objects, upload_object_sizes):
-        super(SwiftUploadLogger, self).__init__(progress_logger)
-        self.total_upload_objects = total_upload_objects
+    operation = 'upload'
+
+    def __init__(self, total_upload_objects, upload_object_sizes, total_bytes=None):
+        super(SwiftUploadLogger, self).__init__(progress_logger,
+                                                total_objects=total_upload_objects,
+                                                total_bytes=total_bytes)
         self.upload_object_sizes = upload_object_sizes
-        self.uploaded_bytes = 0
+        # The bytes of the segments uploaded for every object
+        self._segment_bytes = {}
 
     def update_progress(self, result):
-        """Keep track of total uploaded bytes by referencing the object sizes"""
-        self.uploaded_bytes += self.upload_object_sizes.get(result['path'], 0)
+        """Keep track of total uploaded bytes by referencing the object sizes.
+
+        The bytes of segments are counted as they are uploaded, so only the
+        rest of the object is counted.
+        """
+        segment_bytes = self._segment_bytes.pop((result.get('container'), result.get('object')), 0)
+        self.add_bytes(self.upload_object_sizes.get(result['path'], 0) - segment_bytes)
 
     def add_result(self, result):
         """Only add results if they are ``upload_object`` and ``create_dir_marker``
-        actions"""
-        if result.get('action', None) in ('upload_object', 'create_dir_marker'):
+        actions. The bytes of ``upload_segment`` results are counted as they finish.
+        """
+        action = result.get('action', None)
+        if action == 'upload_segment':
+            key = (result['for_container'], result['for_object'])
+            self._segment_bytes[key] = self._segment_bytes.get(key, 0) + result['segment_size']
+            self.add_bytes(result['segment_size'])
+        elif action in ('upload_object', 'create_dir_marker'):
             super(SwiftUploadLogger, self).add_result(result)
 
     def get_start_message(self):
-        return 'starting upload of %s objects' % self.total_upload_objects
+        return 'starting upload of %s objects' % self.total_objects
 
     def get_finish_message(self):
         return 'upload complete - %s' % self.get_progress_message()
 
-    def get_progress_message(self):
-        elapsed_time = self.get_elapsed_time()
-        formatted_elapsed_time = self.format_time(elapsed_time)
-        mb = self.uploaded_bytes / (1024 * 1024.0)
-        mb_s = mb / elapsed_time.total_seconds() if elapsed_time else 0
-        return (
-            '%s/%s\t'
-            '%s\t'
-            '%0.2f MB\t'
-            '%0.2f MB/s'
-        ) % (self.num_results, self.total_upload_objects, formatted_elapsed_time, mb, mb_s)
+
+class _ThrottledReader(object):
+    """Wraps the contents of an upload and consumes the bytes read from a limiter"""
+    def __init__(self, contents, limiter):
+        self._contents = contents
+        self._limiter = limiter
+
+    def __getattr__(self, name):
+        return getattr(self._contents, name)
+
+    def read(self, *args):
+        data = self._contents.read(*args)
+        self._limiter.consume_bytes(len(data))
+        return data
+
+
+class _ThrottledBody(object):
+    """Wraps the body of a download and consumes the bytes received from a limiter"""
+    def __init__(self, body, limiter):
+        self._body = body
+        self._limiter = limiter
+
+    def __getattr__(self, name):
+        return getattr(self._body, name)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        chunk = next(self._body)
+        self._limiter.consume_bytes(len(chunk))
+        return chunk
+
+    next = __next__
+
+    def read(self, *args):
+        data = self._body.read(*args)
+        self._limiter.consume_bytes(len(data))
+        return data
+
+
+def _throttle_chunks(chunks, limiter):
+    for chunk in chunks:
+        limiter.consume_bytes(len(chunk))
+        yield chunk
+
+
+class _ThrottledConnection(object):
+    """Wraps a swiftclient ``Connection`` and limits the requests and bytes of
+    its uploads and downloads with `stor.throttle`.
+
+    ``put_object`` is limited by the ``swift:upload`` limiter and ``get_object``
+    by the ``swift:download`` limiter. Other methods are not limited.
+    """
+    def __init__(self, connection, upload_limiter, download_limiter):
+        self._connection = connection
+        self._upload_limiter = upload_limiter
+        self._download_limiter = download_limiter
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def put_object(self, container, obj, contents, *args, **kwargs):
+        limiter = self._upload_limiter
+        if limiter:
+            limiter.consume_request()
+            if contents is None or isinstance(contents, (bytes, six.text_type)):
+                limiter.consume_bytes(len(contents or b''))
+            elif hasattr(contents, 'read'):
+                contents = _ThrottledReader(contents, limiter)
+            else:
+                contents = _throttle_chunks(contents, limiter)
+        return self._connection.put_object(container, obj, contents, *args, **kwargs)
+
+    def get_object(self, *args, **kwargs):
+        limiter = self._download_limiter
+        if limiter:
+            limiter.consume_request()
+        headers, body = self._connection.get_object(*args, **kwargs)
+        if limiter:
+            if isinstance(body, bytes):
+                limiter.consume_bytes(len(body))
+            else:
+                body = _ThrottledBody(body, limiter)
+        return headers, body
+
+
+class _SwiftObjectReader(io.RawIOBase):
+    """A raw, seekable stream over the contents of a swift object.
+
+    The object is read in chunks of ``chunk_size`` bytes from a single GET
+    request. Seeking discards the current request and the next read issues
+    a new GET with a ``Range`` header starting at the new position.
+
+    The headers of the first request are available in ``headers``. GET requests
+    are retried with the swift retry policy, overridden by ``retry_args``.
+    """
+    def __init__(self, pth, chunk_size, retry_args=None):
+        self._path = pth
+        self._chunk_size = chunk_size
+        self._retry_args = retry_args or {}
+        self._pos = 0
+        self._size = None
+        self.headers = None
+        self._body = None
+        self._chunk = b''
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def _get_size(self):
+        if self._size is None:
+            headers = self._path._swift_connection_call('head_object',
+                                                        self._path.container,
+                                                        self._path.resource)
+            self._size = int(headers['content-length'])
+        return self._size
+
+    def _close_body(self):
+        if self._body is not None and hasattr(self._body, 'close'):
+            self._body.close()
+        self._body = None
+        self._chunk = b''
+
+    def _open_body(self):
+        # Avoid range requests past the end of the object, which swift rejects
+        if self._pos and self._pos >= self._get_size():
+            return False
+        headers, self._body = self._path._get_object_stream(self._pos, self._chunk_size,
+                                                            **self._retry_args)
+        if self.headers is None:
+            self.headers = headers
+        if self._size is None and not self._pos:
+            self._size = int(headers['content-length'])
+        return True
+
+    def readinto(self, b):
+        if not self._chunk:
+            if self._body is None and not self._open_body():
+                return 0
+            self._chunk = next(self._body, b'')
+            if not self._chunk:
+                return 0
+        num_bytes = min(len(b), len(self._chunk))
+        b[:num_bytes] = self._chunk[:num_bytes]
+        self._chunk = self._chunk[num_bytes:]
+        self._pos += num_bytes
+        return num_bytes
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._get_size() + offset
+        else:
+            raise ValueError('invalid whence (%r)' % whence)
+        if pos < 0:
+            raise ValueError('negative seek position %d' % pos)
+        if pos != self._pos:
+            self._close_body()
+            self._pos = pos
+        return self._pos
+
+    def close(self):
+        self._close_body()
+        super(_SwiftObjectReader, self).close()
+
+
+class _SwiftObjectWriter(io.RawIOBase):
+    """A raw stream that uploads a swift object as it is written.
+
+    Written data is cut into segments of ``segment_size`` bytes that are
+    uploaded concurrently to the segment container while the caller keeps
+    writing. At most ``segment_threads`` segments are uploaded at a time and
+    writes block when all threads are busy, bounding memory usage to roughly
+    ``segment_threads + 1`` segments.
+
+    The large object manifest is written on ``close``. Objects smaller than one
+    segment are uploaded directly without segments. Nothing is written for
+    empty objects unless ``write_empty`` is True. PUT requests are retried with
+    the swift retry policy, overridden by ``retry_args``.
+    """
+    def __init__(self, pth, segment_size, segment_threads, use_slo=True,
+                 checksum=True, headers=None, write_empty=False, retry_args=None):
+        self._path = pth
+        self._retry_args = retry_args or {}
+        self._segment_size = segment_size
+        self._segment_threads = segment_threads
+        self._use_slo = use_slo
+        self._checksum = checksum
+        self._headers = headers or {}
+        self._write_empty = write_empty
+        self._pos = 0
+        self._data = bytearray()
+        self._pool = None
+        self._pending = []
+        self._segments = []
+        self._error = None
+        self._segment_container = SwiftPath('%s%s/.segments_%s' % (
+            pth.drive, pth.tenant, pth.container))
+        self._segment_prefix = '%s/%s/%f/%d/' % (pth.resource, 'slo' if use_slo else 'dlo',
+                                                 time.time(), segment_size)
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def write(self, b):
+        if self.closed:
+            raise ValueError('I/O operation on closed file')
+        if self._error:
+            raise self._error
+        self._data.extend(b)
+        self._pos += len(b)
+        try:
+            while len(self._data) >= self._segment_size:
+                self._upload_segment(bytes(self._data[:self._segment_size]))
+                del self._data[:self._segment_size]
+        except Exception as exc:
+            self._abort(exc)
+            raise
+        return len(b)
+
+    def _abort(self, exc):
+        """Stops uploading segments. No object is written on close after aborting."""
+        self._error = exc
+        self._terminate_pool()
+
+    def _terminate_pool(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+
+    def _put_object(self, pth, contents):
+        # Swift verifies the etag of the contents when it is provided
+        etag = hashlib.md5(contents).hexdigest() if self._checksum else None
+        return {
+            'path': '/%s/%s' % (pth.container, pth.resource),
+            'etag': pth._put_object(contents, etag=etag, **self._retry_args),
+            'size_bytes': len(contents)
+        }
+
+    def _upload_segment(self, contents):
+        if self._pool is None:
+            self._segment_container._swift_connection_call('put_container',
+                                                           self._segment_container.container)
+            self._pool = ThreadPool(self._segment_threads)
+        # Wait for the oldest segment when all threads are busy
+        if len(self._pending) >= self._segment_threads:
+            self._segments.append(self._pending.pop(0).get(0xFFFF))
+        index = len(self._segments) + len(self._pending)
+        segment = self._segment_container / ('%s%08d' % (self._segment_prefix, index))
+        self._pending.append(self._pool.apply_async(retry.propagate_deadline(self._put_object),
+                                                    (segment, contents)))
+
+    def _write_manifest(self):
+        self._path._swift_connection_call('put_container', self._path.container)
+        if self._use_slo:
+            self._path._put_object(json.dumps(self._segments),
+                                   headers=self._headers,
+                                   query_string='multipart-manifest=put',
+                                   **self._retry_args)
+        else:
+            headers = dict(self._headers)
+            headers['X-Object-Manifest'] = '%s/%s' % (self._segment_container.container,
+                                                      self._segment_prefix)
+            self._path._put_object(b'', headers=headers, **self._retry_args)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._error:
+                pass
+            elif self._pool is None:
+                if self._data or self._write_empty:
+                    self._path._swift_connection_call('put_container', self._path.container)
+                    self._path._put_object(bytes(self._data), headers=self._headers,
+                                           **self._retry_args)
+            else:
+                if self._data:
+                    self._upload_segment(bytes(self._data))
+                while self._pending:
+                    self._segments.append(self._pending.pop(0).get(0xFFFF))
+                self._write_manifest()
+                self._pool.close()
+        finally:
+            self._terminate_pool()
+            self._data = bytearray()
+            super(_SwiftObjectWriter, self).close()
+
+
+class SwiftFile(OBSFile):
+    """
+    Provides methods for reading and writing swift objects returned by
+    `SwiftPath.open`.
+
+    By default, reading loads the entire object into memory on the first read.
+    When the ``stream_reads`` option of the ``swift:download`` settings is
+    enabled, objects are instead streamed in chunks of ``read_chunk_size``
+    bytes, allowing large objects to be processed in constant memory.
+    Seeking is supported with ``Range`` requests.
+
+    Similarly, writing buffers the entire object until it is flushed. When the
+    ``stream_writes`` option of the ``swift:upload`` settings is enabled,
+    written data is uploaded in segments of ``segment_size`` bytes while
+    writing and the large object manifest is created on ``close``. Streamed
+    objects are only written on ``close`` and ``flush`` has no effect on
+    the remote object. Only the ``headers`` upload option is supported when
+    streaming writes.
+
+    See `OBSFile` for examples of reading and writing objects.
+    """
+    def __init__(self, pth, mode='r', encoding=None, **kwargs):
+        super(SwiftFile, self).__init__(pth, mode=mode, encoding=encoding, **kwargs)
+        download_settings = settings.get()['swift:download']
+        self._stream_reads = download_settings['stream_reads']
+        self._read_chunk_size = utils.str_to_bytes(download_settings['read_chunk_size'])
+        self._upload_settings = settings.get()['swift:upload']
+        self._stream_writes = self._upload_settings['stream_writes']
+
+    def _create_writer(self):
+        headers = {}
+        for header in self._kwargs.get('headers') or []:
+            key, value = header.split(':', 1)
+            headers[key.strip()] = value.strip()
+        return _SwiftObjectWriter(self._path,
+                                  utils.str_to_bytes(self._upload_settings['segment_size']),
+                                  self._upload_settings['segment_threads'],
+                                  use_slo=self._upload_settings['use_slo'],
+                                  checksum=self._upload_settings['checksum'],
+                                  headers=headers)
+
+    def _get_or_create_buffer(self):
+        if self._buffer:
+            return self._buffer
+
+        if self.mode in self._READ_MODES and self._stream_reads:
+            buf = io.BufferedReader(_SwiftObjectReader(self._path, self._read_chunk_size),
+                                    buffer_size=self._read_chunk_size)
+            if self.mode == 'r':
+                buf = io.TextIOWrapper(buf, encoding=self.encoding, newline='\n')
+            self._buffer = buf
+            return self._buffer
+        elif self.mode in self._WRITE_MODES and self._stream_writes:
+            buf = io.BufferedWriter(self._create_writer())
+            if self.mode == 'w':
+                buf = io.TextIOWrapper(buf, encoding=self.encoding, newline='\n')
+            self._buffer = buf
+            return self._buffer
+
+        return super(SwiftFile, self)._get_or_create_buffer()
+
+    def flush(self):
+        """Flushes the write buffer to the swift path (if it exists).
+
+        When streaming writes, data is only flushed to the underlying segment
+        uploader. The object is written on ``close``.
+        """
+        if self.mode in self._WRITE_MODES and self._stream_writes:
+            if self._buffer:
+                self._buffer.flush()
+            return
+        return super(SwiftFile, self).flush()
 
 
 class SwiftPath(OBSPath):
@@ -432,19 +1041,19 @@ class SwiftPath(OBSPath):
         else:
             return False
 
-    @property
+    @utils.CachedProperty
     def tenant(self):
         """Returns the tenant name from the path or return None"""
-        parts = self._get_parts()
+        parts = self._parts
         return parts[0] if len(parts) > 0 and parts[0] else None
 
-    @property
+    @utils.CachedProperty
     def container(self):
         """Returns the container name from the path or None."""
-        parts = self._get_parts()
+        parts = self._parts
         return parts[1] if len(parts) > 1 and parts[1] else None
 
-    @property
+    @utils.CachedProperty
     def resource(self):
         """Returns the resource as a ``PosixPath`` object or None.
 
@@ -452,10 +1061,10 @@ class SwiftPath(OBSPath):
         Note that it's important to keep the trailing slash in a resource
         name for prefix queries.
         """
-        parts = self._get_parts()
+        parts = self._parts
         joined_resource = '/'.join(parts[2:]) if len(parts) > 2 else None
 
-        return self.parts_class(joined_resource) if joined_resource else None
+        return self.parts_class._from_trusted(joined_resource) if joined_resource else None
 
     def _get_swift_connection_options(self, **options):
         """Returns options for constructing ``SwiftService`` and
@@ -481,6 +1090,15 @@ class SwiftPath(OBSPath):
                 'and auth_url settings variables may also be set with settings.update.'
             ))
 
+        # Cap the socket timeout of requests with the time left before the deadline
+        timeout = global_options.get('timeout') or None
+        remaining_time = retry.get_remaining_time()
+        if remaining_time is not None:
+            retry.check_deadline('connecting to %s' % self)
+            timeout = min(timeout, remaining_time) if timeout else remaining_time
+        if timeout:
+            options['timeout'] = timeout
+
         # Set additional options on top of what was passed in
         options['os_tenant_name'] = self.tenant
         options['os_auth_url'] = auth_url
@@ -507,11 +1125,29 @@ class SwiftPath(OBSPath):
             options: Additional options that are directly passed
                 into swift service creation.
 
+        The connections of the service are limited by `stor.throttle` when
+        limits are set for swift uploads or downloads.
+
         Returns:
             swiftclient.service.SwiftService: The service instance.
         """
         conn_opts = self._get_swift_connection_options(**options)
-        return swift_service.SwiftService(conn_opts)
+        service = swift_service.SwiftService(conn_opts)
+        upload_limiter = throttle.get_limiter('swift', 'upload')
+        download_limiter = throttle.get_limiter('swift', 'download')
+        if upload_limiter or download_limiter:
+            # Limit the connections of the thread pools of the service
+            def create_connection():
+                return _ThrottledConnection(swift_service.get_conn(conn_opts),
+                                            upload_limiter, download_limiter)
+
+            service.thread_manager = swift_multithreading.MultiThreadingManager(
+                create_connection,
+                segment_threads=conn_opts['segment_threads'],
+                object_dd_threads=conn_opts['object_dd_threads'],
+                object_uu_threads=conn_opts['object_uu_threads'],
+                container_threads=conn_opts['container_threads'])
+        return service
 
     def _get_swift_connection(self, **options):
         """Initialize a swift client connection based on the path.
@@ -525,13 +1161,23 @@ class SwiftPath(OBSPath):
             options: Additional options that are directly passed
                 into swift connection creation.
 
+        The connection is wrapped by a `_ThrottledConnection` when limits are
+        set for swift uploads or downloads.
+
         Returns:
             swiftclient.client.Connection: The connection instance.
         """
         conn_opts = self._get_swift_connection_options(**options)
-        return swift_service.get_conn(conn_opts)
-
+        connection = swift_service.get_conn(conn_opts)
+        upload_limiter = throttle.get_limiter('swift', 'upload')
+        download_limiter = throttle.get_limiter('swift', 'download')
+        if upload_limiter or download_limiter:
+            connection = _ThrottledConnection(connection, upload_limiter, download_limiter)
+        return connection
+
+    @_check_circuit_breaker
     @_retry_on_cached_auth_err
+    @_instrument_swift_call
     @_propagate_swift_exceptions
     def _swift_connection_call(self, method_name, *args, **kwargs):
         """Instantiates a ``Connection`` object and runs ``method_name``.
@@ -547,17 +1193,23 @@ class SwiftPath(OBSPath):
         method = getattr(connection, method_name)
         return method(*args, **kwargs)
 
+    @_check_circuit_breaker
     @_retry_on_cached_auth_err
+    @_instrument_swift_call
     @_propagate_swift_exceptions
     def _swift_service_call(self, method_name, *args, **kwargs):
         """Instantiates a ``SwiftService`` object and runs ``method_name``.
 
         Note that getting the swift service and doing the call in the same method
         is done for the same reasons explained in ``_swift_connection_call``.
+
+        Results with errors are raised unless ``_raise_errors`` is False, in which
+        case they are returned along with the successful results.
         """
         method_options = copy.copy(kwargs)
         service_options = copy.deepcopy(method_options.pop('_service_options', {}))
         service_progress_logger = method_options.pop('_progress_logger', None)
+        raise_errors = method_options.pop('_raise_errors', True)
         service = self._get_swift_service(**service_options)
         method = getattr(service, method_name)
         results_iter = method(*args, **method_options)
@@ -565,17 +1217,90 @@ class SwiftPath(OBSPath):
         results_iter = [results_iter] if isinstance(results_iter, dict) else results_iter
 
         results = []
+        tracer = tracing.get_tracer()
         for r in results_iter:
-            if 'error' in r:
-                http_status = getattr(r['error'], 'http_status', None)
-                if not http_status or http_status >= 400:
-                    raise r['error']
+            if tracer:
+                _trace_service_result(tracer, r)
+            failed = _is_failed_result(r)
+            if failed and raise_errors:
+                raise r['error']
             results.append(r)
-            if service_progress_logger:
+            if service_progress_logger and not failed:
                 service_progress_logger.add_result(r)
 
         return results
 
+    def _swift_service_transfer(self, method_name, objects, retry_policy, **kwargs):
+        """Runs a ``SwiftService`` download or upload and retries only failed objects.
+
+        When objects fail with an exception of ``retry_policy``, only the failed objects are
+        passed to ``method_name`` again after backing off, and the successful
+        results of every attempt are merged. Failures that do not belong to an
+        object (for example, listing the container) retry every object that has not
+        been transferred yet.
+
+        Args:
+            method_name (str): The ``SwiftService`` method, "download" or "upload".
+            objects (List[str|OBSUploadObject]): The objects to transfer. None
+                downloads every object of the container.
+            retry_policy (RetryPolicy): The policy for retrying failed objects.
+            **kwargs: Keyword arguments for `SwiftPath._swift_service_call`.
+
+        Returns:
+            List[dict]: The successful results of every attempt.
+        """
+        results = []
+        attempt = {'objects': objects}
+
+        def _transfer():
+            args = (self.container,)
+            if attempt['objects'] is not None:
+                objects = attempt['objects']
+                if method_name == 'upload':
+                    objects = [_to_swift_upload_object(obj) for obj in objects]
+                args += (objects,)
+            attempt_results = self._swift_service_call(method_name, *args,
+                                                       _raise_errors=False, **kwargs)
+            failed_results = [r for r in attempt_results if _is_failed_result(r)]
+            results.extend(r for r in attempt_results if not _is_failed_result(r))
+            if failed_results:
+                attempt['objects'] = self._get_objects_to_retry(method_name,
+                                                                attempt['objects'],
+                                                                results,
+                                                                failed_results)
+                if attempt['objects'] is None:
+                    # The container is transferred again from scratch
+                    del results[:]
+                error = failed_results[0]['error']
+                six.raise_from(_swiftclient_error_to_descriptive_exception(error), error)
+            return results
+
+        return retry_policy.call(_transfer)
+
+    def _get_objects_to_retry(self, method_name, objects, results, failed_results):
+        """Returns the objects to transfer again after ``failed_results``"""
+        object_action = '%s_object' % method_name
+        failed_names = set()
+        for r in failed_results:
+            if r.get('action') == object_action and 'object' in r:
+                failed_names.add(r['object'])
+            elif 'for_object' in r:
+                # Segments of large objects
+                failed_names.add(r['for_object'])
+            elif objects is None:
+                return None
+            else:
+                transferred_names = {
+                    r['object'] for r in results if r.get('action') == object_action
+                }
+                failed_names = {
+                    _transfer_object_name(obj) for obj in objects
+                } - transferred_names
+                break
+
+        return [obj for obj in objects or failed_names
+                if _transfer_object_name(obj) in failed_names]
+
     @_swift_retry(exceptions=(NotFoundError, UnavailableError,
                               InconsistentDownloadError, UnauthorizedError))
     def read_object(self):
@@ -595,6 +1320,76 @@ class SwiftPath(OBSPath):
                                                        self.resource)
         return content
 
+    @_swift_retry(exceptions=UnavailableError)
+    def _put_object(self, contents, etag=None, headers=None, query_string=None):
+        """Writes ``contents`` to the object with a single PUT request.
+
+        Returns:
+            str: The etag of the written object.
+        """
+        return self._swift_connection_call('put_object',
+                                           self.container,
+                                           self.resource,
+                                           contents,
+                                           etag=etag,
+                                           headers=headers,
+                                           query_string=query_string)
+
+    @_swift_retry(exceptions=(NotFoundError, UnavailableError, UnauthorizedError))
+    def _get_object_stream(self, offset, chunk_size):
+        """Starts reading an object from ``offset`` in chunks of ``chunk_size``.
+
+        Returns:
+            tuple(dict, iter): The response headers and an iterator of
+                the chunks of the object.
+        """
+        headers = {'Range': 'bytes=%d-' % offset} if offset else {}
+        return self._swift_connection_call('get_object',
+                                           self.container,
+                                           self.resource,
+                                           resp_chunk_size=chunk_size,
+                                           headers=headers)
+
+    def _open_read_stream(self):
+        chunk_size = utils.str_to_bytes(settings.get()['swift:download']['read_chunk_size'])
+        # Streamed copies retry whole objects, so requests are not retried again
+        reader = _SwiftObjectReader(self, chunk_size, retry_args={'num_retries': 0})
+        # Start the GET request to read the metadata of the object from its headers
+        reader._open_body()
+        metadata = {
+            'content_type': reader.headers.get('content-type'),
+            'metadata': {
+                header[len(_OBJECT_META_PREFIX):]: value
+                for header, value in reader.headers.items()
+                if header.startswith(_OBJECT_META_PREFIX)
+            }
+        }
+        return io.BufferedReader(reader, buffer_size=chunk_size), metadata
+
+    def _write_stream(self, stream, segment_size, segment_threads, metadata=None):
+        upload_settings = settings.get()['swift:upload']
+        headers = {}
+        if metadata and metadata.get('content_type'):
+            headers['Content-Type'] = metadata['content_type']
+        for key, value in ((metadata or {}).get('metadata') or {}).items():
+            headers['X-Object-Meta-%s' % key] = value
+        writer = _SwiftObjectWriter(self, segment_size, segment_threads,
+                                    use_slo=upload_settings['use_slo'],
+                                    checksum=upload_settings['checksum'],
+                                    headers=headers,
+                                    write_empty=True,
+                                    retry_args={'num_retries': 0})
+        try:
+            shutil.copyfileobj(stream, writer, segment_size)
+        except Exception as exc:
+            writer._abort(exc)
+            raise
+        finally:
+            writer.close()
+
+    def _get_retry_policy(self):
+        return _get_retry_policy()
+
     def temp_url(self, lifetime=300, method='GET', inline=True, filename=None):
         """Obtains a temporary URL to an object.
 
@@ -697,7 +1492,6 @@ class SwiftPath(OBSPath):
         swift_upload_options = swift_upload_options or {}
         return SwiftFile(self, mode=mode, encoding=encoding, **swift_upload_options)
 
-    @_swift_retry(exceptions=(ConditionNotMetError, UnavailableError))
     def list(self,
              starts_with=None,
              limit=None,
@@ -706,7 +1500,8 @@ class SwiftPath(OBSPath):
              # intentionally not documented
              list_as_dir=False,
              ignore_segment_containers=True,
-             ignore_dir_markers=False):
+             ignore_dir_markers=False,
+             **retry_args):
         """List contents using the resource of the path as a prefix.
 
         This method retries ``num_retries`` times if swift is unavailable
@@ -724,7 +1519,8 @@ class SwiftPath(OBSPath):
             condition (function(results) -> bool): The method will only return
                 when the results matches the condition.
             use_manifest (bool): Perform the list and use the data manfest file to validate
-                the list.
+                the list. The sizes and checksums of the manifest are verified against the
+                listing, and retries only check the objects that have not been validated yet.
 
         Returns:
             List[SwiftPath]: Every path in the listing.
@@ -734,16 +1530,19 @@ class SwiftPath(OBSPath):
             ConditionNotMetError: Results were returned, but they did not
                 meet the condition.
         """
+        utils.validate_condition(condition)
+        manifest_validator = (utils.ManifestValidator(utils.iter_data_manifest(self))
+                              if use_manifest else None)
+        return self._list(starts_with, limit, condition, manifest_validator, list_as_dir,
+                          ignore_segment_containers, ignore_dir_markers, **retry_args)
+
+    @_swift_retry(exceptions=(ConditionNotMetError, UnavailableError))
+    def _list(self, starts_with, limit, condition, manifest_validator, list_as_dir,
+              ignore_segment_containers, ignore_dir_markers):
+        """Performs `SwiftPath.list`, validating the listing with ``manifest_validator``"""
         tenant = self.tenant
         prefix = self.resource
         full_listing = limit is None
-        utils.validate_condition(condition)
-
-        if use_manifest:
-            object_names = utils.get_data_manifest_contents(self)
-            manifest_cond = partial(utils.validate_manifest_list, object_names)
-            condition = (utils.join_conditions(condition, manifest_cond)
-                         if condition else manifest_cond)
 
         # When starts_with is provided, treat the resource as a
         # directory that has the starts_with parameter after it. This allows
@@ -778,15 +1577,19 @@ class SwiftPath(OBSPath):
         if ignore_dir_markers:
             result_objs = [r for r in result_objs if r.get('content_type') not in DIR_MARKER_TYPES]
 
-        path_pre = SwiftPath('%s%s' % (self.drive, tenant)) / (self.container or '')
+        path_pre = utils.with_trailing_slash(
+            '%s%s/%s' % (self.drive, tenant, self.container or ''))
+        make_path = SwiftPath._from_trusted
         paths = list({
-            path_pre / (r.get('name') or r['subdir'].rstrip('/'))
+            make_path(path_pre + (r.get('name') or r['subdir'].rstrip('/')))
             for r in result_objs
         })
 
         if ignore_segment_containers:
             paths = [p for p in paths if not p.is_segment_container()]
 
+        if manifest_validator:
+            manifest_validator.check(_get_listing_metadata(result_objs))
         utils.check_condition(condition, paths)
         return paths
 
@@ -884,14 +1687,19 @@ class SwiftPath(OBSPath):
         except NotFoundError:
             return False
 
-    @_swift_retry(exceptions=(UnavailableError, InconsistentDownloadError,
-                              UnauthorizedError))
-    def download_object(self, out_file):
+    def download_object(self, out_file, **retry_args):
         """Downloads a single object to an output file.
 
+        Static and dynamic large objects are downloaded by fetching their
+        segments concurrently into their offsets of the output file, using the
+        ``segment_threads`` option of the ``swift:download`` settings. The size
+        and MD5 checksum of every segment are verified against the manifest
+        (or the segment listing for dynamic large objects).
+
         This method retries ``num_retries`` times if swift is unavailable.
-        View module-level documentation for more information about configuring
-        retry logic at the module or method level.
+        The segments of large objects are retried on their own, so only failed
+        segments are downloaded again. View module-level documentation for more
+        information about configuring retry logic at the module or method level.
 
         Args:
             out_file (str): The output file
@@ -903,10 +1711,128 @@ class SwiftPath(OBSPath):
         if not self.resource:
             raise ValueError('can only call download_object on object path')
 
-        self._swift_service_call('download',
-                                 container=self.container,
-                                 objects=[self.resource],
-                                 options={'out_file': out_file})
+        retry_policy = _get_retry_policy().replace(
+            exceptions=(UnavailableError, InconsistentDownloadError, UnauthorizedError))
+        retry_policy = retry_policy.with_retry_args(retry_args)
+        retry.check_unexpected_args('download_object', retry_args)
+        # The deadline bounds the whole download, while every request is retried on its own
+        retry_policy.replace(num_retries=0).call(self._download_object, out_file, retry_policy)
+
+    def _download_object(self, out_file, retry_policy):
+        """Performs `SwiftPath.download_object` with the retry policy of the call"""
+        segments = retry_policy.call(self._get_large_object_segments)
+        if segments is None:
+            retry_policy.call(self._swift_service_call,
+                              'download',
+                              container=self.container,
+                              objects=[self.resource],
+                              options={'out_file': out_file})
+        else:
+            self._download_segments(segments, out_file, retry_policy)
+
+    def _get_large_object_segments(self, headers=None):
+        """Returns the segments of a static or dynamic large object.
+
+        Args:
+            headers (dict, optional): The headers of the object, which are
+                fetched with a HEAD request if not provided.
+
+        Returns:
+            List[dict]|None: The ``path``, ``bytes`` and ``hash`` of every segment
+                in order, or None if the object is not a large object. Static large
+                objects with nested manifests, ranges or inline data also return None
+                since their segments do not map directly to offsets of the object.
+        """
+        if headers is None:
+            headers = self._swift_connection_call('head_object', self.container, self.resource)
+        if headers.get('x-static-large-object', '').lower() == 'true':
+            _, manifest = self._swift_connection_call('get_object',
+                                                      self.container,
+                                                      self.resource,
+                                                      query_string='multipart-manifest=get')
+            manifest = json.loads(manifest.decode('utf-8'))
+            if any({'sub_slo', 'range', 'data'} & set(segment) for segment in manifest):
+                return None
+            return [{
+                'path': SwiftPath('swift://%s/%s' % (self.tenant, segment['name'].lstrip('/'))),
+                'bytes': segment['bytes'],
+                'hash': segment['hash']
+            } for segment in manifest]
+        elif headers.get('x-object-manifest'):
+            segment_container, segment_prefix = parse.unquote(
+                headers['x-object-manifest']).split('/', 1)
+            _, listing = self._swift_connection_call('get_container',
+                                                     segment_container,
+                                                     prefix=segment_prefix,
+                                                     full_listing=True)
+            return [{
+                'path': SwiftPath('swift://%s/%s/%s' % (self.tenant,
+                                                        segment_container,
+                                                        segment['name'])),
+                'bytes': segment['bytes'],
+                'hash': segment['hash']
+            } for segment in listing]
+        else:
+            return None
+
+    def _download_segments(self, segments, out_file, retry_policy):
+        """Downloads large object segments concurrently into their offsets of ``out_file``
+
+        Every segment is retried with ``retry_policy``.
+        """
+        out_dir = os.path.dirname(out_file)
+        if out_dir:
+            utils.make_dest_dir(out_dir)
+        with open(out_file, 'wb') as fp:
+            fp.truncate(sum(segment['bytes'] for segment in segments))
+
+        options = settings.get()['swift:download']
+        chunk_size = utils.str_to_bytes(options['read_chunk_size'])
+        to_download = []
+        offset = 0
+        for segment in segments:
+            to_download.append((segment, offset))
+            offset += segment['bytes']
+
+        def _download(args):
+            segment, offset = args
+            retry_policy.call(segment['path']._download_segment, out_file, offset,
+                              segment['bytes'], segment['hash'], chunk_size)
+
+        list(utils.threaded_imap_unordered(_download, to_download, options['segment_threads']))
+
+    @_propagate_swift_exceptions
+    def _download_segment(self, out_file, offset, size, etag, chunk_size):
+        """Downloads a large object segment into ``out_file`` at ``offset``.
+
+        Raises:
+            InconsistentDownloadError: The size or MD5 checksum of the segment
+                does not match the expected ``size`` and ``etag``.
+        """
+        _, body = self._swift_connection_call('get_object',
+                                              self.container,
+                                              self.resource,
+                                              resp_chunk_size=chunk_size)
+        md5 = hashlib.md5()
+        read_length = 0
+        with open(out_file, 'r+b') as fp:
+            fp.seek(offset)
+            for chunk in body:
+                read_length += len(chunk)
+                if read_length > size:
+                    # Never write over the offsets of the next segment
+                    break
+                fp.write(chunk)
+                md5.update(chunk)
+
+        if read_length != size:
+            raise InconsistentDownloadError(
+                'Error downloading segment %s: read_length != content_length, %d != %d'
+                % (self, read_length, size))
+        if md5.hexdigest() != etag.strip('"'):
+            raise InconsistentDownloadError(
+                'Error downloading segment %s: md5sum != etag, %s != %s'
+                % (self, md5.hexdigest(), etag))
 
     @_swift_retry(exceptions=(UnavailableError, InconsistentDownloadError,
                               UnauthorizedError))
@@ -1006,17 +1932,17 @@ class SwiftPath(OBSPath):
         # Return results mapped back to their input name
         return {obj: results[objs_to_download[obj]] for obj in objects}
 
-    @_swift_retry(exceptions=(ConditionNotMetError, UnavailableError,
-                              InconsistentDownloadError))
     def download(self,
                  dest,
                  condition=None,
-                 use_manifest=False):
+                 use_manifest=False,
+                 **retry_args):
         """Downloads a directory to a destination.
 
         This method retries ``num_retries`` times if swift is unavailable or if
         the returned download result does not match the ``condition``
-        condition. View `module-level documentation <stor.swift>`
+        condition. When objects fail to download, only the failed objects are
+        downloaded again. View `module-level documentation <stor.swift>`
         for more information about configuring retry logic at the module or
         method level.
 
@@ -1047,6 +1973,13 @@ class SwiftPath(OBSPath):
             raise ValueError('cannot call download on tenant with no container')
         utils.validate_condition(condition)
 
+        retry_policy = _get_retry_policy().with_retry_args(retry_args)
+        retry.check_unexpected_args('download', retry_args)
+        return retry_policy.replace(exceptions=ConditionNotMetError).call(
+            self._download, dest, condition, use_manifest, retry_policy)
+
+    def _download(self, dest, condition, use_manifest, retry_policy):
+        """Performs `SwiftPath.download` with the retry policy of the call"""
         if use_manifest:
             # Do a full list with the manifest before the download. This will retry until
             # all results in the manifest can be listed, which helps ensure the download
@@ -1070,33 +2003,30 @@ class SwiftPath(OBSPath):
             'shuffle': options['shuffle']
         }
         with SwiftDownloadLogger() as dl:
-            results = self._swift_service_call('download',
-                                               self.container,
-                                               options=download_options,
-                                               _progress_logger=dl,
-                                               _service_options=service_options)
+            retry_policy = retry_policy.replace(exceptions=(UnavailableError,
+                                                            InconsistentDownloadError))
+            results = self._swift_service_transfer('download',
+                                                   None,
+                                                   retry_policy,
+                                                   options=download_options,
+                                                   _progress_logger=dl,
+                                                   _service_options=service_options)
 
         utils.check_condition(condition, results)
         return results
 
-    @_swift_retry(
-        exceptions=(
-            ConditionNotMetError,
-            UnavailableError,
-            UnauthorizedError,
-            AuthenticationError,
-        )
-    )
     def upload(self,
                to_upload,
                condition=None,
                use_manifest=False,
-               headers=None):
+               headers=None,
+               **retry_args):
         """Uploads a list of files and directories to swift.
 
         This method retries ``num_retries`` times if swift is unavailable or if
         the returned upload result does not match the ``condition``
-        condition. View `module-level documentation <stor.swift>`
+        condition. When objects fail to upload, only the failed objects are
+        uploaded again. View `module-level documentation <stor.swift>`
         for more information about configuring retry logic at the module or
         method level.
 
@@ -1159,6 +2089,15 @@ class SwiftPath(OBSPath):
             raise ValueError('must specify container when uploading')
         utils.validate_condition(condition)
 
+        retry_policy = _get_retry_policy().with_retry_args(retry_args)
+        retry.check_unexpected_args('upload', retry_args)
+        return retry_policy.replace(exceptions=ConditionNotMetError).call(
+            self._upload, to_upload, condition, use_manifest, headers, retry_policy)
+
+    def _upload(self, to_upload, condition, use_manifest, headers, retry_policy):
+        """Performs `SwiftPath.upload` with the retry policy of the call"""
+        retry_policy = retry_policy.replace(exceptions=(UnavailableError, UnauthorizedError,
+                                                        AuthenticationError))
         swift_upload_objects = [
             name for name in to_upload
             if isinstance(name, OBSUploadObject)
@@ -1189,22 +2128,39 @@ class SwiftPath(OBSPath):
             for f in all_files_to_upload if f != manifest_file_name
         ])
 
+        options = settings.get()['swift:upload']
+        segment_size = utils.str_to_bytes(options['segment_size'])
+
         if use_manifest:
             # Generate the data manifest and save it remotely
             object_names = [o.object_name for o in swift_upload_objects]
-            utils.generate_and_save_data_manifest(manifest_path_prefix, object_names)
+            checksums = {}
+            if (settings.get()['stor:checksum']['manifest_checksums'] and
+                    settings.get()['stor']['data_manifest_version'] == 2):
+                checksums = _compute_upload_checksums(swift_upload_objects,
+                                                      all_files_to_upload,
+                                                      segment_size)
+            utils.generate_and_save_data_manifest(manifest_path_prefix, [
+                utils.ManifestEntry(o.object_name, all_files_to_upload.get(o.source),
+                                    checksums.get(o.source))
+                for o in swift_upload_objects
+            ])
             manifest_obj_name = resource_base / utils.file_name_to_object_name(manifest_file_name)
             manifest_obj = OBSUploadObject(manifest_file_name,
                                            object_name=manifest_obj_name,
                                            options=upload_object_options)
-            self._swift_service_call('upload', self.container, [manifest_obj])
+            self._swift_service_transfer('upload', [manifest_obj], retry_policy)
 
             # Make a condition for validating the upload
             manifest_cond = partial(_validate_manifest_upload, object_names)
             condition = (utils.join_conditions(condition, manifest_cond)
                          if condition else manifest_cond)
 
-        options = settings.get()['swift:upload']
+        skipped_results = []
+        if options['skip_identical']:
+            swift_upload_objects, skipped_results = self._skip_identical_uploads(
+                swift_upload_objects, all_files_to_upload, segment_size)
+
         service_options = {
             'object_uu_threads': options['object_threads'],
             'segment_threads': options['segment_threads']
@@ -1218,13 +2174,220 @@ class SwiftPath(OBSPath):
             'skip_identical': options['skip_identical'],
             'checksum': options['checksum']
         }
-        with SwiftUploadLogger(len(swift_upload_objects), all_files_to_upload) as ul:
-            results = self._swift_service_call('upload',
-                                               self.container,
-                                               swift_upload_objects,
-                                               options=upload_options,
-                                               _progress_logger=ul,
-                                               _service_options=service_options)
+        with SwiftUploadLogger(len(swift_upload_objects), all_files_to_upload,
+                               utils.get_upload_size(swift_upload_objects,
+                                                     all_files_to_upload)) as ul:
+            results = self._swift_service_transfer('upload',
+                                                   swift_upload_objects,
+                                                   retry_policy,
+                                                   options=upload_options,
+                                                   _progress_logger=ul,
+                                                   _service_options=service_options)
+        results = skipped_results + results
+
+        utils.check_condition(condition, results)
+        return results
+
+    @_swift_retry(exceptions=UnavailableError)
+    def _get_full_listing(self, prefix):
+        """Returns the listing of the objects of the container under ``prefix``.
+
+        Containers that do not exist yet have no objects.
+        """
+        try:
+            return self._swift_connection_call('get_container', self.container,
+                                               prefix=prefix, full_listing=True)[1]
+        except NotFoundError:
+            return []
+
+    def _skip_identical_uploads(self, upload_objects, walked_files, segment_size):
+        """Finds the objects of an upload that are identical on swift.
+
+        Files that have the size of the listed object are compared with its
+        MD5 using `stor.checksum`, so unchanged files are not read again.
+        Other objects are left to ``SwiftService``.
+
+        Returns:
+            tuple(List[OBSUploadObject], List[dict]): The objects to upload and
+                the results of the identical objects.
+        """
+        resource_base = utils.with_trailing_slash(self.resource) or ''
+        listing = self._get_full_listing(str(resource_base))
+        listed_objs = {r['name']: r for r in listing if 'name' in r}
+        candidates = [
+            o for o in upload_objects
+            if str(o.object_name) in listed_objs and
+            listed_objs[str(o.object_name)]['bytes'] == walked_files.get(o.source)
+        ]
+        checksums = (_compute_upload_checksums(candidates, walked_files, segment_size)
+                     if candidates else {})
+        identical = [
+            o for o in candidates
+            if checksums.get(o.source) == listed_objs[str(o.object_name)]['hash']
+        ]
+        identical_ids = {id(o) for o in identical}
+        results = [{
+            'action': 'upload_object',
+            'container': self.container,
+            'object': str(o.object_name),
+            'path': o.source,
+            'success': True,
+            'status': 'skipped-identical'
+        } for o in identical]
+        logger.info('skipping %d identical objects of upload', len(results))
+        return [o for o in upload_objects if id(o) not in identical_ids], results
+
+    @_swift_retry(exceptions=UnavailableError)
+    def _get_segments_to_copy(self):
+        """Returns the segments of the object (see `_get_large_object_segments`)
+        and the headers of the object.
+        """
+        headers = self._swift_connection_call('head_object', self.container, self.resource)
+        return self._get_large_object_segments(headers=headers), headers
+
+    @_swift_retry(exceptions=UnavailableError)
+    def _copy_from(self, source):
+        """Writes the object with a server-side copy of the ``source`` object.
+
+        Returns:
+            str: The etag of the written object.
+        """
+        headers = {'X-Copy-From': parse.quote('/%s/%s' % (source.container, source.resource))}
+        if source.tenant != self.tenant:
+            headers['X-Copy-From-Account'] = source.tenant
+        return self._swift_connection_call('put_object',
+                                           self.container,
+                                           self.resource,
+                                           None,
+                                           headers=headers,
+                                           query_string=None)
+
+    def _copy_to(self, dest, **retry_args):
+        """Copies the object to ``dest`` on the server with ``X-Copy-From`` requests.
+
+        The segments of static and dynamic large objects are copied concurrently
+        to the ``.segments_<container>`` container of the destination and a new
+        manifest of the copied segments is written, so removing either object
+        does not affect the other. Other objects are copied with one request.
+
+        Returns:
+            SwiftPath: The destination path.
+        """
+        segments, headers = self._get_segments_to_copy(**retry_args)
+        if segments is None:
+            dest._copy_from(self, **retry_args)
+            return dest
+
+        use_slo = headers.get('x-static-large-object', '').lower() == 'true'
+        segment_container = SwiftPath('%s%s/.segments_%s' % (dest.drive, dest.tenant,
+                                                             dest.container))
+        segment_prefix = '%s/%s/%f/' % (dest.resource, 'slo' if use_slo else 'dlo', time.time())
+        segment_container._create_container(**retry_args)
+
+        def _copy_segment(indexed_segment):
+            index, segment = indexed_segment
+            segment_p = segment_container / ('%s%08d' % (segment_prefix, index))
+            return index, {
+                'path': '/%s/%s' % (segment_p.container, segment_p.resource),
+                'etag': segment_p._copy_from(segment['path'], **retry_args),
+                'size_bytes': segment['bytes']
+            }
+
+        num_threads = settings.get()['swift:copy']['object_threads']
+        copied = sorted(utils.threaded_imap_unordered(_copy_segment, list(enumerate(segments)),
+                                                      num_threads))
+        manifest_headers = {
+            header: value for header, value in headers.items()
+            if header.startswith(_OBJECT_META_PREFIX)
+        }
+        if headers.get('content-type'):
+            manifest_headers['Content-Type'] = headers['content-type']
+        if use_slo:
+            dest._put_object(json.dumps([segment for _, segment in copied]),
+                             headers=manifest_headers,
+                             query_string='multipart-manifest=put',
+                             **retry_args)
+        else:
+            manifest_headers['X-Object-Manifest'] = '%s/%s' % (segment_container.container,
+                                                               segment_prefix)
+            dest._put_object(b'', headers=manifest_headers, **retry_args)
+        return dest
+
+    @_swift_retry(exceptions=UnavailableError)
+    def _create_container(self):
+        """Creates the container of the path if it does not exist"""
+        self._swift_connection_call('put_container', self.container)
+
+    def copy_object(self, dest, **retry_args):
+        """Copies the object to another swift object without downloading it.
+
+        The copy is performed by the swift cluster and only metadata passes
+        through the client. The destination container is created if it does
+        not exist.
+
+        The segments of static and dynamic large objects are copied to the
+        ``.segments_<container>`` container of the destination, so the copy
+        does not share segments with the source and removing either object
+        does not affect the other. View the
+        `module-level documentation <swiftretry>` for retry arguments.
+
+        Args:
+            dest (str|SwiftPath): The destination object.
+
+        Returns:
+            SwiftPath: The destination path.
+        """
+        dest = SwiftPath(dest)
+        if not self.resource or not dest.resource:
+            raise ValueError('source and destination must be swift objects to copy')
+        dest._create_container(**retry_args)
+        return self._copy_to(dest, **retry_args)
+
+    def copy_objects(self, dest, condition=None, **retry_args):
+        """Copies every object under the path to another swift path without
+        downloading them.
+
+        Objects are copied concurrently by the swift cluster using the
+        ``object_threads`` option of the ``swift:copy`` settings. For example::
+
+            SwiftPath('swift://tenant/container/dir').copy_objects(
+                'swift://tenant/other_container/other_dir')
+
+        copies ``swift://tenant/container/dir/a/b.txt`` to
+        ``swift://tenant/other_container/other_dir/a/b.txt``.
+        Large objects are copied as described in `SwiftPath.copy_object`.
+
+        Args:
+            dest (str|SwiftPath): The destination directory.
+            condition (function(results) -> bool): The method will only return
+                when the list of copied paths matches the condition.
+
+        Returns:
+            List[SwiftPath]: The copied destination paths.
+
+        Raises:
+            ConditionNotMetError: The copied paths do not meet the condition.
+        """
+        dest = SwiftPath(dest)
+        if not self.container or not dest.container:
+            raise ValueError('source and destination must include containers to copy')
+        utils.validate_condition(condition)
+
+        source_dir = utils.with_trailing_slash(self)
+        dest_dir = utils.with_trailing_slash(dest)
+        to_copy = [
+            (p, dest_dir / p[len(source_dir):])
+            for p in source_dir.list(**retry_args)
+        ]
+        if to_copy:
+            dest._create_container(**retry_args)
+
+        def _copy(paths):
+            source_p, dest_p = paths
+            return source_p._copy_to(dest_p, **retry_args)
+
+        num_threads = settings.get()['swift:copy']['object_threads']
+        results = list(utils.threaded_imap_unordered(_copy, to_copy, num_threads))
 
         utils.check_condition(condition, results)
         return results
@@ -1264,6 +2427,16 @@ class SwiftPath(OBSPath):
         ``swift://tenant/container``, ``swift://tenant/container_segments``
         will also be deleted.
 
+        When the cluster supports the bulk middleware, objects are listed in pages
+        that are deleted with concurrent bulk-delete requests while listing.
+        Since bulk deletes do not delete the segments of large objects, they are
+        only used to remove a container (whose segment containers are emptied
+        with bulk deletes and removed with it) or a directory of a container
+        without a segment container.
+        Otherwise objects are deleted one at a time along with their segments.
+        Bulk deletes are disabled with the ``bulk_delete`` option of the
+        ``swift:delete`` settings.
+
         Note:
             Calling rmtree on a directory marker will delete everything under the
             directory marker but not the marker itself.
@@ -1288,41 +2461,24 @@ class SwiftPath(OBSPath):
                            'when their associated objects or containers are '
                            'deleted.', self.container)
 
-        options = settings.get()
-
-        service_options = {
-            'object_dd_threads': options['swift:delete']['object_threads']
-        }
-
-        def _ignore_not_found(service_call):
-            """Ignores 404 errors when performing a swift service call"""
-            def wrapper(*args, **kwargs):
-                try:
-                    return service_call(*args, **kwargs)
-                except NotFoundError:
-                    return []
-            return wrapper
+        bulk_delete_page_size = to_delete._bulk_delete_page_size()
+        if bulk_delete_page_size and to_delete.resource and to_delete._has_segment_container():
+            # Bulk deletes only delete manifests. Delete objects one at a time so
+            # that the segments of large objects are deleted with them
+            bulk_delete_page_size = None
+        if bulk_delete_page_size:
+            # Delete objects with the bulk middleware. Swiftclient then only deletes
+            # the container if the path is a container.
+            results = _ignore_not_found(to_delete._bulk_delete_prefix)(bulk_delete_page_size)
 
         if not to_delete.resource:
-            results = _ignore_not_found(self._swift_service_call)('delete',
-                                                                  to_delete.container,
-                                                                  _service_options=service_options)
-            # Try to delete a segment container since swift client does not
-            # do this automatically
-            if not deleting_segments:
-                segment_containers = ('%s_segments' % to_delete.container,
-                                      '.segments_%s' % to_delete.container,
-                                      '%s+segments' % to_delete.container)
-                for segment_container in segment_containers:
-                    _ignore_not_found(self._swift_service_call)('delete',
-                                                                segment_container,
-                                                                _service_options=service_options)
-        else:
+            results = to_delete._delete_container(delete_segment_containers=not deleting_segments,
+                                                  bulk_delete_page_size=bulk_delete_page_size)
+        elif not bulk_delete_page_size:
             objs_to_delete = [p.resource for p in to_delete.list()]
-            results = _ignore_not_found(self._swift_service_call)('delete',
-                                                                  self.container,
-                                                                  objs_to_delete,
-                                                                  _service_options=service_options)
+            results = _ignore_not_found(self._swift_service_call)(
+                'delete', self.container, objs_to_delete,
+                _service_options=self._delete_service_options())
 
         # Verify that all objects have been deleted before returning. Otherwise try deleting again
         with settings.use({'swift': {'num_retries': 0}}):
@@ -1330,6 +2486,166 @@ class SwiftPath(OBSPath):
 
         return results
 
+    def _delete_service_options(self):
+        """Returns the ``SwiftService`` options of deletes"""
+        return {
+            'object_dd_threads': settings.get()['swift:delete']['object_threads']
+        }
+
+    def _segment_container_names(self):
+        """Returns the names of the segment containers that stor and swiftclient
+        use for the container of the path"""
+        return ('%s_segments' % self.container,
+                '.segments_%s' % self.container,
+                '%s+segments' % self.container)
+
+    def _has_segment_container(self):
+        """Returns True if a segment container of the container of the path exists"""
+        for segment_container in self._segment_container_names():
+            try:
+                self._swift_connection_call('head_container', segment_container)
+                return True
+            except NotFoundError:
+                pass
+        return False
+
+    def _delete_container(self, delete_segment_containers=True, bulk_delete_page_size=None):
+        """Deletes the container of the path and its objects with ``SwiftService``.
+
+        Segment containers are also deleted since swiftclient does not do this
+        automatically. When ``bulk_delete_page_size`` is given, the objects of
+        segment containers are deleted with bulk deletes first.
+        """
+        service_options = self._delete_service_options()
+        results = _ignore_not_found(self._swift_service_call)('delete',
+                                                              self.container,
+                                                              _service_options=service_options)
+        if delete_segment_containers:
+            for segment_container in self._segment_container_names():
+                if bulk_delete_page_size:
+                    segment_path = SwiftPath('%s%s/%s/' % (self.drive, self.tenant,
+                                                           segment_container))
+                    _ignore_not_found(segment_path._bulk_delete_prefix)(bulk_delete_page_size)
+                _ignore_not_found(self._swift_service_call)('delete',
+                                                            segment_container,
+                                                            _service_options=service_options)
+        return results
+
+    def _get_capabilities(self):
+        """Returns the capabilities of the ``/info`` endpoint of the cluster.
+
+        Capabilities are cached for every auth url. Clusters without the
+        ``/info`` endpoint have no capabilities. Other errors are not cached and
+        return no capabilities for this call only.
+        """
+        auth_url = settings.get()['swift']['auth_url']
+        if auth_url not in _cached_capabilities_map:
+            try:
+                capabilities = self._swift_connection_call('get_capabilities')
+            except NotFoundError:
+                capabilities = {}
+            except SwiftError as exc:
+                logger.warning('could not get the capabilities of the swift cluster: %s', exc)
+                return {}
+            with _singleton_lock:
+                _cached_capabilities_map[auth_url] = capabilities
+        return _cached_capabilities_map[auth_url]
+
+    def _bulk_delete_page_size(self):
+        """Returns the maximum number of objects deleted per bulk-delete request.
+
+        Returns:
+            int: The maximum number of deletes per request or None if the cluster
+                does not support bulk deletes or the ``bulk_delete`` option of the
+                ``swift:delete`` settings is disabled.
+        """
+        if not settings.get()['swift:delete']['bulk_delete']:
+            return None
+        bulk_delete = self._get_capabilities().get('bulk_delete')
+        if not bulk_delete:
+            return None
+        return bulk_delete.get('max_deletes_per_request', 10000)
+
+    @_swift_retry(exceptions=UnavailableError)
+    def _get_listing_page(self, marker, page_size):
+        """Returns the names of a page of the objects of the path after ``marker``"""
+        headers, page = self._swift_connection_call('get_container',
+                                                    self.container,
+                                                    prefix=self.resource,
+                                                    marker=marker,
+                                                    limit=page_size)
+        return [r['name'] for r in page]
+
+    def _iter_listing_pages(self, page_size):
+        """Lazily lists the object names of the path, one page at a time."""
+        marker = None
+        while True:
+            page = self._get_listing_page(marker, page_size)
+            if not page:
+                return
+            yield page
+            marker = page[-1]
+
+    @_swift_retry(exceptions=UnavailableError)
+    def _bulk_delete(self, object_names):
+        """Deletes objects of the container with one bulk-delete request.
+
+        Objects that do not exist are ignored.
+
+        Returns:
+            dict: The result of the bulk delete, similar to the results of
+                ``SwiftService.delete``.
+        """
+        data = b''.join(
+            parse.quote(('/%s/%s' % (self.container, name)).encode('utf-8')).encode('utf-8') +
+            b'\n' for name in object_names
+        )
+        headers, body = self._swift_connection_call('post_account',
+                                                    headers={
+                                                        'Accept': 'application/json',
+                                                        'Content-Type': 'text/plain'
+                                                    },
+                                                    query_string='bulk-delete',
+                                                    data=data)
+        if not body:
+            raise SwiftError('no content received on bulk-delete request. '
+                             'Is the bulk middleware enabled?')
+        result = parse_api_response(headers, body)
+
+        # Bulk deletes always return 200 and report errors in the response body
+        errors = result.get('Errors') or []
+        status = errors[0][1] if errors else result.get('Response Status', '')
+        if errors or not status.startswith('2'):
+            exc = swift_exceptions.ClientException('bulk-delete failed: %s %s' %
+                                                   (result.get('Response Body', ''), errors),
+                                                   http_status=int(status.split()[0])
+                                                   if status else None)
+            six.raise_from(_swiftclient_error_to_descriptive_exception(exc), exc)
+
+        return {
+            'action': 'bulk_delete',
+            'container': self.container,
+            'objects': object_names,
+            'success': True,
+            'result': result
+        }
+
+    def _bulk_delete_prefix(self, page_size):
+        """Deletes every object of the path with concurrent bulk-delete requests.
+
+        Objects are listed lazily in pages of ``page_size`` names and every page is
+        deleted with one request while the next pages are being listed. The number
+        of concurrent requests is the ``object_threads`` option of the
+        ``swift:delete`` settings.
+
+        Returns:
+            List[dict]: The results of every bulk delete.
+        """
+        # Swift limits listings to 10,000 results per request
+        pages = self._iter_listing_pages(min(page_size, 10000))
+        num_threads = settings.get()['swift:delete']['object_threads']
+        return list(utils.threaded_imap_unordered(self._bulk_delete, pages, num_threads))
+
     @_swift_retry(exceptions=(UnavailableError, UnauthorizedError))
     def remove_container(self):
         """
@@ -1459,18 +2775,39 @@ class SwiftPath(OBSPath):
         result = self._swift_service_call('stat',
                                           container=self.container,
                                           objects=stat_objects)[0]
+        return _stat_result_to_dict(result)
 
-        stat_values = {
-            k.replace(' ', '-'): v
-            for k, v in result['items']
-        }
-        stat_values['headers'] = result['headers']
+    @_swift_retry(exceptions=UnavailableError)
+    def _stat_objects(self, objects):
+        """Stats many objects of a container with one ``SwiftService``.
+
+        The HEAD requests are performed concurrently using the ``batch_threads``
+        option of the ``stor`` settings.
 
-        if result['action'] == 'stat_account':
-            # Load account ACLs
-            stat_values['Access-Control'] = json.loads(
-                result['headers'].get('x-account-access-control', '{}'))
+        Args:
+            objects (List[str]): The names of the objects to stat.
 
+        Returns:
+            dict: A mapping of every object name to its stat dictionary (see
+                `SwiftPath.stat`) or None if the object does not exist.
+        """
+        service_options = {
+            'object_dd_threads': settings.get()['stor']['batch_threads']
+        }
+        results = self._swift_service_call('stat',
+                                           container=self.container,
+                                           objects=objects,
+                                           _service_options=service_options,
+                                           _raise_errors=False)
+        stat_values = {}
+        for result in results:
+            if result['success']:
+                stat_values[result['object']] = _stat_result_to_dict(result)
+            elif getattr(result['error'], 'http_status', None) == 404:
+                stat_values[result['object']] = None
+            else:
+                exc = _swiftclient_error_to_descriptive_exception(result['error'])
+                six.raise_from(exc, result['error'])
         return stat_values
 
     def getsize(self):
@@ -1565,6 +2902,93 @@ class SwiftPath(OBSPath):
                 if pattern is None or f.fnmatch(pattern):
                     yield f
 
+    def _list_container_or_none(self, ignore_dir_markers=False):
+        """Lists a container, returning an empty list if it was deleted after being listed."""
+        try:
+            return self.list(ignore_dir_markers=ignore_dir_markers)
+        except NotFoundError:
+            return []
+
+    def walk_tenant(self, ignore_dir_markers=False):
+        """Iterates over every object in every container of a tenant.
+
+        Containers are listed concurrently using the ``container_threads``
+        option of the ``swift:list`` settings. Objects are yielded as soon as
+        the listing of their container completes, so objects from different
+        containers are not returned in any particular order. Segment containers
+        are skipped.
+
+        Each container listing retries as described in `SwiftPath.list`.
+
+        Args:
+            ignore_dir_markers (bool, default False): Do not yield directory
+                markers.
+
+        Returns:
+            Iter[SwiftPath]: Every object in the tenant.
+
+        Raises:
+            ValueError: The path is not a tenant.
+            SwiftError: A swift client error occurred.
+        """
+        if self.container:
+            raise ValueError('walk_tenant can only be called on a tenant')
+
+        containers = self.list(ignore_segment_containers=True)
+        num_threads = settings.get()['swift:list']['container_threads']
+        list_container = partial(SwiftPath._list_container_or_none,
+                                 ignore_dir_markers=ignore_dir_markers)
+        for results in utils.threaded_imap_unordered(list_container, containers, num_threads):
+            for result in results:
+                yield result
+
+    @_swift_retry(exceptions=UnavailableError)
+    def _head_container_counts(self):
+        """Returns the container path and its object and byte counts from a HEAD request.
+
+        The counts are ``None`` if the container was deleted after being listed.
+        """
+        try:
+            headers = self._swift_connection_call('head_container', self.container)
+        except NotFoundError:
+            return self, None
+        return self, {
+            'Objects': int(headers.get('x-container-object-count', 0)),
+            'Bytes': int(headers.get('x-container-bytes-used', 0))
+        }
+
+    def stat_containers(self):
+        """Returns the object and byte counts of every container in a tenant.
+
+        The containers are stated with concurrent HEAD requests using the
+        ``container_threads`` option of the ``swift:list`` settings. Segment
+        containers are skipped.
+
+        This method retries ``num_retries`` times for every container if swift
+        is unavailable. View `module-level documentation <swiftretry>` for more
+        information about configuring retry logic at the module or method level.
+
+        Returns:
+            dict: A mapping of every container `SwiftPath` to a dictionary with
+                its number of objects (``Objects``) and the total bytes of
+                its objects (``Bytes``).
+
+        Raises:
+            ValueError: The path is not a tenant.
+            SwiftError: A swift client error occurred.
+        """
+        if self.container:
+            raise ValueError('stat_containers can only be called on a tenant')
+
+        containers = self.list(ignore_segment_containers=True)
+        num_threads = settings.get()['swift:list']['container_threads']
+        return {
+            container: counts
+            for container, counts in utils.threaded_imap_unordered(
+                SwiftPath._head_container_counts, containers, num_threads)
+            if counts is not None
+        }
+
     def to_url(self):
         """Returns URI for object (based on storage URL)
 
@@ -84,6 +84,10 @@ class SwiftTestMixin(object):
         _cache_patcher = mock.patch.dict('stor.swift._cached_auth_token_map', clear=True)
         self.addCleanup(_cache_patcher.stop)
         _cache_patcher.start()
+        _capabilities_patcher = mock.patch.dict('stor.swift._cached_capabilities_map',
+                                                clear=True)
+        self.addCleanup(_capabilities_patcher.stop)
+        _capabilities_patcher.start()
 
     def assertSwiftListResultsEqual(self, r1, r2):
         """
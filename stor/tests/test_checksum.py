@@ -0,0 +1,121 @@
+import hashlib
+import os
+import unittest
+
+import mock
+
+from stor import checksum
+from stor import NamedTemporaryDirectory
+
+
+def _md5(data):
+    return hashlib.md5(data).hexdigest()
+
+
+class TestComputeChecksum(unittest.TestCase):
+    def setUp(self):
+        tmp_d = NamedTemporaryDirectory()
+        self.tmp_d = tmp_d.__enter__()
+        self.addCleanup(tmp_d.__exit__, None, None, None)
+
+    def write_file(self, name, data):
+        path = os.path.join(self.tmp_d, name)
+        with open(path, 'wb') as fp:
+            fp.write(data)
+        return path
+
+    def test_md5(self):
+        path = self.write_file('file', b'0123456789')
+        self.assertEquals(checksum.compute_checksum(path), _md5(b'0123456789'))
+
+    def test_smaller_than_chunk_size(self):
+        path = self.write_file('file', b'0123456789')
+        self.assertEquals(checksum.compute_checksum(path, chunk_size=11),
+                          _md5(b'0123456789'))
+
+    def test_multipart(self):
+        path = self.write_file('file', b'0123456789')
+        expected = '%s-3' % _md5(b''.join(hashlib.md5(part).digest()
+                                          for part in (b'0123', b'4567', b'89')))
+        self.assertEquals(checksum.compute_checksum(path, chunk_size=4), expected)
+
+    def test_multipart_exact_multiple(self):
+        path = self.write_file('file', b'0123456789')
+        expected = '%s-2' % _md5(b''.join(hashlib.md5(part).digest()
+                                          for part in (b'01234', b'56789')))
+        self.assertEquals(checksum.compute_checksum(path, chunk_size=5), expected)
+
+    @mock.patch.object(checksum, 'READ_SIZE', 3)
+    def test_multipart_small_reads(self):
+        path = self.write_file('file', b'0123456789')
+        expected = '%s-3' % _md5(b''.join(hashlib.md5(part).digest()
+                                          for part in (b'0123', b'4567', b'89')))
+        self.assertEquals(checksum.compute_checksum(path, chunk_size=4), expected)
+
+    def test_empty(self):
+        path = self.write_file('file', b'')
+        self.assertEquals(checksum.compute_checksum(path, chunk_size=4), _md5(b''))
+
+
+class TestComputeChecksums(unittest.TestCase):
+    def setUp(self):
+        tmp_d = NamedTemporaryDirectory()
+        self.tmp_d = tmp_d.__enter__()
+        self.addCleanup(tmp_d.__exit__, None, None, None)
+        self.cache_file = os.path.join(self.tmp_d, 'cache', 'checksums.sqlite')
+        self.paths = []
+        for i in range(4):
+            path = os.path.join(self.tmp_d, 'file%d' % i)
+            with open(path, 'wb') as fp:
+                fp.write(b'data%d' % i)
+            # Make the files old enough to be cached
+            os.utime(path, (1000000000, 1000000000 + i))
+            self.paths.append(path)
+        self.expected = {path: _md5(b'data%d' % i) for i, path in enumerate(self.paths)}
+
+    def test_process_pool(self):
+        checksums = checksum.compute_checksums(self.paths, processes=2, cache_file='')
+        self.assertEquals(checksums, self.expected)
+
+    def test_processes_setting(self):
+        with mock.patch('multiprocessing.cpu_count', return_value=1):
+            checksums = checksum.compute_checksums(self.paths, cache_file='')
+        self.assertEquals(checksums, self.expected)
+
+    def test_cache(self):
+        self.assertEquals(checksum.compute_checksums(self.paths, processes=1,
+                                                     cache_file=self.cache_file),
+                          self.expected)
+        with mock.patch.object(checksum, 'compute_checksum', autospec=True) as mock_compute:
+            self.assertEquals(checksum.compute_checksums(self.paths, processes=1,
+                                                         cache_file=self.cache_file),
+                              self.expected)
+            self.assertFalse(mock_compute.called)
+
+            # Checksums of other chunk sizes are cached separately
+            mock_compute.return_value = 'multipart'
+            checksums = checksum.compute_checksums(self.paths[:1], chunk_size=4,
+                                                   processes=1, cache_file=self.cache_file)
+            self.assertEquals(checksums, {self.paths[0]: 'multipart'})
+
+    def test_cache_modified_file(self):
+        checksum.compute_checksums(self.paths, processes=1, cache_file=self.cache_file)
+        with open(self.paths[0], 'wb') as fp:
+            fp.write(b'modified')
+        os.utime(self.paths[0], (1000000000, 1000000100))
+
+        checksums = checksum.compute_checksums(self.paths, processes=1,
+                                               cache_file=self.cache_file)
+        self.assertEquals(checksums[self.paths[0]], _md5(b'modified'))
+
+    def test_recently_modified_not_cached(self):
+        os.utime(self.paths[0], None)
+        checksum.compute_checksums(self.paths, processes=1, cache_file=self.cache_file)
+        with checksum.ChecksumCache(self.cache_file) as cache:
+            self.assertIsNone(cache.get(os.stat(self.paths[0])))
+            self.assertEquals(cache.get(os.stat(self.paths[1])), self.expected[self.paths[1]])
+
+    def test_missing_file(self):
+        with self.assertRaises(OSError):
+            checksum.compute_checksums([os.path.join(self.tmp_d, 'missing')],
+                                       processes=1, cache_file=self.cache_file)
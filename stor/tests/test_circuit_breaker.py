@@ -0,0 +1,127 @@
+import mock
+import unittest
+
+from stor import circuit_breaker
+from stor import exceptions
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.breaker = circuit_breaker.CircuitBreaker('endpoint', exceptions.UnavailableError,
+                                                      failure_threshold=2, reset_timeout=30)
+
+    def call_unavailable(self):
+        func = mock.Mock(side_effect=exceptions.UnavailableError('unavailable'))
+        with self.assertRaises(exceptions.UnavailableError):
+            self.breaker.call(func)
+
+    def test_success(self):
+        func = mock.Mock(return_value='result')
+        self.assertEquals(self.breaker.call(func, 'arg', kwarg='kwarg'), 'result')
+        func.assert_called_once_with('arg', kwarg='kwarg')
+        self.assertEquals(self.breaker.state, circuit_breaker.CLOSED)
+
+    def test_disabled(self):
+        self.breaker.failure_threshold = 0
+        for i in range(5):
+            self.call_unavailable()
+        self.assertEquals(self.breaker.state, circuit_breaker.CLOSED)
+
+    def test_success_resets_failures(self):
+        self.call_unavailable()
+        self.breaker.call(mock.Mock())
+        self.call_unavailable()
+        self.assertEquals(self.breaker.state, circuit_breaker.CLOSED)
+        self.assertEquals(self.breaker.failures, 1)
+
+    def test_other_exceptions_not_failures(self):
+        self.call_unavailable()
+        with self.assertRaises(exceptions.NotFoundError):
+            self.breaker.call(mock.Mock(side_effect=exceptions.NotFoundError('not found')))
+        self.assertEquals(self.breaker.failures, 0)
+
+    @mock.patch('time.time', autospec=True, return_value=100)
+    def test_open_fails_fast(self, mock_time):
+        self.call_unavailable()
+        self.call_unavailable()
+        self.assertEquals(self.breaker.state, circuit_breaker.OPEN)
+
+        mock_time.return_value = 129
+        func = mock.Mock()
+        with self.assertRaisesRegexp(exceptions.CircuitOpenError, 'circuit of endpoint is open'):
+            self.breaker.call(func)
+        self.assertFalse(func.called)
+
+    @mock.patch('time.time', autospec=True, return_value=100)
+    def test_probe_success_closes(self, mock_time):
+        self.call_unavailable()
+        self.call_unavailable()
+
+        mock_time.return_value = 130
+        self.assertEquals(self.breaker.call(mock.Mock(return_value='result')), 'result')
+        self.assertEquals(self.breaker.state, circuit_breaker.CLOSED)
+        self.assertEquals(self.breaker.failures, 0)
+
+    @mock.patch('time.time', autospec=True, return_value=100)
+    def test_probe_failure_opens(self, mock_time):
+        self.call_unavailable()
+        self.call_unavailable()
+
+        mock_time.return_value = 130
+        self.call_unavailable()
+        self.assertEquals(self.breaker.state, circuit_breaker.OPEN)
+        self.assertEquals(self.breaker.opened_at, 130)
+
+    @mock.patch('time.time', autospec=True, return_value=100)
+    def test_single_probe(self, mock_time):
+        self.call_unavailable()
+        self.call_unavailable()
+        mock_time.return_value = 130
+
+        def probe():
+            # Other calls fail fast while the probe is running
+            with self.assertRaises(exceptions.CircuitOpenError):
+                self.breaker.call(mock.Mock())
+            return 'result'
+
+        self.assertEquals(self.breaker.call(probe), 'result')
+        self.assertEquals(self.breaker.state, circuit_breaker.CLOSED)
+
+    @mock.patch('time.time', autospec=True, return_value=100)
+    def test_interrupted_probe(self, mock_time):
+        self.call_unavailable()
+        self.call_unavailable()
+        mock_time.return_value = 130
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.breaker.call(mock.Mock(side_effect=KeyboardInterrupt))
+        self.assertEquals(self.breaker.state, circuit_breaker.OPEN)
+        # The next call probes the endpoint again
+        self.assertEquals(self.breaker.call(mock.Mock(return_value='result')), 'result')
+        self.assertEquals(self.breaker.state, circuit_breaker.CLOSED)
+
+    def test_failed_results(self):
+        self.breaker.is_failed_result = lambda result: result == 'failed'
+        self.breaker.call(mock.Mock(return_value='failed'))
+        self.assertEquals(self.breaker.failures, 1)
+        self.breaker.call(mock.Mock(return_value='failed'))
+        self.assertEquals(self.breaker.state, circuit_breaker.OPEN)
+
+
+class TestGetCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        circuit_breaker.reset_circuit_breakers()
+        self.addCleanup(circuit_breaker.reset_circuit_breakers)
+
+    def test_shared_per_endpoint(self):
+        breaker = circuit_breaker.get_circuit_breaker('endpoint', (), 5, 30)
+        self.assertIs(circuit_breaker.get_circuit_breaker('endpoint', (), 5, 30), breaker)
+        self.assertIsNot(circuit_breaker.get_circuit_breaker('other', (), 5, 30), breaker)
+
+    def test_settings_updated(self):
+        breaker = circuit_breaker.get_circuit_breaker('endpoint', (), 5, 30)
+        breaker.failures = 3
+        self.assertIs(circuit_breaker.get_circuit_breaker('endpoint', (), 10, 60), breaker)
+        self.assertEquals(breaker.failure_threshold, 10)
+        self.assertEquals(breaker.reset_timeout, 60)
+        self.assertEquals(breaker.failures, 3)
@@ -1,6 +1,7 @@
 from __future__ import print_function
 
 import contextlib
+import json
 import os
 import mock
 import sys
@@ -11,8 +12,11 @@ import six
 from stor.posix import PosixPath
 from stor.s3 import S3Path
 from stor.swift import SwiftPath
+import stor
 from stor import cli
 from stor import exceptions
+from stor import instrumentation
+from stor import NamedTemporaryDirectory
 from stor import settings
 from stor import test
 
@@ -81,54 +85,111 @@ class TestCliBasics(BaseCliTest):
         with self.assertOutputMatches(exit_status='1', stderr='RemoteError: some error'):
             self.parse_args('stor list s3://bucket')
 
-    @mock.patch.dict('stor.settings._global_settings', {}, clear=True)
+    @mock.patch('stor._get_version', autospec=True, return_value='1.2.3')
+    def test_version(self, mock_get_version):
+        # The version is only looked up when it is requested
+        with mock.patch.dict(stor.__dict__):
+            stor.__dict__.pop('__version__', None)
+            with self.assertOutputMatches(exit_status='0', stdout='1.2.3'):
+                self.parse_args('stor --version')
+        mock_get_version.assert_called_once_with()
+
+    @mock.patch('stor.settings._global_settings', settings._freeze({}))
     @mock.patch.dict(os.environ, {}, clear=True)
     @mock.patch('stor.copytree', autospec=True)
     @mock.patch('stor.settings.USER_CONFIG_FILE', '')
     def test_cli_config(self, mock_copytree):
         expected_settings = {
-            'stor': {},
+            'stor': {
+                'batch_threads': 10,
+                'walk_threads': 8,
+                'progress_interval': 10,
+                'data_manifest_version': 1
+            },
+            'stor:copy': {
+                'object_threads': 10,
+                'segment_size': 67108864,
+                'segment_threads': 2
+            },
+            'stor:checksum': {
+                'processes': 0,
+                'cache_file': '~/.stor_checksums.sqlite',
+                'manifest_checksums': False
+            },
+            'posix:copy': {
+                'file_threads': 8
+            },
             's3': {
                 'aws_access_key_id': '',
                 'aws_secret_access_key': '',
                 'aws_session_token': '',
+                'num_retries': 0,
+                'retry_jitter': 0,
+                'deadline': 0,
+                'timeout': 0,
+                'circuit_failure_threshold': 0,
+                'circuit_reset_timeout': 30,
                 'profile_name': '',
                 'region_name': ''
             },
             's3:upload': {
                 'segment_size': 8388608,
                 'object_threads': 10,
-                'segment_threads': 10
+                'segment_threads': 10,
+                'max_bytes_per_second': 0,
+                'max_requests_per_second': 0
             },
             's3:download': {
                 'segment_size': 8388608,
                 'object_threads': 10,
-                'segment_threads': 10
+                'segment_threads': 10,
+                'max_bytes_per_second': 0,
+                'max_requests_per_second': 0
             },
             'swift': {
                 'username': 'fake_user',
                 'password': 'fake_password',
                 'auth_url': '',
                 'temp_url_key': '',
-                'num_retries': 0
+                'num_retries': 0,
+                'retry_jitter': 0,
+                'deadline': 0,
+                'timeout': 0,
+                'circuit_failure_threshold': 0,
+                'circuit_reset_timeout': 30
+            },
+            'swift:list': {
+                'container_threads': 10
+            },
+            'swift:copy': {
+                'object_threads': 10
             },
             'swift:delete': {
+                'bulk_delete': True,
                 'object_threads': 10
             },
             'swift:download': {
                 'container_threads': 10,
+                'max_bytes_per_second': 0,
+                'max_requests_per_second': 0,
                 'object_threads': 10,
+                'read_chunk_size': 1048576,
+                'segment_threads': 10,
                 'shuffle': True,
-                'skip_identical': True
+                'skip_identical': True,
+                'stream_reads': False
             },
             'swift:upload': {
                 'changed': False,
                 'checksum': True,
                 'leave_segments': True,
+                'max_bytes_per_second': 0,
+                'max_requests_per_second': 0,
                 'object_threads': 10,
                 'segment_size': 1073741824,
                 'segment_threads': 10,
                 'skip_identical': False,
+                'stream_writes': False,
                 'use_slo': True
             }
         }
@@ -402,6 +463,20 @@ class TestCopytree(BaseCliTest):
         self.parse_args('stor cp -r s3://bucket .')
         mock_copytree.assert_called_once_with(source='s3://bucket', dest='.')
 
+    def test_copytree_trace(self, mock_copytree):
+        def copytree(source, dest):
+            with instrumentation.request('s3', 'upload_file', 'bucket', 'key'):
+                pass
+        mock_copytree.side_effect = copytree
+
+        with NamedTemporaryDirectory() as tmp_d:
+            trace_file = os.path.join(tmp_d, 'trace.jsonl')
+            self.parse_args('stor --trace %s cp -r . s3://bucket' % trace_file)
+            with open(trace_file) as fp:
+                spans = [json.loads(line) for line in fp]
+        self.assertEquals([span['name'] for span in spans], ['s3://bucket/key'])
+        mock_copytree.assert_called_once_with(source='.', dest='s3://bucket')
+
     def test_copytree_stdin_error(self, mock_copytree):
         with self.assertOutputMatches(exit_status='2', stderr='- cannot be used with -r'):
             self.parse_args('stor cp -r - s3://bucket')
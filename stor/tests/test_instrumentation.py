@@ -0,0 +1,181 @@
+import threading
+import unittest
+
+import mock
+
+from stor import exceptions
+from stor import instrumentation
+
+
+class RecordingInstrument(instrumentation.Instrument):
+    def __init__(self):
+        self.events = []
+
+    def before_request(self, event):
+        self.events.append(('before', event.operation, event.duration))
+
+    def after_request(self, event):
+        self.events.append(('after', event.operation, event.duration))
+
+
+class TestInstruments(unittest.TestCase):
+    def test_not_instrumented(self):
+        with instrumentation.request('s3', 'head_object', 'bucket') as event:
+            self.assertIsNone(event)
+
+    def test_use(self):
+        instrument = RecordingInstrument()
+        with instrumentation.use(instrument):
+            with instrumentation.request('s3', 'head_object', 'bucket') as event:
+                self.assertEquals(event.bucket, 'bucket')
+                self.assertEquals(instrument.events, [('before', 'head_object', None)])
+        self.assertEquals(instrument.events[1][:2], ('after', 'head_object'))
+        self.assertGreaterEqual(instrument.events[1][2], 0)
+
+        # The instrument is removed after the block
+        with instrumentation.request('s3', 'head_object', 'bucket') as event:
+            self.assertIsNone(event)
+        self.assertEquals(len(instrument.events), 2)
+
+    def test_remove_missing_instrument(self):
+        with self.assertRaises(ValueError):
+            instrumentation.remove_instrument(RecordingInstrument())
+
+    def test_error(self):
+        instrument = mock.Mock()
+        error = exceptions.UnavailableError('unavailable',
+                                            mock.Mock(http_status=503, spec=['http_status']))
+        with instrumentation.use(instrument):
+            with self.assertRaises(exceptions.UnavailableError):
+                with instrumentation.request('swift', 'head_object', 'container'):
+                    raise error
+        event = instrument.after_request.call_args[0][0]
+        self.assertEquals((event.error, event.status), (error, 503))
+
+    def test_failing_instrument(self):
+        instrument = mock.Mock()
+        instrument.before_request.side_effect = ValueError
+        instrument.after_request.side_effect = ValueError
+        with instrumentation.use(instrument):
+            with instrumentation.request('s3', 'head_object', 'bucket'):
+                pass
+        self.assertTrue(instrument.after_request.called)
+
+    def test_retries(self):
+        instrument = mock.Mock()
+        with instrumentation.use(instrument):
+            with mock.patch('stor.retry.get_attempt', return_value=2, autospec=True):
+                with instrumentation.request('s3', 'head_object', 'bucket'):
+                    pass
+        self.assertEquals(instrument.after_request.call_args[0][0].retries, 2)
+
+    def test_iter_requests(self):
+        instrument = RecordingInstrument()
+        with instrumentation.use(instrument):
+            pages = list(instrumentation.iter_requests('s3', 'list_objects_v2', 'bucket',
+                                                       [{'page': 1}, {'page': 2}]))
+        self.assertEquals(pages, [{'page': 1}, {'page': 2}])
+        self.assertEquals([e[0] for e in instrument.events],
+                          ['before', 'after', 'before', 'after', 'before'])
+
+    def test_iter_requests_error(self):
+        def pages():
+            yield {'page': 1}
+            raise exceptions.RemoteError('error')
+
+        instrument = mock.Mock()
+        with instrumentation.use(instrument):
+            with self.assertRaises(exceptions.RemoteError):
+                list(instrumentation.iter_requests('s3', 'list_objects_v2', 'bucket', pages()))
+        self.assertEquals(instrument.after_request.call_count, 2)
+        self.assertIsInstance(instrument.after_request.call_args[0][0].error,
+                              exceptions.RemoteError)
+
+
+class TestGetErrorStatus(unittest.TestCase):
+    def test_boto_error(self):
+        caught = mock.Mock(response={'ResponseMetadata': {'HTTPStatusCode': 404}},
+                           spec=['response'])
+        error = exceptions.NotFoundError('not found', caught)
+        self.assertEquals(instrumentation.get_error_status(error), 404)
+
+    def test_swift_service_error(self):
+        caught = mock.Mock(exception=mock.Mock(http_status=409, spec=['http_status']),
+                           spec=['exception'])
+        error = exceptions.ConflictError('conflict', caught)
+        self.assertEquals(instrumentation.get_error_status(error), 409)
+
+    def test_unknown(self):
+        self.assertIsNone(instrumentation.get_error_status(ValueError()))
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_empty(self):
+        self.assertIsNone(instrumentation.LatencyHistogram().percentile(50))
+
+    def test_percentiles(self):
+        histogram = instrumentation.LatencyHistogram(min_value=0.001, growth=1.01)
+        for i in range(1, 1001):
+            histogram.add(i / 1000.0)
+        self.assertEquals(histogram.count, 1000)
+        self.assertAlmostEquals(histogram.total, 500.5)
+        self.assertEquals(histogram.max, 1.0)
+        for percent in (50, 95, 99):
+            self.assertAlmostEqual(histogram.percentile(percent), percent / 100.0,
+                                   delta=percent / 100.0 * 0.01)
+        self.assertEquals(histogram.percentile(100), 1.0)
+
+    def test_small_values(self):
+        histogram = instrumentation.LatencyHistogram(min_value=0.001)
+        histogram.add(0)
+        histogram.add(0.0005)
+        self.assertEquals(histogram.percentile(50), 0.0005)
+
+
+class TestLatencyAggregator(unittest.TestCase):
+    def make_event(self, operation, duration, **kwargs):
+        event = instrumentation.RequestEvent('s3', operation, 'bucket')
+        event.duration = duration
+        for key, value in kwargs.items():
+            setattr(event, key, value)
+        return event
+
+    def test_get_stats(self):
+        aggregator = instrumentation.LatencyAggregator()
+        aggregator.after_request(self.make_event('get_object', 0.1, bytes=10))
+        aggregator.after_request(self.make_event('get_object', 0.2, bytes=20, retries=1,
+                                                 error=exceptions.RemoteError('error')))
+        aggregator.after_request(self.make_event('head_object', 0.01))
+
+        stats = aggregator.get_stats()
+        self.assertEquals(sorted(stats), ['s3:get_object', 's3:head_object'])
+        get_stats = stats['s3:get_object']
+        self.assertEquals((get_stats['count'], get_stats['errors'], get_stats['retries'],
+                           get_stats['bytes']), (2, 1, 1, 30))
+        self.assertAlmostEquals(get_stats['total'], 0.3)
+        self.assertEquals(get_stats['max'], 0.2)
+        self.assertAlmostEqual(get_stats['p50'], 0.1, delta=0.005)
+        self.assertEquals(get_stats['p99'], 0.2)
+
+        report = aggregator.get_report().splitlines()
+        self.assertEquals(len(report), 3)
+        self.assertTrue(report[1].startswith('s3:get_object'))
+
+        aggregator.reset()
+        self.assertEquals(aggregator.get_stats(), {})
+
+    def test_threads(self):
+        aggregator = instrumentation.LatencyAggregator()
+
+        def make_requests():
+            for i in range(1000):
+                with instrumentation.request('s3', 'head_object', 'bucket'):
+                    pass
+
+        with instrumentation.use(aggregator):
+            threads = [threading.Thread(target=make_requests) for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEquals(aggregator.get_stats()['s3:head_object']['count'], 4000)
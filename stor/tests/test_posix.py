@@ -1,5 +1,7 @@
+import errno
 import mock
 import os
+import shutil
 import tempfile
 import unittest
 
@@ -156,6 +158,99 @@ class TestCopytree(unittest.TestCase):
             utils.copytree(source, dest)
             self.assertTrue((dest / '1').exists())
 
+    def make_source(self, tmp_d):
+        source = tmp_d / 'source'
+        (source / 'dir' / 'subdir').makedirs_p()
+        (source / 'empty').makedirs_p()
+        with open(source / '1', 'w') as tmp_file:
+            tmp_file.write('1')
+        with open(source / 'dir' / 'subdir' / '2', 'w') as tmp_file:
+            tmp_file.write('22' * 1000)
+        os.symlink(source / '1', source / 'link')
+        os.chmod(source / '1', 0o640)
+        os.utime(source / 'dir', (1000, 1000))
+        return source
+
+    def assert_copied(self, source, dest):
+        self.assertEquals(open(dest / '1').read(), '1')
+        self.assertEquals(open(dest / 'dir' / 'subdir' / '2').read(), '22' * 1000)
+        self.assertTrue((dest / 'empty').isdir())
+        # Symlinks are followed like shutil.copytree
+        self.assertFalse((dest / 'link').islink())
+        self.assertEquals(open(dest / 'link').read(), '1')
+        self.assertEquals(os.stat(dest / '1').st_mode, os.stat(source / '1').st_mode)
+        self.assertEquals(os.stat(dest / '1').st_mtime, os.stat(source / '1').st_mtime)
+        self.assertEquals(os.stat(dest / 'dir').st_mtime, 1000)
+
+    def test_parallel_copytree(self):
+        with stor.NamedTemporaryDirectory() as tmp_d:
+            source = self.make_source(tmp_d)
+            dest = tmp_d / 'dest'
+            with mock.patch.object(posix.PosixCopyLogger, 'add_result',
+                                   autospec=True) as mock_add_result:
+                posix.parallel_copytree(source, dest, num_threads=3)
+            self.assert_copied(source, dest)
+            self.assertEquals(sorted(c[0][1]['bytes'] for c in mock_add_result.call_args_list),
+                              [1, 1, 2000])
+
+    @mock.patch('stor.posix._copy_file_range', autospec=True)
+    def test_parallel_copytree_kernel_copy_fallback(self, mock_copy_file_range):
+        mock_copy_file_range.side_effect = OSError(errno.EXDEV, 'cross-device link')
+        with stor.NamedTemporaryDirectory() as tmp_d:
+            source = self.make_source(tmp_d)
+            dest = tmp_d / 'dest'
+            with mock.patch.object(posix, '_unsupported_copy_functions', set(['sendfile'])):
+                posix.parallel_copytree(source, dest, num_threads=1)
+            self.assert_copied(source, dest)
+
+    def test_parallel_copytree_file_errors(self):
+        with stor.NamedTemporaryDirectory() as tmp_d:
+            source = self.make_source(tmp_d)
+            os.symlink(source / 'missing', source / 'broken_link')
+            dest = tmp_d / 'dest'
+            with self.assertRaises(shutil.Error) as cm:
+                posix.parallel_copytree(source, dest)
+            self.assertEquals([e[:2] for e in cm.exception.args[0]],
+                              [(source / 'broken_link', dest / 'broken_link')])
+            self.assertEquals(open(dest / '1').read(), '1')
+
+    def test_parallel_copytree_named_pipe(self):
+        with stor.NamedTemporaryDirectory() as tmp_d:
+            source = self.make_source(tmp_d)
+            os.mkfifo(source / 'fifo')
+            dest = tmp_d / 'dest'
+            with self.assertRaises(shutil.Error) as cm:
+                posix.parallel_copytree(source, dest)
+            self.assertEquals(cm.exception.args[0],
+                              [(source / 'fifo', dest / 'fifo',
+                                '`%s` is a named pipe' % (source / 'fifo'))])
+            self.assert_copied(source, dest)
+
+    def test_parallel_copytree_symlinked_dir(self):
+        with stor.NamedTemporaryDirectory() as tmp_d:
+            source = self.make_source(tmp_d)
+            os.symlink(source / 'dir', source / 'dir_link')
+            dest = tmp_d / 'dest'
+            posix.parallel_copytree(source, dest)
+            self.assertFalse((dest / 'dir_link').islink())
+            self.assertEquals(open(dest / 'dir_link' / 'subdir' / '2').read(), '22' * 1000)
+
+    @mock.patch('stor.posix._copy_file_range', autospec=True)
+    @mock.patch('os.sendfile', autospec=True, create=True)
+    def test_parallel_copytree_sendfile_linux_only(self, mock_sendfile, mock_copy_file_range):
+        mock_copy_file_range.side_effect = OSError(errno.EXDEV, 'cross-device link')
+        with stor.NamedTemporaryDirectory() as tmp_d:
+            source = self.make_source(tmp_d)
+            with mock.patch.object(posix, '_HAS_FILE_SENDFILE', False):
+                posix.parallel_copytree(source, tmp_d / 'dest')
+            self.assertFalse(mock_sendfile.called)
+            self.assert_copied(source, tmp_d / 'dest')
+
+    def test_copy_chunk_size(self):
+        self.assertEquals(posix._get_copy_chunk_size(0), 1 << 23)
+        self.assertEquals(posix._get_copy_chunk_size(100 << 20), 100 << 20)
+        self.assertEquals(posix._get_copy_chunk_size(10 << 30), 1 << 30)
+
     def test_posix_destination_w_cmd(self):
         with stor.NamedTemporaryDirectory() as tmp_d:
             source = tmp_d / 'source'
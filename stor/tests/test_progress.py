@@ -0,0 +1,80 @@
+import logging
+import unittest
+
+import mock
+from testfixtures import LogCapture
+
+from stor import progress
+from stor import utils
+
+
+class ProgressLogger(utils.BaseProgressLogger):
+    operation = 'upload'
+
+    def get_start_message(self):
+        return None
+
+    def get_finish_message(self):
+        return 'complete - %s' % self.get_progress_message()
+
+
+class TestCallbacks(unittest.TestCase):
+    def test_use(self):
+        reports = []
+        with progress.use(reports.append):
+            with ProgressLogger(logging.getLogger('progress'), total_objects=1) as progress_logger:
+                progress_logger.add_result({})
+        self.assertEquals(len(reports), 1)
+        self.assertEquals(reports[0].operation, 'upload')
+        self.assertEquals(reports[0].objects, 1)
+        self.assertTrue(reports[0].finished)
+
+        # The callback is removed after the block
+        with ProgressLogger(logging.getLogger('progress')) as progress_logger:
+            progress_logger.add_result({})
+        self.assertEquals(len(reports), 1)
+
+    def test_remove_missing_callback(self):
+        with self.assertRaises(ValueError):
+            progress.remove_callback(lambda report: None)
+
+    def test_callback_error_logged(self):
+        callback = mock.Mock(side_effect=ValueError('failed'))
+        with LogCapture('stor.progress') as log:
+            with progress.use(callback):
+                progress.notify(mock.sentinel.report)
+        callback.assert_called_once_with(mock.sentinel.report)
+        self.assertEquals(len(log.records), 1)
+        self.assertIn('failed', log.records[0].getMessage())
+
+
+class TestThroughputMeter(unittest.TestCase):
+    def test_get_rate(self):
+        meter = progress.ThroughputMeter(window=30)
+        self.assertIsNone(meter.get_rate())
+        meter.add_sample(0, 0)
+        self.assertIsNone(meter.get_rate())
+        meter.add_sample(10, 100)
+        self.assertEquals(meter.get_rate(), 10)
+        meter.add_sample(20, 200)
+        meter.add_sample(30, 300)
+        self.assertEquals(meter.get_rate(), 10)
+
+        # Older samples are discarded, so the rate follows recent changes
+        meter.add_sample(40, 300)
+        meter.add_sample(50, 300)
+        meter.add_sample(60, 300)
+        self.assertEquals(meter.get_rate(), 0)
+
+    def test_same_time(self):
+        meter = progress.ThroughputMeter()
+        meter.add_sample(5, 0)
+        meter.add_sample(5, 10)
+        self.assertIsNone(meter.get_rate())
+
+
+class TestFormatDuration(unittest.TestCase):
+    def test_format_duration(self):
+        self.assertEquals(progress.format_duration(0), '0:00:00')
+        self.assertEquals(progress.format_duration(61.9), '0:01:01')
+        self.assertEquals(progress.format_duration(3 * 3600 + 5), '3:00:05')
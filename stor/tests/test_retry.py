@@ -0,0 +1,201 @@
+import mock
+import threading
+import unittest
+
+from stor import exceptions
+from stor import retry
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_no_retries(self):
+        func = mock.Mock(side_effect=exceptions.UnavailableError('unavailable'))
+        policy = retry.RetryPolicy(exceptions=exceptions.UnavailableError)
+        with self.assertRaises(exceptions.UnavailableError):
+            policy.call(func, 'arg', kwarg='kwarg')
+        func.assert_called_once_with('arg', kwarg='kwarg')
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_retries(self, mock_sleep):
+        func = mock.Mock(side_effect=[exceptions.UnavailableError('unavailable'),
+                                      exceptions.UnavailableError('unavailable'),
+                                      'result'])
+        policy = retry.RetryPolicy(exceptions=exceptions.UnavailableError,
+                                   num_retries=3,
+                                   initial_sleep=2)
+        self.assertEquals(policy.call(func), 'result')
+        self.assertEquals(func.call_count, 3)
+        self.assertEquals(mock_sleep.call_args_list, [mock.call(2), mock.call(4)])
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_retries_exhausted(self, mock_sleep):
+        func = mock.Mock(side_effect=exceptions.UnavailableError('unavailable'))
+        policy = retry.RetryPolicy(exceptions=exceptions.UnavailableError,
+                                   num_retries=2,
+                                   sleep_function=lambda t, attempt: t + 1)
+        with self.assertRaises(exceptions.UnavailableError):
+            policy.call(func)
+        self.assertEquals(func.call_count, 3)
+        self.assertEquals(mock_sleep.call_args_list, [mock.call(1), mock.call(2)])
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_circuit_open_not_retried(self, mock_sleep):
+        func = mock.Mock(side_effect=exceptions.CircuitOpenError('circuit open'))
+        policy = retry.RetryPolicy(exceptions=exceptions.UnavailableError, num_retries=3)
+        with self.assertRaises(exceptions.CircuitOpenError):
+            policy.call(func)
+        func.assert_called_once_with()
+        self.assertFalse(mock_sleep.called)
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_other_exceptions_not_retried(self, mock_sleep):
+        func = mock.Mock(side_effect=exceptions.NotFoundError('not found'))
+        policy = retry.RetryPolicy(exceptions=exceptions.UnavailableError, num_retries=2)
+        with self.assertRaises(exceptions.NotFoundError):
+            policy.call(func)
+        func.assert_called_once_with()
+        self.assertFalse(mock_sleep.called)
+
+    @mock.patch('random.uniform', autospec=True, return_value=1.1)
+    @mock.patch('time.sleep', autospec=True)
+    def test_jitter(self, mock_sleep, mock_uniform):
+        func = mock.Mock(side_effect=[exceptions.UnavailableError('unavailable'), 'result'])
+        policy = retry.RetryPolicy(exceptions=exceptions.UnavailableError,
+                                   num_retries=1,
+                                   initial_sleep=10,
+                                   jitter=0.1)
+        self.assertEquals(policy.call(func), 'result')
+        mock_uniform.assert_called_once_with(0.9, 1.1)
+        mock_sleep.assert_called_once_with(11.0)
+
+    @mock.patch('time.time', autospec=True, side_effect=[0, 5])
+    @mock.patch('time.sleep', autospec=True)
+    def test_deadline(self, mock_sleep, mock_time):
+        error = exceptions.UnavailableError('unavailable')
+        func = mock.Mock(side_effect=error, __name__='func')
+        policy = retry.RetryPolicy(exceptions=exceptions.UnavailableError,
+                                   num_retries=5,
+                                   initial_sleep=10,
+                                   deadline=12)
+        with self.assertRaisesRegexp(exceptions.DeadlineExceededError,
+                                     'after 1 attempts of func') as cm:
+            policy.call(func)
+        self.assertIs(cm.exception.caught_exception, error)
+        func.assert_called_once_with()
+        self.assertFalse(mock_sleep.called)
+        self.assertIsNone(retry.get_remaining_time())
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_nested_deadline(self, mock_sleep):
+        remaining_times = []
+
+        def func():
+            remaining_times.append(retry.get_remaining_time())
+            return retry.RetryPolicy(deadline=100).call(retry.get_remaining_time)
+
+        with mock.patch('time.time', autospec=True, return_value=0):
+            inner_remaining_time = retry.RetryPolicy(deadline=10).call(func)
+        self.assertEquals(remaining_times, [10])
+        # The earlier deadline of the outer operation applies
+        self.assertEquals(inner_remaining_time, 10)
+        self.assertIsNone(retry.get_remaining_time())
+
+    def test_check_deadline(self):
+        retry.check_deadline('no deadline')
+
+        def func():
+            retry.check_deadline('calling func')
+
+        with mock.patch('time.time', autospec=True, side_effect=[0, 10]):
+            with self.assertRaisesRegexp(exceptions.DeadlineExceededError, 'calling func'):
+                retry.RetryPolicy(deadline=5).call(func)
+
+    def test_propagate_deadline(self):
+        def func(arg):
+            return arg, retry.get_remaining_time()
+
+        # Functions are not wrapped when no deadline is active
+        self.assertIs(retry.propagate_deadline(func), func)
+
+        results = []
+
+        def run_in_thread():
+            wrapped = retry.propagate_deadline(func)
+            thread = threading.Thread(target=lambda: results.append(wrapped('arg')))
+            thread.start()
+            thread.join()
+
+        with mock.patch('time.time', autospec=True, return_value=0):
+            retry.RetryPolicy(deadline=10).call(run_in_thread)
+            self.assertEquals(results, [('arg', 10)])
+            self.assertIsNone(retry.get_remaining_time())
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_get_attempt(self, mock_sleep):
+        attempts = []
+
+        def func():
+            attempts.append(retry.get_attempt())
+            if len(attempts) < 3:
+                raise exceptions.UnavailableError('unavailable')
+
+        policy = retry.RetryPolicy(exceptions=exceptions.UnavailableError, num_retries=2)
+        policy.call(func)
+        self.assertEquals(attempts, [0, 1, 2])
+        self.assertEquals(retry.get_attempt(), 0)
+
+    def test_with_retry_args(self):
+        policy = retry.RetryPolicy(exceptions=exceptions.UnavailableError, num_retries=1)
+        self.assertIs(policy.with_retry_args({'other': 'arg'}), policy)
+
+        retry_args = {'num_retries': 3, 'initial_retry_sleep': 5, 'deadline': 60, 'other': 'arg'}
+        call_policy = policy.with_retry_args(retry_args)
+        self.assertEquals(retry_args, {'other': 'arg'})
+        self.assertEquals(call_policy.num_retries, 3)
+        self.assertEquals(call_policy.initial_sleep, 5)
+        self.assertEquals(call_policy.deadline, 60)
+        self.assertEquals(call_policy.exceptions, exceptions.UnavailableError)
+        self.assertEquals(policy.num_retries, 1)
+
+
+class TestRetry(unittest.TestCase):
+    def test_policy_cached(self):
+        default_policy = retry.RetryPolicy()
+        get_policy = mock.Mock(return_value=default_policy)
+
+        @retry.retry(exceptions.UnavailableError, get_policy)
+        def func():
+            return 'result'
+
+        with mock.patch.object(retry.RetryPolicy, 'replace', autospec=True,
+                               wraps=retry.RetryPolicy.replace) as mock_replace:
+            self.assertEquals(func(), 'result')
+            self.assertEquals(func(), 'result')
+            self.assertEquals(mock_replace.call_count, 1)
+
+            get_policy.return_value = retry.RetryPolicy(num_retries=1)
+            self.assertEquals(func(), 'result')
+            self.assertEquals(mock_replace.call_count, 2)
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_retry_args(self, mock_sleep):
+        calls = []
+
+        @retry.retry(exceptions.UnavailableError, retry.RetryPolicy)
+        def func(arg):
+            calls.append(arg)
+            raise exceptions.UnavailableError('unavailable')
+
+        with self.assertRaises(exceptions.UnavailableError):
+            func('arg', num_retries=2, initial_retry_sleep=3)
+        self.assertEquals(calls, ['arg', 'arg', 'arg'])
+        self.assertEquals(mock_sleep.call_args_list, [mock.call(3), mock.call(6)])
+
+    def test_get_retry_args(self):
+        kwargs = {'num_retries': 2, 'deadline': 10, 'other': 'arg'}
+        self.assertEquals(retry.get_retry_args(kwargs), {'num_retries': 2, 'deadline': 10})
+        self.assertEquals(len(kwargs), 3)
+
+    def test_check_unexpected_args(self):
+        retry.check_unexpected_args('func', {})
+        with self.assertRaisesRegexp(TypeError, r'func\(\) .*: num_retires, other'):
+            retry.check_unexpected_args('func', {'other': 'arg', 'num_retires': 3})
@@ -1,23 +1,31 @@
 import datetime
 import ntpath
+import os
 from tempfile import NamedTemporaryFile
 import unittest
 
 from boto3.exceptions import RetriesExceededError
 from boto3.exceptions import S3UploadFailedError
 from botocore.exceptions import ClientError
+from botocore.exceptions import EndpointConnectionError
 import freezegun
 import mock
 from testfixtures import LogCapture
 
 import stor
+from stor import circuit_breaker
 from stor import exceptions
+from stor import instrumentation
 from stor import NamedTemporaryDirectory
 from stor.obs import OBSUploadObject
 from stor import Path
+from stor import retry
 from stor import settings
 from stor import s3
+from stor import throttle
+from stor import tracing
 from stor.s3 import S3Path
+from stor.swift import SwiftPath
 from stor.test import S3TestCase
 from stor.tests.shared_obs import SharedOBSFileCases
 from stor import utils
@@ -135,6 +143,103 @@ class TestGetS3Client(S3TestCase):
         self.mock_s3_session.return_value.client.assert_called_once_with('s3')
         self.assertEquals(client, self.mock_s3_session.return_value.client.return_value)
 
+    @mock.patch('stor.s3.botocore_config.Config', autospec=True)
+    def test_get_s3_client_w_timeout(self, mock_config):
+        if hasattr(s3._thread_local, 's3_client'):
+            del s3._thread_local.s3_client
+        self.disable_get_s3_client_mock()
+        with settings.use({'s3': {'timeout': 30}}):
+            s3._get_s3_client()
+        mock_config.assert_called_once_with(connect_timeout=30, read_timeout=30)
+        self.mock_s3_session.return_value.client.assert_called_once_with(
+            's3', config=mock_config.return_value)
+
+
+def _make_operation_model(name):
+    model = mock.Mock()
+    model.name = name
+    return model
+
+
+class TestTracePart(unittest.TestCase):
+    def setUp(self):
+        self.tracer = tracing.Tracer()
+        patcher = tracing.use(self.tracer)
+        patcher.__enter__()
+        self.addCleanup(patcher.__exit__, None, None, None)
+
+    def test_upload_part(self):
+        context = {}
+        s3._trace_part_start(params={'Bucket': 'bucket', 'Key': 'key', 'PartNumber': 2,
+                                     'Body': b'data'},
+                             model=_make_operation_model('UploadPart'), context=context)
+        context['retries'] = {'attempt': 2}
+        s3._trace_part_end(context=context,
+                           parsed={'ResponseMetadata': {'HTTPStatusCode': 200}})
+
+        span, = self.tracer.spans
+        self.assertEquals((span.name, span.category, span.bytes, span.retries),
+                          ('s3://bucket/key', 'part', 4, 1))
+        self.assertEquals(span.args, {'operation': 'UploadPart', 'part_number': 2,
+                                      'status': 200})
+
+    def test_ranged_download(self):
+        context = {}
+        s3._trace_part_start(params={'Bucket': 'bucket', 'Key': 'key', 'Range': 'bytes=0-9'},
+                             model=_make_operation_model('GetObject'), context=context)
+        s3._trace_part_end(context=context, exception=ValueError('error'))
+
+        span, = self.tracer.spans
+        self.assertEquals((span.bytes, span.retries), (None, 0))
+        self.assertEquals(span.args, {'operation': 'GetObject', 'range': 'bytes=0-9',
+                                      'error': repr(ValueError('error'))})
+
+    def test_not_a_part(self):
+        context = {}
+        s3._trace_part_start(params={'Bucket': 'bucket', 'Key': 'key'},
+                             model=_make_operation_model('GetObject'), context=context)
+        s3._trace_part_end(context=context, parsed={'ContentLength': 10})
+        self.assertEquals(self.tracer.spans, [])
+
+    def test_not_tracing(self):
+        context = {}
+        with mock.patch.object(tracing, '_tracer', None):
+            s3._trace_part_start(params={'Bucket': 'bucket', 'Key': 'key',
+                                         'Range': 'bytes=0-9'},
+                                 model=_make_operation_model('GetObject'), context=context)
+        self.assertEquals(context, {})
+
+    def test_register_trace_handlers(self):
+        mock_client = mock.Mock()
+        s3._register_trace_handlers(mock_client)
+        mock_client.meta.events.register.assert_any_call(
+            'before-parameter-build.s3.UploadPart', s3._trace_part_start)
+        mock_client.meta.events.register.assert_any_call(
+            'after-call-error.s3.GetObject', s3._trace_part_end)
+
+
+class TestThrottleRequest(unittest.TestCase):
+    @mock.patch.object(throttle, 'get_limiter', autospec=True)
+    def test_throttle_request(self, mock_get_limiter):
+        s3._throttle_request('upload', request=mock.Mock())
+        mock_get_limiter.assert_called_once_with('s3', 'upload')
+        mock_get_limiter.return_value.consume_request.assert_called_once_with()
+
+        mock_get_limiter.return_value = None
+        s3._throttle_request('download', request=mock.Mock())
+
+    def test_register_throttle_handlers(self):
+        mock_client = mock.Mock()
+        s3._register_throttle_handlers(mock_client)
+        events = {c[0][0]: c[0][1] for c in mock_client.meta.events.register.call_args_list}
+        self.assertEquals(set(events), {
+            'before-send.s3.PutObject', 'before-send.s3.CreateMultipartUpload',
+            'before-send.s3.UploadPart', 'before-send.s3.CompleteMultipartUpload',
+            'before-send.s3.GetObject'
+        })
+        self.assertEquals(events['before-send.s3.UploadPart'].args, ('upload',))
+        self.assertEquals(events['before-send.s3.GetObject'].args, ('download',))
+
 
 class TestGetS3Iterator(S3TestCase):
     def test_get_s3_iterator(self):
@@ -145,14 +250,137 @@ class TestGetS3Iterator(S3TestCase):
         s3_p._get_s3_iterator('method', key='val')
         mock_paginate.assert_called_once_with(key='val')
 
+    def test_get_s3_iterator_instrumented(self):
+        mock_paginator = self.mock_s3.get_paginator.return_value
+        mock_paginator.paginate.return_value = iter([
+            {'ResponseMetadata': {'HTTPStatusCode': 200}, 'Contents': []},
+            {'ResponseMetadata': {'HTTPStatusCode': 200}, 'Contents': []}
+        ])
+        self.disable_get_s3_iterator_mock()
+        s3_p = S3Path('s3://test-bucket')
+        instrument = mock.Mock()
+        with instrumentation.use(instrument):
+            self.assertEquals(len(list(s3_p._get_s3_iterator('list_objects_v2'))), 2)
+
+        # The end of the listing is not a request
+        self.assertEquals(instrument.before_request.call_count, 3)
+        self.assertEquals(instrument.after_request.call_count, 2)
+        event = instrument.after_request.call_args[0][0]
+        self.assertEquals((event.service, event.operation, event.bucket, event.status),
+                          ('s3', 'list_objects_v2', 'test-bucket', 200))
+
 
 class TestS3ClientCall(S3TestCase):
+    def test_s3_client_call_circuit_open(self):
+        circuit_breaker.reset_circuit_breakers()
+        self.addCleanup(circuit_breaker.reset_circuit_breakers)
+        mock_method = self.mock_s3.method
+        mock_method.side_effect = EndpointConnectionError(endpoint_url='endpoint')
+        s3_p = S3Path('s3://test-bucket/path')
+        with settings.use({'s3': {'circuit_failure_threshold': 2}}):
+            for i in range(2):
+                with self.assertRaises(EndpointConnectionError):
+                    s3_p._s3_client_call('method')
+            with self.assertRaises(exceptions.CircuitOpenError):
+                s3_p._s3_client_call('method')
+        self.assertEquals(mock_method.call_count, 2)
+
+    def test_retry_policy(self):
+        with settings.use({'s3': {'num_retries': 2, 'retry_jitter': 0.1, 'deadline': 30}}):
+            policy = s3._get_retry_policy()
+            self.assertEquals((policy.num_retries, policy.jitter, policy.deadline), (2, 0.1, 30))
+            # The policy is only built again when the settings change
+            self.assertIs(s3._get_retry_policy(), policy)
+
+    def test_get_s3_iterator_circuit_open(self):
+        circuit_breaker.reset_circuit_breakers()
+        self.addCleanup(circuit_breaker.reset_circuit_breakers)
+
+        def paginate(**kwargs):
+            raise ClientError({'Error': {}, 'ResponseMetadata': {'HTTPStatusCode': 503}},
+                              'ListObjectsV2')
+            yield  # pragma: no cover
+        self.mock_s3.get_paginator.return_value.paginate.side_effect = paginate
+        self.disable_get_s3_iterator_mock()
+        s3_p = S3Path('s3://test-bucket/path')
+        with settings.use({'s3': {'circuit_failure_threshold': 2}}):
+            for i in range(2):
+                with self.assertRaises(exceptions.UnavailableError):
+                    list(s3_p._get_s3_iterator('list_objects_v2'))
+            with self.assertRaises(exceptions.CircuitOpenError):
+                list(s3_p._get_s3_iterator('list_objects_v2'))
+
+    def test_make_s3_transfer_circuit_open(self):
+        circuit_breaker.reset_circuit_breakers()
+        self.addCleanup(circuit_breaker.reset_circuit_breakers)
+        try:
+            raise ClientError({'Error': {}, 'ResponseMetadata': {'HTTPStatusCode': 503}},
+                              'UploadPart')
+        except ClientError:
+            try:
+                raise S3UploadFailedError('failed')
+            except S3UploadFailedError as e:
+                upload_error = e
+        self.mock_s3_transfer.upload_file.side_effect = upload_error
+        s3_p = S3Path('s3://test-bucket/path')
+        with settings.use({'s3': {'circuit_failure_threshold': 2}}):
+            for i in range(2):
+                with self.assertRaises(exceptions.UnavailableError):
+                    s3_p._make_s3_transfer('upload_file', filename='file',
+                                           bucket='test-bucket', key='path')
+            with self.assertRaises(exceptions.CircuitOpenError):
+                s3_p._make_s3_transfer('upload_file', filename='file',
+                                       bucket='test-bucket', key='path')
+        self.assertEquals(self.mock_s3_transfer.upload_file.call_count, 2)
+
+    @mock.patch('time.time', autospec=True, side_effect=[0, 10])
+    def test_s3_client_call_deadline_exceeded(self, mock_time):
+        s3_p = S3Path('s3://test-bucket/path')
+        with self.assertRaisesRegexp(exceptions.DeadlineExceededError, 'calling method'):
+            retry.RetryPolicy(deadline=5).call(s3_p._s3_client_call, 'method')
+        self.assertFalse(self.mock_s3.method.called)
+
     def test_s3_client_call(self):
         mock_method = self.mock_s3.method
         s3_p = S3Path('s3://test-bucket/path')
         s3_p._s3_client_call('method', key='val')
         mock_method.assert_called_once_with(key='val')
 
+    def test_s3_client_call_instrumented(self):
+        self.mock_s3.get_object.return_value = {
+            'ResponseMetadata': {'HTTPStatusCode': 200},
+            'ContentLength': 10
+        }
+        s3_p = S3Path('s3://test-bucket/path')
+        instrument = mock.Mock()
+        with instrumentation.use(instrument):
+            s3_p._s3_client_call('get_object', Bucket='test-bucket', Key='path')
+
+        event = instrument.after_request.call_args[0][0]
+        instrument.before_request.assert_called_once_with(event)
+        self.assertEquals((event.service, event.operation, event.bucket),
+                          ('s3', 'get_object', 'test-bucket'))
+        self.assertEquals((event.status, event.bytes, event.retries, event.error),
+                          (200, 10, 0, None))
+        self.assertGreaterEqual(event.duration, 0)
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_s3_client_call_instrumented_error(self, mock_sleep):
+        self.mock_s3.head_object.side_effect = ClientError(
+            {
+                'ResponseMetadata': {'HTTPStatusCode': 503},
+                'Error': {'Message': 'unavailable'}
+            },
+            'head_object')
+        s3_p = S3Path('s3://test-bucket/path')
+        aggregator = instrumentation.LatencyAggregator()
+        with instrumentation.use(aggregator):
+            with self.assertRaises(exceptions.UnavailableError):
+                s3_p.stat(num_retries=2)
+
+        stats = aggregator.get_stats()['s3:head_object']
+        self.assertEquals((stats['count'], stats['errors'], stats['retries']), (3, 3, 2))
+
     def test_s3_client_call_any_error(self):
         mock_method = self.mock_s3.method
         mock_method.side_effect = ClientError({'Error': {}}, 'method')
@@ -387,6 +615,51 @@ class TestList(S3TestCase):
         with self.assertRaises(exceptions.ConditionNotMetError):
             s3_p.list(use_manifest=True)
 
+    @mock.patch('time.sleep', autospec=True)
+    @mock.patch('botocore.response.StreamingBody', autospec=True)
+    def test_list_w_use_manifest_v2(self, mock_stream, mock_sleep):
+        mock_stream.read.return_value = (b'#stor-data-manifest:v2\n'
+                                         b'10,abc,my/obj1\n20,def,my/obj2\n')
+        self.mock_s3.get_object.return_value = {'Body': mock_stream}
+        mock_list = self.mock_s3_iterator
+        mock_list.__iter__.side_effect = [iter([{
+            'Contents': [
+                {'Key': 'my/obj1', 'Size': 10, 'ETag': '"abc"'},
+                {'Key': 'my/obj2', 'Size': 20, 'ETag': '"xyz"'}
+            ],
+            'IsTruncated': False
+        }]), iter([{
+            'Contents': [
+                {'Key': 'my/obj1', 'Size': 10, 'ETag': '"abc"'},
+                {'Key': 'my/obj2', 'Size': 20, 'ETag': '"def"'}
+            ],
+            'IsTruncated': False
+        }])]
+
+        s3_p = S3Path('s3://bucket')
+        results = s3_p.list(use_manifest=True, num_retries=1)
+        self.assertEquals(set(results), set([
+            's3://bucket/my/obj1',
+            's3://bucket/my/obj2'
+        ]))
+        # The manifest is only read once and my/obj1 is not validated again
+        self.assertEquals(self.mock_s3.get_object.call_count, 1)
+        self.assertEquals(len(mock_sleep.call_args_list), 1)
+
+    @mock.patch('botocore.response.StreamingBody', autospec=True)
+    def test_list_w_use_manifest_v2_size_mismatch(self, mock_stream):
+        mock_stream.read.return_value = b'#stor-data-manifest:v2\n10,,my/obj1\n'
+        self.mock_s3.get_object.return_value = {'Body': mock_stream}
+        mock_list = self.mock_s3_iterator
+        mock_list.__iter__.return_value = [{
+            'Contents': [{'Key': 'my/obj1', 'Size': 2, 'ETag': '"abc"'}],
+            'IsTruncated': False
+        }]
+
+        s3_p = S3Path('s3://bucket')
+        with self.assertRaises(exceptions.ConditionNotMetError):
+            s3_p.list(use_manifest=True)
+
     @mock.patch('botocore.response.StreamingBody', autospec=True)
     def test_list_w_condition_and_use_manifest(self, mock_stream):
         mock_stream.read.return_value = b'my/obj1\nmy/obj2\nmy/obj3\n'
@@ -922,6 +1195,35 @@ class TestStat(S3TestCase):
             s3_p.stat()
         mock_head_object.assert_called_once_with(Bucket='bucket', Key='dir')
 
+    @mock.patch('time.sleep', autospec=True)
+    def test_stat_retry(self, mock_sleep):
+        mock_head_object = self.mock_s3.head_object
+        mock_head_object.side_effect = [
+            ClientError({
+                'ResponseMetadata': {'HTTPStatusCode': 503},
+                'Error': {'Message': 'slow down'}
+            }, 'head_object'),
+            {'ContentLength': 10}
+        ]
+        s3_p = S3Path('s3://bucket/obj')
+        with settings.use({'s3': {'num_retries': 1}}):
+            self.assertEquals(s3_p.stat(), {'ContentLength': 10})
+        self.assertEquals(mock_head_object.call_count, 2)
+        mock_sleep.assert_called_once_with(1)
+
+    def test_stat_no_retry_by_default(self):
+        mock_head_object = self.mock_s3.head_object
+        mock_head_object.side_effect = ClientError({
+            'ResponseMetadata': {'HTTPStatusCode': 503},
+            'Error': {'Message': 'slow down'}
+        }, 'head_object')
+        s3_p = S3Path('s3://bucket/obj')
+        with self.assertRaises(exceptions.UnavailableError):
+            s3_p.stat()
+        with self.assertRaises(exceptions.UnavailableError):
+            s3_p.stat(num_retries=0)
+        self.assertEquals(mock_head_object.call_count, 2)
+
 
 @mock.patch('stor.utils.walk_files_and_dirs', autospec=True)
 @mock.patch('os.path.getsize', autospec=True)
@@ -937,9 +1239,9 @@ class TestUpload(S3TestCase):
         s3_p.upload(['upload'])
 
         self.mock_s3_transfer.upload_file.assert_has_calls([
-            mock.call(bucket='bucket', key='file1', filename='file1'),
-            mock.call(bucket='bucket', key='file2', filename='file2'),
-            mock.call(bucket='bucket', key='dir/file3', filename='dir/file3')
+            mock.call(bucket='bucket', key='file1', filename='file1', callback=mock.ANY),
+            mock.call(bucket='bucket', key='file2', filename='file2', callback=mock.ANY),
+            mock.call(bucket='bucket', key='dir/file3', filename='dir/file3', callback=mock.ANY)
         ], any_order=True)
 
     def test_upload_rel_path(self, mock_getsize, mock_files):
@@ -949,8 +1251,8 @@ class TestUpload(S3TestCase):
         s3_p.upload(['../', './'])
 
         self.mock_s3_transfer.upload_file.assert_has_calls([
-            mock.call(bucket='a', key='b/file1', filename='../file1'),
-            mock.call(bucket='a', key='b/file2', filename='./file2')
+            mock.call(bucket='a', key='b/file1', filename='../file1', callback=mock.ANY),
+            mock.call(bucket='a', key='b/file2', filename='./file2', callback=mock.ANY)
         ], any_order=True)
 
     def test_upload_abs_path(self, mock_getsize, mock_files):
@@ -961,7 +1263,8 @@ class TestUpload(S3TestCase):
 
         self.mock_s3_transfer.upload_file.assert_called_once_with(bucket='a',
                                                                   key='b/path/to/file1',
-                                                                  filename='/path/to/file1')
+                                                                  filename='/path/to/file1',
+                                                                  callback=mock.ANY)
 
     def test_upload_object_invalid(self, mock_getsize, mock_files):
         s3_p = S3Path('s3://a/b')
@@ -981,14 +1284,15 @@ class TestUpload(S3TestCase):
                                                                       filename='file.txt',
                                                                       extra_args={
                                                                           'ContentLanguage': 'en'
-                                                                      })
+                                                                      },
+                                                                      callback=mock.ANY)
             self.mock_s3.put_object.assert_called_once_with(Bucket='a',
                                                             Key='b/dir/',
                                                             ContentLanguage='en')
 
     def test_upload_empty_dir(self, mock_getsize, mock_files):
         with mock.patch.object(type(Path('dir')), 'isdir') as mock_isdir:
-            mock_files.return_value = {'dir/'}
+            mock_files.return_value = {'dir/': 0}
             mock_isdir.return_value = True
             s3_p = S3Path('s3://a/b/')
             s3_p.upload(['dir/'])
@@ -1020,7 +1324,12 @@ class TestUpload(S3TestCase):
 
         with NamedTemporaryDirectory(change_dir=True):
             s3_p = S3Path('s3://bucket/path/')
-            s3_p.upload(['.'], use_manifest=True)
+            with settings.use({'stor': {'data_manifest_version': 2}}):
+                s3_p.upload(['.'], use_manifest=True)
+            self.assertEquals(set(utils.iter_data_manifest(Path('.'))), {
+                utils.ManifestEntry('path/file1', 20, None),
+                utils.ManifestEntry('path/file2', 30, None)
+            })
 
         manifest_upload_kwargs = self.mock_s3_transfer.upload_file.call_args_list[0][1]
         self.assertEquals(len(manifest_upload_kwargs), 3)
@@ -1030,6 +1339,37 @@ class TestUpload(S3TestCase):
         self.assertEquals(manifest_upload_kwargs['key'],
                           'path/%s' % utils.DATA_MANIFEST_FILE_NAME)
 
+    @mock.patch('stor.checksum.compute_checksums', autospec=True)
+    def test_upload_w_manifest_checksums(self, mock_compute_checksums, mock_getsize,
+                                         mock_files):
+        mock_files.side_effect = [
+            {
+                './file1': 20,
+                './dir': 0
+            },
+            {
+                './%s' % utils.DATA_MANIFEST_FILE_NAME: 10
+            }
+        ]
+        mock_compute_checksums.return_value = {'./file1': 'etag-2'}
+
+        upload_settings = {
+            's3:upload': {'segment_size': 10},
+            'stor:checksum': {'manifest_checksums': True},
+            'stor': {'data_manifest_version': 2}
+        }
+        with NamedTemporaryDirectory(change_dir=True), settings.use(upload_settings):
+            open('file1', 'w').close()
+            os.mkdir('dir')
+            s3_p = S3Path('s3://bucket/path/')
+            s3_p.upload(['.'], use_manifest=True)
+
+            mock_compute_checksums.assert_called_once_with(['./file1'], chunk_size=10)
+            self.assertEquals(set(utils.iter_data_manifest(Path('.'))), {
+                utils.ManifestEntry('path/file1', 20, 'etag-2'),
+                utils.ManifestEntry('path/dir/', 0, None)
+            })
+
     @mock.patch.object(S3Path, '_upload_object', autospec=True)
     def test_upload_w_manifest_validation_err(self, mock_upload, mock_getsize, mock_files):
         mock_files.return_value = {
@@ -1112,6 +1452,42 @@ class TestUpload(S3TestCase):
         with self.assertRaises(exceptions.FailedUploadError):
             S3Path('s3://bucket/path').upload(['test'])
 
+    @mock.patch('time.sleep', autospec=True)
+    def test_upload_retry(self, mock_sleep, mock_getsize, mock_files):
+        mock_files.return_value = {
+            'file1': 20
+        }
+        self.mock_s3_transfer.upload_file.side_effect = S3UploadFailedError('failed')
+
+        with self.assertRaises(exceptions.FailedUploadError) as exc:
+            S3Path('s3://bucket/path').upload(['test'], num_retries=3)
+        self.assertEquals(self.mock_s3_transfer.upload_file.call_count, 4)
+        self.assertEquals(len(mock_sleep.call_args_list), 3)
+        failed = exc.exception.caught_exception['failed']
+        self.assertEquals(len(failed), 1)
+        self.assertIsInstance(failed[0]['error'], exceptions.FailedUploadError)
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_upload_retry_succeeds(self, mock_sleep, mock_getsize, mock_files):
+        mock_files.return_value = {
+            'file1': 20
+        }
+
+        def upload_file(callback, **kwargs):
+            callback(10)
+            if self.mock_s3_transfer.upload_file.call_count == 1:
+                raise S3UploadFailedError('failed')
+            callback(10)
+        self.mock_s3_transfer.upload_file.side_effect = upload_file
+
+        with mock.patch.object(utils.BaseProgressLogger, 'add_bytes',
+                               autospec=True) as mock_add_bytes:
+            results = S3Path('s3://bucket/path').upload(['test'], num_retries=1)
+        self.assertEquals(len(results['completed']), 1)
+        self.assertEquals(self.mock_s3_transfer.upload_file.call_count, 2)
+        # The bytes of the failed attempt are not counted
+        self.assertEquals(sum(c[0][1] for c in mock_add_bytes.call_args_list), 20)
+
     def test_upload_other_error(self, mock_getsize, mock_files):
         mock_files.return_value = {
             'file1': 20,
@@ -1140,16 +1516,16 @@ class TestUpload(S3TestCase):
             'file%s' % i: 20
             for i in range(20)
         }
-        mock_getsize.return_value = 20
+        self.mock_s3_transfer.upload_file.side_effect = (
+            lambda callback, **kwargs: callback(1024 * 1024))
 
         s3_p = S3Path('s3://bucket')
         with LogCapture('stor.s3.progress') as progress_log:
             s3_p.upload(['upload'])
+            # Progress is only logged every progress_interval seconds
             progress_log.check(
                 ('stor.s3.progress', 'INFO', 'starting upload of 20 objects'),  # nopep8
-                ('stor.s3.progress', 'INFO', '10/20\t0:00:00\t0.00 MB\t0.00 MB/s'),  # nopep8
-                ('stor.s3.progress', 'INFO', '20/20\t0:00:00\t0.00 MB\t0.00 MB/s'),  # nopep8
-                ('stor.s3.progress', 'INFO', 'upload complete - 20/20\t0:00:00\t0.00 MB\t0.00 MB/s'),  # nopep8
+                ('stor.s3.progress', 'INFO', 'upload complete - 20/20\t0:00:00\t20.00 MB\t0.00 MB/s'),  # nopep8
             )
 
 
@@ -1165,6 +1541,19 @@ class TestDownload(S3TestCase):
                                                                     filename='test/d.txt')
         mock_make_dest.assert_called_once_with('test')
 
+    @mock.patch.dict(throttle._limiters, clear=True)
+    @mock.patch.object(throttle.TokenBucket, 'consume', autospec=True)
+    def test_download_object_throttled(self, mock_consume, mock_getsize, mock_make_dest):
+        self.mock_s3_transfer.download_file.side_effect = (
+            lambda callback, **kwargs: callback(100))
+        callback = mock.Mock()
+
+        with settings.use({'s3:download': {'max_bytes_per_second': '1K'}}):
+            S3Path('s3://a/b/c.txt').download_object('test/d.txt', callback=callback)
+            limiter = throttle.get_limiter('s3', 'download')
+        mock_consume.assert_called_once_with(limiter.bytes, 100)
+        callback.assert_called_once_with(100)
+
     @mock.patch.object(S3Path, 'list', autospec=True)
     def test_download_dir(self, mock_list, mock_getsize, mock_make_dest):
         mock_list.return_value = [
@@ -1175,9 +1564,10 @@ class TestDownload(S3TestCase):
         s3_p = S3Path('s3://bucket')
         s3_p.download('test')
         self.mock_s3_transfer.download_file.assert_has_calls([
-            mock.call(bucket='bucket', key='file1', filename='test/file1'),
-            mock.call(bucket='bucket', key='file2', filename='test/file2'),
-            mock.call(bucket='bucket', key='dir/file3', filename='test/dir/file3')
+            mock.call(bucket='bucket', key='file1', filename='test/file1', callback=mock.ANY),
+            mock.call(bucket='bucket', key='file2', filename='test/file2', callback=mock.ANY),
+            mock.call(bucket='bucket', key='dir/file3', filename='test/dir/file3',
+                      callback=mock.ANY)
         ], any_order=True)
         mock_make_dest.assert_has_calls([
             mock.call('test'),
@@ -1196,9 +1586,10 @@ class TestDownload(S3TestCase):
         s3_p = S3Path('s3://bucket')
         s3_p.download('test')
         self.mock_s3_transfer.download_file.assert_has_calls([
-            mock.call(bucket='bucket', key='file1', filename='test/file1'),
-            mock.call(bucket='bucket', key='file2', filename='test/file2'),
-            mock.call(bucket='bucket', key='dir/file3', filename='test/dir/file3')
+            mock.call(bucket='bucket', key='file1', filename='test/file1', callback=mock.ANY),
+            mock.call(bucket='bucket', key='file2', filename='test/file2', callback=mock.ANY),
+            mock.call(bucket='bucket', key='dir/file3', filename='test/dir/file3',
+                      callback=mock.ANY)
         ], any_order=True)
         mock_make_dest.assert_has_calls([
             mock.call('test'),
@@ -1301,6 +1692,16 @@ class TestDownload(S3TestCase):
         with self.assertRaises(exceptions.FailedDownloadError):
             S3Path('s3://bucket/path').download('test')
 
+    @mock.patch('time.sleep', autospec=True)
+    def test_download_object_retry(self, mock_sleep, mock_getsize, mock_make_dest_dir):
+        self.mock_s3_transfer.download_file.side_effect = RetriesExceededError('failed')
+
+        with settings.use({'s3': {'num_retries': 3}}):
+            result = S3Path('s3://bucket/obj').download_object('test/obj')
+        self.assertFalse(result['success'])
+        self.assertIsInstance(result['error'], exceptions.FailedDownloadError)
+        self.assertEquals(self.mock_s3_transfer.download_file.call_count, 4)
+
     @mock.patch.object(S3Path, 'list', autospec=True)
     def test_download_other_error(self, mock_list, mock_getsize, mock_make_dest_dir):
         mock_list.return_value = [
@@ -1334,16 +1735,16 @@ class TestDownload(S3TestCase):
             S3Path('s3://bucket/file%s' % i)
             for i in range(19)
         ] + [S3Path('s3://bucket/dir')]
-        mock_getsize.return_value = 100
+        self.mock_s3_transfer.download_file.side_effect = (
+            lambda callback, **kwargs: callback(512 * 1024))
 
         s3_p = S3Path('s3://bucket')
         with LogCapture('stor.s3.progress') as progress_log:
             s3_p.download('output_dir')
+            # Progress is only logged every progress_interval seconds
             progress_log.check(
                 ('stor.s3.progress', 'INFO', 'starting download of 20 objects'),  # nopep8
-                ('stor.s3.progress', 'INFO', '10/20\t0:00:00\t0.00 MB\t0.00 MB/s'),  # nopep8
-                ('stor.s3.progress', 'INFO', '20/20\t0:00:00\t0.00 MB\t0.00 MB/s'),  # nopep8
-                ('stor.s3.progress', 'INFO', 'download complete - 20/20\t0:00:00\t0.00 MB\t0.00 MB/s'),  # nopep8
+                ('stor.s3.progress', 'INFO', 'download complete - 20/20\t0:00:00\t10.00 MB\t0.00 MB/s'),  # nopep8
             )
 
 
@@ -1361,14 +1762,21 @@ class TestCopy(S3TestCase):
             p.copy(tmp_d)
             mockdownload_object.assert_called_once_with(p, Path(tmp_d) / 'file_source.txt')
 
-    def test_copy_swift_destination(self):
+    @mock.patch('stor.obs.stream_copy_objects', autospec=True)
+    def test_copy_swift_destination(self, mock_stream_copy_objects):
         p = S3Path('s3://bucket/key/file_source')
-        with self.assertRaisesRegexp(ValueError, 'OBS path'):
+        p.copy('swift://tenant/container/dir/')
+        mock_stream_copy_objects.assert_called_once_with(
+            [(p, SwiftPath('swift://tenant/container/dir/file_source'))])
+
+    def test_copy_swift_ambiguous_destination(self):
+        p = S3Path('s3://bucket/key/file_source')
+        with self.assertRaisesRegexp(ValueError, 'OBS destination'):
             p.copy('swift://tenant/container/file_dest')
 
     def test_copy_s3_destination(self):
         p = S3Path('s3://bucket/key/file_source')
-        with self.assertRaisesRegexp(ValueError, 'OBS path'):
+        with self.assertRaisesRegexp(ValueError, 'S3 path'):
             p.copy('s3://bucket/key/file_dest')
 
 
@@ -1541,6 +1949,11 @@ class TestSessionSettings(unittest.TestCase):
             assert len(mock_session.call_args_list) == 1
             assert mock_session.call_args_list[0] == ((), {'aws_access_key_id': 'blah'})
 
+    def test_only_session_settings_passed_through(self, mock_session):
+        with stor.settings.use({'s3': {'region_name': 'us-east-1', 'num_retries': 3}}):
+            s3._get_s3_client()
+        mock_session.assert_called_once_with(region_name='us-east-1')
+
 
 class TestS3ErrorParsing(unittest.TestCase):
     def test_cold_storage_exception(self):
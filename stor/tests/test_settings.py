@@ -26,54 +26,105 @@ test_settings = {
 }
 
 
-@mock.patch.dict('stor.settings._global_settings', copy.deepcopy(test_settings),
-                 clear=True)
 class TestSettings(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch('stor.settings._global_settings', settings._freeze(test_settings))
+        self.addCleanup(patcher.stop)
+        patcher.start()
+
     @mock.patch.dict(os.environ, {}, clear=True)
     def test_initialize_default(self):
         expected_settings = {
-            'stor': {},
+            'stor': {
+                'batch_threads': 10,
+                'walk_threads': 8,
+                'progress_interval': 10,
+                'data_manifest_version': 1
+            },
+            'stor:copy': {
+                'object_threads': 10,
+                'segment_size': 67108864,
+                'segment_threads': 2
+            },
+            'stor:checksum': {
+                'processes': 0,
+                'cache_file': '~/.stor_checksums.sqlite',
+                'manifest_checksums': False
+            },
+            'posix:copy': {
+                'file_threads': 8
+            },
             's3': {
                 'aws_access_key_id': '',
                 'aws_secret_access_key': '',
                 'aws_session_token': '',
+                'num_retries': 0,
+                'retry_jitter': 0,
+                'deadline': 0,
+                'timeout': 0,
+                'circuit_failure_threshold': 0,
+                'circuit_reset_timeout': 30,
                 'profile_name': '',
                 'region_name': ''
             },
             's3:upload': {
                 'segment_size': 8388608,
                 'object_threads': 10,
-                'segment_threads': 10
+                'segment_threads': 10,
+                'max_bytes_per_second': 0,
+                'max_requests_per_second': 0
             },
             's3:download': {
                 'segment_size': 8388608,
                 'object_threads': 10,
-                'segment_threads': 10
+                'segment_threads': 10,
+                'max_bytes_per_second': 0,
+                'max_requests_per_second': 0
             },
             'swift': {
                 'username': '',
                 'password': '',
                 'auth_url': '',
                 'temp_url_key': '',
-                'num_retries': 0
+                'num_retries': 0,
+                'retry_jitter': 0,
+                'deadline': 0,
+                'timeout': 0,
+                'circuit_failure_threshold': 0,
+                'circuit_reset_timeout': 30
+            },
+            'swift:list': {
+                'container_threads': 10
+            },
+            'swift:copy': {
+                'object_threads': 10
             },
             'swift:delete': {
+                'bulk_delete': True,
                 'object_threads': 10
             },
             'swift:download': {
                 'container_threads': 10,
+                'max_bytes_per_second': 0,
+                'max_requests_per_second': 0,
                 'object_threads': 10,
+                'read_chunk_size': 1048576,
+                'segment_threads': 10,
                 'shuffle': True,
-                'skip_identical': True
+                'skip_identical': True,
+                'stream_reads': False
             },
             'swift:upload': {
                 'changed': False,
                 'checksum': True,
                 'leave_segments': True,
+                'max_bytes_per_second': 0,
+                'max_requests_per_second': 0,
                 'object_threads': 10,
                 'segment_size': 1073741824,
                 'segment_threads': 10,
                 'skip_identical': False,
+                'stream_writes': False,
                 'use_slo': True
             }
         }
@@ -83,48 +134,96 @@ class TestSettings(unittest.TestCase):
     @mock.patch.dict(os.environ, {}, clear=True)
     def test_initialize_w_user_file(self):
         expected_settings = {
-            'stor': {},
+            'stor': {
+                'batch_threads': 10,
+                'walk_threads': 8,
+                'progress_interval': 10,
+                'data_manifest_version': 1
+            },
+            'stor:copy': {
+                'object_threads': 10,
+                'segment_size': 67108864,
+                'segment_threads': 2
+            },
+            'stor:checksum': {
+                'processes': 0,
+                'cache_file': '~/.stor_checksums.sqlite',
+                'manifest_checksums': False
+            },
+            'posix:copy': {
+                'file_threads': 8
+            },
             's3': {
                 'aws_access_key_id': '',
                 'aws_secret_access_key': '',
                 'aws_session_token': '',
+                'num_retries': 0,
+                'retry_jitter': 0,
+                'deadline': 0,
+                'timeout': 0,
+                'circuit_failure_threshold': 0,
+                'circuit_reset_timeout': 30,
                 'profile_name': '',
                 'region_name': ''
             },
             's3:upload': {
                 'segment_size': 8388608,
                 'object_threads': 10,
-                'segment_threads': 10
+                'segment_threads': 10,
+                'max_bytes_per_second': 0,
+                'max_requests_per_second': 0
             },
             's3:download': {
                 'segment_size': 8388608,
                 'object_threads': 10,
-                'segment_threads': 10
+                'segment_threads': 10,
+                'max_bytes_per_second': 0,
+                'max_requests_per_second': 0
             },
             'swift': {
                 'username': 'fake_user',
                 'password': 'fake_password',
                 'auth_url': '',
                 'temp_url_key': '',
-                'num_retries': 0
+                'num_retries': 0,
+                'retry_jitter': 0,
+                'deadline': 0,
+                'timeout': 0,
+                'circuit_failure_threshold': 0,
+                'circuit_reset_timeout': 30
+            },
+            'swift:list': {
+                'container_threads': 10
+            },
+            'swift:copy': {
+                'object_threads': 10
             },
             'swift:delete': {
+                'bulk_delete': True,
                 'object_threads': 10
             },
             'swift:download': {
                 'container_threads': 10,
+                'max_bytes_per_second': 0,
+                'max_requests_per_second': 0,
                 'object_threads': 10,
+                'read_chunk_size': 1048576,
+                'segment_threads': 10,
                 'shuffle': True,
-                'skip_identical': True
+                'skip_identical': True,
+                'stream_reads': False
             },
             'swift:upload': {
                 'changed': False,
                 'checksum': True,
                 'leave_segments': True,
+                'max_bytes_per_second': 0,
+                'max_requests_per_second': 0,
                 'object_threads': 10,
                 'segment_size': 1073741824,
                 'segment_threads': 10,
                 'skip_identical': False,
+                'stream_writes': False,
                 'use_slo': True
             }
         }
@@ -148,8 +247,32 @@ class TestSettings(unittest.TestCase):
     def test_get(self):
         self.assertEquals(settings.get(), test_settings)
 
-    @mock.patch.dict('stor.settings._global_settings',
-                     copy.deepcopy(test_settings), clear=True)
+    def test_get_read_only(self):
+        self.assertIs(settings.get(), settings.get())
+        with self.assertRaisesRegexp(TypeError, 'read-only'):
+            settings.get()['swift:upload']['object_threads'] = 20
+        with self.assertRaisesRegexp(TypeError, 'read-only'):
+            settings.get().update({'swift:upload': {}})
+
+        mutable_settings = copy.deepcopy(settings.get())
+        mutable_settings['swift:upload']['object_threads'] = 20
+        self.assertEquals(type(mutable_settings['swift:upload']), dict)
+        self.assertEquals(settings.get(), test_settings)
+
+    def test_update_copy_on_write(self):
+        initial_settings = settings.get()
+        settings.update({'swift:upload': {'object_threads': 30}})
+        self.assertEquals(initial_settings, test_settings)
+        self.assertEquals(settings.get()['swift:upload']['object_threads'], 30)
+        self.assertIs(settings.get()['swift:download'], initial_settings['swift:download'])
+
+        with settings.use({'swift:download': {'object_threads': 20}}):
+            self.assertEquals(settings.get()['swift:download']['object_threads'], 20)
+            self.assertIs(settings.get()['swift:upload'],
+                          settings._global_settings['swift:upload'])
+        self.assertEquals(settings.get()['swift:download']['object_threads'], 10)
+
+    @mock.patch('stor.settings._global_settings', settings._freeze(test_settings))
     def test_update_w_settings(self):
         update_settings = {
             'swift:upload': {
@@ -185,8 +308,7 @@ class TestSettings(unittest.TestCase):
         settings.update()
         self.assertEquals(settings._global_settings, test_settings)
 
-    @mock.patch.dict('stor.settings._global_settings',
-                     {'foo': 1}, clear=True)
+    @mock.patch('stor.settings._global_settings', settings._freeze({'foo': 1}))
     def test_update_validation_error(self):
         with self.assertRaisesRegexp(ValueError, 'not a valid setting'):
             settings.update({'foo': {'bar': 3}})
@@ -235,7 +357,7 @@ class TestSettings(unittest.TestCase):
             self.assertEquals(settings._global_settings, test_settings)
         self.assertEquals(settings._global_settings, test_settings)
 
-    @mock.patch.dict('stor.settings._global_settings', {'foo': ''}, clear=True)
+    @mock.patch('stor.settings._global_settings', settings._freeze({'foo': ''}))
     def test_use_nested_w_update(self):
         settings.update({'foo': 0})
         self.assertEquals(settings.get(), {'foo': 0})
@@ -252,7 +374,7 @@ class TestSettings(unittest.TestCase):
         settings.update({'foo': 3})
         self.assertEquals(settings.get(), {'foo': 3})
 
-    @mock.patch.dict('stor.settings._global_settings', {'foo': ''}, clear=True)
+    @mock.patch('stor.settings._global_settings', settings._freeze({'foo': ''}))
     def test_use_update_w_error(self):
         with settings.use({'foo': 1}):
             with self.assertRaises(RuntimeError):
@@ -264,7 +386,7 @@ class TestSettings(unittest.TestCase):
             self.assertEquals(settings.get(), {'foo': value})
             time.sleep(.01)
 
-    @mock.patch.dict('stor.settings._global_settings', {'foo': ''}, clear=True)
+    @mock.patch('stor.settings._global_settings', settings._freeze({'foo': ''}))
     def test_use_multithreaded(self):
         threads = []
         for i in range(30):
@@ -274,3 +396,18 @@ class TestSettings(unittest.TestCase):
 
         for thread in threads:
             thread.join()
+
+    @mock.patch('stor.settings._global_settings', settings._freeze({'foo': ''}))
+    def test_use_snapshot(self):
+        with settings.use({'foo': 1}):
+            snapshot = settings.get()
+        results = []
+
+        def get_in_thread():
+            with settings.use_snapshot(snapshot):
+                results.append(settings.get())
+            results.append(settings.get())
+        thread = threading.Thread(target=get_in_thread)
+        thread.start()
+        thread.join()
+        self.assertEquals(results, [{'foo': 1}, {'foo': ''}])
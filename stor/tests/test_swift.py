@@ -1,3 +1,5 @@
+import hashlib
+import json
 import logging
 import ntpath
 import os
@@ -6,17 +8,25 @@ import unittest
 
 import freezegun
 import mock
+import six
 from swiftclient.exceptions import ClientException
 from swiftclient.service import SwiftError
+from swiftclient.service import SwiftUploadObject
 from testfixtures import LogCapture
 
 import stor
+from stor import circuit_breaker
 from stor import exceptions
+from stor import instrumentation
 from stor import NamedTemporaryDirectory
 from stor import Path
+from stor import progress
 from stor import settings
 from stor import swift
+from stor import throttle
+from stor import tracing
 from stor import utils
+from stor.s3 import S3Path
 from stor.swift import SwiftPath
 from stor.test import SwiftTestCase
 from stor.tests.shared_obs import SharedOBSFileCases
@@ -103,6 +113,88 @@ class TestManifestUtilities(unittest.TestCase):
 
             self.assertEquals(set(manifest_contents), set(read_contents))
 
+    def test_generate_save_and_read_manifest_entries(self):
+        with NamedTemporaryDirectory() as tmp_d:
+            manifest_contents = [
+                utils.ManifestEntry('obj1', 10, 'abc'),
+                utils.ManifestEntry('dir/obj,2', 0, None),
+                utils.ManifestEntry('obj3', None, None)
+            ]
+            utils.generate_and_save_data_manifest(tmp_d, manifest_contents, version=2)
+            with open(tmp_d / utils.DATA_MANIFEST_FILE_NAME) as manifest_file:
+                self.assertEquals(manifest_file.read(),
+                                  '%s\n10,abc,obj1\n0,,dir/obj,2\n,,obj3\n'
+                                  % utils.DATA_MANIFEST_V2_HEADER)
+
+            self.assertEquals(list(utils.iter_data_manifest(tmp_d)), manifest_contents)
+            self.assertEquals(utils.get_data_manifest_contents(tmp_d),
+                              ['obj1', 'dir/obj,2', 'obj3'])
+
+    def test_generate_v1_manifest_by_default(self):
+        with NamedTemporaryDirectory() as tmp_d:
+            utils.generate_and_save_data_manifest(tmp_d, [
+                utils.ManifestEntry('obj1', 10, 'abc'),
+                'dir/obj2'
+            ])
+            with open(tmp_d / utils.DATA_MANIFEST_FILE_NAME) as manifest_file:
+                self.assertEquals(manifest_file.read(), 'obj1\ndir/obj2\n')
+
+            with settings.use({'stor': {'data_manifest_version': 2}}):
+                utils.generate_and_save_data_manifest(tmp_d, ['obj1'])
+            with open(tmp_d / utils.DATA_MANIFEST_FILE_NAME) as manifest_file:
+                self.assertEquals(manifest_file.readline().strip(),
+                                  utils.DATA_MANIFEST_V2_HEADER)
+
+            with self.assertRaisesRegexp(ValueError, 'invalid data manifest version'):
+                utils.generate_and_save_data_manifest(tmp_d, ['obj1'], version=3)
+
+    def test_read_v1_manifest(self):
+        with NamedTemporaryDirectory() as tmp_d:
+            with open(tmp_d / utils.DATA_MANIFEST_FILE_NAME, 'w') as manifest_file:
+                manifest_file.write('obj1\n\ndir/obj2\n')
+
+            self.assertEquals(list(utils.iter_data_manifest(tmp_d)), [
+                utils.ManifestEntry('obj1', None, None),
+                utils.ManifestEntry('dir/obj2', None, None)
+            ])
+
+    def test_read_empty_manifest(self):
+        with NamedTemporaryDirectory() as tmp_d:
+            open(tmp_d / utils.DATA_MANIFEST_FILE_NAME, 'w').close()
+            self.assertEquals(list(utils.iter_data_manifest(tmp_d)), [])
+
+
+class TestManifestValidator(unittest.TestCase):
+    def test_validate_incrementally(self):
+        validator = utils.ManifestValidator([
+            utils.ManifestEntry('obj1', 10, 'abc'),
+            utils.ManifestEntry('obj2', 20, None),
+            utils.ManifestEntry('obj3', None, None)
+        ])
+        self.assertFalse(validator.validate({'obj1': (10, 'abc'), 'obj2': (20, 'def')}))
+        self.assertEquals(set(validator.pending), {'obj3'})
+
+        # Confirmed entries are not checked again
+        self.assertTrue(validator.validate({'obj3': (5, 'ghi')}))
+        self.assertEquals(validator.pending, {})
+
+    def test_validate_mismatches(self):
+        validator = utils.ManifestValidator([
+            utils.ManifestEntry('obj1', 10, 'abc'),
+            utils.ManifestEntry('obj2', 20, 'def')
+        ])
+        self.assertFalse(validator.validate({'obj1': (11, 'abc'), 'obj2': (20, 'xyz')}))
+        self.assertEquals(set(validator.pending), {'obj1', 'obj2'})
+
+        # Unknown sizes and checksums of the listing are not compared
+        self.assertTrue(validator.validate({'obj1': (None, 'abc'), 'obj2': (20, None)}))
+
+    def test_check(self):
+        validator = utils.ManifestValidator([utils.ManifestEntry('obj1', 10, None)])
+        with self.assertRaisesRegexp(exceptions.ConditionNotMetError, 'did not confirm 1'):
+            validator.check({})
+        validator.check({'obj1': (10, None)})
+
 
 class TestNew(SwiftTestCase):
     def test_failed_new(self):
@@ -213,6 +305,26 @@ class TestGetSwiftConnectionOptions(SwiftTestCase):
         self.assertEquals(options['os_password'], 'new_password')
         self.assertEquals(options['os_tenant_name'], 'tenant')
 
+    def test_wo_timeout(self):
+        options = SwiftPath('swift://tenant/')._get_swift_connection_options()
+        self.assertNotIn('timeout', options)
+
+    def test_w_timeout(self):
+        with settings.use({'swift': {'timeout': 30}}):
+            options = SwiftPath('swift://tenant/')._get_swift_connection_options()
+        self.assertEquals(options['timeout'], 30)
+
+    @mock.patch('stor.retry.get_remaining_time', autospec=True, return_value=10)
+    def test_timeout_capped_by_deadline(self, mock_get_remaining_time):
+        with settings.use({'swift': {'timeout': 30}}):
+            options = SwiftPath('swift://tenant/')._get_swift_connection_options()
+        self.assertEquals(options['timeout'], 10)
+
+    @mock.patch('stor.retry.get_remaining_time', autospec=True, return_value=-1)
+    def test_deadline_exceeded(self, mock_get_remaining_time):
+        with self.assertRaises(exceptions.DeadlineExceededError):
+            SwiftPath('swift://tenant/')._get_swift_connection_options()
+
 
 @mock.patch.object(SwiftPath, '_get_swift_connection_options',
                    autospec=True)
@@ -236,6 +348,262 @@ class TestGetSwiftConnection(SwiftTestCase):
         self.mock_swift_get_conn.assert_called_once_with({'option': 'value'})
 
 
+class TestThrottledConnection(SwiftTestCase):
+    def setUp(self):
+        super(TestThrottledConnection, self).setUp()
+        self.upload_limiter = mock.Mock()
+        self.download_limiter = mock.Mock()
+        self.conn = swift._ThrottledConnection(self.mock_swift_conn, self.upload_limiter,
+                                               self.download_limiter)
+
+    def test_put_object(self):
+        self.conn.put_object('container', 'obj', b'data', headers={})
+        self.mock_swift_conn.put_object.assert_called_once_with('container', 'obj', b'data',
+                                                                headers={})
+        self.upload_limiter.consume_request.assert_called_once_with()
+        self.upload_limiter.consume_bytes.assert_called_once_with(4)
+        self.assertFalse(self.download_limiter.consume_request.called)
+
+    def test_put_object_file(self):
+        self.conn.put_object('container', 'obj', six.BytesIO(b'data'), content_length=4)
+        contents = self.mock_swift_conn.put_object.call_args[0][2]
+        self.assertEquals(contents.read(3), b'dat')
+        self.assertEquals(contents.tell(), 3)
+        self.upload_limiter.consume_bytes.assert_called_once_with(3)
+
+    def test_put_object_iterable(self):
+        self.conn.put_object('container', 'obj', [b'da', b'ta'])
+        contents = self.mock_swift_conn.put_object.call_args[0][2]
+        self.assertEquals(list(contents), [b'da', b'ta'])
+        self.assertEquals(self.upload_limiter.consume_bytes.call_args_list,
+                          [mock.call(2), mock.call(2)])
+
+    def test_get_object(self):
+        self.mock_swift_conn.get_object.return_value = ({}, b'data')
+        self.assertEquals(self.conn.get_object('container', 'obj'), ({}, b'data'))
+        self.download_limiter.consume_request.assert_called_once_with()
+        self.download_limiter.consume_bytes.assert_called_once_with(4)
+
+    def test_get_object_chunks(self):
+        self.mock_swift_conn.get_object.return_value = ({}, iter([b'da', b'ta']))
+        headers, body = self.conn.get_object('container', 'obj', resp_chunk_size=2)
+        self.assertEquals(list(body), [b'da', b'ta'])
+        self.assertEquals(self.download_limiter.consume_bytes.call_args_list,
+                          [mock.call(2), mock.call(2)])
+
+    def test_other_methods(self):
+        self.conn.head_object('container', 'obj')
+        self.mock_swift_conn.head_object.assert_called_once_with('container', 'obj')
+        self.assertFalse(self.upload_limiter.method_calls)
+        self.assertFalse(self.download_limiter.method_calls)
+
+    @mock.patch.dict(throttle._limiters, clear=True)
+    @mock.patch.object(SwiftPath, '_get_swift_connection_options', autospec=True)
+    def test_get_swift_connection(self, mock_get_swift_connection_options):
+        mock_get_swift_connection_options.return_value = {}
+        swift_p = SwiftPath('swift://tenant/')
+        self.assertIs(swift_p._get_swift_connection(), self.mock_swift_conn)
+
+        with settings.use({'swift:upload': {'max_bytes_per_second': 1000}}):
+            conn = swift_p._get_swift_connection()
+            self.assertIsInstance(conn, swift._ThrottledConnection)
+            self.assertIs(conn._upload_limiter, throttle.get_limiter('swift', 'upload'))
+            self.assertIsNone(conn._download_limiter)
+
+    @mock.patch.dict(throttle._limiters, clear=True)
+    @mock.patch('stor.swift.swift_multithreading.MultiThreadingManager', autospec=True)
+    @mock.patch.object(SwiftPath, '_get_swift_connection_options', autospec=True)
+    def test_get_swift_service(self, mock_get_swift_connection_options, mock_manager):
+        self.disable_get_swift_service_mock()
+        mock_get_swift_connection_options.return_value = {
+            'segment_threads': 1,
+            'object_dd_threads': 2,
+            'object_uu_threads': 3,
+            'container_threads': 4
+        }
+        swift_p = SwiftPath('swift://tenant/')
+        service = swift_p._get_swift_service()
+        self.assertFalse(mock_manager.called)
+
+        with settings.use({'swift:download': {'max_requests_per_second': 10}}):
+            service = swift_p._get_swift_service()
+        # The connections of the thread pools of the service are throttled
+        self.assertIs(service.thread_manager, mock_manager.return_value)
+        mock_manager.assert_called_once_with(mock.ANY, segment_threads=1, object_dd_threads=2,
+                                             object_uu_threads=3, container_threads=4)
+        conn = mock_manager.call_args[0][0]()
+        self.assertIsInstance(conn, swift._ThrottledConnection)
+        self.assertIs(conn._connection, self.mock_swift_conn)
+        self.assertEquals(conn._download_limiter.requests.rate, 10)
+
+
+class TestCircuitBreaker(SwiftTestCase):
+    def setUp(self):
+        super(TestCircuitBreaker, self).setUp()
+        circuit_breaker.reset_circuit_breakers()
+        self.addCleanup(circuit_breaker.reset_circuit_breakers)
+
+    def test_disabled_by_default(self):
+        self.mock_swift_conn.head_object.side_effect = ClientException('unavailable',
+                                                                       http_status=503)
+        swift_p = SwiftPath('swift://tenant/container/obj')
+        for i in range(5):
+            with self.assertRaises(swift.UnavailableError):
+                swift_p._swift_connection_call('head_object', 'container', 'obj')
+        self.assertEquals(self.mock_swift_conn.head_object.call_count, 5)
+
+    def test_fails_fast_when_open(self):
+        self.mock_swift_conn.head_object.side_effect = ClientException('unavailable',
+                                                                       http_status=503)
+        swift_p = SwiftPath('swift://tenant/container/obj')
+        with settings.use({'swift': {'circuit_failure_threshold': 2}}):
+            for i in range(2):
+                with self.assertRaises(swift.UnavailableError):
+                    swift_p._swift_connection_call('head_object', 'container', 'obj')
+            # The circuit is shared by the service calls of the cluster
+            with self.assertRaises(exceptions.CircuitOpenError):
+                swift_p._swift_service_call('stat', 'container')
+            with self.assertRaises(exceptions.CircuitOpenError):
+                swift_p._swift_connection_call('head_object', 'container', 'obj')
+        self.assertEquals(self.mock_swift_conn.head_object.call_count, 2)
+        self.assertFalse(self.mock_swift.stat.called)
+
+    def test_failed_results(self):
+        self.mock_swift.upload.return_value = [
+            {'action': 'upload_object', 'object': 'obj', 'success': False,
+             'error': ClientException('unavailable', http_status=503)}
+        ]
+        swift_p = SwiftPath('swift://tenant/container')
+        with settings.use({'swift': {'circuit_failure_threshold': 2}}):
+            for i in range(2):
+                results = swift_p._swift_service_call('upload', 'container', ['obj'],
+                                                      _raise_errors=False)
+                self.assertEquals(len(results), 1)
+            with self.assertRaises(exceptions.CircuitOpenError):
+                swift_p._swift_service_call('upload', 'container', ['obj'],
+                                            _raise_errors=False)
+        self.assertEquals(self.mock_swift.upload.call_count, 2)
+
+    def test_other_failed_results(self):
+        self.mock_swift.upload.return_value = [
+            {'action': 'upload_object', 'object': 'obj', 'success': False,
+             'error': ClientException('not found', http_status=404)}
+        ]
+        swift_p = SwiftPath('swift://tenant/container')
+        with settings.use({'swift': {'circuit_failure_threshold': 1}}):
+            for i in range(2):
+                swift_p._swift_service_call('upload', 'container', ['obj'],
+                                            _raise_errors=False)
+        self.assertEquals(self.mock_swift.upload.call_count, 2)
+
+
+class TestInstrumentation(SwiftTestCase):
+    def test_connection_call(self):
+        self.mock_swift_conn.get_object.return_value = ({'content-length': '10'}, b'0123456789')
+        swift_p = SwiftPath('swift://tenant/container/obj')
+        instrument = mock.Mock()
+        with instrumentation.use(instrument):
+            swift_p._swift_connection_call('get_object', 'container', 'obj')
+
+        event = instrument.after_request.call_args[0][0]
+        instrument.before_request.assert_called_once_with(event)
+        self.assertEquals((event.service, event.operation, event.bucket),
+                          ('swift', 'get_object', 'container'))
+        self.assertEquals((event.bytes, event.retries, event.error), (10, 0, None))
+        self.assertGreaterEqual(event.duration, 0)
+
+    def test_connection_call_put_object(self):
+        swift_p = SwiftPath('swift://tenant/container/obj')
+        instrument = mock.Mock()
+        with instrumentation.use(instrument):
+            swift_p._swift_connection_call('put_object', 'container', 'obj', b'data')
+        self.assertEquals(instrument.after_request.call_args[0][0].bytes, 4)
+
+    def test_connection_call_error(self):
+        self.mock_swift_conn.head_object.side_effect = ClientException('unavailable',
+                                                                       http_status=503)
+        swift_p = SwiftPath('swift://tenant/container/obj')
+        aggregator = instrumentation.LatencyAggregator()
+        with instrumentation.use(aggregator):
+            with self.assertRaises(swift.UnavailableError):
+                swift_p._swift_connection_call('head_object', 'container', 'obj')
+
+        stats = aggregator.get_stats()['swift:head_object']
+        self.assertEquals((stats['count'], stats['errors']), (1, 1))
+
+    def test_request_container(self):
+        self.mock_swift_conn.head_container.side_effect = ClientException('not found',
+                                                                          http_status=404)
+        self.mock_swift.download.return_value = []
+        swift_p = SwiftPath('swift://tenant/container/obj')
+        instrument = mock.Mock()
+        with instrumentation.use(instrument):
+            swift_p._has_segment_container()
+            swift_p._swift_service_call('download', container='other')
+            swift_p._swift_connection_call('post_account', query_string='bulk-delete')
+
+        # Calls are reported with the container they request
+        self.assertEquals([c[0][0].bucket for c in instrument.after_request.call_args_list],
+                          ['container_segments', '.segments_container', 'container+segments',
+                           'other', 'container'])
+
+    def test_service_call_failed_results(self):
+        error = ClientException('not found', http_status=404)
+        self.mock_swift.download.return_value = [
+            {'action': 'download_object', 'success': True, 'read_length': 10},
+            {'action': 'download_object', 'success': False, 'error': error}
+        ]
+        swift_p = SwiftPath('swift://tenant/container')
+        instrument = mock.Mock()
+        with instrumentation.use(instrument):
+            swift_p._swift_service_call('download', 'container', _raise_errors=False)
+
+        event = instrument.after_request.call_args[0][0]
+        self.assertEquals((event.operation, event.bytes, event.error, event.status),
+                          ('download', 10, error, 404))
+
+
+class TestTracing(SwiftTestCase):
+    def test_service_results(self):
+        error = ClientException('unavailable', http_status=503)
+        self.mock_swift.download.return_value = [
+            {'action': 'download_object', 'success': True, 'container': 'container',
+             'object': 'obj1', 'start_time': 10.0, 'finish_time': 12.0, 'read_length': 10,
+             'attempts': 2},
+            {'action': 'download_object', 'success': False, 'container': 'container',
+             'object': 'obj2', 'error': error, 'error_timestamp': 11.0},
+            {'action': 'create_dir_marker', 'success': True}
+        ]
+        swift_p = SwiftPath('swift://tenant/container')
+        tracer = tracing.Tracer()
+        with tracing.use(tracer):
+            swift_p._swift_service_call('download', 'container', _raise_errors=False)
+
+        spans = {span.name: span for span in tracer.spans}
+        self.assertEquals(sorted(spans), ['swift://container', 'swift://container/obj1',
+                                          'swift://container/obj2'])
+        obj1 = spans['swift://container/obj1']
+        self.assertEquals((obj1.category, obj1.start, obj1.end, obj1.thread, obj1.bytes,
+                           obj1.retries), ('object', 10.0, 12.0, None, 10, 1))
+        obj2 = spans['swift://container/obj2']
+        self.assertEquals((obj2.start, obj2.end, obj2.args['error']), (11.0, 11.0, repr(error)))
+        self.assertEquals(spans['swift://container'].category, 'request')
+
+    def test_upload_segment_results(self):
+        self.mock_swift.upload.return_value = [
+            {'action': 'upload_segment', 'success': True, 'segment_size': 5,
+             'segment_location': '/container_segments/obj/1'}
+        ]
+        swift_p = SwiftPath('swift://tenant/container')
+        tracer = tracing.Tracer()
+        with tracing.use(tracer):
+            swift_p._swift_service_call('upload', 'container', [])
+
+        span = [span for span in tracer.spans if span.category == 'part'][0]
+        self.assertEquals((span.name, span.bytes, span.start),
+                          ('swift://container_segments/obj/1', 5, span.end))
+
+
 class TestSwiftFile(SwiftTestCase):
     def setUp(self):
         super(TestSwiftFile, self).setUp()
@@ -290,6 +658,151 @@ line4
         self.assertEquals(obj.read(), 'data')
         self.assertEquals(len(mock_sleep.call_args_list), 1)
 
+    def test_stream_reads(self):
+        self.mock_swift_conn.get_object.return_value = (
+            {'content-length': '18'}, iter([b'line1\nli', b'ne2\n', b'line3\n']))
+        swift_p = SwiftPath('swift://tenant/container/obj')
+        with settings.use({'swift:download': {'stream_reads': True, 'read_chunk_size': 8}}):
+            obj = swift_p.open('rb')
+        self.assertEquals(obj.read(3), b'lin')
+        self.assertEquals(obj.readline(), b'e1\n')
+        self.assertEquals(obj.tell(), 6)
+        self.assertEquals(obj.read(), b'line2\nline3\n')
+        self.assertEquals(obj.read(), b'')
+        self.mock_swift_conn.get_object.assert_called_once_with(
+            'container', 'obj', resp_chunk_size=8, headers={})
+
+    def test_stream_reads_text_iteration(self):
+        self.mock_swift_conn.get_object.return_value = (
+            {'content-length': '18'}, iter([b'line1\nli', b'ne2\n', b'line3\n']))
+        swift_p = SwiftPath('swift://tenant/container/obj')
+        with settings.use({'swift:download': {'stream_reads': True}}):
+            obj = swift_p.open('r')
+        self.assertEquals(list(obj), ['line1\n', 'line2\n', 'line3\n'])
+        self.assertEquals(self.mock_swift_conn.get_object.call_args[1]['resp_chunk_size'],
+                          1048576)
+
+    def test_stream_reads_seek(self):
+        self.mock_swift_conn.get_object.side_effect = [
+            ({'content-length': '10'}, iter([b'0123', b'4567', b'89'])),
+            ({'content-range': 'bytes 6-9/10'}, iter([b'6789'])),
+        ]
+        self.mock_swift_conn.head_object.return_value = {'content-length': '10'}
+        swift_p = SwiftPath('swift://tenant/container/obj')
+        with settings.use({'swift:download': {'stream_reads': True, 'read_chunk_size': 4}}):
+            obj = swift_p.open('rb')
+        self.assertEquals(obj.read(2), b'01')
+        obj.seek(6)
+        self.assertEquals(obj.read(), b'6789')
+        self.assertEquals(self.mock_swift_conn.get_object.call_args_list, [
+            mock.call('container', 'obj', resp_chunk_size=4, headers={}),
+            mock.call('container', 'obj', resp_chunk_size=4, headers={'Range': 'bytes=6-'}),
+        ])
+        # Seeking to the end does not perform range requests past the object
+        obj.seek(0, os.SEEK_END)
+        self.assertEquals(obj.read(), b'')
+        self.assertEquals(self.mock_swift_conn.get_object.call_count, 2)
+        self.assertFalse(self.mock_swift_conn.head_object.called)
+
+    def test_stream_reads_seek_before_read(self):
+        self.mock_swift_conn.head_object.return_value = {'content-length': '10'}
+        self.mock_swift_conn.get_object.return_value = (
+            {'content-range': 'bytes 8-9/10'}, iter([b'89']))
+        swift_p = SwiftPath('swift://tenant/container/obj')
+        with settings.use({'swift:download': {'stream_reads': True}}):
+            obj = swift_p.open('rb')
+        obj.seek(-2, os.SEEK_END)
+        self.assertEquals(obj.read(), b'89')
+        self.mock_swift_conn.head_object.assert_called_once_with('container', 'obj')
+
+    @mock.patch('time.time', autospec=True, return_value=1.0)
+    def test_stream_writes_segments(self, mock_time):
+        self.mock_swift_conn.put_object.side_effect = lambda c, o, contents, **kw: (
+            'etag-' + o[-1] if c.startswith('.segments') else 'manifest')
+        swift_p = SwiftPath('swift://tenant/container/obj')
+        with settings.use({'swift:upload': {'stream_writes': True, 'segment_size': 4,
+                                            'segment_threads': 2}}):
+            obj = swift_p.open('wb', swift_upload_options={'headers': ['X-Delete-After: 10']})
+        with obj:
+            obj.write(b'0123456')
+            obj.write(b'789')
+            obj.flush()
+            self.assertEquals(obj.tell(), 10)
+
+        self.assertEquals(self.mock_swift_conn.put_container.call_args_list, [
+            mock.call('.segments_container'),
+            mock.call('container')
+        ])
+        segment_prefix = 'obj/slo/1.000000/4/'
+        put_calls = self.mock_swift_conn.put_object.call_args_list
+        self.assertEquals(sorted(put_calls[:3]), [
+            mock.call('.segments_container', segment_prefix + '00000000', b'0123',
+                      etag=hashlib.md5(b'0123').hexdigest(), headers=None, query_string=None),
+            mock.call('.segments_container', segment_prefix + '00000001', b'4567',
+                      etag=hashlib.md5(b'4567').hexdigest(), headers=None, query_string=None),
+            mock.call('.segments_container', segment_prefix + '00000002', b'89',
+                      etag=hashlib.md5(b'89').hexdigest(), headers=None, query_string=None),
+        ])
+        manifest_call = put_calls[3]
+        self.assertEquals(manifest_call[0][:2], ('container', 'obj'))
+        self.assertEquals(manifest_call[1]['query_string'], 'multipart-manifest=put')
+        self.assertEquals(manifest_call[1]['headers'], {'X-Delete-After': '10'})
+        self.assertEquals(json.loads(manifest_call[0][2]), [
+            {'path': '/.segments_container/' + segment_prefix + '00000000',
+             'etag': 'etag-0', 'size_bytes': 4},
+            {'path': '/.segments_container/' + segment_prefix + '00000001',
+             'etag': 'etag-1', 'size_bytes': 4},
+            {'path': '/.segments_container/' + segment_prefix + '00000002',
+             'etag': 'etag-2', 'size_bytes': 2},
+        ])
+
+    def test_stream_writes_single_object(self):
+        swift_p = SwiftPath('swift://tenant/container/obj')
+        with settings.use({'swift:upload': {'stream_writes': True, 'checksum': False}}):
+            obj = swift_p.open('w')
+        with obj:
+            obj.write('hello ')
+            obj.write('world')
+        self.mock_swift_conn.put_container.assert_called_once_with('container')
+        self.mock_swift_conn.put_object.assert_called_once_with(
+            'container', 'obj', b'hello world', etag=None, headers={}, query_string=None)
+
+    def test_stream_writes_nothing_written(self):
+        swift_p = SwiftPath('swift://tenant/container/obj')
+        with settings.use({'swift:upload': {'stream_writes': True}}):
+            obj = swift_p.open('wb')
+        obj.tell()
+        obj.close()
+        self.assertFalse(self.mock_swift_conn.put_object.called)
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_stream_writes_segment_error(self, mock_sleep):
+        self.mock_swift_conn.put_object.side_effect = ClientException('unavailable',
+                                                                      http_status=503)
+        swift_p = SwiftPath('swift://tenant/container/obj')
+        with settings.use({'swift:upload': {'stream_writes': True, 'segment_size': 2,
+                                            'segment_threads': 1}}):
+            obj = swift_p.open('wb')
+        with self.assertRaises(swift.UnavailableError):
+            with obj:
+                obj.write(b'0123456789')
+                obj.flush()
+        # The first segment is retried and no other segment or manifest is written
+        self.assertEquals(self.mock_swift_conn.put_object.call_count, 6)
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_stream_writes_dlo(self, mock_sleep):
+        self.mock_swift_conn.put_object.return_value = 'etag'
+        swift_p = SwiftPath('swift://tenant/container/obj')
+        with settings.use({'swift:upload': {'stream_writes': True, 'segment_size': 4,
+                                            'use_slo': False}}):
+            with swift_p.open('wb') as obj:
+                obj.write(b'012345')
+        manifest_call = self.mock_swift_conn.put_object.call_args_list[-1]
+        self.assertEquals(manifest_call[0], ('container', 'obj', b''))
+        self.assertTrue(manifest_call[1]['headers']['X-Object-Manifest'].startswith(
+            '.segments_container/obj/dlo/'))
+
     @mock.patch('time.sleep', autospec=True)
     @mock.patch.object(SwiftPath, 'upload', autospec=True)
     def test_write_use_manifest_multiple_and_close(self, mock_upload, mock_sleep):
@@ -877,6 +1390,51 @@ class TestList(SwiftTestCase):
         with self.assertRaises(exceptions.ConditionNotMetError):
             swift_p.list(use_manifest=True)
 
+    @mock.patch('time.sleep', autospec=True)
+    def test_list_use_manifest_v2(self, mock_sleep):
+        self.mock_swift_conn.get_object.return_value = (
+            'header', b'#stor-data-manifest:v2\n10,abc,my/obj1\n20,,my/obj2\n')
+        mock_list = self.mock_swift_conn.get_container
+        mock_list.side_effect = [
+            ({}, [{'name': 'my/obj1', 'bytes': 10, 'hash': 'abc'},
+                  {'name': 'my/obj2', 'bytes': 2, 'hash': 'def'}]),
+            ({}, [{'name': 'my/obj1', 'bytes': 0, 'hash': 'xyz'},
+                  {'name': 'my/obj2', 'bytes': 20, 'hash': 'def'}])
+        ]
+
+        swift_p = SwiftPath('swift://tenant/container/')
+        results = swift_p.list(use_manifest=True, num_retries=1)
+        self.assertEquals(set(results), set([
+            'swift://tenant/container/my/obj1',
+            'swift://tenant/container/my/obj2'
+        ]))
+        # The manifest is only read once and my/obj1 is not validated again
+        self.assertEquals(self.mock_swift_conn.get_object.call_count, 1)
+        self.assertEquals(mock_list.call_count, 2)
+        self.assertEquals(len(mock_sleep.call_args_list), 1)
+
+    def test_list_use_manifest_v2_dynamic_large_object(self):
+        self.mock_swift_conn.get_object.return_value = (
+            'header', b'#stor-data-manifest:v2\n2000,,my/large\n')
+        # Dynamic large object manifests are listed as empty objects
+        self.mock_swift_conn.get_container.return_value = ({}, [
+            {'name': 'my/large', 'bytes': 0, 'hash': 'd41d8cd98f00b204e9800998ecf8427e'}
+        ])
+        swift_p = SwiftPath('swift://tenant/container/')
+        self.assertEquals(swift_p.list(use_manifest=True),
+                          ['swift://tenant/container/my/large'])
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_list_use_manifest_v2_size_mismatch(self, mock_sleep):
+        self.mock_swift_conn.get_object.return_value = (
+            'header', b'#stor-data-manifest:v2\n10,,my/obj1\n')
+        mock_list = self.mock_swift_conn.get_container
+        mock_list.return_value = ({}, [{'name': 'my/obj1', 'bytes': 2, 'hash': 'abc'}])
+
+        swift_p = SwiftPath('swift://tenant/container/')
+        with self.assertRaises(exceptions.ConditionNotMetError):
+            swift_p.list(use_manifest=True)
+
 
 class TestWalkFiles(SwiftTestCase):
     def test_no_pattern_w_dir_markers(self):
@@ -930,6 +1488,106 @@ class TestWalkFiles(SwiftTestCase):
         ]))
 
 
+class TestWalkTenant(SwiftTestCase):
+    def test_w_container(self):
+        with self.assertRaisesRegexp(ValueError, 'tenant'):
+            list(SwiftPath('swift://tenant/container').walk_tenant())
+
+    def test_walk_tenant(self):
+        self.mock_swift_conn.get_account.return_value = ({}, [{
+            'name': 'container1'
+        }, {
+            'name': 'container2'
+        }, {
+            'name': '.segments_container1'
+        }])
+        container_listings = {
+            'container1': [{'name': 'a'}, {'name': 'b', 'content_type': 'application/directory'}],
+            'container2': [{'name': 'c'}]
+        }
+        self.mock_swift_conn.get_container.side_effect = (
+            lambda container, **kwargs: ({}, container_listings[container]))
+
+        results = list(SwiftPath('swift://tenant').walk_tenant())
+        self.assertSwiftListResultsEqual(results, [
+            'swift://tenant/container1/a',
+            'swift://tenant/container1/b',
+            'swift://tenant/container2/c'
+        ])
+        listed = sorted(c[0][0] for c in self.mock_swift_conn.get_container.call_args_list)
+        self.assertEquals(listed, ['container1', 'container2'])
+
+        results = list(SwiftPath('swift://tenant').walk_tenant(ignore_dir_markers=True))
+        self.assertSwiftListResultsEqual(results, [
+            'swift://tenant/container1/a',
+            'swift://tenant/container2/c'
+        ])
+
+    def test_walk_tenant_container_deleted(self):
+        self.mock_swift_conn.get_account.return_value = ({}, [{
+            'name': 'container1'
+        }, {
+            'name': 'container2'
+        }])
+
+        def get_container(container, **kwargs):
+            if container == 'container1':
+                raise _service_404_exception()
+            return {}, [{'name': 'c'}]
+        self.mock_swift_conn.get_container.side_effect = get_container
+
+        results = list(SwiftPath('swift://tenant').walk_tenant())
+        self.assertEquals(results, ['swift://tenant/container2/c'])
+
+
+class TestStatContainers(SwiftTestCase):
+    def test_w_container(self):
+        with self.assertRaisesRegexp(ValueError, 'tenant'):
+            SwiftPath('swift://tenant/container').stat_containers()
+
+    def test_stat_containers(self):
+        self.mock_swift_conn.get_account.return_value = ({}, [{
+            'name': 'container1'
+        }, {
+            'name': 'container2'
+        }, {
+            'name': 'container3'
+        }, {
+            'name': 'container1_segments'
+        }])
+        container_headers = {
+            'container1': {'x-container-object-count': '3', 'x-container-bytes-used': '300'},
+            'container2': {'x-container-object-count': '0', 'x-container-bytes-used': '0'}
+        }
+
+        def head_container(container):
+            if container not in container_headers:
+                raise _service_404_exception()
+            return container_headers[container]
+        self.mock_swift_conn.head_container.side_effect = head_container
+
+        results = SwiftPath('swift://tenant').stat_containers()
+        self.assertEquals(results, {
+            SwiftPath('swift://tenant/container1'): {'Objects': 3, 'Bytes': 300},
+            SwiftPath('swift://tenant/container2'): {'Objects': 0, 'Bytes': 0}
+        })
+        self.assertEquals(len(self.mock_swift_conn.head_container.call_args_list), 3)
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_stat_containers_unavailable(self, mock_sleep):
+        self.mock_swift_conn.get_account.return_value = ({}, [{'name': 'container1'}])
+        self.mock_swift_conn.head_container.side_effect = [
+            ClientException('unavailable', http_status=503),
+            {'x-container-object-count': '1', 'x-container-bytes-used': '10'}
+        ]
+
+        settings.update({'swift': {'num_retries': 1}})
+        results = SwiftPath('swift://tenant').stat_containers()
+        self.assertEquals(results, {
+            SwiftPath('swift://tenant/container1'): {'Objects': 1, 'Bytes': 10}
+        })
+
+
 @mock.patch.object(SwiftPath, 'list', autospec=True)
 class TestGlob(SwiftTestCase):
     def test_valid_pattern(self, mock_list):
@@ -1081,6 +1739,10 @@ class TestExists(SwiftTestCase):
 
 
 class TestDownloadObject(SwiftTestCase):
+    def setUp(self):
+        super(TestDownloadObject, self).setUp()
+        self.mock_swift_conn.head_object.return_value = {}
+
     def test_container(self):
         swift_p = SwiftPath('swift://tenant/container')
         with self.assertRaisesRegexp(ValueError, 'path'):
@@ -1108,6 +1770,140 @@ class TestDownloadObject(SwiftTestCase):
                 swift_p.download_object('file.txt')
 
 
+class TestDownloadLargeObject(SwiftTestCase):
+    def setUp(self):
+        super(TestDownloadLargeObject, self).setUp()
+        self.segments = {
+            'seg/0': b'hello ',
+            'seg/1': b'large ',
+            'seg/2': b'world'
+        }
+
+        def get_object(container, obj, resp_chunk_size=None, query_string=None):
+            if query_string == 'multipart-manifest=get':
+                return {}, json.dumps([{
+                    'name': '/.segments_container/%s' % name,
+                    'bytes': len(contents),
+                    'hash': hashlib.md5(contents).hexdigest()
+                } for name, contents in sorted(self.segments.items())]).encode('utf-8')
+            contents = self.segments[obj]
+            return {}, iter([contents[:3], contents[3:]])
+        self.mock_swift_conn.get_object.side_effect = get_object
+
+    def test_slo(self):
+        self.mock_swift_conn.head_object.return_value = {'x-static-large-object': 'True'}
+        with NamedTemporaryDirectory() as tmp_d:
+            out_file = Path(tmp_d) / 'dir' / 'large.txt'
+            SwiftPath('swift://tenant/container/large.txt').download_object(out_file)
+            self.assertEquals(out_file.open().read(), 'hello large world')
+
+        self.assertFalse(self.mock_swift.download.called)
+        self.assertEquals(self.mock_swift_conn.get_object.call_args_list[0],
+                          mock.call('container', 'large.txt',
+                                    query_string='multipart-manifest=get'))
+        segment_calls = sorted(self.mock_swift_conn.get_object.call_args_list[1:])
+        self.assertEquals(segment_calls, [
+            mock.call('.segments_container', 'seg/%d' % i, resp_chunk_size=1048576)
+            for i in range(3)
+        ])
+
+    def test_dlo(self):
+        self.mock_swift_conn.head_object.return_value = {
+            'x-object-manifest': '.segments_container/seg/'
+        }
+        self.mock_swift_conn.get_container.return_value = ({}, [{
+            'name': name,
+            'bytes': len(contents),
+            'hash': hashlib.md5(contents).hexdigest()
+        } for name, contents in sorted(self.segments.items())])
+        with NamedTemporaryDirectory() as tmp_d:
+            out_file = Path(tmp_d) / 'large.txt'
+            SwiftPath('swift://tenant/container/large.txt').download_object(out_file)
+            self.assertEquals(out_file.open().read(), 'hello large world')
+
+        self.mock_swift_conn.get_container.assert_called_once_with(
+            '.segments_container', prefix='seg/', full_listing=True)
+        self.assertEquals(self.mock_swift_conn.get_object.call_count, 3)
+
+    def test_nested_slo_downloaded_sequentially(self):
+        self.mock_swift_conn.head_object.return_value = {'x-static-large-object': 'True'}
+        self.mock_swift_conn.get_object.side_effect = None
+        self.mock_swift_conn.get_object.return_value = ({}, json.dumps([{
+            'name': '/.segments_container/sub_manifest',
+            'bytes': 10,
+            'hash': 'etag',
+            'sub_slo': True
+        }]).encode('utf-8'))
+        self.mock_swift.download.return_value = [{}]
+        SwiftPath('swift://tenant/container/large.txt').download_object('large.txt')
+
+        self.mock_swift.download.assert_called_once_with(container='container',
+                                                         objects=['large.txt'],
+                                                         options={'out_file': 'large.txt'})
+
+    def test_inconsistent_segment_retried(self):
+        self.mock_swift_conn.head_object.return_value = {'x-static-large-object': 'True'}
+        get_object = self.mock_swift_conn.get_object.side_effect
+        corrupt_calls = []
+
+        def corrupt_get_object(container, obj, **kwargs):
+            headers, body = get_object(container, obj, **kwargs)
+            if obj == 'seg/1' and not corrupt_calls:
+                corrupt_calls.append(obj)
+                return headers, iter([b'corrupt'])
+            return headers, body
+        self.mock_swift_conn.get_object.side_effect = corrupt_get_object
+
+        with NamedTemporaryDirectory() as tmp_d:
+            out_file = Path(tmp_d) / 'large.txt'
+            with settings.use({'swift': {'num_retries': 1}}):
+                SwiftPath('swift://tenant/container/large.txt').download_object(out_file)
+            self.assertEquals(out_file.open().read(), 'hello large world')
+
+        # Only the corrupt segment is downloaded again
+        self.assertEquals(self.mock_swift_conn.get_object.call_count, 5)
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_segment_retry_args(self, mock_sleep):
+        self.mock_swift_conn.head_object.return_value = {'x-static-large-object': 'True'}
+        get_object = self.mock_swift_conn.get_object.side_effect
+
+        def corrupt_get_object(container, obj, **kwargs):
+            headers, body = get_object(container, obj, **kwargs)
+            return headers, iter([b'corrupt']) if obj == 'seg/1' else body
+        self.mock_swift_conn.get_object.side_effect = corrupt_get_object
+
+        with NamedTemporaryDirectory() as tmp_d:
+            with settings.use({'swift': {'num_retries': 5}}):
+                with self.assertRaises(swift.InconsistentDownloadError):
+                    SwiftPath('swift://tenant/container/large.txt').download_object(
+                        Path(tmp_d) / 'large.txt', num_retries=2)
+
+        # The segment is retried with the retries of the call and the object is not
+        segment_calls = [c for c in self.mock_swift_conn.get_object.call_args_list
+                         if c[0][1] == 'seg/1']
+        self.assertEquals(len(segment_calls), 3)
+        self.assertEquals(self.mock_swift_conn.head_object.call_count, 1)
+
+    def test_inconsistent_segment(self):
+        self.mock_swift_conn.head_object.return_value = {'x-static-large-object': 'True'}
+        self.segments['seg/1'] = b'changed'
+        get_object = self.mock_swift_conn.get_object.side_effect
+
+        def stale_manifest_get_object(container, obj, **kwargs):
+            headers, body = get_object(container, obj, **kwargs)
+            if obj == 'seg/1':
+                body = iter([b'stale!'])
+            return headers, body
+        self.mock_swift_conn.get_object.side_effect = stale_manifest_get_object
+
+        with NamedTemporaryDirectory() as tmp_d:
+            with settings.use({'swift': {'num_retries': 0}}):
+                with self.assertRaisesRegexp(swift.InconsistentDownloadError, 'seg/1'):
+                    SwiftPath('swift://tenant/container/large.txt').download_object(
+                        Path(tmp_d) / 'large.txt')
+
+
 class TestDownloadObjects(SwiftTestCase):
     def test_tenant(self):
         swift_p = SwiftPath('swift://tenant')
@@ -1222,6 +2018,12 @@ class TestDownload(SwiftTestCase):
         with self.assertRaisesRegexp(ValueError, 'tenant'):
             swift_p.download('output_dir')
 
+    def test_download_unexpected_args(self):
+        swift_p = SwiftPath('swift://tenant/container')
+        with self.assertRaisesRegexp(TypeError, 'num_retires'):
+            swift_p.download('output_dir', num_retires=3)
+        self.assertFalse(self.mock_swift.download.called)
+
     def test_download_container(self):
         self.mock_swift.download.return_value = []
         download_settings = {
@@ -1249,7 +2051,7 @@ class TestDownload(SwiftTestCase):
         self.mock_swift.download.return_value = [
             {
                 'action': 'download_object',
-                'read_length': 100
+                'read_length': 1024 * 1024
             }
             for i in range(20)
         ]
@@ -1258,11 +2060,10 @@ class TestDownload(SwiftTestCase):
         swift_p = SwiftPath('swift://tenant/container')
         with LogCapture('stor.swift.progress') as progress_log:
             swift_p.download('output_dir')
+            # Progress is only logged every progress_interval seconds
             progress_log.check(
                 ('stor.swift.progress', 'INFO', 'starting download'),
-                ('stor.swift.progress', 'INFO', '10\t0:00:00\t0.00 MB\t0.00 MB/s'),  # nopep8
-                ('stor.swift.progress', 'INFO', '20\t0:00:00\t0.00 MB\t0.00 MB/s'),  # nopep8
-                ('stor.swift.progress', 'INFO', 'download complete - 20\t0:00:00\t0.00 MB\t0.00 MB/s'),  # nopep8
+                ('stor.swift.progress', 'INFO', 'download complete - 20\t0:00:00\t20.00 MB\t0.00 MB/s'),  # nopep8
             )
 
     def test_download_resource(self):
@@ -1343,6 +2144,78 @@ class TestDownload(SwiftTestCase):
         self.assertEquals(options_passed['object_dd_threads'], 20)
         self.assertEquals(options_passed['container_threads'], 30)
 
+    @mock.patch('time.sleep', autospec=True)
+    def test_download_retries_failed_objects(self, mock_sleep):
+        self.mock_swift.download.side_effect = [
+            [{
+                'action': 'download_object',
+                'object': 'r/obj%d' % i,
+                'success': True
+            } for i in range(3)] + [{
+                'action': 'download_object',
+                'object': 'r/obj3',
+                'success': False,
+                'error': SwiftError('Error downloading r/obj3: md5sum != etag, a != b')
+            }],
+            [{
+                'action': 'download_object',
+                'object': 'r/obj3',
+                'success': True
+            }]
+        ]
+
+        swift_p = SwiftPath('swift://tenant/container/r')
+        results = swift_p.download('output_dir', num_retries=1)
+
+        self.assertEquals(sorted(r['object'] for r in results),
+                          ['r/obj0', 'r/obj1', 'r/obj2', 'r/obj3'])
+        self.assertEquals(len(self.mock_swift.download.call_args_list), 2)
+        self.assertEquals(self.mock_swift.download.call_args_list[1][0],
+                          ('container', ['r/obj3']))
+        self.assertEquals(len(mock_sleep.call_args_list), 1)
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_download_failed_objects_retries_exhausted(self, mock_sleep):
+        self.mock_swift.download.return_value = [{
+            'action': 'download_object',
+            'object': 'r/obj0',
+            'success': False,
+            'error': ClientException('unavailable', http_status=503)
+        }]
+
+        swift_p = SwiftPath('swift://tenant/container/r')
+        with self.assertRaises(swift.UnavailableError):
+            swift_p.download('output_dir', num_retries=2)
+
+        self.assertEquals(len(self.mock_swift.download.call_args_list), 3)
+        self.assertEquals(self.mock_swift.download.call_args_list[2][0],
+                          ('container', ['r/obj0']))
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_download_listing_error_retries_container(self, mock_sleep):
+        self.mock_swift.download.side_effect = [
+            [{
+                'action': 'download_object',
+                'object': 'r/obj0',
+                'success': True
+            }, {
+                'action': 'list_container_part',
+                'success': False,
+                'error': ClientException('unavailable', http_status=503)
+            }],
+            [{
+                'action': 'download_object',
+                'object': 'r/obj%d' % i,
+                'success': True
+            } for i in range(2)]
+        ]
+
+        swift_p = SwiftPath('swift://tenant/container/r')
+        results = swift_p.download('output_dir', num_retries=1)
+
+        self.assertEquals([r['object'] for r in results], ['r/obj0', 'r/obj1'])
+        self.assertEquals(self.mock_swift.download.call_args_list[1][0], ('container',))
+
     @mock.patch('time.sleep', autospec=True)
     @mock.patch.object(SwiftPath, 'list', autospec=True)
     def test_download_w_condition_and_use_manifest(self, mock_list, mock_sleep):
@@ -1440,6 +2313,17 @@ class TestDownload(SwiftTestCase):
 
 @mock.patch('stor.utils.walk_files_and_dirs', autospec=True)
 class TestUpload(SwiftTestCase):
+    def setUp(self):
+        super(TestUpload, self).setUp()
+        # Uploads with skip_identical list the destination first
+        self.mock_swift_conn.get_container.return_value = ({}, [])
+
+    def test_unexpected_args(self, mock_walk_files_and_dirs):
+        swift_p = SwiftPath('swift://tenant/container/path')
+        with self.assertRaisesRegexp(TypeError, 'upload\\(\\) .*num_retires'):
+            swift_p.upload(['file1'], num_retries=1, num_retires=3)
+        self.assertFalse(self.mock_swift.upload.called)
+
     def test_abs_path(self, mock_walk_files_and_dirs):
         mock_walk_files_and_dirs.return_value = {
             '/abs_path/file1': 10
@@ -1456,6 +2340,8 @@ class TestUpload(SwiftTestCase):
                           ['/abs_path/file1'])
         self.assertEquals([o.object_name for o in upload_args[1]],
                           ['path/abs_path/file1'])
+        # swiftclient only accepts its own upload objects
+        self.assertTrue(all(isinstance(o, SwiftUploadObject) for o in upload_args[1]))
 
     def test_relative_path(self, mock_walk_files_and_dirs):
         segment_size = settings.get()['swift:upload']['segment_size']
@@ -1522,6 +2408,178 @@ class TestUpload(SwiftTestCase):
 
         self.assertEquals(len(self.mock_swift.upload.call_args_list), 6)
 
+    @mock.patch('time.sleep', autospec=True)
+    def test_upload_retries_failed_objects(self, mock_sleep, mock_walk_files_and_dirs):
+        mock_walk_files_and_dirs.return_value = {
+            'file1': 20,
+            'file2': 30,
+            'file3': 40
+        }
+        self.mock_swift.upload.side_effect = [
+            [{
+                'action': 'upload_object',
+                'object': 'path/file1',
+                'path': 'file1',
+                'success': True
+            }, {
+                'action': 'upload_segment',
+                'for_object': 'path/file2',
+                'success': False,
+                'error': ClientException('unavailable', http_status=503)
+            }, {
+                'action': 'upload_object',
+                'object': 'path/file2',
+                'path': 'file2',
+                'success': False,
+                'error': ClientException('unavailable', http_status=503)
+            }, {
+                'action': 'upload_object',
+                'object': 'path/file3',
+                'path': 'file3',
+                'success': True
+            }],
+            [{
+                'action': 'upload_object',
+                'object': 'path/file2',
+                'path': 'file2',
+                'success': True
+            }]
+        ]
+
+        swift_p = SwiftPath('swift://tenant/container/path')
+        with settings.use({'swift': {'num_retries': 1}}):
+            results = swift_p.upload(['upload'])
+
+        self.assertEquals(sorted(r['object'] for r in results),
+                          ['path/file1', 'path/file2', 'path/file3'])
+        retry_args = self.mock_swift.upload.call_args_list[1][0]
+        self.assertEquals([o.object_name for o in retry_args[1]], ['path/file2'])
+        self.assertEquals(len(mock_sleep.call_args_list), 1)
+
+    @mock.patch('stor.checksum.compute_checksums', autospec=True)
+    def test_upload_skip_identical(self, mock_compute_checksums, mock_walk_files_and_dirs):
+        mock_walk_files_and_dirs.return_value = {
+            'file1': 20,
+            'file2': 30,
+            'file3': 40,
+            'large': 2000
+        }
+        self.mock_swift_conn.get_container.return_value = ({}, [
+            {'name': 'path/file1', 'bytes': 20, 'hash': 'md5-1'},
+            {'name': 'path/file2', 'bytes': 30, 'hash': 'other'},
+            {'name': 'path/file3', 'bytes': 41, 'hash': 'md5-3'},
+            {'name': 'path/large', 'bytes': 2000, 'hash': 'slo'}
+        ])
+        mock_compute_checksums.return_value = {'file1': 'md5-1', 'file2': 'md5-2'}
+        self.mock_swift.upload.return_value = [{
+            'success': True,
+            'action': 'upload_object',
+            'object': 'path/file2',
+            'path': 'file2'
+        }]
+
+        upload_settings = {
+            'swift:upload': {
+                'segment_size': 1000,
+                'skip_identical': True
+            }
+        }
+        with NamedTemporaryDirectory(change_dir=True), settings.use(upload_settings):
+            for name in mock_walk_files_and_dirs.return_value:
+                open(name, 'w').close()
+            swift_p = SwiftPath('swift://tenant/container/path')
+            results = swift_p.upload(['.'])
+
+        self.mock_swift_conn.get_container.assert_called_once_with('container',
+                                                                   prefix='path/',
+                                                                   full_listing=True)
+        # Only files with the listed size that are not segmented are hashed
+        self.assertEquals(mock_compute_checksums.call_args_list, [mock.call(['file1', 'file2'])])
+        upload_args = self.mock_swift.upload.call_args_list[0][0]
+        self.assertEquals(sorted(o.source for o in upload_args[1]), ['file2', 'file3', 'large'])
+        self.assertEquals(results[0], {
+            'action': 'upload_object',
+            'container': 'container',
+            'object': 'path/file1',
+            'path': 'file1',
+            'success': True,
+            'status': 'skipped-identical'
+        })
+        self.assertEquals(len(results), 2)
+
+    @mock.patch('time.sleep', autospec=True)
+    @mock.patch('stor.checksum.compute_checksums', autospec=True)
+    def test_upload_skip_identical_new_container(self, mock_compute_checksums, mock_sleep,
+                                                 mock_walk_files_and_dirs):
+        mock_walk_files_and_dirs.return_value = {
+            'file1': 20
+        }
+        # The listing is retried, and containers that do not exist have no objects
+        self.mock_swift_conn.get_container.side_effect = [
+            ClientException('unavailable', http_status=503),
+            ClientException('not found', http_status=404)
+        ]
+        self.mock_swift.upload.return_value = [{
+            'success': True,
+            'action': 'upload_object',
+            'object': 'path/file1',
+            'path': 'file1'
+        }]
+
+        with settings.use({'swift:upload': {'skip_identical': True},
+                           'swift': {'num_retries': 1}}):
+            results = SwiftPath('swift://tenant/container/path').upload(['.'])
+
+        self.assertEquals(self.mock_swift_conn.get_container.call_count, 2)
+        self.assertFalse(mock_compute_checksums.called)
+        upload_args = self.mock_swift.upload.call_args_list[0][0]
+        self.assertEquals([o.source for o in upload_args[1]], ['file1'])
+        self.assertEquals(len(results), 1)
+
+    @mock.patch('stor.checksum.compute_checksums', autospec=True)
+    def test_upload_w_manifest_checksums(self, mock_compute_checksums,
+                                         mock_walk_files_and_dirs):
+        mock_walk_files_and_dirs.return_value = {
+            './file1': 20,
+            './large': 2000
+        }
+        mock_compute_checksums.return_value = {'./file1': 'md5-1'}
+        self.mock_swift.upload.side_effect = [
+            [{
+                'success': True,
+                'action': 'upload_object',
+                'object': 'path/%s' % utils.DATA_MANIFEST_FILE_NAME
+            }],
+            [{
+                'success': True,
+                'action': 'upload_object',
+                'object': 'path/file1',
+                'path': './file1'
+            }, {
+                'success': True,
+                'action': 'upload_object',
+                'object': 'path/large',
+                'path': './large'
+            }]
+        ]
+
+        upload_settings = {
+            'swift:upload': {'segment_size': 1000},
+            'stor:checksum': {'manifest_checksums': True},
+            'stor': {'data_manifest_version': 2}
+        }
+        with NamedTemporaryDirectory(change_dir=True), settings.use(upload_settings):
+            for name in mock_walk_files_and_dirs.return_value:
+                open(name, 'w').close()
+            swift_p = SwiftPath('swift://tenant/container/path')
+            swift_p.upload(['.'], use_manifest=True)
+
+            self.assertEquals(mock_compute_checksums.call_args_list, [mock.call(['./file1'])])
+            self.assertEquals(set(utils.iter_data_manifest(Path('.'))), {
+                utils.ManifestEntry('path/file1', 20, 'md5-1'),
+                utils.ManifestEntry('path/large', 2000, None)
+            })
+
     def test_upload_to_dir(self, mock_walk_files_and_dirs):
         mock_walk_files_and_dirs.return_value = {
             'file1': 20,
@@ -1714,7 +2772,7 @@ class TestUpload(SwiftTestCase):
     @freezegun.freeze_time('2016-4-5')
     def test_progress_logging(self, mock_walk_files_and_dirs):
         mock_walk_files_and_dirs.return_value = {
-            'file%s' % i: 20
+            'file%s' % i: 1024 * 1024
             for i in range(20)
         }
         self.mock_swift.upload.return_value = [
@@ -1738,13 +2796,51 @@ class TestUpload(SwiftTestCase):
         with LogCapture('stor.swift.progress') as progress_log:
             with settings.use(upload_settings):
                 swift_p.upload(['upload'])
+            # Progress is only logged every progress_interval seconds
             progress_log.check(
                 ('stor.swift.progress', 'INFO', 'starting upload of 20 objects'),
-                ('stor.swift.progress', 'INFO', '10/20\t0:00:00\t0.00 MB\t0.00 MB/s'),  # nopep8
-                ('stor.swift.progress', 'INFO', '20/20\t0:00:00\t0.00 MB\t0.00 MB/s'),  # nopep8
-                ('stor.swift.progress', 'INFO', 'upload complete - 20/20\t0:00:00\t0.00 MB\t0.00 MB/s'),  # nopep8
+                ('stor.swift.progress', 'INFO', 'upload complete - 20/20\t0:00:00\t20.00 MB\t0.00 MB/s'),  # nopep8
             )
 
+    def test_progress_segments(self, mock_walk_files_and_dirs):
+        mock_walk_files_and_dirs.return_value = {'file1': 30, 'file2': 10}
+        self.mock_swift.upload.return_value = [
+            {
+                'action': 'upload_segment',
+                'for_container': 'container',
+                'for_object': 'file1',
+                'segment_size': 20,
+                'success': True
+            },
+            {
+                'action': 'upload_object',
+                'container': 'container',
+                'object': 'file1',
+                'path': 'file1',
+                'success': True
+            },
+            {
+                'action': 'upload_object',
+                'container': 'container',
+                'object': 'file2',
+                'path': 'file2',
+                'success': True
+            }
+        ]
+        reports = []
+
+        swift_p = SwiftPath('swift://tenant/container')
+        with settings.use({'stor': {'progress_interval': 0}}):
+            with progress.use(reports.append):
+                swift_p.upload(['upload'])
+        # The segment is counted when it finishes and only the rest of its
+        # object is counted with the object
+        self.assertEquals([(r.objects, r.bytes) for r in reports],
+                          [(0, 20), (1, 30), (2, 40), (2, 40)])
+        self.assertEquals(reports[-1].total_bytes, 40)
+        self.assertEquals(reports[-1].operation, 'upload')
+        self.assertTrue(reports[-1].finished)
+
     def test_upload_to_tenant(self, mock_walk_files_and_dirs):
         mock_walk_files_and_dirs.return_value = {
             'file1': 10,
@@ -1940,6 +3036,10 @@ class TestUpload(SwiftTestCase):
 
 
 class TestCopy(SwiftTestCase):
+    def setUp(self):
+        super(TestCopy, self).setUp()
+        self.mock_swift_conn.head_object.return_value = {}
+
     @mock.patch.object(swift.SwiftPath, 'download_object', autospec=True)
     def test_copy_posix_file_destination(self, mockdownload_object):
         p = SwiftPath('swift://tenant/container/file_source.txt')
@@ -1953,13 +3053,140 @@ class TestCopy(SwiftTestCase):
             p.copy(tmp_d)
             mockdownload_object.assert_called_once_with(p, Path(tmp_d) / 'file_source.txt')
 
-    def test_copy_swift_destination(self):
+    @mock.patch.object(swift.SwiftPath, 'copy_object', autospec=True)
+    def test_copy_swift_destination(self, mock_copy_object):
         p = SwiftPath('swift://tenant/container/file_source')
-        with self.assertRaisesRegexp(ValueError, 'OBS path'):
-            p.copy('swift://tenant/container/file_dest')
+        p.copy('swift://tenant/container/file_dest.txt', swift_retry_options={'num_retries': 1})
+        mock_copy_object.assert_called_once_with(
+            p, SwiftPath('swift://tenant/container/file_dest.txt'), num_retries=1)
+
+    @mock.patch.object(swift.SwiftPath, 'copy_object', autospec=True)
+    def test_copy_swift_dir_destination(self, mock_copy_object):
+        p = SwiftPath('swift://tenant/container/file_source')
+        p.copy('swift://tenant/container/dir/')
+        mock_copy_object.assert_called_once_with(
+            p, SwiftPath('swift://tenant/container/dir/file_source'))
+
+    @mock.patch('stor.obs.stream_copy_objects', autospec=True)
+    def test_copy_s3_destination(self, mock_stream_copy_objects):
+        p = SwiftPath('swift://tenant/container/file_source')
+        p.copy('s3://bucket/file_dest.txt')
+        mock_stream_copy_objects.assert_called_once_with(
+            [(p, S3Path('s3://bucket/file_dest.txt'))])
+
+    def test_copy_object(self):
+        p = SwiftPath('swift://tenant/container/dir/file source.txt')
+        dest = p.copy_object('swift://tenant/other_container/file.txt')
+        self.assertEquals(dest, SwiftPath('swift://tenant/other_container/file.txt'))
+        self.mock_swift_conn.put_container.assert_called_once_with('other_container')
+        self.mock_swift_conn.put_object.assert_called_once_with(
+            'other_container', 'file.txt', None,
+            headers={'X-Copy-From': '/container/dir/file%20source.txt'},
+            query_string=None)
+
+    def test_copy_object_other_tenant(self):
+        p = SwiftPath('swift://tenant/container/file.txt')
+        p.copy_object('swift://other_tenant/container/file.txt')
+        self.mock_swift_conn.put_object.assert_called_once_with(
+            'container', 'file.txt', None,
+            headers={'X-Copy-From': '/container/file.txt', 'X-Copy-From-Account': 'tenant'},
+            query_string=None)
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_copy_object_retry(self, mock_sleep):
+        self.mock_swift_conn.put_object.side_effect = [
+            ClientException('unavailable', http_status=503),
+            'etag'
+        ]
+        p = SwiftPath('swift://tenant/container/file.txt')
+        p.copy_object('swift://tenant/container/file2.txt', num_retries=1)
+        self.assertEquals(self.mock_swift_conn.put_object.call_count, 2)
+
+    @mock.patch('random.uniform', autospec=True, return_value=1.5)
+    @mock.patch('time.sleep', autospec=True)
+    def test_copy_object_retry_jitter(self, mock_sleep, mock_uniform):
+        self.mock_swift_conn.put_object.side_effect = [
+            ClientException('unavailable', http_status=503),
+            'etag'
+        ]
+        p = SwiftPath('swift://tenant/container/file.txt')
+        with settings.use({'swift': {'retry_jitter': 0.5}}):
+            p.copy_object('swift://tenant/container/file2.txt', num_retries=1,
+                          initial_retry_sleep=2)
+        mock_uniform.assert_called_once_with(0.5, 1.5)
+        mock_sleep.assert_called_once_with(3.0)
+
+    @mock.patch('time.time', autospec=True, return_value=1.0)
+    def test_copy_static_large_object(self, mock_time):
+        self.mock_swift_conn.head_object.return_value = {
+            'x-static-large-object': 'True',
+            'content-type': 'text/plain',
+            'x-object-meta-owner': 'me'
+        }
+        self.mock_swift_conn.get_object.return_value = ({}, json.dumps([
+            {'name': '/container_segments/file.txt/1', 'bytes': 5, 'hash': 'a'},
+            {'name': '/container_segments/file.txt/2', 'bytes': 3, 'hash': 'b'}
+        ]).encode('utf-8'))
+        self.mock_swift_conn.put_object.side_effect = lambda container, obj, contents, **kwargs: (
+            'etag-%s' % obj[-1])
+        p = SwiftPath('swift://tenant/container/file.txt')
+        with settings.use({'swift:copy': {'object_threads': 2}}):
+            p.copy_object('swift://tenant/other/file2.txt')
+
+        put_calls = self.mock_swift_conn.put_object.call_args_list
+        # Segments are copied instead of being shared with the source
+        self.assertEquals(sorted(put_calls[:2]), [
+            mock.call('.segments_other', 'file2.txt/slo/1.000000/00000000', None,
+                      headers={'X-Copy-From': '/container_segments/file.txt/1'},
+                      query_string=None),
+            mock.call('.segments_other', 'file2.txt/slo/1.000000/00000001', None,
+                      headers={'X-Copy-From': '/container_segments/file.txt/2'},
+                      query_string=None)
+        ])
+        self.assertEquals(put_calls[2], mock.call(
+            'other', 'file2.txt', mock.ANY, etag=None,
+            headers={'Content-Type': 'text/plain', 'x-object-meta-owner': 'me'},
+            query_string='multipart-manifest=put'))
+        self.assertEquals(json.loads(put_calls[2][0][2]), [
+            {'path': '/.segments_other/file2.txt/slo/1.000000/00000000', 'etag': 'etag-0',
+             'size_bytes': 5},
+            {'path': '/.segments_other/file2.txt/slo/1.000000/00000001', 'etag': 'etag-1',
+             'size_bytes': 3}
+        ])
+        self.mock_swift_conn.put_container.assert_has_calls([mock.call('other'),
+                                                             mock.call('.segments_other')])
+
+    @mock.patch('time.time', autospec=True, return_value=1.0)
+    def test_copy_dynamic_large_object_other_tenant(self, mock_time):
+        self.mock_swift_conn.head_object.return_value = {
+            'x-object-manifest': 'container_segments/file.txt/'
+        }
+        self.mock_swift_conn.get_container.return_value = ({}, [
+            {'name': 'file.txt/1', 'bytes': 5, 'hash': 'a'}
+        ])
+        p = SwiftPath('swift://tenant/container/file.txt')
+        p.copy_object('swift://other_tenant/other/file2.txt')
+
+        self.assertEquals(self.mock_swift_conn.put_object.call_args_list, [
+            mock.call('.segments_other', 'file2.txt/dlo/1.000000/00000000', None,
+                      headers={'X-Copy-From': '/container_segments/file.txt/1',
+                               'X-Copy-From-Account': 'tenant'},
+                      query_string=None),
+            mock.call('other', 'file2.txt', b'', etag=None, query_string=None,
+                      headers={'X-Object-Manifest': '.segments_other/file2.txt/dlo/1.000000/'})
+        ])
+
+    def test_copy_object_invalid(self):
+        p = SwiftPath('swift://tenant/container/file.txt')
+        with self.assertRaisesRegexp(ValueError, 'must be swift objects'):
+            p.copy_object('swift://tenant/container')
 
 
 class TestCopytree(SwiftTestCase):
+    def setUp(self):
+        super(TestCopytree, self).setUp()
+        self.mock_swift_conn.head_object.return_value = {}
+
     @mock.patch.object(swift.SwiftPath, 'download', autospec=True)
     def test_copytree_posix_destination(self, mock_download):
         p = SwiftPath('swift://tenant/container')
@@ -1975,9 +3202,49 @@ class TestCopytree(SwiftTestCase):
             use_manifest=False)
 
     def test_copytree_swift_destination(self):
+        self.mock_swift_conn.get_container.return_value = ({}, [
+            {'name': 'dir/a.txt'},
+            {'name': 'dir/b/c.txt'}
+        ])
+        p = SwiftPath('swift://tenant/container/dir')
+        with settings.use({'swift:copy': {'object_threads': 2}}):
+            p.copytree('swift://tenant/container2/dir2')
+
+        self.mock_swift_conn.get_container.assert_called_once_with(
+            'container', full_listing=True, limit=None, prefix='dir/')
+        self.mock_swift_conn.put_container.assert_called_once_with('container2')
+        self.assertEquals(sorted(self.mock_swift_conn.put_object.call_args_list), [
+            mock.call('container2', 'dir2/a.txt', None,
+                      headers={'X-Copy-From': '/container/dir/a.txt'},
+                      query_string=None),
+            mock.call('container2', 'dir2/b/c.txt', None,
+                      headers={'X-Copy-From': '/container/dir/b/c.txt'},
+                      query_string=None),
+        ])
+
+    def test_copytree_swift_destination_condition(self):
+        self.mock_swift_conn.get_container.return_value = ({}, [{'name': 'a.txt'}])
         p = SwiftPath('swift://tenant/container')
-        with self.assertRaises(ValueError):
-            p.copytree('swift://swift/path')
+        with self.assertRaises(swift.ConditionNotMetError):
+            p.copytree('swift://tenant/container2', condition=lambda results: len(results) == 2)
+
+    @mock.patch('stor.obs.stream_copy_objects', autospec=True)
+    def test_copytree_s3_destination(self, mock_stream_copy_objects):
+        self.mock_swift_conn.get_container.return_value = ({}, [
+            {'name': 'dir/a.txt'},
+            {'name': 'dir/b', 'content_type': 'application/directory'},
+        ])
+        mock_stream_copy_objects.return_value = [S3Path('s3://bucket/path/a.txt')]
+        p = SwiftPath('swift://tenant/container/dir')
+        p.copytree('s3://bucket/path')
+        mock_stream_copy_objects.assert_called_once_with(
+            [(SwiftPath('swift://tenant/container/dir/a.txt'), S3Path('s3://bucket/path/a.txt'))])
+
+    def test_copytree_swift_empty_source(self):
+        self.mock_swift_conn.get_container.return_value = ({}, [])
+        p = SwiftPath('swift://tenant/container/dir')
+        self.assertEquals(p.copy_objects('swift://tenant/container2/'), [])
+        self.assertFalse(self.mock_swift_conn.put_container.called)
 
     @mock.patch('os.path', ntpath)
     def test_copytree_windows_destination(self):
@@ -2235,6 +3502,45 @@ class TestStat(SwiftTestCase):
         self.assertEqual(SwiftPath('swift://A/C/d.txt').getsize(), 0)
 
 
+class TestStatObjects(SwiftTestCase):
+    def test_stat_objects(self):
+        self.mock_swift.stat.return_value = [
+            _make_stat_response({
+                'action': 'stat_object',
+                'object': 'a.txt',
+                'items': [('Content Length', '10')],
+                'headers': {'content-length': '10'}
+            })[0],
+            {
+                'action': 'stat_object',
+                'object': 'b.txt',
+                'success': False,
+                'error': _service_404_exception()
+            }
+        ]
+        swift_p = SwiftPath('swift://tenant/container')
+        res = swift_p._stat_objects(['a.txt', 'b.txt'])
+        self.assertEquals(res, {
+            'a.txt': {'Content-Length': '10', 'headers': {'content-length': '10'}},
+            'b.txt': None
+        })
+        self.mock_swift.stat.assert_called_once_with(container='container',
+                                                     objects=['a.txt', 'b.txt'])
+        self.assertEquals(self.mock_get_swift_service.call_args[1],
+                          {'object_dd_threads': 10})
+
+    def test_stat_objects_error(self):
+        self.mock_swift.stat.return_value = [{
+            'action': 'stat_object',
+            'object': 'a.txt',
+            'success': False,
+            'error': ClientException('unauthorized', http_status=403)
+        }]
+        swift_p = SwiftPath('swift://tenant/container')
+        with self.assertRaises(swift.UnauthorizedError):
+            swift_p._stat_objects(['a.txt'])
+
+
 class TestRemove(SwiftTestCase):
     def test_invalid_remove(self):
         # Remove()s must happen on a resource of a container
@@ -2268,6 +3574,8 @@ class TestRmtree(SwiftTestCase):
         # check at the end of rmtree for no results passes
         mock_list = self.mock_swift_conn.get_container
         mock_list.return_value = ({}, [])
+        # Bulk deletes are tested in TestRmtreeBulkDelete
+        self.mock_swift_conn.get_capabilities.return_value = {}
 
     def test_w_only_tenant(self):
         self.mock_swift.delete.return_value = {}
@@ -2390,6 +3698,175 @@ class TestRmtree(SwiftTestCase):
         ])
 
 
+class TestRmtreeBulkDelete(SwiftTestCase):
+    def setUp(self):
+        super(TestRmtreeBulkDelete, self).setUp()
+        self.mock_swift_conn.get_capabilities.return_value = {
+            'bulk_delete': {'max_deletes_per_request': 2}
+        }
+        self.mock_swift_conn.post_account.return_value = (
+            {'content-type': 'application/json'},
+            b'{"Response Status": "200 OK", "Errors": [], "Number Deleted": 2}')
+        # The container has no segment containers
+        self.mock_swift_conn.head_container.side_effect = ClientException('not found',
+                                                                          http_status=404)
+
+    def test_w_container_and_resource(self):
+        self.mock_swift_conn.get_container.side_effect = [
+            ({}, [{'name': 'dir/r1'}, {'name': 'dir/r 2'}]),
+            ({}, [{'name': 'dir/r3'}]),
+            ({}, []),
+            # Verification listing
+            ({}, []),
+        ]
+        swift_p = SwiftPath('swift://tenant/container/dir')
+        results = swift_p.rmtree()
+
+        self.assertEquals(sorted(r['objects'] for r in results),
+                          [['dir/r1', 'dir/r 2'], ['dir/r3']])
+        self.assertEquals(self.mock_swift_conn.get_container.call_args_list, [
+            mock.call('container', prefix='dir/', marker=None, limit=2),
+            mock.call('container', prefix='dir/', marker='dir/r 2', limit=2),
+            mock.call('container', prefix='dir/', marker='dir/r3', limit=2),
+            mock.call('container', full_listing=True, limit=None, prefix='dir/'),
+        ])
+        self.assertEquals(sorted(c[1]['data'] for c in
+                                 self.mock_swift_conn.post_account.call_args_list),
+                          [b'/container/dir/r1\n/container/dir/r%202\n',
+                           b'/container/dir/r3\n'])
+        self.assertEquals(self.mock_swift_conn.post_account.call_args[1]['query_string'],
+                          'bulk-delete')
+        self.assertFalse(self.mock_swift.delete.called)
+
+    def test_w_only_container(self):
+        self.mock_swift.delete.return_value = {}
+        listings = {
+            'container': [({}, [{'name': 'r1'}]), ({}, []), ({}, [])],
+            'container_segments': [({}, [{'name': 's1'}, {'name': 's2'}]), ({}, [])]
+        }
+
+        def get_container(container, **kwargs):
+            if not listings.get(container):
+                raise ClientException('not found', http_status=404)
+            return listings[container].pop(0)
+        self.mock_swift_conn.get_container.side_effect = get_container
+        swift_p = SwiftPath('swift://tenant/container')
+        swift_p.rmtree()
+
+        # The objects of segment containers are also deleted with bulk deletes
+        post_calls = self.mock_swift_conn.post_account.call_args_list
+        self.assertEquals([c[1]['data'] for c in post_calls], [
+            b'/container/r1\n',
+            b'/container_segments/s1\n/container_segments/s2\n'
+        ])
+        # The emptied container and segment containers are deleted by swiftclient
+        self.assertEquals(self.mock_swift.delete.call_args_list,
+                          [mock.call('container'),
+                           mock.call('container_segments'),
+                           mock.call('.segments_container'),
+                           mock.call('container+segments')])
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_bulk_delete_errors(self, mock_sleep):
+        self.mock_swift_conn.get_container.return_value = ({}, [{'name': 'dir/r1'}])
+        self.mock_swift_conn.post_account.return_value = (
+            {'content-type': 'application/json'},
+            b'{"Response Status": "400 Bad Request", '
+            b'"Errors": [["/container/dir/r1", "503 Service Unavailable"]]}')
+        swift_p = SwiftPath('swift://tenant/container/dir')
+        with self.assertRaises(swift.UnavailableError):
+            swift_p.rmtree(num_retries=1)
+
+    def test_w_segment_container(self):
+        # Objects are deleted one at a time so that segments are deleted with them
+        self.mock_swift_conn.head_container.side_effect = [
+            ClientException('not found', http_status=404),
+            {}
+        ]
+        self.mock_swift.delete.return_value = {}
+        self.mock_swift_conn.get_container.side_effect = [
+            ({}, [{'name': 'dir/r1'}]),
+            ({}, [])
+        ]
+        swift_p = SwiftPath('swift://tenant/container/dir')
+        swift_p.rmtree()
+
+        self.mock_swift.delete.assert_called_once_with('container', ['dir/r1'])
+        self.assertEquals(self.mock_swift_conn.head_container.call_args_list,
+                          [mock.call('container_segments'), mock.call('.segments_container')])
+        self.assertFalse(self.mock_swift_conn.post_account.called)
+
+    def test_bulk_delete_disabled(self):
+        self.mock_swift.delete.return_value = {}
+        self.mock_swift_conn.get_container.side_effect = [
+            ({}, [{'name': 'dir/r1'}]),
+            ({}, [])
+        ]
+        swift_p = SwiftPath('swift://tenant/container/dir')
+        with settings.use({'swift:delete': {'bulk_delete': False}}):
+            swift_p.rmtree()
+
+        self.mock_swift.delete.assert_called_once_with('container', ['dir/r1'])
+        self.assertFalse(self.mock_swift_conn.get_capabilities.called)
+        self.assertFalse(self.mock_swift_conn.post_account.called)
+
+    def test_capabilities_cached(self):
+        self.mock_swift_conn.get_container.return_value = ({}, [])
+        SwiftPath('swift://tenant/container/dir').rmtree()
+        SwiftPath('swift://tenant/container/dir2').rmtree()
+        self.mock_swift_conn.get_capabilities.assert_called_once_with()
+
+    def test_capabilities_error_not_cached(self):
+        self.mock_swift_conn.get_capabilities.side_effect = [
+            ClientException('unavailable', http_status=503),
+            {'bulk_delete': {'max_deletes_per_request': 2}}
+        ]
+        self.mock_swift.delete.return_value = {}
+        self.mock_swift_conn.get_container.return_value = ({}, [])
+        SwiftPath('swift://tenant/container/dir').rmtree()
+        # Objects are deleted one at a time only while the capabilities are unknown
+        self.assertTrue(self.mock_swift.delete.called)
+        self.assertFalse(self.mock_swift_conn.post_account.called)
+
+        SwiftPath('swift://tenant/container/dir').rmtree()
+        self.assertEquals(self.mock_swift_conn.get_capabilities.call_count, 2)
+        self.assertEquals(self.mock_swift_conn.get_container.call_args_list[-2],
+                          mock.call('container', prefix='dir/', marker=None, limit=2))
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_listing_retried(self, mock_sleep):
+        self.mock_swift_conn.get_container.side_effect = [
+            ClientException('unavailable', http_status=503),
+            ({}, [{'name': 'dir/r1'}]),
+            ({}, []),
+            ({}, []),
+        ]
+        swift_p = SwiftPath('swift://tenant/container/dir')
+        # The listing is retried while rmtree itself is not
+        with settings.use({'swift': {'num_retries': 1}}):
+            results = swift_p.rmtree(num_retries=0)
+
+        self.assertEquals([r['objects'] for r in results], [['dir/r1']])
+        self.assertEquals(len(mock_sleep.call_args_list), 1)
+
+    def test_no_bulk_delete_middleware(self):
+        self.mock_swift_conn.get_capabilities.side_effect = ClientException('not found',
+                                                                            http_status=404)
+        self.mock_swift.delete.return_value = {}
+        self.mock_swift_conn.get_container.side_effect = [
+            ({}, [{'name': 'dir/r1'}]),
+            ({}, [])
+        ]
+        swift_p = SwiftPath('swift://tenant/container/dir')
+        swift_p.rmtree()
+
+        self.mock_swift.delete.assert_called_once_with('container', ['dir/r1'])
+        self.assertFalse(self.mock_swift_conn.post_account.called)
+        # Clusters without the info endpoint are cached
+        self.assertEquals(swift_p._get_capabilities(), {})
+        self.mock_swift_conn.get_capabilities.assert_called_once_with()
+
+
 class TestRemoveContainer(SwiftTestCase):
     def test_w_only_tenant(self):
         self.mock_swift.delete_container.return_value = None
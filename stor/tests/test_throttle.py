@@ -0,0 +1,103 @@
+import unittest
+
+import mock
+
+from stor import settings
+from stor import throttle
+
+
+@mock.patch('time.sleep', autospec=True)
+@mock.patch('time.time', autospec=True, return_value=100)
+class TestTokenBucket(unittest.TestCase):
+    def test_consume(self, mock_time, mock_sleep):
+        bucket = throttle.TokenBucket(10)
+        bucket.consume(5)
+        bucket.consume(5)
+        self.assertFalse(mock_sleep.called)
+
+        # Consumers take tokens before they are available and wait for them
+        bucket.consume(5)
+        mock_sleep.assert_called_once_with(0.5)
+        bucket.consume(10)
+        mock_sleep.assert_called_with(1.5)
+
+    def test_refill(self, mock_time, mock_sleep):
+        bucket = throttle.TokenBucket(10, capacity=20)
+        bucket.consume(20)
+        mock_time.return_value = 101
+        bucket.consume(10)
+        self.assertFalse(mock_sleep.called)
+
+        # The bucket holds at most its capacity after it is idle
+        mock_time.return_value = 200
+        bucket.consume(30)
+        mock_sleep.assert_called_once_with(1.0)
+
+    def test_return_tokens(self, mock_time, mock_sleep):
+        bucket = throttle.TokenBucket(10)
+        bucket.consume(15)
+        mock_sleep.assert_called_once_with(0.5)
+        bucket.consume(-10)
+        bucket.consume(5)
+        self.assertEquals(mock_sleep.call_count, 1)
+
+        # Returned tokens do not exceed the capacity
+        bucket.consume(-100)
+        bucket.consume(15)
+        mock_sleep.assert_called_with(0.5)
+
+
+class TestLimiter(unittest.TestCase):
+    def test_no_limits(self):
+        limiter = throttle.Limiter()
+        limiter.consume_bytes(100)
+        limiter.consume_request()
+        self.assertIsNone(limiter.bytes)
+        self.assertIsNone(limiter.requests)
+
+    def test_consume(self):
+        limiter = throttle.Limiter(bytes_per_second=1000, requests_per_second=2)
+        with mock.patch.object(limiter.bytes, 'consume', autospec=True) as mock_bytes:
+            limiter.consume_bytes(100)
+            # Transfers that read data again return the bytes
+            limiter.consume_bytes(-100)
+            limiter.consume_bytes(0)
+            self.assertEquals(mock_bytes.call_args_list, [mock.call(100), mock.call(-100)])
+        with mock.patch.object(limiter.requests, 'consume', autospec=True) as mock_requests:
+            limiter.consume_request()
+            mock_requests.assert_called_once_with()
+
+
+class TestGetLimiter(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(throttle._limiters, clear=True)
+        self.addCleanup(patcher.stop)
+        patcher.start()
+
+    def test_no_limits(self):
+        self.assertIsNone(throttle.get_limiter('s3', 'upload'))
+        self.assertIsNone(throttle.get_limiter('swift', 'download'))
+
+    def test_get_limiter(self):
+        with settings.use({'s3:upload': {'max_bytes_per_second': '2M'}}):
+            limiter = throttle.get_limiter('s3', 'upload')
+            self.assertEquals(limiter.bytes.rate, 2 * 1024 * 1024)
+            self.assertIsNone(limiter.requests)
+            # Limiters are shared
+            self.assertIs(throttle.get_limiter('s3', 'upload'), limiter)
+            self.assertIsNone(throttle.get_limiter('s3', 'download'))
+
+        with settings.use({'s3:upload': {'max_bytes_per_second': '2M',
+                                         'max_requests_per_second': 5}}):
+            new_limiter = throttle.get_limiter('s3', 'upload')
+            self.assertIsNot(new_limiter, limiter)
+            self.assertEquals(new_limiter.requests.rate, 5)
+
+    def test_throttle_callback(self):
+        limiter = mock.Mock()
+        callback = mock.Mock()
+        throttle.throttle_callback(limiter, callback)(10)
+        limiter.consume_bytes.assert_called_once_with(10)
+        callback.assert_called_once_with(10)
+        throttle.throttle_callback(limiter)(5)
+        limiter.consume_bytes.assert_called_with(5)
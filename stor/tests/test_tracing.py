@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+import unittest
+
+from stor import instrumentation
+from stor import NamedTemporaryDirectory
+from stor import tracing
+
+
+class TestTracer(unittest.TestCase):
+    def setUp(self):
+        tmp_d = NamedTemporaryDirectory()
+        self.tmp_d = tmp_d.__enter__()
+        self.addCleanup(tmp_d.__exit__, None, None, None)
+
+    def test_use(self):
+        self.assertIsNone(tracing.get_tracer())
+        tracer = tracing.Tracer()
+        with tracing.use(tracer):
+            self.assertIs(tracing.get_tracer(), tracer)
+            with instrumentation.request('s3', 'get_object', 'bucket', 'key') as event:
+                event.bytes = 10
+                event.status = 200
+        self.assertIsNone(tracing.get_tracer())
+
+        span, = tracer.spans
+        self.assertEquals((span.name, span.category, span.thread, span.bytes, span.retries),
+                          ('s3://bucket/key', 'request', threading.current_thread().name, 10, 0))
+        self.assertEquals(span.args, {'operation': 'get_object', 'status': 200})
+        self.assertGreaterEqual(span.end, span.start)
+
+    def test_request_error(self):
+        tracer = tracing.Tracer()
+        with tracing.use(tracer):
+            with self.assertRaises(ValueError):
+                with instrumentation.request('swift', 'get_account', None):
+                    raise ValueError('error')
+        span, = tracer.spans
+        self.assertEquals(span.name, 'swift://')
+        self.assertEquals(span.args['error'], repr(ValueError('error')))
+
+    def test_write_json_lines(self):
+        tracer = tracing.Tracer()
+        tracer.add_span('s3://bucket/key', 'part', 1.0, 2.0, thread='thread', bytes=5,
+                        retries=1, part_number=1)
+        filename = os.path.join(self.tmp_d, 'trace.jsonl')
+        tracer.write(filename)
+        with open(filename) as fp:
+            lines = [json.loads(line) for line in fp]
+        self.assertEquals(lines, [{
+            'name': 's3://bucket/key',
+            'category': 'part',
+            'start': 1.0,
+            'end': 2.0,
+            'thread': 'thread',
+            'bytes': 5,
+            'retries': 1,
+            'args': {'part_number': 1}
+        }])
+
+    def test_write_chrome_trace(self):
+        tracer = tracing.Tracer()
+        tracer.add_span('obj1', 'object', 10.0, 12.0)
+        tracer.add_span('obj2', 'object', 11.0, 13.0, bytes=5)
+        tracer.add_span('obj3', 'object', 12.5, 14.0)
+        tracer.add_span('request', 'request', 10.5, 11.0, thread='thread', retries=2)
+        filename = os.path.join(self.tmp_d, 'trace.json')
+        tracer.write(filename)
+        with open(filename) as fp:
+            trace = json.load(fp)
+
+        self.assertEquals(trace['otherData'], {'start_time': 10.0})
+        events = trace['traceEvents']
+        threads = {e['tid']: e['args']['name'] for e in events if e['ph'] == 'M'}
+        spans = {e['name']: e for e in events if e['ph'] == 'X'}
+        # Overlapping spans without threads are laid out on separate rows
+        self.assertEquals(threads[spans['obj1']['tid']], 'concurrent 0')
+        self.assertEquals(threads[spans['obj2']['tid']], 'concurrent 1')
+        self.assertEquals(threads[spans['obj3']['tid']], 'concurrent 0')
+        self.assertEquals(threads[spans['request']['tid']], 'thread')
+        self.assertEquals((spans['obj2']['ts'], spans['obj2']['dur']), (1e6, 2e6))
+        self.assertEquals(spans['obj2']['args'], {'bytes': 5, 'retries': 0})
+        self.assertEquals(spans['request']['args'], {'bytes': None, 'retries': 2})
+        self.assertEquals(spans['request']['cat'], 'request')
+
+    def test_write_empty(self):
+        filename = os.path.join(self.tmp_d, 'trace.json')
+        tracing.Tracer().write(filename)
+        with open(filename) as fp:
+            self.assertEquals(json.load(fp)['traceEvents'], [])
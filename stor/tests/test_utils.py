@@ -1,11 +1,17 @@
 import errno
+import io
+import json
 import logging
 import mock
 import ntpath
 import os
 import stat
+import subprocess
+import sys
 import unittest
 
+from boto3.exceptions import S3UploadFailedError
+from swiftclient.exceptions import ClientException
 from testfixtures import LogCapture
 
 import stor
@@ -13,6 +19,10 @@ from stor import Path
 from stor.posix import PosixPath
 from stor.s3 import S3Path
 from stor.swift import SwiftPath
+from stor import retry
+from stor import settings
+from stor.test import S3TestMixin
+from stor.test import SwiftTestCase
 from stor.windows import WindowsPath
 from stor import utils
 
@@ -28,6 +38,83 @@ class TestBaseProgressLogger(unittest.TestCase):
                 l.add_result({})
             progress_log.check()
 
+    @mock.patch('time.time', autospec=True)
+    def test_progress_interval(self, mock_time):
+        mock_time.return_value = 1000
+        mb = 1024 * 1024
+        with LogCapture('progress') as progress_log:
+            with utils.BaseProgressLogger(logging.getLogger('progress'), total_objects=4,
+                                          total_bytes=40 * mb, progress_interval=10) as progress:
+                progress.add_bytes(5 * mb)
+                mock_time.return_value = 1005
+                progress.add_result({})
+                progress.add_bytes(5 * mb)
+                mock_time.return_value = 1010
+                progress.add_bytes(10 * mb)
+                mock_time.return_value = 1015
+                progress.add_result({})
+                mock_time.return_value = 1020
+                progress.add_result({})
+                progress.add_bytes(10 * mb)
+            progress_log.check(
+                ('progress', 'INFO', '0/4\t0:00:00\t0.00 MB\t0.00 MB/s'),
+                ('progress', 'INFO', '1/4\t0:00:10\t20.00 MB\t2.00 MB/s\tETA 0:00:10'),
+                ('progress', 'INFO', '3/4\t0:00:20\t20.00 MB\t1.00 MB/s\tETA 0:00:20'),
+                ('progress', 'INFO', '3/4\t0:00:20\t30.00 MB\t1.50 MB/s'),
+            )
+
+    @mock.patch('time.time', autospec=True)
+    def test_eta_from_objects(self, mock_time):
+        mock_time.return_value = 0
+        progress = utils.BaseProgressLogger(logging.getLogger('progress'), total_objects=4,
+                                            progress_interval=10)
+        self.assertIsNone(progress.get_progress().eta)
+        mock_time.return_value = 10
+        progress.add_result({})
+        report = progress.get_progress()
+        self.assertEquals(report.eta, 30)
+        self.assertIsNone(report.total_bytes)
+        self.assertFalse(report.finished)
+
+    def test_result_interval(self):
+        with LogCapture('progress') as progress_log:
+            with utils.BaseProgressLogger(logging.getLogger('progress'), result_interval=2,
+                                          progress_interval=3600) as progress:
+                for i in range(5):
+                    progress.add_result({})
+        self.assertEquals([r.getMessage().split('\t')[0] for r in progress_log.records],
+                          ['0', '2', '4', '5'])
+
+    def test_add_bytes_threaded(self):
+        progress = utils.BaseProgressLogger(logging.getLogger('progress'), progress_interval=0)
+        list(utils.threaded_imap_unordered(progress.add_bytes, [1] * 1000, 8))
+        self.assertEquals(progress.num_bytes, 1000)
+
+
+class TestThreadedImapUnordered(unittest.TestCase):
+    def test_settings_of_calling_thread(self):
+        def iter_items():
+            for i in range(3):
+                yield settings.get()['stor']['batch_threads']
+
+        def get_setting(item):
+            return item, settings.get()['stor']['batch_threads']
+
+        with settings.use({'stor': {'batch_threads': 3}}):
+            results = list(utils.threaded_imap_unordered(get_setting, iter_items(), 2))
+        self.assertEquals(results, [(3, 3)] * 3)
+
+    def test_deadline_of_calling_thread(self):
+        def get_remaining_time(item):
+            return retry.get_remaining_time()
+
+        def run():
+            return list(utils.threaded_imap_unordered(get_remaining_time, range(3), 2))
+
+        with mock.patch('time.time', autospec=True, return_value=0):
+            self.assertEquals(retry.RetryPolicy(deadline=10).call(run), [10] * 3)
+            self.assertEquals(run(), [None] * 3)
+
 
 class TestPath(unittest.TestCase):
     def test_swift_returned(self):
@@ -47,6 +134,60 @@ class TestPath(unittest.TestCase):
         p = stor.Path('s3://my/s3/path')
         self.assertTrue(isinstance(p, S3Path))
 
+    def test_unknown_drive_posix_path_returned(self):
+        p = Path('gs://my/path')
+        self.assertEquals(type(p), PosixPath)
+        p = Path('my/dir://path')
+        self.assertEquals(type(p), PosixPath)
+
+    def test_from_trusted(self):
+        p = S3Path._from_trusted('s3://bucket/key')
+        self.assertEquals(type(p), S3Path)
+        self.assertEquals(p, S3Path('s3://bucket/key'))
+        self.assertEquals(p.bucket, 'bucket')
+
+
+class TestLazyImports(unittest.TestCase):
+    def get_imported_modules(self, code):
+        output = subprocess.check_output([sys.executable, '-c',
+                                          code + '; import sys; print(sorted(sys.modules))'])
+        return output.decode()
+
+    def test_import_stor(self):
+        modules = self.get_imported_modules('import stor')
+        for module in ('swiftclient', 'boto3', 'botocore', 'pkg_resources'):
+            self.assertNotIn("'%s'" % module, modules)
+
+    def test_s3_path_wo_swiftclient(self):
+        modules = self.get_imported_modules("import stor; stor.Path('s3://bucket/key')")
+        self.assertIn("'boto3'", modules)
+        self.assertNotIn("'swiftclient'", modules)
+
+
+class TestCachedProperty(unittest.TestCase):
+    def test_computed_once(self):
+        compute = mock.Mock(return_value='value')
+
+        class Cached(object):
+            @utils.CachedProperty
+            def prop(self):
+                """The property"""
+                return compute()
+
+        obj = Cached()
+        self.assertEquals(obj.prop, 'value')
+        self.assertEquals(obj.prop, 'value')
+        compute.assert_called_once_with()
+        self.assertEquals(Cached.prop.__doc__, 'The property')
+
+    def test_obs_path_components_cached(self):
+        p = SwiftPath('swift://tenant/container/dir/obj')
+        self.assertIs(p.resource, p.resource)
+        self.assertEquals(p.resource, 'dir/obj')
+        self.assertEquals(type(p.resource), PosixPath)
+        self.assertEquals(p.__dict__['resource'], 'dir/obj')
+        self.assertEquals((p.tenant, p.container), ('tenant', 'container'))
+
 
 class TestIsSwiftPath(unittest.TestCase):
     def test_true(self):
@@ -160,6 +301,80 @@ class TestWalkFilesAndDirs(unittest.TestCase):
             self.assert_(utils.walk_files_and_dirs([self.swift_dir]))
 
 
+class TestScanTree(unittest.TestCase):
+    def make_tree(self, tmp_dir):
+        (tmp_dir / 'empty').makedirs_p()
+        (tmp_dir / 'dir' / 'subdir').makedirs_p()
+        with open(tmp_dir / 'file', 'w') as fp:
+            fp.write('a')
+        with open(tmp_dir / 'dir' / 'subdir' / 'file', 'w') as fp:
+            fp.write('abc')
+        os.symlink(tmp_dir / 'dir', tmp_dir / 'dir_link')
+        os.symlink(tmp_dir / 'missing', tmp_dir / 'broken_link')
+
+    def test_scan_tree(self):
+        with utils.NamedTemporaryDirectory() as tmp_dir:
+            self.make_tree(tmp_dir)
+            for num_threads in (1, 4):
+                missing_files = []
+                entries = {
+                    entry.path: entry
+                    for entry in utils.scan_tree(tmp_dir, num_threads=num_threads,
+                                                 missing_files=missing_files)
+                }
+                # Symlinks to directories are not followed
+                self.assertEquals(set(entries), set([
+                    tmp_dir / 'empty',
+                    tmp_dir / 'file',
+                    tmp_dir / 'dir' / 'subdir' / 'file',
+                ]))
+                self.assertEquals(missing_files, [tmp_dir / 'broken_link'])
+
+                entry = entries[tmp_dir / 'dir' / 'subdir' / 'file']
+                self.assertEquals(entry.size, 3)
+                self.assertEquals(entry.mtime, os.stat(entry.path).st_mtime)
+                self.assertFalse(entry.is_dir)
+                self.assertEquals(entries[tmp_dir / 'empty'],
+                                  utils.ScanEntry(tmp_dir / 'empty', 0, None, True))
+
+    def test_follow_symlinks_and_errors(self):
+        with utils.NamedTemporaryDirectory() as tmp_dir:
+            self.make_tree(tmp_dir)
+            for num_threads in (1, 4):
+                errors = []
+                entries = set(entry.path for entry in utils.scan_tree(
+                    tmp_dir, num_threads=num_threads, follow_symlinks=True, errors=errors))
+                self.assertEquals(entries, set([
+                    tmp_dir / 'empty',
+                    tmp_dir / 'file',
+                    tmp_dir / 'dir' / 'subdir' / 'file',
+                    tmp_dir / 'dir_link' / 'subdir' / 'file',
+                ]))
+                self.assertEquals(errors, [])
+
+                list(utils.scan_tree(tmp_dir / 'missing', num_threads=num_threads,
+                                     errors=errors))
+                self.assertEquals([e.errno for e in errors], [errno.ENOENT])
+
+    def test_posix_list_and_walkfiles(self):
+        with utils.NamedTemporaryDirectory() as tmp_dir:
+            self.make_tree(tmp_dir)
+            self.assertEquals(set(tmp_dir.list()), set([
+                tmp_dir / 'empty',
+                tmp_dir / 'file',
+                tmp_dir / 'dir' / 'subdir' / 'file',
+            ]))
+            files = list(tmp_dir.walkfiles())
+            self.assertEquals(set(files), set([
+                tmp_dir / 'file',
+                tmp_dir / 'dir' / 'subdir' / 'file',
+            ]))
+            self.assertTrue(all(type(f) is PosixPath for f in files))
+            self.assertEquals(list((tmp_dir / 'dir').walkfiles('f*')),
+                              [tmp_dir / 'dir' / 'subdir' / 'file'])
+            self.assertEquals(list((tmp_dir / 'file').walkfiles()), [tmp_dir / 'file'])
+
+
 class TestNamedTemporaryDirectory(unittest.TestCase):
     def test_w_chdir(self):
         tmp_d = None
@@ -460,3 +675,318 @@ class TestIsWriteableS3(unittest.TestCase):
         self.mock_copy.side_effect = stor.exceptions.FailedUploadError('foo')
         self.assertFalse(utils.is_writeable('s3://stor-test/foo/bar'))
         self.assertFalse(self.mock_remove.called)
+
+
+class TestExistsMany(unittest.TestCase):
+    def setUp(self):
+        super(TestExistsMany, self).setUp()
+
+        mock_list_patcher = mock.patch('stor.swift.SwiftPath.list', autospec=True)
+        self.mock_list = mock_list_patcher.start()
+        self.addCleanup(mock_list_patcher.stop)
+
+        mock_exists_patcher = mock.patch('stor.s3.S3Path.exists', autospec=True)
+        self.mock_exists = mock_exists_patcher.start()
+        self.addCleanup(mock_exists_patcher.stop)
+
+        mock_swift_exists_patcher = mock.patch('stor.swift.SwiftPath.exists', autospec=True)
+        self.mock_swift_exists = mock_swift_exists_patcher.start()
+        self.addCleanup(mock_swift_exists_patcher.stop)
+
+        threshold_patcher = mock.patch.object(utils, 'EXISTS_MANY_LISTING_THRESHOLD', 2)
+        threshold_patcher.start()
+        self.addCleanup(threshold_patcher.stop)
+
+    def test_grouped_by_directory(self):
+        self.mock_list.return_value = [
+            SwiftPath('swift://tenant/container/dir/a.txt'),
+            SwiftPath('swift://tenant/container/dir/sub/c.txt'),
+            SwiftPath('swift://tenant/container/dir/empty/'),
+        ]
+        results = stor.exists_many([
+            'swift://tenant/container/dir/a.txt',
+            'swift://tenant/container/dir/b.txt',
+            'swift://tenant/container/dir/sub',
+            'swift://tenant/container/dir/sub/',
+            'swift://tenant/container/dir/empty',
+            'swift://tenant/container/dir/su',
+        ])
+        self.assertEquals(results, {
+            'swift://tenant/container/dir/a.txt': True,
+            'swift://tenant/container/dir/b.txt': False,
+            'swift://tenant/container/dir/sub': True,
+            'swift://tenant/container/dir/sub/': True,
+            'swift://tenant/container/dir/empty': True,
+            'swift://tenant/container/dir/su': False,
+        })
+        # Only one listing is performed with the common prefix of the paths
+        self.mock_list.assert_called_once_with(SwiftPath('swift://tenant/container/dir/'))
+        self.assertFalse(self.mock_swift_exists.called)
+
+    def test_missing_container(self):
+        self.mock_list.side_effect = stor.exceptions.NotFoundError('not found')
+        results = stor.exists_many([
+            'swift://tenant/container/dir/a.txt',
+            'swift://tenant/container/dir/b.txt',
+        ])
+        self.assertEquals(results, {
+            'swift://tenant/container/dir/a.txt': False,
+            'swift://tenant/container/dir/b.txt': False,
+        })
+
+    def test_small_groups_use_exists(self):
+        self.mock_list.return_value = [
+            SwiftPath('swift://tenant/container/dir1/a.txt'),
+            SwiftPath('swift://tenant/container/dir1/b.txt'),
+        ]
+        self.mock_swift_exists.side_effect = lambda p: p.endswith('c.txt')
+        results = stor.exists_many([
+            'swift://tenant/container/dir1/a.txt',
+            'swift://tenant/container/dir1/b.txt',
+            'swift://tenant/container/dir2/c.txt',
+            'swift://tenant/container/dir3/d.txt',
+        ])
+        self.assertEquals(results, {
+            'swift://tenant/container/dir1/a.txt': True,
+            'swift://tenant/container/dir1/b.txt': True,
+            'swift://tenant/container/dir2/c.txt': True,
+            'swift://tenant/container/dir3/d.txt': False,
+        })
+        # Only the directory with enough paths is listed
+        self.mock_list.assert_called_once_with(SwiftPath('swift://tenant/container/dir1/'))
+        self.assertEquals(self.mock_swift_exists.call_count, 2)
+
+    def test_top_level_paths_use_exists(self):
+        self.mock_swift_exists.side_effect = lambda p: p.endswith('a.txt')
+        results = stor.exists_many([
+            'swift://tenant/container/a.txt',
+            'swift://tenant/container/b.txt',
+            'swift://tenant/container/c.txt',
+        ])
+        self.assertEquals(results, {
+            'swift://tenant/container/a.txt': True,
+            'swift://tenant/container/b.txt': False,
+            'swift://tenant/container/c.txt': False,
+        })
+        # Containers are never listed as a whole
+        self.assertFalse(self.mock_list.called)
+        self.assertEquals(self.mock_swift_exists.call_count, 3)
+
+    def test_single_paths_use_exists(self):
+        self.mock_exists.side_effect = lambda p: p == 's3://bucket1/a.txt'
+        results = stor.exists_many(['s3://bucket1/a.txt', 's3://bucket2/b.txt'])
+        self.assertEquals(results, {
+            's3://bucket1/a.txt': True,
+            's3://bucket2/b.txt': False,
+        })
+        self.assertEquals(self.mock_exists.call_count, 2)
+        self.assertFalse(self.mock_list.called)
+
+    def test_posix_paths(self):
+        with utils.NamedTemporaryDirectory() as tmp_d:
+            existing = Path(tmp_d) / 'existing.txt'
+            open(existing, 'w').close()
+            missing = Path(tmp_d) / 'missing.txt'
+            self.assertEquals(stor.exists_many([existing, missing]),
+                              {existing: True, missing: False})
+
+
+class TestStatMany(unittest.TestCase):
+    def setUp(self):
+        super(TestStatMany, self).setUp()
+
+        mock_stat_objects_patcher = mock.patch('stor.swift.SwiftPath._stat_objects',
+                                               autospec=True)
+        self.mock_stat_objects = mock_stat_objects_patcher.start()
+        self.addCleanup(mock_stat_objects_patcher.stop)
+
+        mock_stat_patcher = mock.patch('stor.s3.S3Path.stat', autospec=True)
+        self.mock_stat = mock_stat_patcher.start()
+        self.addCleanup(mock_stat_patcher.stop)
+
+    def test_swift_grouped_by_container(self):
+        self.mock_stat_objects.return_value = {'a.txt': {'Content-Length': '1'}, 'b.txt': None}
+        results = stor.stat_many([
+            'swift://tenant/container/a.txt',
+            'swift://tenant/container/b.txt',
+        ])
+        self.assertEquals(results, {
+            'swift://tenant/container/a.txt': {'Content-Length': '1'},
+            'swift://tenant/container/b.txt': None,
+        })
+        self.mock_stat_objects.assert_called_once_with(
+            SwiftPath('swift://tenant/container/'), mock.ANY)
+        self.assertEquals(sorted(self.mock_stat_objects.call_args[0][1]), ['a.txt', 'b.txt'])
+
+    def test_s3_not_found(self):
+        def stat(p):
+            if p == 's3://bucket/b.txt':
+                raise stor.exceptions.NotFoundError('not found')
+            return {'ContentLength': 1}
+        self.mock_stat.side_effect = stat
+        results = stor.stat_many(['s3://bucket/a.txt', 's3://bucket/b.txt'])
+        self.assertEquals(results, {
+            's3://bucket/a.txt': {'ContentLength': 1},
+            's3://bucket/b.txt': None,
+        })
+
+    def test_s3_error(self):
+        self.mock_stat.side_effect = stor.exceptions.UnauthorizedError('unauthorized')
+        with self.assertRaises(stor.exceptions.UnauthorizedError):
+            stor.stat_many(['s3://bucket/a.txt'])
+
+    def test_posix_paths(self):
+        with self.assertRaisesRegexp(ValueError, 'only supports OBS paths'):
+            stor.stat_many(['swift://tenant/container/a.txt', '/tmp/file.txt'])
+
+
+class TestStreamCopy(SwiftTestCase, S3TestMixin):
+    def setUp(self):
+        super(TestStreamCopy, self).setUp()
+        self.setup_s3_mocks()
+
+        # Isolate the tests from the retry settings of other tests
+        retry_settings = {'num_retries': 0, 'retry_jitter': 0, 'deadline': 0}
+        use_settings = settings.use({'swift': retry_settings, 's3': retry_settings})
+        self.addCleanup(use_settings.__exit__, None, None, None)
+
+        self.uploaded = {}
+
+        def upload_fileobj(stream, bucket, key, Config, **kwargs):
+            self.uploaded[(bucket, key)] = stream.read()
+        self.mock_s3.upload_fileobj.side_effect = upload_fileobj
+
+    def test_swift_to_s3(self):
+        self.mock_swift_conn.get_object.return_value = (
+            {'content-length': '11'}, iter([b'hello ', b'world']))
+        with LogCapture('stor.obs.progress') as progress_log:
+            stor.copy('swift://tenant/container/a.txt', 's3://bucket/dir/')
+
+        self.assertEquals(self.uploaded, {('bucket', 'dir/a.txt'): b'hello world'})
+        self.mock_get_s3_transfer_config.assert_called_once_with(
+            multipart_threshold=67108864, multipart_chunksize=67108864, max_concurrency=2)
+        progress_log.check(
+            ('stor.obs.progress', 'INFO', 'starting copy of 1 objects'),
+            ('stor.obs.progress', 'INFO', mock.ANY)
+        )
+        self.assertIn('0.00 MB', progress_log.records[-1].getMessage())
+        self.assertTrue(progress_log.records[-1].getMessage().startswith('copy complete - 1/1'))
+
+    @mock.patch('time.time', autospec=True, return_value=1.0)
+    def test_s3_to_swift_segments(self, mock_time):
+        self.mock_s3.get_object.return_value = {'Body': io.BytesIO(b'0123456789')}
+        self.mock_swift_conn.put_object.return_value = 'etag'
+        with settings.use({'stor:copy': {'segment_size': 4}}):
+            stor.copy('s3://bucket/a.txt', 'swift://tenant/container/b.txt')
+
+        self.mock_s3.get_object.assert_called_once_with(Bucket='bucket', Key='a.txt')
+        put_calls = self.mock_swift_conn.put_object.call_args_list
+        self.assertEquals(sorted(c[0][2] for c in put_calls[:3]), [b'0123', b'4567', b'89'])
+        self.assertEquals(put_calls[3][0][:2], ('container', 'b.txt'))
+        self.assertEquals(len(json.loads(put_calls[3][0][2])), 3)
+        self.assertEquals(put_calls[3][1]['query_string'], 'multipart-manifest=put')
+
+    def test_s3_to_swift_empty_object(self):
+        self.mock_s3.get_object.return_value = {'Body': io.BytesIO(b'')}
+        stor.copy('s3://bucket/a.txt', 'swift://tenant/container/b.txt')
+        self.mock_swift_conn.put_object.assert_called_once_with(
+            'container', 'b.txt', b'', etag=mock.ANY, headers={}, query_string=None)
+
+    def test_copytree_swift_to_s3(self):
+        self.mock_swift_conn.get_container.return_value = ({}, [
+            {'name': 'dir/a.txt'},
+            {'name': 'dir/b/c.txt'},
+        ])
+        self.mock_swift_conn.get_object.side_effect = lambda container, obj, **kwargs: (
+            {'content-length': str(len(obj))}, iter([obj.encode('utf-8')]))
+        stor.copytree('swift://tenant/container/dir', 's3://bucket/copy')
+
+        self.assertEquals(self.uploaded, {
+            ('bucket', 'copy/a.txt'): b'dir/a.txt',
+            ('bucket', 'copy/b/c.txt'): b'dir/b/c.txt',
+        })
+
+    def test_copytree_condition(self):
+        self.mock_swift_conn.get_container.return_value = ({}, [])
+        with self.assertRaises(stor.exceptions.ConditionNotMetError):
+            stor.copytree('swift://tenant/container/dir', 's3://bucket/copy',
+                          condition=lambda results: len(results) == 1)
+
+    def test_source_error(self):
+        self.mock_s3.get_object.return_value = {'Body': io.BytesIO(b'0123456789')}
+        self.mock_swift_conn.put_object.side_effect = ClientException('unauthorized',
+                                                                      http_status=403)
+        with self.assertRaises(stor.exceptions.UnauthorizedError):
+            stor.copy('s3://bucket/a.txt', 'swift://tenant/container/b.txt')
+
+    def test_swift_to_s3_metadata(self):
+        self.mock_swift_conn.get_object.return_value = ({
+            'content-length': '2',
+            'content-type': 'text/plain',
+            'x-object-meta-owner': 'me'
+        }, iter([b'hi']))
+        stor.copy('swift://tenant/container/a.txt', 's3://bucket/b.txt')
+        self.assertEquals(self.mock_s3.upload_fileobj.call_args[1]['ExtraArgs'], {
+            'ContentType': 'text/plain',
+            'Metadata': {'owner': 'me'}
+        })
+
+    def test_s3_to_swift_metadata(self):
+        self.mock_s3.get_object.return_value = {
+            'Body': io.BytesIO(b'hi'),
+            'ContentType': 'text/plain',
+            'Metadata': {'owner': 'me'}
+        }
+        stor.copy('s3://bucket/a.txt', 'swift://tenant/container/b.txt')
+        self.mock_swift_conn.put_object.assert_called_once_with(
+            'container', 'b.txt', b'hi', etag=mock.ANY, query_string=None,
+            headers={'Content-Type': 'text/plain', 'X-Object-Meta-owner': 'me'})
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_copytree_retry(self, mock_sleep):
+        self.mock_swift_conn.get_container.return_value = ({}, [{'name': 'dir/a.txt'}])
+        self.mock_swift_conn.get_object.side_effect = lambda *args, **kwargs: (
+            {'content-length': '2'}, iter([b'hi']))
+        self.mock_s3.upload_fileobj.side_effect = [S3UploadFailedError('failed'), None]
+
+        stor.copytree('swift://tenant/container/dir', 's3://bucket/copy', num_retries=1)
+        self.assertEquals(self.mock_swift_conn.get_object.call_count, 2)
+        self.assertEquals(self.mock_s3.upload_fileobj.call_count, 2)
+        self.assertEquals(mock_sleep.call_count, 1)
+
+    @mock.patch('time.sleep', autospec=True)
+    @mock.patch.object(stor.obs.OBSCopyLogger, 'add_bytes', autospec=True)
+    def test_retry_progress(self, mock_add_bytes, mock_sleep):
+        self.mock_swift_conn.get_object.side_effect = lambda *args, **kwargs: (
+            {'content-length': '11'}, iter([b'hello ', b'world']))
+        attempts = []
+
+        def upload_fileobj(stream, bucket, key, Config, **kwargs):
+            attempts.append(stream.read())
+            if len(attempts) == 1:
+                raise S3UploadFailedError('failed')
+        self.mock_s3.upload_fileobj.side_effect = upload_fileobj
+
+        with settings.use({'s3': {'num_retries': 1}}):
+            stor.copy('swift://tenant/container/a.txt', 's3://bucket/b.txt')
+        self.assertEquals(attempts, [b'hello world', b'hello world'])
+        # Bytes of failed attempts are counted as they are read and returned
+        self.assertEquals([c[0][1] for c in mock_add_bytes.call_args_list], [11, -11, 11])
+
+    def test_retry_exhausted(self):
+        self.mock_s3.get_object.side_effect = lambda **kwargs: {'Body': io.BytesIO(b'hi')}
+        self.mock_swift_conn.put_object.side_effect = ClientException('unavailable',
+                                                                      http_status=503)
+        with settings.use({'swift': {'num_retries': 5}}):
+            with self.assertRaises(stor.exceptions.UnavailableError):
+                stor.copy('s3://bucket/a.txt', 'swift://tenant/container/b.txt',
+                          swift_retry_options={'num_retries': 1, 'initial_retry_sleep': 0})
+        # Only the copy of the object is retried, not the requests of each attempt
+        self.assertEquals(self.mock_s3.get_object.call_count, 2)
+        self.assertEquals(self.mock_swift_conn.put_object.call_count, 2)
+
+    def test_s3_to_s3(self):
+        with self.assertRaisesRegexp(ValueError, 'S3 path'):
+            stor.copy('s3://bucket/a.txt', 's3://bucket/b.txt')
+        with self.assertRaisesRegexp(ValueError, 'S3 path'):
+            stor.copytree('s3://bucket/a', 's3://bucket/b')
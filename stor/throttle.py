@@ -0,0 +1,144 @@
+"""
+Bandwidth and request rate limits of transfers.
+
+Transfers of every thread of the process share token buckets that limit the
+bytes and requests per second of each service and direction. Limits are set
+with the ``max_bytes_per_second`` and ``max_requests_per_second`` options of
+the ``s3:upload``, ``s3:download``, ``swift:upload`` and ``swift:download``
+settings::
+
+    stor.settings.update({'s3:upload': {'max_bytes_per_second': '20M'}})
+    stor.copytree('dir', 's3://bucket/dir')
+
+Limits are read from the settings of the threads that make the requests. Since
+the threads of transfers do not see the settings of ``stor.settings.use``
+blocks, limits should be set in the settings file or with
+``stor.settings.update``.
+
+S3 transfers consume bytes in the callbacks of boto3 transfers and requests
+before every request of an upload or download. Swift transfers consume bytes
+as objects and segments are read from and written to connections, including
+the connections of ``SwiftService``.
+"""
+import threading
+import time
+
+from stor import settings
+from stor import utils
+
+
+class TokenBucket(object):
+    """A token bucket that is shared by threads.
+
+    Tokens are added at ``rate`` per second up to ``capacity``. Consumers
+    take tokens before they are available and sleep until the bucket is
+    refilled, so amounts larger than the capacity are allowed and threads
+    are served in the order in which they consume. Negative amounts return
+    tokens to the bucket.
+
+    Args:
+        rate (float): The number of tokens added per second.
+        capacity (float, optional): The maximum number of tokens, which is
+            the largest burst allowed after the bucket is idle. Defaults to
+            one second of tokens.
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._last_time = time.time()
+        self._lock = threading.Lock()
+
+    def _reserve(self, amount):
+        """Takes tokens and returns the time (in seconds) until they are available"""
+        with self._lock:
+            now = time.time()
+            self._tokens = min(self.capacity,
+                               self._tokens + (now - self._last_time) * self.rate)
+            self._last_time = now
+            self._tokens = min(self.capacity, self._tokens - amount)
+            return -self._tokens / self.rate if self._tokens < 0 else 0
+
+    def consume(self, amount=1):
+        """Takes tokens from the bucket, sleeping until they are available.
+
+        Args:
+            amount (float): The number of tokens.
+        """
+        wait = self._reserve(amount)
+        if wait > 0:
+            time.sleep(wait)
+
+
+class Limiter(object):
+    """The limits of a service and direction.
+
+    Args:
+        bytes_per_second (int): The bandwidth limit, or 0 for no limit.
+        requests_per_second (float): The request rate limit, or 0 for no limit.
+    """
+    def __init__(self, bytes_per_second=0, requests_per_second=0):
+        self.bytes = TokenBucket(bytes_per_second) if bytes_per_second else None
+        self.requests = TokenBucket(requests_per_second) if requests_per_second else None
+
+    def consume_bytes(self, num_bytes):
+        """Sleeps until ``num_bytes`` may be transferred.
+
+        boto3 transfers call their callbacks with negative amounts when they
+        read data again, for example to compute checksums or to retry, which
+        return the bytes to the limiter.
+        """
+        if self.bytes and num_bytes:
+            self.bytes.consume(num_bytes)
+
+    def consume_request(self):
+        """Sleeps until a request may be made."""
+        if self.requests:
+            self.requests.consume()
+
+
+# The limiters of the process and their limits, keyed by service and direction
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(service, direction):
+    """Returns the limiter of a service and direction.
+
+    Limiters are shared by every thread of the process and are replaced
+    when their settings change.
+
+    Args:
+        service (str): "s3" or "swift".
+        direction (str): "upload" or "download".
+
+    Returns:
+        Limiter: The limiter, or None if the transfers are not limited.
+    """
+    options = settings.get()['%s:%s' % (service, direction)]
+    limits = (utils.str_to_bytes(options['max_bytes_per_second']),
+              options['max_requests_per_second'])
+    if not any(limits):
+        return None
+    key = (service, direction)
+    with _limiters_lock:
+        cached_limits, limiter = _limiters.get(key, (None, None))
+        if cached_limits != limits:
+            limiter = Limiter(*limits)
+            _limiters[key] = (limits, limiter)
+        return limiter
+
+
+def throttle_callback(limiter, callback=None):
+    """Returns a transfer callback that consumes the bytes of a limiter.
+
+    Args:
+        limiter (Limiter): The limiter.
+        callback (function(int), optional): A callback that is called after
+            the bytes are consumed.
+    """
+    def throttled_callback(num_bytes):
+        limiter.consume_bytes(num_bytes)
+        if callback:
+            callback(num_bytes)
+    return throttled_callback
@@ -0,0 +1,223 @@
+"""
+Timelines of transfers.
+
+A `Tracer` records a span for every request, every object transferred by
+``SwiftService`` and every part of S3 multipart uploads and ranged downloads.
+Spans record when they started and ended, the thread that ran them, the
+number of bytes and the number of retries. Traces are written as Chrome
+trace events, which can be opened in ``chrome://tracing`` or Perfetto, or as
+JSON lines::
+
+    from stor import tracing
+
+    tracer = tracing.Tracer()
+    with tracing.use(tracer):
+        stor.copytree('dir', 's3://bucket/dir')
+    tracer.write('upload.trace.json')
+
+Spans have one of the following categories:
+
+* ``request``: A request made through `stor.instrumentation`. S3 uploads and
+  downloads make one ``upload_file`` or ``download_file`` request per object.
+* ``object``: An object uploaded, downloaded or deleted by ``SwiftService``.
+  swiftclient only reports the start time of downloads, so the other spans
+  have no duration and mark when the object finished.
+* ``part``: A part of an S3 multipart upload or a ranged download.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+
+from stor import instrumentation
+
+
+# The tracer of the process
+_tracer = None
+
+
+class Span(object):
+    """A span of a trace.
+
+    Attributes:
+        name (str): The name of the span, usually the path of an object.
+        category (str): "request", "object" or "part".
+        start (float): The time at which the span started.
+        end (float): The time at which the span ended.
+        thread (str): The name of the thread of the span, or None if it is unknown.
+        bytes (int): The number of bytes transferred, when known.
+        retries (int): The number of retries made before the span succeeded or failed.
+        args (dict): Other values of the span, such as the operation or the error.
+    """
+    __slots__ = ('name', 'category', 'start', 'end', 'thread', 'bytes', 'retries', 'args')
+
+    def __init__(self, name, category, start, end, thread=None, bytes=None, retries=0,
+                 args=None):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.end = end
+        self.thread = thread
+        self.bytes = bytes
+        self.retries = retries
+        self.args = args or {}
+
+    def __repr__(self):
+        return 'Span(%r, %r, start=%r, end=%r, thread=%r, bytes=%r, retries=%r)' % (
+            self.name, self.category, self.start, self.end, self.thread, self.bytes,
+            self.retries)
+
+    def to_dict(self):
+        """Returns the span as a dictionary."""
+        return {
+            'name': self.name,
+            'category': self.category,
+            'start': self.start,
+            'end': self.end,
+            'thread': self.thread,
+            'bytes': self.bytes,
+            'retries': self.retries,
+            'args': self.args
+        }
+
+
+def _get_request_name(event):
+    name = '%s://%s' % (event.service, event.bucket or '')
+    return '%s/%s' % (name, event.resource) if event.resource else name
+
+
+class Tracer(instrumentation.Instrument):
+    """Records the spans of a trace.
+
+    Tracers are thread-safe and record spans in memory until they are written.
+    """
+    def __init__(self):
+        self._spans = []
+        self._lock = threading.Lock()
+
+    @property
+    def spans(self):
+        """The spans recorded so far, ordered by end time."""
+        with self._lock:
+            return list(self._spans)
+
+    def add_span(self, name, category, start, end, thread=None, bytes=None, retries=0,
+                 **args):
+        """Records a span.
+
+        Args:
+            name (str): The name of the span.
+            category (str): The category of the span.
+            start (float): The time at which the span started.
+            end (float): The time at which the span ended.
+            thread (str, optional): The name of the thread of the span, if it
+                is known.
+            bytes (int, optional): The number of bytes transferred.
+            retries (int, optional): The number of retries.
+            **args: Other values of the span.
+        """
+        span = Span(name, category, start, end, thread=thread, bytes=bytes, retries=retries,
+                    args=args)
+        with self._lock:
+            self._spans.append(span)
+
+    def after_request(self, event):
+        args = {'operation': event.operation}
+        if event.status:
+            args['status'] = event.status
+        if event.error is not None:
+            args['error'] = repr(event.error)
+        self.add_span(_get_request_name(event), 'request', event.start_time,
+                      event.start_time + event.duration,
+                      thread=threading.current_thread().name, bytes=event.bytes,
+                      retries=event.retries, **args)
+
+    def write_json_lines(self, filename):
+        """Writes every span as a JSON object on its own line.
+
+        Args:
+            filename (str): The file of the trace.
+        """
+        with open(filename, 'w') as fp:
+            for span in self.spans:
+                fp.write(json.dumps(span.to_dict(), sort_keys=True))
+                fp.write('\n')
+
+    def write_chrome_trace(self, filename):
+        """Writes the spans as Chrome trace events.
+
+        Every thread is shown on its own row. Spans without a thread are laid
+        out on ``concurrent`` rows, so that the number of rows shows how many
+        of them overlapped.
+
+        Args:
+            filename (str): The file of the trace.
+        """
+        spans = sorted(self.spans, key=lambda span: span.start)
+        origin = spans[0].start if spans else time.time()
+        pid = os.getpid()
+        tids = {}
+        lane_ends = []
+        events = []
+        for span in spans:
+            if span.thread is None:
+                # Use the first concurrent row that is free at the start of the span
+                lane = next((i for i, end in enumerate(lane_ends) if end <= span.start),
+                            len(lane_ends))
+                lane_ends[lane:lane + 1] = [span.end]
+                thread = 'concurrent %d' % lane
+            else:
+                thread = span.thread
+            if thread not in tids:
+                tids[thread] = len(tids) + 1
+                events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid,
+                               'tid': tids[thread], 'args': {'name': thread}})
+            args = dict(span.args, bytes=span.bytes, retries=span.retries)
+            events.append({
+                'name': span.name,
+                'cat': span.category,
+                'ph': 'X',
+                'ts': (span.start - origin) * 1e6,
+                'dur': (span.end - span.start) * 1e6,
+                'pid': pid,
+                'tid': tids[thread],
+                'args': args
+            })
+        with open(filename, 'w') as fp:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms',
+                       'otherData': {'start_time': origin}}, fp)
+
+    def write(self, filename):
+        """Writes the trace as JSON lines if ``filename`` ends with ``.jsonl``
+        and as Chrome trace events otherwise.
+
+        Args:
+            filename (str): The file of the trace.
+        """
+        if filename.endswith('.jsonl'):
+            self.write_json_lines(filename)
+        else:
+            self.write_chrome_trace(filename)
+
+
+def get_tracer():
+    """Returns the tracer of the process, or None when no tracer is used."""
+    return _tracer
+
+
+@contextlib.contextmanager
+def use(tracer):
+    """Records spans with a tracer for the duration of a ``with`` block.
+
+    Args:
+        tracer (Tracer): The tracer.
+    """
+    global _tracer
+    previous_tracer = _tracer
+    _tracer = tracer
+    try:
+        with instrumentation.use(tracer):
+            yield tracer
+    finally:
+        _tracer = previous_tracer
@@ -1,20 +1,47 @@
+from collections import deque
+from collections import namedtuple
 from contextlib import contextmanager
-import datetime
 import errno
+from functools import partial
+import itertools
 import logging
 import os
+import posixpath
 import shlex
 import shutil
 from subprocess import check_call
 import tempfile
+import threading
+import time
 
 from stor import exceptions
+from stor import progress
+
+try:
+    from os import scandir
+except ImportError:  # pragma: no cover
+    # Python < 3.5 uses the scandir backport
+    from scandir import scandir
 
 logger = logging.getLogger(__name__)
 
 # Name for the data manifest file when using the use_manifest option
 # for upload/download
 DATA_MANIFEST_FILE_NAME = '.data_manifest.csv'
+# First line of version 2 data manifests, which have sizes and checksums
+DATA_MANIFEST_V2_HEADER = '#stor-data-manifest:v2'
+
+#: The number of paths of a directory from which `exists_many` answers their
+#: existence with one listing instead of checking every path
+EXISTS_MANY_LISTING_THRESHOLD = 10
+
+#: An object of a data manifest. The size and checksum are None when unknown.
+ManifestEntry = namedtuple('ManifestEntry', ['name', 'size', 'checksum'])
+
+#: A file or empty directory found by `scan_tree`. Sizes and modification times
+#: of files come from the directory scan. Empty directories have a size of 0 and
+#: a modification time of None.
+ScanEntry = namedtuple('ScanEntry', ['path', 'size', 'mtime', 'is_dir'])
 
 
 def str_to_bytes(s):
@@ -139,32 +166,82 @@ def join_conditions(*conditions):
     return wrapper
 
 
-def generate_and_save_data_manifest(manifest_dir, data_manifest_contents):
+def _format_manifest_entry(entry):
+    """Formats a `ManifestEntry` as a line of a version 2 data manifest"""
+    return '%s,%s,%s\n' % ('' if entry.size is None else entry.size,
+                           entry.checksum or '',
+                           entry.name)
+
+
+def generate_and_save_data_manifest(manifest_dir, data_manifest_contents, version=None):
     """Generates a data manifest for a given directory and saves it.
 
+    The manifest is written one entry at a time. Version 1 manifests have the name
+    of one object per line. The first line of version 2 manifests is
+    `DATA_MANIFEST_V2_HEADER` and every other line is the size, checksum and name
+    of an object separated by commas. Unknown sizes and checksums are left empty.
+
     Args:
         manifest_dir (str): The directory in which the manifest will be saved
-        data_manifest_contents (List[str]): The list of all objects that will
-            be part of the manifest.
+        data_manifest_contents (Iterable[str|ManifestEntry]): All objects that will
+            be part of the manifest. Objects given by name have no size or checksum.
+        version (int, optional): The version of the manifest. Defaults to the
+            ``data_manifest_version`` option of the ``stor`` settings.
     """
     import stor
     from stor import Path
+    from stor import settings
 
+    version = version or settings.get()['stor']['data_manifest_version']
+    if version not in (1, 2):
+        raise ValueError('invalid data manifest version: %r' % version)
     manifest_file_name = Path(manifest_dir) / DATA_MANIFEST_FILE_NAME
     with stor.open(manifest_file_name, 'w') as out_file:
-        contents = '\n'.join(data_manifest_contents) + '\n'
-        out_file.write(contents)
+        if version == 2:
+            out_file.write(DATA_MANIFEST_V2_HEADER + '\n')
+        for entry in data_manifest_contents:
+            if not isinstance(entry, ManifestEntry):
+                entry = ManifestEntry(entry, None, None)
+            out_file.write(_format_manifest_entry(entry) if version == 2 else entry.name + '\n')
 
 
-def get_data_manifest_contents(manifest_dir):
-    """Reads the manifest file and returns a set of expected files"""
+def iter_data_manifest(manifest_dir):
+    """Reads the manifest file of a directory one entry at a time.
+
+    Both version 1 manifests, which only have object names, and version 2
+    manifests are read. Entries of version 1 manifests have no size or checksum.
+
+    Args:
+        manifest_dir (Path): The directory of the manifest file.
+
+    Yields:
+        ManifestEntry: Every entry of the manifest.
+    """
     import stor
 
     manifest = manifest_dir / DATA_MANIFEST_FILE_NAME
     with stor.open(manifest, 'r') as manifest_file:
-        return [
-            f.strip() for f in manifest_file.readlines() if f.strip()
-        ]
+        lines = iter(manifest_file)
+        first_line = next(lines, '').rstrip('\r\n')
+        if first_line != DATA_MANIFEST_V2_HEADER:
+            # Version 1 manifests only have one object name per line
+            for line in itertools.chain([first_line], lines):
+                name = line.strip()
+                if name:
+                    yield ManifestEntry(name, None, None)
+            return
+
+        for line in lines:
+            line = line.rstrip('\r\n')
+            if not line:
+                continue
+            size, checksum, name = line.split(',', 2)
+            yield ManifestEntry(name, int(size) if size else None, checksum or None)
+
+
+def get_data_manifest_contents(manifest_dir):
+    """Reads the manifest file and returns a list of expected object names"""
+    return [entry.name for entry in iter_data_manifest(manifest_dir)]
 
 
 def validate_manifest_list(expected_objs, list_results):
@@ -176,6 +253,62 @@ def validate_manifest_list(expected_objs, list_results):
     return set(expected_objs).issubset(listed_objs)
 
 
+class ManifestValidator(object):
+    """Incrementally validates listings against the entries of a data manifest.
+
+    Entries are confirmed when they are listed with the size and checksum of the
+    manifest. Sizes and checksums are only compared when both the manifest and
+    the listing have them. Confirmed entries are not checked again, so retried
+    listings only look up the entries that are still pending.
+
+    Args:
+        entries (Iterable[ManifestEntry]): The entries of the manifest.
+    """
+    def __init__(self, entries):
+        self.pending = {entry.name: entry for entry in entries}
+
+    def __repr__(self):
+        return 'ManifestValidator(pending=%d)' % len(self.pending)
+
+    def _matches(self, entry, size, checksum):
+        if entry.size is not None and size is not None and entry.size != size:
+            logger.warning('size of %s is %s, expected %s', entry.name, size, entry.size)
+            return False
+        if entry.checksum and checksum and entry.checksum != checksum:
+            logger.warning('checksum of %s is %s, expected %s',
+                           entry.name, checksum, entry.checksum)
+            return False
+        return True
+
+    def validate(self, listing):
+        """Confirms pending entries with the metadata of a listing.
+
+        Args:
+            listing (dict): The ``(size, checksum)`` of every listed object keyed on
+                the object name. Unknown sizes and checksums are None.
+
+        Returns:
+            bool: True if every entry of the manifest has been confirmed.
+        """
+        confirmed = [
+            name for name, entry in self.pending.items()
+            if name in listing and self._matches(entry, *listing[name])
+        ]
+        for name in confirmed:
+            del self.pending[name]
+        return not self.pending
+
+    def check(self, listing):
+        """Like `validate`, but raises when entries of the manifest are still pending.
+
+        Raises:
+            ConditionNotMetError: Entries of the manifest were not confirmed.
+        """
+        if not self.validate(listing):
+            raise exceptions.ConditionNotMetError(
+                'listing did not confirm %d objects of the data manifest' % len(self.pending))
+
+
 def is_swift_path(p):
     """Determines if the path is a Swift path.
 
@@ -187,8 +320,8 @@ def is_swift_path(p):
     Returns:
         bool: True if p is a Swift path, False otherwise.
     """
-    from stor.swift import SwiftPath
-    return p.startswith(SwiftPath.drive)
+    # Compare with the drive directly so that checking a path doesn't import swiftclient
+    return p.startswith('swift://')
 
 
 def is_filesystem_path(p):
@@ -214,8 +347,8 @@ def is_s3_path(p):
     Returns
         bool: True if p is a S3 path, False otherwise.
     """
-    from stor.s3 import S3Path
-    return p.startswith(S3Path.drive)
+    # Compare with the drive directly so that checking a path doesn't import boto3
+    return p.startswith('s3://')
 
 
 def is_obs_path(p):
@@ -253,7 +386,7 @@ def is_writeable(path, swift_retry_options=None):
     Args:
         path (stor.Path|str): The path to check.
         swift_retry_options (dict): Optional retry arguments to use for swift
-            upload or download. View the
+            upload or download, or for copies between swift and S3. View the
             `swift module-level documentation <swiftretry>` for more
             information on retry arguments. If the goal is to not use
             exponential backoff, pass ``{'num_retries': 0}`` here.
@@ -341,6 +474,17 @@ def copy(source, dest, swift_retry_options=None):
             >>> # File will be uploaded to swift://tenant/container/dir/my_file.txt
             >>> local_p.copy('swift://tenant/container/dir/')
 
+        Copying between swift paths is performed on the swift cluster
+        without downloading the object (see `SwiftPath.copy_object`)::
+
+            >>> stor.copy(swift_p, 'swift://tenant/other_container/file.txt')
+
+        Copying between swift and S3 streams the object through memory without
+        staging it on local disk, along with its content type and user metadata
+        (see `stor.obs.stream_copy_objects`)::
+
+            >>> stor.copy(swift_p, 's3://bucket/dir/file.txt')
+
         Because of the ambiguity in whether a remote target is a file or directory, copy()
         will error on ambiguous paths.
 
@@ -351,15 +495,24 @@ def copy(source, dest, swift_retry_options=None):
     """
     from stor import Path
     from stor.obs import OBSUploadObject
+    from stor.obs import stream_copy_objects
 
     source = Path(source)
     dest = Path(dest)
     swift_retry_options = swift_retry_options or {}
-    if is_obs_path(source) and is_obs_path(dest):
-        raise ValueError('cannot copy one OBS path to another OBS path')
+    if is_s3_path(source) and is_s3_path(dest):
+        raise ValueError('copies from one S3 path to another S3 path are not supported')
     if is_obs_path(dest) and dest.is_ambiguous():
         raise ValueError('OBS destination must be file with extension or directory with slash')
 
+    if is_obs_path(source) and is_obs_path(dest):
+        dest_file = dest if not dest.endswith('/') else dest / source.name
+        if is_swift_path(source) and is_swift_path(dest):
+            source.copy_object(dest_file, **swift_retry_options)
+        else:
+            stream_copy_objects([(source, dest_file)], **swift_retry_options)
+        return
+
     if is_filesystem_path(dest):
         dest.parent.makedirs_p()
         if is_obs_path(source):
@@ -385,8 +538,9 @@ def copytree(source, dest, copy_cmd=None, use_manifest=False, headers=None,
     """Copies a source directory to a destination directory. Assumes that
     paths are capable of being copied to/from.
 
-    Note that this function uses shutil.copytree by default, meaning
-    that a posix or windows destination must not exist beforehand.
+    Note that this function follows the semantics of shutil.copytree by
+    default, meaning that a posix or windows destination must not exist
+    beforehand. Files are copied concurrently (see `stor.posix.parallel_copytree`).
 
     For example, assume the following file hierarchy::
 
@@ -419,6 +573,13 @@ def copytree(source, dest, copy_cmd=None, use_manifest=False, headers=None,
 
         Path('swift://tenant/container/folder/b/1.txt')
 
+    Copying between swift paths is performed on the swift cluster without
+    downloading objects (see `SwiftPath.copy_objects`). Copying between swift
+    and S3 streams objects through memory without staging them on local disk
+    and copies their content type and user metadata (see
+    `stor.obs.stream_copy_objects`). The ``use_manifest`` and ``headers``
+    arguments do not apply to these copies.
+
     Similarly one can do::
 
         Path('swift://tenant/container/folder/').copytree('c')
@@ -434,21 +595,35 @@ def copytree(source, dest, copy_cmd=None, use_manifest=False, headers=None,
         dest (path|str): The directory to copy to. Must not exist if
             its a posix directory
         copy_cmd (str): If copying to / from posix or windows, this command is
-            used instead of shutil.copytree
+            used instead of `stor.posix.parallel_copytree`
         use_manifest (bool, default False): See `SwiftPath.upload` and
             `SwiftPath.download`.
         headers (List[str]): See `SwiftPath.upload`.
 
     Raises:
-        ValueError: if two OBS paths are specified
+        ValueError: if two S3 paths are specified
         OSError: if destination is a posix path and it already exists
     """
     from stor import Path
 
     source = Path(source)
     dest = Path(dest)
+    if is_swift_path(source) and is_swift_path(dest):
+        source.copy_objects(dest, condition=condition, **retry_args)
+        return
+    if is_s3_path(source) and is_s3_path(dest):
+        raise ValueError('copies from one S3 path to another S3 path are not supported')
     if is_obs_path(source) and is_obs_path(dest):
-        raise ValueError('cannot copy one OBS path to another OBS path')
+        from stor.obs import stream_copy_objects
+
+        source_dir = with_trailing_slash(source)
+        dest_dir = with_trailing_slash(dest)
+        results = stream_copy_objects([
+            (p, dest_dir / p[len(source_dir):])
+            for p in source_dir.list(ignore_dir_markers=True)
+        ], **retry_args)
+        check_condition(condition, results)
+        return
     from stor.windows import WindowsPath
     if is_obs_path(source) and isinstance(dest, WindowsPath):
         raise ValueError('OBS copytree to windows is not supported')
@@ -466,7 +641,9 @@ def copytree(source, dest, copy_cmd=None, use_manifest=False, headers=None,
                 logger.info('performing copy with command - %s', copy_cmd)
                 check_call(copy_cmd)
             else:
-                shutil.copytree(source, dest)
+                from stor.posix import parallel_copytree
+
+                parallel_copytree(source, dest)
     else:
         with source:
             dest.upload(['.'], use_manifest=use_manifest, headers=headers,
@@ -485,9 +662,122 @@ def _safe_get_size(name):
             raise
 
 
+def _scan_dir(path, follow_symlinks=False):
+    """Scans a single directory for `scan_tree`.
+
+    Returns:
+        tuple(List[ScanEntry], List[str], List[str], OSError): The entries of the
+            directory, the subdirectories to scan, the files that no longer exist
+            and the error raised if the directory cannot be listed.
+    """
+    entries = []
+    subdirs = []
+    missing = []
+    has_dirs = False
+    try:
+        dir_entries = list(scandir(path))
+    except OSError as e:
+        # Like os.walk, directories that cannot be listed are skipped
+        return entries, subdirs, missing, e
+
+    for entry in dir_entries:
+        if entry.is_dir():
+            has_dirs = True
+            # Like os.walk, symlinks to directories are not followed by default
+            if follow_symlinks or not entry.is_symlink():
+                subdirs.append(entry.path)
+            continue
+        try:
+            stat_result = entry.stat()
+        except OSError as e:
+            if e.errno == errno.ENOENT:
+                # Broken symlinks and files deleted during the scan
+                missing.append(entry.path)
+                continue
+            raise  # pragma: no cover
+        entries.append(ScanEntry(entry.path, stat_result.st_size, stat_result.st_mtime, False))
+
+    if not entries and not has_dirs:
+        entries.append(ScanEntry(path, 0, None, True))
+    return entries, subdirs, missing, None
+
+
+def _add_scan_results(scan_results, missing_files, errors):
+    """Adds the missing files and errors of `_scan_dir` to the lists of `scan_tree`.
+
+    Returns:
+        tuple(List[ScanEntry], List[str]): The entries and subdirectories to scan.
+    """
+    entries, subdirs, missing, error = scan_results
+    if missing_files is not None:
+        missing_files.extend(missing)
+    if errors is not None and error is not None:
+        errors.append(error)
+    return entries, subdirs
+
+
+def scan_tree(top, num_threads=None, missing_files=None, follow_symlinks=False, errors=None):
+    """Yields the files and empty directories under a directory.
+
+    The tree is walked with ``os.scandir`` and the sizes and modification times
+    of files come from the stat data of the directory entries, so every file is
+    only stat'ed once. Subdirectories are scanned concurrently when
+    ``num_threads`` is greater than 1, so the order of the entries is not
+    guaranteed. As with ``os.walk``, symlinks to directories are not followed
+    by default and directories that cannot be listed are skipped.
+
+    Args:
+        top (str): The directory to walk.
+        num_threads (int): The number of directories to scan concurrently.
+            Defaults to the ``walk_threads`` option of the ``stor`` settings.
+        missing_files (list): If provided, broken symlinks and files that are
+            deleted during the walk are appended to it.
+        follow_symlinks (bool): Walk the directories that symlinks point to.
+        errors (list): If provided, the ``OSError`` of every directory that
+            cannot be listed is appended to it.
+
+    Returns:
+        Iter[ScanEntry]: The files and empty directories under ``top``.
+    """
+    if num_threads is None:
+        from stor import settings
+
+        num_threads = settings.get()['stor']['walk_threads']
+
+    if num_threads <= 1:
+        to_scan = deque([top])
+        while to_scan:
+            entries, subdirs = _add_scan_results(_scan_dir(to_scan.popleft(), follow_symlinks),
+                                                 missing_files, errors)
+            to_scan.extend(subdirs)
+            for entry in entries:
+                yield entry
+        return
+
+    from multiprocessing.pool import ThreadPool
+
+    pool = ThreadPool(num_threads)
+    try:
+        pending = deque([pool.apply_async(_scan_dir, (top, follow_symlinks))])
+        while pending:
+            # Waiting with a timeout allows the main thread to be interrupted
+            entries, subdirs = _add_scan_results(pending.popleft().get(0xFFFF),
+                                                 missing_files, errors)
+            pending.extend(pool.apply_async(_scan_dir, (subdir, follow_symlinks))
+                           for subdir in subdirs)
+            for entry in entries:
+                yield entry
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
 def walk_files_and_dirs(files_and_dirs):
     """Walk all files and directories.
 
+    Directories are walked with `scan_tree`.
+
     Args:
         files_and_dirs (List[str]): All file or directory names to walk.
 
@@ -510,19 +800,8 @@ def walk_files_and_dirs(files_and_dirs):
         if os.path.isfile(name):
             walked_upload_names_and_sizes[name] = _safe_get_size(name)
         elif os.path.isdir(name):
-            for (root_dir, dir_names, file_names) in os.walk(name):
-                sizes = []
-                for file_name in file_names:
-                    full_name = os.path.join(root_dir, file_name)
-                    sz = _safe_get_size(full_name)
-                    if sz is not None:
-                        sizes.append(sz)
-                        walked_upload_names_and_sizes[full_name] = sz
-                    else:
-                        non_existent_files.append(full_name)
-                if not sizes and not dir_names:
-                    # we have an empty directory
-                    walked_upload_names_and_sizes[root_dir] = 0
+            for entry in scan_tree(name, missing_files=non_existent_files):
+                walked_upload_names_and_sizes[entry.path] = entry.size
         else:
             raise ValueError('file "%s" not found' % name)
 
@@ -537,6 +816,272 @@ def walk_files_and_dirs(files_and_dirs):
     return walked_upload_names_and_sizes
 
 
+def get_upload_size(upload_objects, walked_files):
+    """Returns the total size of the files of an upload.
+
+    Args:
+        upload_objects (List[OBSUploadObject]): The objects to upload.
+        walked_files (dict): The sizes of files keyed by name, as returned by
+            `walk_files_and_dirs`.
+
+    Returns:
+        int: The number of bytes to upload, or None if the size of an object
+            is unknown because it was not walked.
+    """
+    try:
+        return sum(walked_files[o.source] for o in upload_objects)
+    except KeyError:
+        return None
+
+
+def _iter_with_settings(iterable, snapshot):
+    """Iterates over ``iterable`` with the settings of ``snapshot``"""
+    from stor import settings
+
+    iterator = iter(iterable)
+    while True:
+        with settings.use_snapshot(snapshot):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def _call_with_settings(func, snapshot, item):
+    """Calls ``func(item)`` with the settings of ``snapshot``"""
+    from stor import settings
+
+    with settings.use_snapshot(snapshot):
+        return func(item)
+
+
+def threaded_imap_unordered(func, iterable, num_threads):
+    """Yields ``func(item)`` for every item of ``iterable`` using a thread pool.
+
+    Results are yielded as they complete, so their order is not guaranteed.
+    The pool is terminated if an error occurs or if the caller stops
+    iterating early. ``func`` is called and ``iterable`` is iterated over
+    with the settings of the calling thread, including those of
+    ``stor.settings.use``, and ``func`` is called with the retry deadline of
+    the calling thread (see `stor.retry.propagate_deadline`).
+
+    Args:
+        func (function): The function to apply to every item.
+        iterable (iterable): The items to process.
+        num_threads (int): The number of threads in the pool.
+
+    Returns:
+        Iter: The results of ``func``.
+    """
+    from multiprocessing.pool import ThreadPool
+    from stor import retry
+    from stor import settings
+
+    snapshot = settings.get()
+    pool = ThreadPool(num_threads)
+    try:
+        result_iter = pool.imap_unordered(
+            partial(_call_with_settings, retry.propagate_deadline(func), snapshot),
+            _iter_with_settings(iterable, snapshot))
+        while True:
+            try:
+                # Waiting with a timeout allows the main thread to be interrupted
+                yield result_iter.next(0xFFFF)
+            except StopIteration:
+                break
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+def _group_obs_paths(paths):
+    """Groups OBS object paths by their bucket or container.
+
+    Returns:
+        tuple(dict, list): A mapping of every bucket or container path to the
+            paths under it, and the list of paths that cannot be grouped
+            (posix paths and paths without a resource).
+    """
+    from stor import Path
+
+    groups = {}
+    ungrouped = []
+    for p in paths:
+        path = Path(p)
+        if is_obs_path(path) and path.resource:
+            # The bucket or container path is everything before the resource
+            root = path.path_class(path[:-len(path.resource)])
+            groups.setdefault(root, []).append(p)
+        else:
+            ungrouped.append(p)
+    return groups, ungrouped
+
+
+def _group_by_directory(paths):
+    """Groups OBS object paths of one bucket or container by their parent directory.
+
+    Returns:
+        tuple(List[list], list): The groups of paths that share a parent directory,
+            and the paths at the top of the bucket or container.
+    """
+    from stor import Path
+
+    groups = {}
+    top_level = []
+    for p in paths:
+        directory = posixpath.dirname(remove_trailing_slash(Path(p).resource))
+        if directory:
+            groups.setdefault(directory, []).append(p)
+        else:
+            top_level.append(p)
+    return list(groups.values()), top_level
+
+
+def _exists_from_listing(args):
+    """Answers existence of all paths of a directory with one listing.
+
+    The listing uses the longest common prefix of the resources of the paths.
+    A path exists if it is an object or a directory in the listing.
+    """
+    root, paths = args
+    from stor import Path
+
+    resources = [Path(p).resource for p in paths]
+    prefix = os.path.commonprefix(resources)
+    try:
+        listed = (root / prefix).list() if prefix else root.list()
+    except exceptions.NotFoundError:
+        # The bucket or container does not exist
+        return {p: False for p in paths}
+
+    existing = set()
+    for listed_path in listed:
+        name = remove_trailing_slash(listed_path.resource)
+        while name and name not in existing:
+            existing.add(name)
+            name = os.path.dirname(name)
+
+    return {
+        p: remove_trailing_slash(resource) in existing
+        for p, resource in zip(paths, resources)
+    }
+
+
+def _exists_item(p):
+    from stor import Path
+
+    return p, Path(p).exists()
+
+
+def exists_many(paths):
+    """Checks the existence of many paths at once.
+
+    OBS paths are grouped by their parent directory. When at least
+    `EXISTS_MANY_LISTING_THRESHOLD` paths of a directory need to be checked, the
+    group is answered with a single listing of the longest common prefix of the
+    paths. All other paths, including the paths at the top of a bucket or
+    container, are checked concurrently with ``exists``, so whole buckets or
+    containers are never listed. The number of threads used is configured with
+    the ``batch_threads`` option of the ``stor`` settings.
+
+    Args:
+        paths (List[path|str]): The paths to check.
+
+    Returns:
+        dict: A mapping of every path to True if it exists or False otherwise.
+
+    Examples:
+        >>> import stor
+        >>> stor.exists_many(['s3://bucket/dir/a.txt', 's3://bucket/dir/b.txt'])
+        {'s3://bucket/dir/a.txt': True, 's3://bucket/dir/b.txt': False}
+    """
+    from stor import settings
+
+    groups, ungrouped = _group_obs_paths(paths)
+    listed_groups = []
+    for root, group_paths in groups.items():
+        directory_groups, top_level = _group_by_directory(group_paths)
+        ungrouped.extend(top_level)
+        for directory_paths in directory_groups:
+            if len(directory_paths) >= EXISTS_MANY_LISTING_THRESHOLD:
+                listed_groups.append((root, directory_paths))
+            else:
+                ungrouped.extend(directory_paths)
+
+    num_threads = settings.get()['stor']['batch_threads']
+    results = {}
+    for group_results in threaded_imap_unordered(_exists_from_listing, listed_groups,
+                                                 num_threads):
+        results.update(group_results)
+    results.update(threaded_imap_unordered(_exists_item, ungrouped, num_threads))
+    return results
+
+
+def _stat_item(p):
+    from stor import Path
+
+    try:
+        return p, Path(p).stat()
+    except exceptions.NotFoundError:
+        return p, None
+
+
+def _stat_swift_objects(args):
+    container_path, paths = args
+    from stor import Path
+
+    stat_values = container_path._stat_objects([Path(p).resource for p in paths])
+    return {p: stat_values.get(Path(p).resource) for p in paths}
+
+
+def stat_many(paths):
+    """Performs a stat on many paths at once.
+
+    Swift objects are grouped by container and stated with one ``SwiftService``
+    per container. All other paths are stated concurrently with ``stat``. The
+    number of threads used is configured with the ``batch_threads`` option
+    of the ``stor`` settings.
+
+    Unlike `exists_many`, results cannot be answered from listings since the
+    stat of a path contains all of the headers of the object.
+
+    Args:
+        paths (List[path|str]): The OBS paths to stat.
+
+    Returns:
+        dict: A mapping of every path to the results of its ``stat`` or None
+            if the path does not exist.
+
+    Raises:
+        ValueError: A path is not an OBS path.
+    """
+    from stor import settings
+
+    for p in paths:
+        if not is_obs_path(p):
+            raise ValueError('stat_many only supports OBS paths (got %r)' % p)
+
+    groups, ungrouped = _group_obs_paths(paths)
+    swift_groups = []
+    for root, group_paths in groups.items():
+        if is_swift_path(root):
+            swift_groups.append((root, group_paths))
+        else:
+            ungrouped.extend(group_paths)
+
+    num_threads = settings.get()['stor']['batch_threads']
+    results = {}
+    for group_results in threaded_imap_unordered(_stat_swift_objects, swift_groups,
+                                                 num_threads):
+        results.update(group_results)
+    results.update(threaded_imap_unordered(_stat_item, ungrouped, num_threads))
+    return results
+
+
 @contextmanager
 def NamedTemporaryDirectory(suffix='', prefix='tmp', dir=None,
                             change_dir=False):
@@ -582,6 +1127,25 @@ class ClassProperty(property):
         return self.fget.__get__(None, owner)()
 
 
+class CachedProperty(object):
+    """A read-only property that is computed on first access and cached.
+
+    The value is stored in the ``__dict__`` of the instance under the name of
+    the property, so later accesses are plain attribute reads. Only use it for
+    values derived from immutable objects, such as paths.
+    """
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+        self.__name__ = func.__name__
+
+    def __get__(self, obj, owner):
+        if obj is None:
+            return self
+        value = obj.__dict__[self.__name__] = self.func(obj)
+        return value
+
+
 class BaseProgressLogger(object):
     """Base class and methods for logging progress.
 
@@ -595,28 +1159,54 @@ class BaseProgressLogger(object):
                 l.add_result(r)
 
     When the progress logger is instantiated, the message returned
-    from ``get_start_message`` is logged. As results are added, logs
-    are printed at each result interval. For example, if the
-    ``result_interval`` is 3, progress will be logged for every third result
-    added.
+    from ``get_start_message`` is logged. As results and bytes are added,
+    progress is logged at most every ``progress_interval`` seconds (the
+    ``progress_interval`` option of the ``stor`` settings by default). If a
+    ``result_interval`` is given, progress is also logged for every
+    ``result_interval`` results added.
+
+    Bytes are added with ``add_bytes``, which is thread-safe so that it can
+    be used as the callback of transfers. Progress messages include the
+    throughput over the last `stor.progress.THROUGHPUT_WINDOW` seconds and,
+    when ``total_bytes`` or ``total_objects`` is known, the estimated time
+    left. Every progress report is also passed to the callbacks of
+    `stor.progress` as a `stor.progress.Progress`.
 
     When exiting the context manager, the log message from ``get_finish_message``
     is returned.
 
-    To accumulate more results, implement the ``update_progress`` method. For
-    example, to track the amount of bytes tracked so far::
+    To count bytes from results, implement the ``update_progress`` method. For
+    example::
 
         def update_progress(self, result):
-            self.total_bytes += result['bytes']
+            self.add_bytes(result['bytes'])
 
     Any custom results can be printed when implementing ``get_progress_message``.
     """
-    def __init__(self, logger, level=logging.INFO, result_interval=10):
+    #: The name of the operation in progress reports
+    operation = None
+
+    def __init__(self, logger, level=logging.INFO, result_interval=None, total_objects=None,
+                 total_bytes=None, progress_interval=None):
+        from stor import settings
+
         self.logger = logger
         self.level = level
         self.result_interval = result_interval
+        if progress_interval is None:
+            progress_interval = settings.get()['stor']['progress_interval']
+        self.progress_interval = progress_interval
+        self.total_objects = total_objects
+        self.total_bytes = total_bytes
         self.num_results = 0
-        self.start_time = datetime.datetime.utcnow()
+        self.num_bytes = 0
+        self.finished = False
+        self.start_time = time.time()
+        self._last_progress_time = self.start_time
+        self._last_progress_state = (0, 0)
+        self._throughput = progress.ThroughputMeter()
+        self._throughput.add_sample(self.start_time, 0)
+        self._lock = threading.Lock()
 
     def __enter__(self):
         start_msg = self.get_start_message()
@@ -626,18 +1216,48 @@ class BaseProgressLogger(object):
 
     def __exit__(self, exc_type, exc_value, exc_tb):
         if exc_type is None:
+            self.finished = True
             finish_msg = self.get_finish_message()
             if finish_msg:
                 self.logger.log(self.level, finish_msg)
+            progress.notify(self.get_progress())
 
     def get_elapsed_time(self):
-        return datetime.datetime.utcnow() - self.start_time
+        """Returns the time (in seconds) since the logger was created."""
+        return time.time() - self.start_time
 
     def format_time(self, t):
-        time_elapsed = datetime.datetime.utcnow() - self.start_time
-        hours, remainder = divmod(time_elapsed.total_seconds(), 3600)
-        minutes, seconds = divmod(remainder, 60)
-        return '%d:%02d:%02d' % (hours, minutes, seconds)
+        """Formats a time in seconds as ``H:MM:SS``."""
+        return progress.format_duration(t)
+
+    def get_progress(self):
+        """Returns the progress so far.
+
+        Returns:
+            Progress: The progress.
+        """
+        elapsed = self.get_elapsed_time()
+        if self.finished:
+            throughput = self.num_bytes / elapsed if elapsed else 0.0
+        else:
+            throughput = self._throughput.get_rate()
+        return progress.Progress(self.operation, self.num_results, self.total_objects,
+                                 self.num_bytes, self.total_bytes, elapsed, throughput,
+                                 self.get_eta(elapsed, throughput), self.finished)
+
+    def get_eta(self, elapsed, throughput):
+        """Returns the estimated time (in seconds) left, or None if it is unknown.
+
+        The estimate is based on bytes when ``total_bytes`` is known and
+        on the rate of results when only ``total_objects`` is known.
+        """
+        if self.finished:
+            return 0.0
+        if self.total_bytes is not None and throughput:
+            return max(self.total_bytes - self.num_bytes, 0) / throughput
+        if self.total_objects is not None and self.num_results:
+            return max(self.total_objects - self.num_results, 0) * elapsed / self.num_results
+        return None
 
     def get_start_message(self):
         return self.get_progress_message()
@@ -646,19 +1266,60 @@ class BaseProgressLogger(object):
         return self.get_progress_message()
 
     def get_progress_message(self):
-        raise NotImplementedError
+        report = self.get_progress()
+        if report.total_objects is None:
+            objects = '%s' % report.objects
+        else:
+            objects = '%s/%s' % (report.objects, report.total_objects)
+        msg = '%s\t%s\t%0.2f MB\t%0.2f MB/s' % (
+            objects, self.format_time(report.elapsed), report.bytes / (1024 * 1024.0),
+            (report.throughput or 0.0) / (1024 * 1024.0))
+        if report.eta is not None and not report.finished:
+            msg += '\tETA %s' % self.format_time(report.eta)
+        return msg
 
     def update_progress(self, result):
         pass
 
+    def log_progress(self):
+        """Logs the progress message and passes the progress to callbacks."""
+        progress_msg = self.get_progress_message()
+        if progress_msg:  # pragma: no cover
+            self.logger.log(self.level, progress_msg)
+        progress.notify(self.get_progress())
+
+    def _maybe_log_progress(self, force=False):
+        now = time.time()
+        if not force and now - self._last_progress_time < self.progress_interval:
+            return
+        with self._lock:
+            # Another thread may have logged progress since the check
+            if not force and (now - self._last_progress_time < self.progress_interval or
+                              (self.num_results, self.num_bytes) == self._last_progress_state):
+                return
+            self._last_progress_time = now
+            self._last_progress_state = (self.num_results, self.num_bytes)
+            self._throughput.add_sample(now, self.num_bytes)
+        self.log_progress()
+
+    def add_bytes(self, num_bytes):
+        """Adds transferred bytes to the progress logger and logs messages.
+
+        This method is thread-safe and may be used as the callback of
+        boto3 transfers. Messages are logged every ``progress_interval``
+        seconds.
+        """
+        with self._lock:
+            self.num_bytes += num_bytes
+        self._maybe_log_progress()
+
     def add_result(self, result):
         """Adds a result to the progress logger and logs messages.
 
-        Messages are logged every time the ``result_interval`` is met.
+        Messages are logged every ``progress_interval`` seconds and every
+        time the ``result_interval`` is met, if it is set.
         """
         self.num_results += 1
         self.update_progress(result)
-        if self.num_results % self.result_interval == 0:
-            progress_msg = self.get_progress_message()
-            if progress_msg:  # pragma: no cover
-                self.logger.log(self.level, progress_msg)
+        self._maybe_log_progress(force=bool(self.result_interval) and
+                                 self.num_results % self.result_interval == 0)